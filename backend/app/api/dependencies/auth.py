@@ -4,12 +4,22 @@ oauth2_scheme:
 
 get_user_from_token():
     - Depends on retrieval of a token using FastAPI's OAuth2PasswordBearer
-    - Decodes the token and matches it with a user in the database
+    - Keeps this worker's revocation list fresh (a time check, and a small query every
+      REVOCATION_REFRESH_SECONDS); revoked tokens are dropped from the token cache
+    - Syncs the token cache with user changes made through other workers (a time check,
+      and a small query every TOKEN_CACHE_SYNC_SECONDS)
+    - Returns the user straight from the token cache when the token was verified recently
+    - Otherwise decodes the token, rejects it if its jti is revoked (the database is only
+      asked when the Bloom filter says it might be), matches it with a user in the
+      database and caches the result until the cache TTL or the token's exp
     - Returns the user
 
 get_current_active_user():
     - Uses user returned from get_user_from_token and ensures they
       exist and are active
+
+get_current_superuser():
+    - Uses the active user and ensures they are a superuser (403 otherwise)
 """
 # Std Library Imports
 from typing import Optional
@@ -21,8 +31,9 @@ from fastapi.security import OAuth2PasswordBearer
 from app.core.config import SECRET_KEY, API_PREFIX
 from app.models.user import UserInDB
 from app.api.dependencies.database import get_repository
+from app.db.repositories.revocations import RevocationsRepository
 from app.db.repositories.users import UsersRepository
-from app.services import auth_service
+from app.services import auth_service, revocation_list, token_cache
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{API_PREFIX}/users/login/token/")
@@ -31,13 +42,29 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{API_PREFIX}/users/login/token/"
 async def get_user_from_token(
     *,
     token: str = Depends(oauth2_scheme), # Inspects for Authorization header (Bearer + token)
-    user_repo: UsersRepository = Depends(get_repository(UsersRepository))
+    user_repo: UsersRepository = Depends(get_repository(UsersRepository)),
+    revocations_repo: RevocationsRepository = Depends(get_repository(RevocationsRepository))
 ) -> Optional[UserInDB]:
+    await revocation_list.maybe_refresh(revocations_repo)
+    await token_cache.maybe_sync(user_repo)
+
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
     try:
-        username = auth_service.get_username_from_token(token=token, secret_key=str(SECRET_KEY))
-        user = await user_repo.get_user_by_username(username=username)
+        payload = auth_service.get_payload_from_token(token=token, secret_key=str(SECRET_KEY))
+        if await revocation_list.is_revoked(payload.jti, revocations_repo):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked.",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        user = await user_repo.get_user_by_username(username=payload.username)
     except Exception as e:
         raise e
+
+    token_cache.set(token, user=user, username=payload.username, token_exp=payload.exp, jti=payload.jti)
     
     return user
 
@@ -56,4 +83,14 @@ def get_current_active_user(current_user: UserInDB = Depends(get_user_from_token
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def get_current_superuser(current_user: UserInDB = Depends(get_current_active_user)) -> UserInDB:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only superusers can do this."
+        )
+
+    return current_user
@@ -0,0 +1,19 @@
+"""
+ASGI middleware installed on the application in app.api.server.
+
+CompressionMiddleware:
+    - brotli or gzip compression of responses, negotiated with Accept-Encoding
+
+MetricsMiddleware:
+    - Per-route request latency histograms for Prometheus
+
+ProfilingMiddleware:
+    - Traces requests (SQL, timings, stack samples) and keeps the slowest per route
+
+RateLimitMiddleware:
+    - GCRA rate limiting per authenticated user or client IP, with per-route costs
+"""
+from app.api.middleware.compression import CompressionMiddleware
+from app.api.middleware.metrics import MetricsMiddleware
+from app.api.middleware.profiling import ProfilingMiddleware
+from app.api.middleware.rate_limit import RateLimitMiddleware
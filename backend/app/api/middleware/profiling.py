@@ -0,0 +1,43 @@
+"""
+Slow request capture for app.core.profiling.
+
+ProfilingMiddleware:
+    - Opens a RequestTrace for every HTTP request, so the repository queries it runs
+      (and, while the sampler is on, the stacks it was caught in) are filed under it
+    - Hands the finished trace to the slow request recorder with its route name and
+      status; only the slowest PROFILING_SLOW_REQUESTS_PER_ROUTE of each route are kept
+    - Installed only when PROFILING_SLOW_REQUESTS is on
+"""
+# Std Library Imports
+
+# Third Party Imports
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.middleware.metrics import RouteNames
+from app.core.profiling import SlowRequestRecorder, slow_requests
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, recorder: SlowRequestRecorder = slow_requests) -> None:
+        self.app = app
+        self.recorder = recorder
+        self.route_name = RouteNames()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        trace = self.recorder.begin(method=scope["method"], path=scope["path"])
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.recorder.end(trace, route=self.route_name(scope), status=status)
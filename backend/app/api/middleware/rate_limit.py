@@ -0,0 +1,241 @@
+"""
+Request rate limiting with the generic cell rate algorithm (GCRA). A key's whole state
+is one number, its theoretical arrival time (TAT): the moment its bucket would be
+empty again. A request costing n is allowed when TAT + n * interval - burst * interval
+is not in the future, and then moves TAT forward by n * interval. That is a sliding
+window with no per-request bookkeeping and a single read-modify-write per check.
+
+Rate:
+    - Requests per minute and the burst a key may spend at once (both in cost units)
+
+RateLimitBackend:
+    - Interface for the store holding TATs: acquire() checks and charges one key and
+      returns (allowed, seconds until it would be allowed, cost units left)
+
+LocalRateLimitBackend:
+    - In-process dict of TATs; the stand-in for a shared store in tests and single
+      worker deployments. acquire() never awaits, so on the event loop every check is
+      atomic without a lock
+    - Bounded by RATE_LIMIT_MAX_KEYS: full buckets (TAT in the past) are swept first,
+      then the oldest keys, which only forgives them
+    - Limits apply per worker, so with gunicorn each worker allows the full rate
+
+RedisRateLimitBackend:
+    - Shares limits between gunicorn workers and hosts through Redis
+    - The check runs as one Lua script on the server (one round trip, atomic, no
+      WATCH/retry or lock), timed by the Redis clock so hosts need not agree on time
+    - The redis package is optional and only imported when this backend is used
+
+RateLimitMiddleware:
+    - Charges every HTTP request to the authenticated user when the bearer token is
+      valid (looked up in the token cache first, so usually without a JWT decode),
+      otherwise to the client IP (the last X-Forwarded-For entry when
+      RATE_LIMIT_TRUST_FORWARDED is on, else the socket peer)
+    - The cost of a request comes from RATE_LIMIT_ROUTE_COSTS by route name; routes
+      not listed cost 1, a cost of 0 exempts the route and costs are capped at the burst
+    - Rejected requests get a 429 with Retry-After and never reach the application
+
+create_rate_limit_backend():
+    - Builds the backend selected by RATE_LIMIT_BACKEND
+"""
+# Std Library Imports
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Third Party Imports
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import (
+    SECRET_KEY,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_IP_BURST,
+    RATE_LIMIT_IP_PER_MINUTE,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_REDIS_URL,
+    RATE_LIMIT_ROUTE_COSTS,
+    RATE_LIMIT_TRUST_FORWARDED,
+    RATE_LIMIT_USER_BURST,
+    RATE_LIMIT_USER_PER_MINUTE
+)
+from app.services import auth_service, token_cache
+
+# KEYS[1] = key, ARGV = interval, burst, cost; replies {allowed, retry_after, remaining}
+# (fractions are returned as strings since Redis truncates Lua numbers to integers)
+GCRA_SCRIPT = """
+redis.replicate_commands()
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local interval, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+local new_tat = tat + cost * interval
+local allow_at = new_tat - burst * interval
+if allow_at > now then
+    return {0, tostring(allow_at - now), 0}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0', math.floor((now - allow_at) / interval)}
+"""
+
+
+class Rate:
+    def __init__(self, *, per_minute: float, burst: int) -> None:
+        self.per_minute = per_minute
+        self.burst = burst
+        self.interval = 60.0 / per_minute
+
+
+class RateLimitBackend:
+    async def acquire(self, key: str, *, cost: int, interval: float, burst: int) -> Tuple[bool, float, int]:
+        raise NotImplementedError
+
+
+class LocalRateLimitBackend(RateLimitBackend):
+    def __init__(self, *, max_keys: int = RATE_LIMIT_MAX_KEYS, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_keys = max_keys
+        self.clock = clock
+        self.tats: Dict[str, float] = {}
+
+    async def acquire(self, key: str, *, cost: int, interval: float, burst: int) -> Tuple[bool, float, int]:
+        now = self.clock()
+        new_tat = max(self.tats.get(key, now), now) + cost * interval
+        allow_at = new_tat - burst * interval
+        if allow_at > now:
+            return False, allow_at - now, 0
+
+        self.tats[key] = new_tat
+        if len(self.tats) > self.max_keys:
+            self._sweep(now)
+
+        return True, 0.0, int((now - allow_at) / interval)
+
+    def _sweep(self, now: float) -> None:
+        self.tats = {key: tat for key, tat in self.tats.items() if tat > now}
+        # Every key is still active: forget the oldest tenth rather than sweeping on each request
+        if len(self.tats) > self.max_keys:
+            for key in list(self.tats)[:len(self.tats) - int(self.max_keys * 0.9)]:
+                del self.tats[key]
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    def __init__(self, url: str = RATE_LIMIT_REDIS_URL) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package (pip install redis)")
+
+        self.redis = redis.from_url(url)
+        self.script = self.redis.register_script(GCRA_SCRIPT)
+
+    async def acquire(self, key: str, *, cost: int, interval: float, burst: int) -> Tuple[bool, float, int]:
+        allowed, retry_after, remaining = await self.script(keys=[key], args=[interval, burst, cost])
+        return bool(allowed), float(retry_after), int(remaining)
+
+
+def parse_route_costs(entries: Iterable[str]) -> Dict[str, int]:
+    costs = {}
+    for entry in entries:
+        name, _, cost = entry.partition("=")
+        costs[name.strip()] = int(cost)
+
+    return costs
+
+
+def create_rate_limit_backend(kind: str = RATE_LIMIT_BACKEND) -> RateLimitBackend:
+    if kind == "redis":
+        return RedisRateLimitBackend()
+
+    return LocalRateLimitBackend()
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        backend: Optional[RateLimitBackend] = None,
+        user_rate: Rate = Rate(per_minute=RATE_LIMIT_USER_PER_MINUTE, burst=RATE_LIMIT_USER_BURST),
+        ip_rate: Rate = Rate(per_minute=RATE_LIMIT_IP_PER_MINUTE, burst=RATE_LIMIT_IP_BURST),
+        route_costs: Optional[Dict[str, int]] = None,
+        trust_forwarded: bool = RATE_LIMIT_TRUST_FORWARDED
+    ) -> None:
+        self.app = app
+        self.backend = backend if backend is not None else create_rate_limit_backend()
+        self.user_rate = user_rate
+        self.ip_rate = ip_rate
+        self.route_costs = route_costs if route_costs is not None else parse_route_costs(RATE_LIMIT_ROUTE_COSTS)
+        self.trust_forwarded = trust_forwarded
+        # Resolved from the application's routes on the first request
+        self._costed_routes: Optional[List[Tuple[BaseRoute, int]]] = None
+
+    def route_cost(self, scope: Scope) -> int:
+        if self._costed_routes is None:
+            routes = getattr(scope.get("app"), "routes", [])
+            self._costed_routes = [
+                (route, self.route_costs[route.name]) for route in routes
+                if getattr(route, "name", None) in self.route_costs
+            ]
+
+        for route, cost in self._costed_routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return cost
+
+        return 1
+
+    def username(self, token: str) -> Optional[str]:
+        username = token_cache.peek_username(token)
+        if username is not None:
+            return username
+
+        try:
+            return auth_service.get_username_from_token(token=token, secret_key=str(SECRET_KEY))
+        except HTTPException:
+            return None
+
+    def client_ip(self, scope: Scope, forwarded_for: Optional[bytes]) -> str:
+        if self.trust_forwarded and forwarded_for:
+            return forwarded_for.decode("latin-1").rsplit(",", 1)[-1].strip()
+
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def identify(self, scope: Scope) -> Tuple[str, Rate]:
+        authorization = forwarded_for = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value
+            elif name == b"x-forwarded-for":
+                forwarded_for = value
+
+        if authorization is not None:
+            scheme, _, token = authorization.decode("latin-1").partition(" ")
+            username = self.username(token.strip()) if scheme.lower() == "bearer" and token else None
+            if username is not None:
+                return f"ratelimit:user:{username}", self.user_rate
+
+        return f"ratelimit:ip:{self.client_ip(scope, forwarded_for)}", self.ip_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cost = self.route_cost(scope)
+        if cost > 0:
+            key, rate = self.identify(scope)
+            allowed, retry_after, _ = await self.backend.acquire(
+                key, cost=min(cost, rate.burst), interval=rate.interval, burst=rate.burst
+            )
+            if not allowed:
+                response = JSONResponse(
+                    {"detail": "Too many requests."},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,174 @@
+"""
+Binary encodings for the time-series routes (/forecast and /viz), chosen through
+the Accept header so JSON stays the default for browsers and existing clients.
+
+COLUMNS_MEDIA_TYPE (application/vnd.crypto-helms.columns):
+    - Packed little-endian columns behind a small header:
+        b"CHC1" | uint32 header length | JSON header | column bytes
+    - The JSON header holds the response's scalar fields ("meta") and, per column,
+      its name, numpy dtype string ("<f8" or "<i8") and length
+    - The header and every column are padded to 8 bytes so a client can view each
+      column in place (np.frombuffer / Float64Array) without copying
+
+ARROW_MEDIA_TYPE (application/vnd.apache.arrow.stream):
+    - An Arrow IPC stream holding one record batch; meta is stored as schema metadata
+    - Only offered when pyarrow is installed; it is imported on the first Arrow response
+      rather than at startup
+
+negotiate_format():
+    - Picks "columns", "arrow" or "json" from the request's Accept header, honoring q values
+
+encode_columns() / decode_columns():
+    - Build and parse the packed column format
+
+encode_arrow():
+    - Build the Arrow IPC stream
+
+columnar_response():
+    - Response for a negotiated binary format, or None when the client wants JSON
+    - Either way the route's response varies on Accept, so caches keep the formats apart
+
+TimedJSONResponse:
+    - The application's default response class: a JSONResponse that records how long
+      rendering its body took (binary encodings are timed in columnar_response())
+"""
+# Std Library Imports
+import json
+import time
+import struct
+import importlib.util
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Third Party Imports
+import numpy as np
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from app.core.metrics import SERIALIZATION_SECONDS, elapsed_since
+
+COLUMNS_MEDIA_TYPE = "application/vnd.crypto-helms.columns"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+COLUMNS_MAGIC = b"CHC1"
+COLUMN_DTYPES = {"f": "<f8", "i": "<i8", "u": "<i8", "b": "<i8", "M": "<i8"}
+ALIGNMENT = 8
+
+# Arrow is an optional encoding, and pyarrow is slow to import: check for it without loading it
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+def _pad(size: int) -> bytes:
+    return b"\x00" * (-size % ALIGNMENT)
+
+
+def _json_default(value) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _as_column(values) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        values = values.astype("datetime64[s]").astype(np.int64)
+    return np.ascontiguousarray(values, dtype=COLUMN_DTYPES[values.dtype.kind])
+
+
+def negotiate_format(request: Request) -> str:
+    offered = {COLUMNS_MEDIA_TYPE: "columns", "application/json": "json", "*/*": "json"}
+    if ARROW_AVAILABLE:
+        offered[ARROW_MEDIA_TYPE] = "arrow"
+
+    best, best_q = "json", 0.0
+    for part in request.headers.get("accept", "").split(","):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type.lower() in offered and q > best_q:
+            best, best_q = offered[media_type.lower()], q
+
+    return best
+
+
+def encode_columns(meta: dict, columns: Dict[str, np.ndarray]) -> bytes:
+    arrays = {name: _as_column(values) for name, values in columns.items()}
+    header = json.dumps({
+        "meta": meta,
+        "columns": [{"name": name, "dtype": array.dtype.str, "length": len(array)} for name, array in arrays.items()]
+    }, separators=(",", ":"), default=_json_default).encode()
+
+    parts = [COLUMNS_MAGIC, struct.pack("<I", len(header)), header, _pad(len(COLUMNS_MAGIC) + 4 + len(header))]
+    for array in arrays.values():
+        parts.append(array.tobytes())
+        parts.append(_pad(array.nbytes))
+
+    return b"".join(parts)
+
+
+def decode_columns(payload: bytes) -> Tuple[dict, Dict[str, np.ndarray]]:
+    if payload[:4] != COLUMNS_MAGIC:
+        raise ValueError("Not a columns payload.")
+
+    header_size, = struct.unpack_from("<I", payload, 4)
+    header = json.loads(payload[8:8 + header_size])
+    offset = 8 + header_size
+    offset += -offset % ALIGNMENT
+
+    columns = {}
+    for column in header["columns"]:
+        dtype = np.dtype(column["dtype"])
+        columns[column["name"]] = np.frombuffer(payload, dtype=dtype, count=column["length"], offset=offset)
+        offset += dtype.itemsize * column["length"]
+        offset += -offset % ALIGNMENT
+
+    return header["meta"], columns
+
+
+def encode_arrow(meta: dict, columns: Dict[str, np.ndarray]) -> bytes:
+    import pyarrow
+    import pyarrow.ipc
+
+    batch = pyarrow.RecordBatch.from_arrays(
+        [pyarrow.array(_as_column(values)) for values in columns.values()], names=list(columns)
+    )
+    schema = batch.schema.with_metadata({"meta": json.dumps(meta, default=_json_default)})
+
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+
+    return sink.getvalue().to_pybytes()
+
+
+def columnar_response(
+    request: Request, response: Response, meta: dict, columns: Dict[str, np.ndarray]
+) -> Optional[Response]:
+    # `response` is the route's own: its headers end up on the JSON response
+    response.headers["Vary"] = "Accept"
+    response_format = negotiate_format(request)
+    if response_format == "json":
+        return None
+
+    started = time.perf_counter()
+    if response_format == "columns":
+        body, media_type = encode_columns(meta, columns), COLUMNS_MEDIA_TYPE
+    else:
+        body, media_type = encode_arrow(meta, columns), ARROW_MEDIA_TYPE
+    SERIALIZATION_SECONDS.labels(response_format).observe(elapsed_since(started))
+
+    return Response(body, media_type=media_type, headers={"Vary": "Accept"})
+
+
+class TimedJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        body = super().render(content)
+        SERIALIZATION_SECONDS.labels("json").observe(elapsed_since(started))
+        return body
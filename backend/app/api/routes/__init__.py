@@ -1,24 +1,31 @@
 """
-Aggregation of all application routes into a single router. All created routers are imported here and
-added to a single router for access from the app.api.server file.
+All application routers, with the URL prefix and documentation tag of each, for
+app.api.server to include under /api.
 
-router:
-    - Initial instantiation of a router
-    - All routers are aggregated to this router
-    - All routers are given a name (to appear in the URL) and a tag (for documentation)
+routers:
+    - (router, prefix, tag) for every area of the API
+    - The app includes each of them directly: FastAPI rebuilds every route (its
+      dependencies and response model fields) each time a router is included, so an
+      aggregate router in between would add a third build of every route to startup
 """
-from fastapi import APIRouter
-
 # Import routes
 from app.api.routes.dummy import router as dummy_router
 from app.api.routes.forecast import router as forecast_router
+from app.api.routes.health import router as health_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.profiling import router as profiling_router
+from app.api.routes.stream import router as stream_router
 from app.api.routes.viz import router as viz_router
 from app.api.routes.users import router as users_router
 
-# Access all routes with this router
-router = APIRouter()
-
-# Include all routes
-router.include_router(dummy_router, prefix="/dummy", tags=["dummy"])
-router.include_router(forecast_router, prefix="/forecast", tags=["forecast"])
-router.include_router(users_router, prefix="/users", tags=["users"])
\ No newline at end of file
+# Every router with its name (to appear in the URL) and tag (for documentation)
+routers = (
+    (dummy_router, "/dummy", "dummy"),
+    (forecast_router, "/forecast", "forecast"),
+    (viz_router, "/viz", "viz"),
+    (stream_router, "/stream", "stream"),
+    (users_router, "/users", "users"),
+    (health_router, "/health", "health"),
+    (metrics_router, "/metrics", "metrics"),
+    (profiling_router, "/profiling", "profiling")
+)
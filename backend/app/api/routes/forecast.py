@@ -1,12 +1,123 @@
-from fastapi import APIRouter
+"""
+Forecast route generating price predictions.
+
+get_forecast():
+    - Predicts the closes of the next `horizon` candles for a symbol
+    - The newest candles are read from the candles store and handed to the
+      forecast service, which micro-batches concurrent requests into a single
+      model call
+    - 404 when the symbol doesn't have enough stored history to forecast from
+    - Also returns the technical indicators (returns, volatility, SMA/EMA, RSI, MACD,
+      Bollinger bands) of the newest candle, from the forecasting feature engine
+    - Clients sending Accept: application/vnd.crypto-helms.columns (or the Arrow
+      stream type) get open_times (epoch seconds) and predictions in binary form
+    - Lets the model registry check for a newly activated model version in the
+      background (at most every FORECAST_MODEL_REFRESH_SECONDS)
+
+get_forecast_cache_stats():
+    - Hit rate of the forecast cache and the compute time it has saved, and how often
+      this worker's candle windows came from the memory-mapped candle cache
+
+list_forecast_models():
+    - Every registered model version, the one this worker serves and its swap counters
+
+activate_forecast_model():
+    - Superusers only. Loads and warms up a registered version in this worker, marks it
+      active (other workers swap on their next refresh) and swaps it in
+    - 404 for an unregistered version, 400 (and nothing changed) when it fails to load
+"""
+# Std Library Imports
+
+# Third Party Imports
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
+
+from app.api.dependencies.auth import get_current_superuser
+from app.api.dependencies.database import get_repository
+from app.api.responses import columnar_response
+from app.core.config import FORECAST_MAX_HORIZON
+from app.db.repositories.candles import CandlesRepository
+from app.db.repositories.forecast_models import ForecastModelsRepository
+from app.models.candle import CandleInterval
+from app.models.forecast import ForecastModelPublic, ForecastModelsPublic, ForecastPublic
+from app.services import candle_cache, forecast_service, model_registry
 
 # Instantiate router
 router = APIRouter()
 
 # Forecast router to generate predictions and return to user.
-@router.get("/forecast")
-async def forecast():
-    # Retrieve user's input.
-    # Send input to SageMaker endpoint.
-    # Return estimator prediction.
-    return {"Endpoint:": "/forecast"}
+@router.get("/", response_model=ForecastPublic, name="forecast:get-forecast")
+async def get_forecast(
+    request: Request,
+    response: Response,
+    symbol: str = Query(..., regex="^[A-Za-z0-9]+-[A-Za-z0-9]+$"),
+    interval: CandleInterval = CandleInterval.one_hour,
+    horizon: int = Query(24, ge=1, le=FORECAST_MAX_HORIZON),
+    candles_repo: CandlesRepository = Depends(get_repository(CandlesRepository)),
+    models_repo: ForecastModelsRepository = Depends(get_repository(ForecastModelsRepository))
+) -> ForecastPublic:
+    model_registry.maybe_refresh(models_repo)
+    forecast = await forecast_service.forecast(
+        candles_repo=candles_repo, symbol=symbol.upper(), interval=interval, horizon=horizon
+    )
+
+    if not forecast:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail="Not enough price history to forecast this symbol."
+        )
+
+    binary_response = columnar_response(
+        request,
+        response,
+        forecast.dict(exclude={"open_times", "predictions"}),
+        {
+            "open_times": np.array([open_time.timestamp() for open_time in forecast.open_times], dtype=np.int64),
+            "predictions": np.asarray(forecast.predictions, dtype=np.float64)
+        }
+    )
+
+    return binary_response or forecast
+
+@router.get("/cache/stats/", name="forecast:cache-stats")
+async def get_forecast_cache_stats() -> dict:
+    return {**forecast_service.cache.stats(), "candle_cache": candle_cache.stats()}
+
+@router.get("/models/", response_model=ForecastModelsPublic, name="forecast:list-models")
+async def list_forecast_models(
+    models_repo: ForecastModelsRepository = Depends(get_repository(ForecastModelsRepository))
+) -> ForecastModelsPublic:
+    engine = forecast_service.engine
+    return ForecastModelsPublic(
+        serving={"name": engine.name, "version": engine.version},
+        registry=model_registry.stats(),
+        models=[ForecastModelPublic(**model.dict()) for model in await models_repo.list_models()]
+    )
+
+@router.post(
+    "/models/{model_name}/{version}/activate/",
+    response_model=ForecastModelPublic,
+    name="forecast:activate-model",
+    dependencies=[Depends(get_current_superuser)]
+)
+async def activate_forecast_model(
+    model_name: str,
+    version: str,
+    models_repo: ForecastModelsRepository = Depends(get_repository(ForecastModelsRepository))
+) -> ForecastModelPublic:
+    model = await models_repo.get_model(name=model_name, version=version)
+    if not model:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="No forecast model with that name and version.")
+
+    try:
+        engine = await model_registry.prepare(model)
+    except (OSError, ValueError, TypeError) as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=f"The model failed to load: {e}")
+
+    model = await models_repo.activate_model(name=model_name, version=version)
+    model_registry.swap(model, engine)
+
+    return ForecastModelPublic(**model.dict())
@@ -0,0 +1,41 @@
+"""
+Health checks used by load balancers and orchestrators.
+
+liveness():
+    - The process is up and serving requests
+
+readiness():
+    - The database answers a round trip
+    - Reports the connection pool's size, idle connections and saturation
+    - Returns 503 when the database can't be reached so traffic is routed elsewhere
+"""
+# Std Library Imports
+
+# Third Party Imports
+from fastapi import APIRouter, Depends
+from databases import Database
+from starlette.responses import JSONResponse
+from starlette.status import HTTP_200_OK, HTTP_503_SERVICE_UNAVAILABLE
+
+from app.api.dependencies.database import get_database
+from app.db.tasks import get_pool_stats
+
+
+router = APIRouter()
+
+
+@router.get("/live/", name="health:liveness")
+async def liveness() -> dict:
+    return {"status": "ok"}
+
+@router.get("/ready/", name="health:readiness")
+async def readiness(db: Database = Depends(get_database)) -> JSONResponse:
+    try:
+        await db.execute("SELECT 1")
+    except Exception as e:
+        return JSONResponse(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "detail": str(e)}
+        )
+
+    return JSONResponse(status_code=HTTP_200_OK, content={"status": "ok", "pool": get_pool_stats(db)})
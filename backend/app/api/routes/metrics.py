@@ -0,0 +1,24 @@
+"""
+Prometheus scrape endpoint.
+
+get_metrics():
+    - Request latency by route, query time by SQL constant, pool wait, bcrypt time and
+      serialization time in the Prometheus text format
+    - Summed over every gunicorn worker when PROMETHEUS_MULTIPROC_DIR is set
+"""
+# Std Library Imports
+
+# Third Party Imports
+from fastapi import APIRouter
+from starlette.responses import Response
+
+from app.core.metrics import render_metrics
+
+
+router = APIRouter()
+
+
+@router.get("/", name="metrics:get-metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
@@ -0,0 +1,64 @@
+"""
+Superuser-only controls for this worker's profiler (app.core.profiling). Under gunicorn a
+request reaches one worker, so the results are that worker's; `kill -USR2 <pid>`
+(PROFILING_SIGNAL) toggles a chosen worker and writes its profile to PROFILING_OUTPUT_DIR.
+
+start_profiler():
+    - Starts the sampling profiler (optionally at a different sampling interval),
+      discarding the previous profile
+
+stop_profiler():
+    - Stops sampling; the profile stays available until the next start
+
+get_profile():
+    - The samples so far in the collapsed stack format (flamegraph.pl, speedscope)
+
+get_slow_requests():
+    - The slowest requests kept per route with their SQL, timings and stack samples
+    - Empty unless PROFILING_SLOW_REQUESTS is on
+
+clear_slow_requests():
+    - Forgets the kept slow requests
+"""
+# Std Library Imports
+from typing import Optional
+
+# Third Party Imports
+from fastapi import APIRouter, Depends, Query
+from starlette.responses import PlainTextResponse, Response
+from starlette.status import HTTP_204_NO_CONTENT
+
+from app.api.dependencies.auth import get_current_superuser
+from app.core.profiling import profiler, slow_requests
+
+
+router = APIRouter()
+
+
+@router.post("/start/", name="profiling:start", dependencies=[Depends(get_current_superuser)])
+async def start_profiler(interval_ms: Optional[float] = Query(None, ge=0.5, le=1000)) -> dict:
+    profiler.start(interval_ms=interval_ms)
+    return profiler.stats()
+
+@router.post("/stop/", name="profiling:stop", dependencies=[Depends(get_current_superuser)])
+async def stop_profiler() -> dict:
+    profiler.stop()
+    return profiler.stats()
+
+@router.get("/profile/", name="profiling:get-profile", dependencies=[Depends(get_current_superuser)])
+async def get_profile() -> PlainTextResponse:
+    return PlainTextResponse(profiler.collapsed())
+
+@router.get("/slow-requests/", name="profiling:get-slow-requests", dependencies=[Depends(get_current_superuser)])
+async def get_slow_requests() -> dict:
+    return slow_requests.slowest()
+
+@router.delete(
+    "/slow-requests/",
+    status_code=HTTP_204_NO_CONTENT,
+    name="profiling:clear-slow-requests",
+    dependencies=[Depends(get_current_superuser)]
+)
+async def clear_slow_requests() -> Response:
+    slow_requests.clear()
+    return Response(status_code=HTTP_204_NO_CONTENT)
@@ -0,0 +1,122 @@
+"""
+Real-time candle and forecast updates over a WebSocket, so dashboards don't poll
+/forecast and /viz.
+
+stream():
+    - Authenticated like every other route through get_user_from_token (token cache,
+      revocation list, user lookup), with the token in the Authorization header or,
+      for browsers (which can't set headers on a WebSocket), the `token` query
+      parameter. Without a valid token of an active user the handshake is refused
+      (close code 1008)
+    - Clients send commands as JSON:
+        {"action": "subscribe", "symbols": ["BTC-USD", "ETH-USD"], "interval": "1h"}
+        {"action": "unsubscribe", "symbols": ["ETH-USD"], "interval": "1h"}
+    - They receive {"type": "candle" | "forecast" | "error", "symbol", "interval", "data"}:
+      the newest candle whenever it changes and the forecast after every new candle
+      (the latest of each straight after subscribing)
+    - Updates come from the worker's stream hub (one feed per subscribed symbol, shared
+      by every client). A slow client's queue keeps only the newest message per
+      subscription and type; a client that stops reading for STREAM_SEND_TIMEOUT is
+      disconnected (close code 1013)
+
+get_stream_stats():
+    - Clients, subscriptions and feeds of this worker, and messages sent, coalesced
+      and dropped
+"""
+# Std Library Imports
+import asyncio
+from typing import Optional
+
+# Third Party Imports
+from fastapi import APIRouter, HTTPException
+from fastapi.security.utils import get_authorization_scheme_param
+from pydantic import ValidationError
+from starlette.status import WS_1008_POLICY_VIOLATION, WS_1013_TRY_AGAIN_LATER
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.api.dependencies.auth import get_user_from_token
+from app.db.repositories.revocations import RevocationsRepository
+from app.db.repositories.users import UsersRepository
+from app.models.stream import StreamAction, StreamCommand, StreamMessage, StreamMessageType
+from app.models.user import UserInDB
+from app.services import stream_hub
+from app.services.streaming import StreamClient
+
+# Instantiate router
+router = APIRouter()
+
+
+async def authenticate(websocket: WebSocket) -> Optional[UserInDB]:
+    scheme, token = get_authorization_scheme_param(websocket.headers.get("Authorization"))
+    if scheme.lower() != "bearer":
+        token = websocket.query_params.get("token")
+    if not token:
+        return None
+
+    db = websocket.app.state._db
+    try:
+        user = await get_user_from_token(
+            token=token, user_repo=UsersRepository(db), revocations_repo=RevocationsRepository(db)
+        )
+    except HTTPException:
+        return None
+
+    return user if user and user.is_active else None
+
+
+def error(detail: str) -> str:
+    return StreamMessage(type=StreamMessageType.error, data={"detail": detail}).json()
+
+
+async def receive_commands(websocket: WebSocket, client: StreamClient) -> None:
+    while True:
+        try:
+            command = StreamCommand(**await websocket.receive_json())
+        except WebSocketDisconnect:
+            return
+        except (ValueError, TypeError) as e:
+            detail = str(e) if isinstance(e, ValidationError) else "Commands must be JSON objects."
+            client.offer((StreamMessageType.error.value,), error(detail))
+            continue
+
+        for symbol in command.symbols:
+            if command.action == StreamAction.unsubscribe:
+                stream_hub.unsubscribe(client, symbol=symbol, interval=command.interval)
+            elif not stream_hub.subscribe(client, symbol=symbol, interval=command.interval):
+                client.offer(
+                    (StreamMessageType.error.value,),
+                    error(f"At most {stream_hub.max_subscriptions} subscriptions per connection.")
+                )
+                break
+
+
+@router.websocket("/", name="stream:updates")
+async def stream(websocket: WebSocket) -> None:
+    if await authenticate(websocket) is None:
+        await websocket.close(code=WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    client = StreamClient(websocket.send_text)
+    stream_hub.add(client)
+    receiver = asyncio.ensure_future(receive_commands(websocket, client))
+    sender = asyncio.ensure_future(client.run())
+
+    try:
+        done, _ = await asyncio.wait({receiver, sender}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stream_hub.remove(client)
+        receiver.cancel()
+        sender.cancel()
+
+    if sender in done:
+        # The client stopped reading (or the connection broke while sending)
+        if isinstance(sender.exception(), asyncio.TimeoutError):
+            await websocket.close(code=WS_1013_TRY_AGAIN_LATER)
+    elif receiver.exception() is not None:
+        raise receiver.exception()
+
+
+@router.get("/stats/", name="stream:stats")
+async def get_stream_stats() -> dict:
+    return stream_hub.stats()
@@ -15,31 +15,65 @@ register_new_user():
       converts the UserInDB (returned from register_new_user) to a UserPublic object
     - The return value is also converted to the appropriate JSON response object.
 
+get_currently_authenticated_user():
+    - Returns the user behind the bearer token
+    - The user came from our own database, so it is mapped onto UserPublic with
+      from_trusted() (which only copies UserPublic's fields, so password and salt
+      never leave) and returned as JSON directly instead of being re-validated
+      against the response model on every call
+
 user_login_with_email_and_password():
     - Calls on our authenticate_user function from the user repository to ensure
       that the user is correct
     - An access token is then created for the user and sent back to the owner
+
+logout():
+    - Revokes the access token the request was made with; it is refused from then
+      on, by every worker within REVOCATION_REFRESH_SECONDS
+
+revoke_token():
+    - Superusers only
+    - Revokes any access token we signed (e.g. one reported leaked), even if it
+      belongs to another user
+
+bulk_import_users():
+    - Superusers only
+    - Streams an NDJSON or CSV upload (format from ?format= or the Content-Type)
+      through the UserImporter: rows are validated like a signup, hashed in parallel
+      and written with COPY in chunks, so memory stays flat whatever the file size
+    - Returns counts of created, skipped and invalid rows plus rows/second
+
+bulk_export_users():
+    - Superusers only
+    - Streams every user as NDJSON or CSV straight from a server-side cursor
 """
 # Std Library Imports
+from datetime import datetime, timezone
+from typing import Optional
 
 # Third Party Imports
-from fastapi import Depends, APIRouter, HTTPException, Path, Body
+from fastapi import Depends, APIRouter, HTTPException, Body, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
 from starlette.status import (
-  HTTP_200_OK,
   HTTP_201_CREATED,
+  HTTP_204_NO_CONTENT,
   HTTP_400_BAD_REQUEST,
-  HTTP_401_UNAUTHORIZED,
-  HTTP_404_NOT_FOUND,
-  HTTP_422_UNPROCESSABLE_ENTITY
+  HTTP_401_UNAUTHORIZED
 )
 
-from app.api.dependencies.auth import get_current_active_user
+from app.api.dependencies.auth import get_current_active_user, get_current_superuser, oauth2_scheme
 from app.api.dependencies.database import get_repository
-from app.models.user import UserCreate, UserPublic, UserInDB, UserUpdate
+from app.api.responses import TimedJSONResponse
+from app.models.user import UserCreate, UserPublic, UserInDB, UserBulkFormat, UserBulkImportResult
+from app.core.config import SECRET_KEY
+from app.db.repositories.revocations import RevocationsRepository
 from app.db.repositories.users import UsersRepository
-from app.models.token import AccessToken
-from app.services import auth_service
+from app.models.token import AccessToken, JWTPayload, TokenRevocation
+from app.services import auth_service, revocation_list
+from app.services.bulk_users import UserImporter, export_users
 
 
 router = APIRouter()
@@ -47,7 +81,7 @@ router = APIRouter()
 
 @router.get("/me/", response_model=UserPublic, name="users:get-current-user")
 async def get_currently_authenticated_user(current_user: UserInDB = Depends(get_current_active_user)) -> UserPublic:
-    return current_user
+    return TimedJSONResponse(jsonable_encoder(UserPublic.from_trusted(current_user.__dict__)))
 
 @router.post("/login/token/", response_model=AccessToken, name="users:login-email-and-password")
 async def user_login_with_email_and_password(
@@ -78,4 +112,63 @@ async def register_new_user(
       access_token=auth_service.create_access_token_for_user(user=created_user), token_type="bearer"
     )
 
-    return UserPublic(**created_user.dict(), access_token=access_token)
\ No newline at end of file
+    return UserPublic(**created_user.dict(), access_token=access_token)
+
+async def revoke_payload(payload: JWTPayload, revocations_repo: RevocationsRepository) -> None:
+    if not payload.jti:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="This token predates revocation support.")
+
+    await revocation_list.revoke(
+        jti=payload.jti,
+        username=payload.username,
+        expires_at=datetime.fromtimestamp(payload.exp, tz=timezone.utc),
+        revocations_repo=revocations_repo
+    )
+
+@router.post("/logout/", status_code=HTTP_204_NO_CONTENT, name="users:logout")
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: UserInDB = Depends(get_current_active_user),
+    revocations_repo: RevocationsRepository = Depends(get_repository(RevocationsRepository))
+) -> Response:
+    payload = auth_service.get_payload_from_token(token=token, secret_key=str(SECRET_KEY))
+    await revoke_payload(payload, revocations_repo)
+
+    return Response(status_code=HTTP_204_NO_CONTENT)
+
+@router.post("/tokens/revoke/", status_code=HTTP_204_NO_CONTENT, name="users:revoke-token")
+async def revoke_token(
+    revocation: TokenRevocation = Body(..., embed=True),
+    superuser: UserInDB = Depends(get_current_superuser),
+    revocations_repo: RevocationsRepository = Depends(get_repository(RevocationsRepository))
+) -> Response:
+    payload = auth_service.get_payload_from_token(token=revocation.token, secret_key=str(SECRET_KEY))
+    await revoke_payload(payload, revocations_repo)
+
+    return Response(status_code=HTTP_204_NO_CONTENT)
+
+@router.post("/bulk/import/", response_model=UserBulkImportResult, name="users:bulk-import")
+async def bulk_import_users(
+    request: Request,
+    bulk_format: Optional[UserBulkFormat] = Query(None, alias="format"),
+    superuser: UserInDB = Depends(get_current_superuser),
+    user_repo: UsersRepository = Depends(get_repository(UsersRepository))
+) -> UserBulkImportResult:
+    if bulk_format is None:
+        is_csv = request.headers.get("content-type", "").startswith("text/csv")
+        bulk_format = UserBulkFormat.csv if is_csv else UserBulkFormat.ndjson
+
+    importer = UserImporter(users_repo=user_repo, auth_service=auth_service)
+
+    return await importer.run(request.stream(), bulk_format)
+
+@router.get("/bulk/export/", name="users:bulk-export")
+async def bulk_export_users(
+    bulk_format: UserBulkFormat = Query(UserBulkFormat.ndjson, alias="format"),
+    superuser: UserInDB = Depends(get_current_superuser),
+    user_repo: UsersRepository = Depends(get_repository(UsersRepository))
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_users(users_repo=user_repo, bulk_format=bulk_format),
+        media_type="text/csv" if bulk_format == UserBulkFormat.csv else "application/x-ndjson"
+    )
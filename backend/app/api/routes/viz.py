@@ -1,10 +1,103 @@
-from fastapi import APIRouter
+"""
+Visualization route serving chart-ready price series.
+
+get_chart_series():
+    - Never ships more points than the chart has room for: the target point count
+      comes from the requested pixel width (one point per pixel for line charts,
+      one candle per VIZ_CANDLE_PIXELS pixels for candle charts)
+    - Reads the coarsest pre-aggregated resolution (1d/1h/5m rollups or 1m
+      candles) that still has enough points for the range
+    - 1m ranges (recent, short charts) are sliced out of the memory-mapped candle
+      cache when it reaches back far enough and its newest candle is the stored
+      newest one; everything else is read from Postgres
+    - Line charts are downsampled with LTTB; candle charts are re-bucketed into
+      wider OHLC candles
+    - 404 when the symbol has no candles in the range
+    - Clients sending Accept: application/vnd.crypto-helms.columns (or the Arrow
+      stream type) get the columns in binary form, skipping JSON serialization
+"""
+# Std Library Imports
+from datetime import datetime, timezone
+from typing import Optional
+
+# Third Party Imports
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.status import HTTP_404_NOT_FOUND, HTTP_422_UNPROCESSABLE_ENTITY
+
+from app.api.dependencies.database import get_repository
+from app.api.responses import columnar_response
+from app.core.config import VIZ_CANDLE_PIXELS, VIZ_DEFAULT_WIDTH, VIZ_MAX_WIDTH
+from app.db.repositories.candles import CandlesRepository, ROLLUP_INTERVALS
+from app.models.viz import VizChartType, VizSeries
+from app.services import candle_cache
+from app.services.downsampling import choose_resolution, lttb, rebucket_ohlc
 
 # Instantiate router
 router = APIRouter()
 
 # Create visualizations endpoint
-@router.get("/viz")
-async def viz():
-    # Endpoint used for any visualizations
-    return {"Endpoint:": "/viz"}
\ No newline at end of file
+@router.get("/", response_model=VizSeries, name="viz:get-chart-series")
+async def get_chart_series(
+    request: Request,
+    response: Response,
+    symbol: str = Query(..., regex="^[A-Za-z0-9]+-[A-Za-z0-9]+$"),
+    start: datetime = Query(...),
+    end: Optional[datetime] = None,
+    width: int = Query(VIZ_DEFAULT_WIDTH, ge=10, le=VIZ_MAX_WIDTH),
+    chart: VizChartType = VizChartType.line,
+    candles_repo: CandlesRepository = Depends(get_repository(CandlesRepository))
+) -> VizSeries:
+    start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    end = end or datetime.now(timezone.utc)
+    end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+    if end <= start:
+        raise HTTPException(status_code=HTTP_422_UNPROCESSABLE_ENTITY, detail="end must be after start.")
+
+    points = width if chart == VizChartType.line else max(1, width // VIZ_CANDLE_PIXELS)
+    resolution = choose_resolution((end - start).total_seconds(), points)
+    series = None
+    if candle_cache.enabled and resolution not in ROLLUP_INTERVALS:
+        last_open_time = await candles_repo.get_latest_open_time(symbol=symbol.upper(), interval=resolution)
+        if last_open_time is not None:
+            series = candle_cache.series(
+                symbol=symbol.upper(), interval=resolution, start=start, end=end, last_open_time=last_open_time
+            )
+    if series is None:
+        series = await candles_repo.get_series(symbol=symbol.upper(), interval=resolution, start=start, end=end)
+
+    source_points = len(series["open_times"])
+    if not source_points:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="No price history for this symbol and range.")
+
+    if chart == VizChartType.line:
+        timestamps, values = lttb(series["open_times"], series["close"], points)
+        columns = {"values": values}
+    else:
+        candles = rebucket_ohlc(
+            series["open_times"], series["open"], series["high"], series["low"], series["close"], series["volume"],
+            points
+        )
+        timestamps = candles.pop("open_times")
+        columns = candles
+
+    meta = {
+        "symbol": symbol.upper(),
+        "chart": chart.value,
+        "resolution": resolution,
+        "width": width,
+        "source_points": source_points,
+        "points": len(timestamps)
+    }
+    timestamps = timestamps.astype("int64")
+
+    binary_response = columnar_response(request, response, meta, {"timestamps": timestamps, **columns})
+    if binary_response is not None:
+        return binary_response
+
+    return VizSeries(
+        **meta,
+        timestamps=timestamps.tolist(),
+        **{name: values.tolist() for name, values in columns.items()}
+    )
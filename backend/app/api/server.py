@@ -7,19 +7,27 @@ get_application():
     - Factory function that instantiates a FastAPI app with given metadata
     - Adds middleware for app to communicate with other resources like HTTP
       and databases, etc. (more than what's provided from an OS)
+    - Compresses responses with brotli or gzip as negotiated by Accept-Encoding
+    - Rate limits requests per user or client IP (skipped while the test suite runs)
+    - Records request latency per route for the Prometheus /api/metrics/ endpoint, and
+      times JSON rendering through the default response class
+    - Optionally keeps traces of the slowest requests per route (PROFILING_SLOW_REQUESTS)
     - Event handlers perform operations at startup and shutdown of the app
-    - Includes a single router (one that has already aggregated the rest of the routers)
-      to give the app access to all API endpoints
+    - Includes every area's router under /api directly (routing an area's endpoints
+      through an aggregate router first would build each route once more at startup);
+      the OpenAPI schema is only generated when /openapi.json or /docs is first asked for
 """
 # Std Library Imports
+import os
 
 # Third Party Imports
-import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core import config, tasks
-from app.api.routes import router as api_router
+from app.api.middleware import CompressionMiddleware, MetricsMiddleware, ProfilingMiddleware, RateLimitMiddleware
+from app.api.responses import TimedJSONResponse
+from app.api.routes import routers
 
 
 # Create application
@@ -28,9 +36,14 @@ def get_application():
     app = FastAPI(
         title = config.PROJECT_NAME,
         description = "Production web application for cryptocurrency time-series predictions.",
-        version = config.VERSION
+        version = config.VERSION,
+        default_response_class = TimedJSONResponse
     )
 
+    # Reject clients over their rate limit (innermost, so 429s still get CORS headers)
+    if config.RATE_LIMIT_ENABLED and not os.environ.get("TESTING"):
+        app.add_middleware(RateLimitMiddleware)
+
     # Include middleware to handle requests from other origins (IP addresses, ports, etc.)
     app.add_middleware(
         CORSMiddleware,
@@ -40,12 +53,23 @@ def get_application():
         allow_headers=["*"]
     )
 
+    # Compress responses (brotli or gzip, whichever the client accepts)
+    app.add_middleware(CompressionMiddleware)
+
+    # Trace requests to keep the slowest per route
+    if config.PROFILING_SLOW_REQUESTS:
+        app.add_middleware(ProfilingMiddleware)
+
+    # Time requests (outermost, so the latency includes every other middleware)
+    app.add_middleware(MetricsMiddleware)
+
     # Include event handlers (functions executed on starting and closing of application)
     app.add_event_handler("startup", tasks.create_start_app_handler(app))
     app.add_event_handler("shutdown", tasks.create_stop_app_handler(app))
 
     # All api routes sent to app
-    app.include_router(api_router, prefix="/api")
+    for router, prefix, tag in routers:
+        app.include_router(router, prefix=f"/api{prefix}", tags=[tag])
 
     return app
 
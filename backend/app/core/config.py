@@ -11,7 +11,7 @@ referenced all across the application.
 # Third Party Imports
 from databases import DatabaseURL
 from starlette.config import Config
-from starlette.datastructures import Secret
+from starlette.datastructures import CommaSeparatedStrings, Secret
 
 # Config allows you to specify a file in which to search for environment variables
 config = Config(".env")
@@ -24,7 +24,7 @@ API_PREFIX="/api"
 
 # Auth
 SECRET_KEY = config("SECRET_KEY", cast=Secret)
-JWT_ALGORITHM = config("JWT_ALGORITHM", cast=str, defualt="HS256")
+JWT_ALGORITHM = config("JWT_ALGORITHM", cast=str, default="HS256")
 JWT_AUDIENCE = config("JWT_AUDIENCE", cast=str, default="cryptohelms:auth")
 JWT_TOKEN_PREFIX = config("JWT_TOKEN_PREFIX", cast=str, default="Bearer")
 ACCESS_TOKEN_EXPIRE_MINUTES = config(
@@ -32,6 +32,23 @@ ACCESS_TOKEN_EXPIRE_MINUTES = config(
     cast=int,
     default=7 * 24 * 60 # one week
 )
+# Password hashing runs on a bounded worker pool so bcrypt never blocks the event loop
+AUTH_HASH_WORKERS = config("AUTH_HASH_WORKERS", cast=int, default=4)
+AUTH_HASH_MAX_QUEUE = config("AUTH_HASH_MAX_QUEUE", cast=int, default=64)
+AUTH_HASH_RETRY_AFTER = config("AUTH_HASH_RETRY_AFTER", cast=int, default=1) # seconds
+AUTH_HASH_EXECUTOR = config("AUTH_HASH_EXECUTOR", cast=str, default="thread") # "thread" or "process"
+# Verified token cache (0 entries disables it)
+TOKEN_CACHE_MAX_ENTRIES = config("TOKEN_CACHE_MAX_ENTRIES", cast=int, default=10000)
+TOKEN_CACHE_TTL_SECONDS = config("TOKEN_CACHE_TTL_SECONDS", cast=int, default=300)
+TOKEN_CACHE_SYNC_SECONDS = config("TOKEN_CACHE_SYNC_SECONDS", cast=float, default=5.0) # how stale other workers' user changes may be
+# Token revocation: each worker keeps a Bloom filter of revoked jtis and refreshes it from the table
+REVOCATION_BLOOM_CAPACITY = config("REVOCATION_BLOOM_CAPACITY", cast=int, default=100000)
+REVOCATION_BLOOM_ERROR_RATE = config("REVOCATION_BLOOM_ERROR_RATE", cast=float, default=0.001)
+REVOCATION_REFRESH_SECONDS = config("REVOCATION_REFRESH_SECONDS", cast=float, default=5.0)
+# Bulk user import/export (superusers only)
+USERS_IMPORT_CHUNK_SIZE = config("USERS_IMPORT_CHUNK_SIZE", cast=int, default=500) # rows hashed and copied at a time
+USERS_IMPORT_MAX_ERRORS = config("USERS_IMPORT_MAX_ERRORS", cast=int, default=100) # invalid rows reported back
+USERS_EXPORT_PREFETCH = config("USERS_EXPORT_PREFETCH", cast=int, default=1000) # rows per cursor fetch
 
 # Database
 RDS_USER = config("RDS_USER", cast=str)
@@ -47,6 +64,124 @@ DATABASE_URL = config(
     default=f"postgres://{RDS_USER}:{RDS_PASSWORD}@{RDS_NETLOC}:{RDS_PORT}"
 )
 
+# Connection pool (per worker, capped so all workers together stay within DB_CONNECTION_BUDGET)
+DB_MIN_POOL_SIZE = config("DB_MIN_POOL_SIZE", cast=int, default=2)
+DB_MAX_POOL_SIZE = config("DB_MAX_POOL_SIZE", cast=int, default=10)
+DB_CONNECTION_BUDGET = config("DB_CONNECTION_BUDGET", cast=int, default=40) # total across all workers
+DB_ACQUIRE_TIMEOUT = config("DB_ACQUIRE_TIMEOUT", cast=float, default=5.0) # seconds
+DB_STATEMENT_TIMEOUT = config("DB_STATEMENT_TIMEOUT", cast=int, default=30000) # milliseconds
+DB_MAX_QUERIES = config("DB_MAX_QUERIES", cast=int, default=50000) # recycle a connection after this many queries
+DB_MAX_INACTIVE_CONNECTION_LIFETIME = config("DB_MAX_INACTIVE_CONNECTION_LIFETIME", cast=float, default=300.0)
+DB_PREPARED_STATEMENTS = config("DB_PREPARED_STATEMENTS", cast=bool, default=True) # run registered repository queries as prepared statements
+DB_STATEMENT_CACHE_SIZE = config("DB_STATEMENT_CACHE_SIZE", cast=int, default=100) # prepared statements kept per connection
+
+# Server (gunicorn_conf.py; the worker count also splits DB_CONNECTION_BUDGET between the workers' pools)
+WEB_CONCURRENCY = config("WEB_CONCURRENCY", cast=int, default=0) # 0: sized from the available CPUs (app.core.workers.worker_count())
+WEB_WORKERS_PER_CPU = config("WEB_WORKERS_PER_CPU", cast=float, default=1.0)
+WEB_MAX_WORKERS = config("WEB_MAX_WORKERS", cast=int, default=0) # 0: no cap
+WEB_WORKER_CLASS = config("WEB_WORKER_CLASS", cast=str, default="uvicorn.workers.UvicornWorker")
+PORT = config("PORT", cast=int, default=8000) # set by Heroku
+WEB_KEEPALIVE = config("WEB_KEEPALIVE", cast=int, default=5) # seconds an idle keep-alive connection stays open
+WEB_TIMEOUT = config("WEB_TIMEOUT", cast=int, default=60) # seconds a silent worker lives before it is restarted
+WEB_GRACEFUL_TIMEOUT = config("WEB_GRACEFUL_TIMEOUT", cast=int, default=30) # seconds a stopping worker gets to drain
+WEB_SHUTDOWN_TIMEOUT = config("WEB_SHUTDOWN_TIMEOUT", cast=float, default=10.0) # of which the shutdown handler may take
+
+# Market data ingestion
+INGEST_MAX_PARALLEL_SYMBOLS = config("INGEST_MAX_PARALLEL_SYMBOLS", cast=int, default=8)
+INGEST_BATCH_SIZE = config("INGEST_BATCH_SIZE", cast=int, default=5000) # candles buffered per symbol before a write
+INGEST_HTTP_MAX_CONNECTIONS = config("INGEST_HTTP_MAX_CONNECTIONS", cast=int, default=20)
+INGEST_HTTP_TIMEOUT = config("INGEST_HTTP_TIMEOUT", cast=float, default=10.0) # seconds
+INGEST_POLL_SECONDS = config("INGEST_POLL_SECONDS", cast=float, default=30.0)
+INGEST_MAX_BACKOFF_SECONDS = config("INGEST_MAX_BACKOFF_SECONDS", cast=float, default=600.0) # longest wait after failed polls
+CRYPTOCOMPARE_API_KEY = config("CRYPTOCOMPARE_API_KEY", cast=Secret, default="")
+BRAVENEWCOIN_API_KEY = config("BRAVENEWCOIN_API_KEY", cast=Secret, default="")
+
+# Candle cache: a memory-mapped ring file per (symbol, interval), kept current by ingestion and read by every worker
+CANDLE_CACHE_ENABLED = config("CANDLE_CACHE_ENABLED", cast=bool, default=False)
+CANDLE_CACHE_DIR = config("CANDLE_CACHE_DIR", cast=str, default="/dev/shm/crypto-helms-candles") # shared by ingestion and the API workers
+CANDLE_CACHE_CAPACITY = config("CANDLE_CACHE_CAPACITY", cast=int, default=4096) # newest candles kept per (symbol, interval), at least FORECAST_WINDOW
+
+# Forecasting
+FORECAST_ENGINE = config("FORECAST_ENGINE", cast=str, default="local") # "local" or "remote"
+FORECAST_REMOTE_URL = config("FORECAST_REMOTE_URL", cast=str, default="http://localhost:8080/invocations")
+FORECAST_REMOTE_TIMEOUT = config("FORECAST_REMOTE_TIMEOUT", cast=float, default=5.0) # seconds
+FORECAST_WINDOW = config("FORECAST_WINDOW", cast=int, default=256) # candles of history fed to the model
+FORECAST_MIN_HISTORY = config("FORECAST_MIN_HISTORY", cast=int, default=32)
+FORECAST_MAX_HORIZON = config("FORECAST_MAX_HORIZON", cast=int, default=168)
+FORECAST_BATCH_MAX_SIZE = config("FORECAST_BATCH_MAX_SIZE", cast=int, default=64)
+FORECAST_BATCH_WAIT_MS = config("FORECAST_BATCH_WAIT_MS", cast=float, default=5.0)
+FORECAST_CACHE_MAX_ENTRIES = config("FORECAST_CACHE_MAX_ENTRIES", cast=int, default=10000)
+FORECAST_CACHE_BACKEND = config("FORECAST_CACHE_BACKEND", cast=str, default="local") # "local" or "redis"
+FORECAST_CACHE_REDIS_URL = config("FORECAST_CACHE_REDIS_URL", cast=str, default="redis://localhost:6379/0")
+FORECAST_CACHE_TTL_SECONDS = config("FORECAST_CACHE_TTL_SECONDS", cast=int, default=24 * 60 * 60)
+FORECAST_MODEL_DIR = config("FORECAST_MODEL_DIR", cast=str, default="models") # registered model artifacts (forecast_models.artifact is relative to it)
+FORECAST_MODEL_REFRESH_SECONDS = config("FORECAST_MODEL_REFRESH_SECONDS", cast=float, default=30.0) # how often a worker checks for a newly activated model
+FORECAST_MODEL_WARMUP_BATCHES = config("FORECAST_MODEL_WARMUP_BATCHES", cast=int, default=3) # synthetic batches a new model runs before it serves
+FORECAST_FEATURE_STATES = config("FORECAST_FEATURE_STATES", cast=int, default=1000) # (symbol, interval) indicator states kept for incremental updates
+
+# Technical indicator features (app.services.forecasting.features)
+FEATURE_WINDOW = config("FEATURE_WINDOW", cast=int, default=20) # candles in the SMA, Bollinger band and volatility windows
+FEATURE_EMA_SPAN = config("FEATURE_EMA_SPAN", cast=int, default=20)
+FEATURE_RSI_PERIOD = config("FEATURE_RSI_PERIOD", cast=int, default=14)
+FEATURE_MACD_FAST = config("FEATURE_MACD_FAST", cast=int, default=12)
+FEATURE_MACD_SLOW = config("FEATURE_MACD_SLOW", cast=int, default=26)
+FEATURE_MACD_SIGNAL = config("FEATURE_MACD_SIGNAL", cast=int, default=9)
+FEATURE_BOLLINGER_STDDEVS = config("FEATURE_BOLLINGER_STDDEVS", cast=float, default=2.0)
+
+# Backtesting (python -m app.services.forecasting.backtesting)
+BACKTEST_FOLDS = config("BACKTEST_FOLDS", cast=int, default=5) # walk-forward folds per symbol
+BACKTEST_HORIZON = config("BACKTEST_HORIZON", cast=int, default=24) # candles forecast from every origin
+BACKTEST_STEP = config("BACKTEST_STEP", cast=int, default=24) # candles between forecast origins
+BACKTEST_WORKERS = config("BACKTEST_WORKERS", cast=int, default=0) # processes (0: one per available CPU)
+BACKTEST_SHARED_DIR = config("BACKTEST_SHARED_DIR", cast=str, default="/dev/shm") # where the shared candle file goes
+
+# Charts
+VIZ_DEFAULT_WIDTH = config("VIZ_DEFAULT_WIDTH", cast=int, default=1000) # pixels
+VIZ_MAX_WIDTH = config("VIZ_MAX_WIDTH", cast=int, default=4000)
+VIZ_CANDLE_PIXELS = config("VIZ_CANDLE_PIXELS", cast=int, default=6) # pixels per drawn candle
+
+# Streaming (/api/stream/ WebSocket; every worker polls each subscribed (symbol, interval) once for all its clients)
+STREAM_POLL_SECONDS = config("STREAM_POLL_SECONDS", cast=float, default=1.0) # how often a subscribed (symbol, interval) is checked for a new candle
+STREAM_FORECAST_HORIZON = config("STREAM_FORECAST_HORIZON", cast=int, default=24) # candles forecast with every new candle
+STREAM_CLIENT_QUEUE_SIZE = config("STREAM_CLIENT_QUEUE_SIZE", cast=int, default=64) # unsent messages per client (a newer one for the same subscription replaces the older)
+STREAM_MAX_SUBSCRIPTIONS = config("STREAM_MAX_SUBSCRIPTIONS", cast=int, default=32) # (symbol, interval) pairs per client
+STREAM_SEND_TIMEOUT = config("STREAM_SEND_TIMEOUT", cast=float, default=10.0) # seconds a client may take to accept one message before it is disconnected
+
+# Responses
+RESPONSE_COMPRESSION_MIN_SIZE = config("RESPONSE_COMPRESSION_MIN_SIZE", cast=int, default=1024)
+RESPONSE_GZIP_LEVEL = config("RESPONSE_GZIP_LEVEL", cast=int, default=6)
+RESPONSE_BROTLI_QUALITY = config("RESPONSE_BROTLI_QUALITY", cast=int, default=5)
+
+# Rate limiting (GCRA: authenticated requests are limited per user, anonymous ones per client IP)
+RATE_LIMIT_ENABLED = config("RATE_LIMIT_ENABLED", cast=bool, default=True)
+RATE_LIMIT_BACKEND = config("RATE_LIMIT_BACKEND", cast=str, default="local") # "local" (per worker) or "redis" (shared)
+RATE_LIMIT_REDIS_URL = config("RATE_LIMIT_REDIS_URL", cast=str, default="redis://localhost:6379/1")
+RATE_LIMIT_USER_PER_MINUTE = config("RATE_LIMIT_USER_PER_MINUTE", cast=float, default=600)
+RATE_LIMIT_USER_BURST = config("RATE_LIMIT_USER_BURST", cast=int, default=120)
+RATE_LIMIT_IP_PER_MINUTE = config("RATE_LIMIT_IP_PER_MINUTE", cast=float, default=300)
+RATE_LIMIT_IP_BURST = config("RATE_LIMIT_IP_BURST", cast=int, default=60)
+# route name=cost in requests (0 exempts a route; routes not listed cost 1)
+RATE_LIMIT_ROUTE_COSTS = config(
+    "RATE_LIMIT_ROUTE_COSTS",
+    cast=CommaSeparatedStrings,
+    default=(
+        "users:login-email-and-password=10,users:register-new-user=10,users:bulk-import=60,"
+        "forecast:get-forecast=5,health:liveness=0,health:readiness=0,metrics:get-metrics=0"
+    )
+)
+RATE_LIMIT_TRUST_FORWARDED = config("RATE_LIMIT_TRUST_FORWARDED", cast=bool, default=False) # behind a proxy that sets X-Forwarded-For
+RATE_LIMIT_MAX_KEYS = config("RATE_LIMIT_MAX_KEYS", cast=int, default=100000) # local backend
+
+# Profiling (per worker; the sampler stays off until started from /api/profiling/ or with PROFILING_SIGNAL)
+PROFILING_SAMPLE_INTERVAL_MS = config("PROFILING_SAMPLE_INTERVAL_MS", cast=float, default=5.0)
+PROFILING_MAX_STACKS = config("PROFILING_MAX_STACKS", cast=int, default=10000) # distinct stacks kept per profile
+PROFILING_SIGNAL = config("PROFILING_SIGNAL", cast=str, default="SIGUSR2") # toggles the sampler ("" to disable)
+PROFILING_OUTPUT_DIR = config("PROFILING_OUTPUT_DIR", cast=str, default="/tmp") # where signal-triggered profiles go
+PROFILING_SLOW_REQUESTS = config("PROFILING_SLOW_REQUESTS", cast=bool, default=False) # trace the slowest requests per route
+PROFILING_SLOW_REQUESTS_PER_ROUTE = config("PROFILING_SLOW_REQUESTS_PER_ROUTE", cast=int, default=10)
+PROFILING_SLOW_REQUEST_MS = config("PROFILING_SLOW_REQUEST_MS", cast=float, default=100.0)
+PROFILING_MAX_QUERIES_PER_REQUEST = config("PROFILING_MAX_QUERIES_PER_REQUEST", cast=int, default=100)
+
 # AWS
 AWS_ACCESS_KEY = config("AWS_ACCESS_KEY", cast=str)
 AWS_SECRET_ACCESS_KEY = config("AWS_SECRET_ACCESS_KEY", cast=str)
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Prometheus metrics recorded across the application and rendered for /api/metrics/.
+
+Single process (uvicorn) the metrics live in the default registry. Under gunicorn every
+worker is its own process, so set PROMETHEUS_MULTIPROC_DIR to an empty directory before
+the workers start: prometheus_client then keeps each worker's values in memory-mapped
+files there and a scrape of any worker sums them all (a scrape is never answered from
+one worker's counters alone).
+
+REQUEST_SECONDS:
+    - Latency of every HTTP request by method, route name and status code
+
+DB_QUERY_SECONDS:
+    - Time spent in each repository query, labelled with the name of its SQL constant
+
+DB_POOL_WAIT_SECONDS:
+    - Time requests waited for a connection from the pool
+
+PASSWORD_HASH_SECONDS:
+    - bcrypt hashing and verification, including the wait for a pool worker
+
+SERIALIZATION_SECONDS:
+    - Rendering response bodies (JSON, packed columns or Arrow)
+
+elapsed_since():
+    - Seconds since a time.perf_counter() reading
+
+render_metrics():
+    - The text exposition of the current registry (aggregated over workers when
+      running multi-process) and its content type
+
+mark_process_dead():
+    - Drops a dead worker's live values; call it from gunicorn's child_exit hook
+"""
+# Std Library Imports
+import os
+import time
+from typing import Tuple
+
+# Third Party Imports
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir")
+
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, float("inf"))
+HASH_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0, float("inf"))
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"]
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Repository query time by SQL constant",
+    ["query"],
+    buckets=FAST_BUCKETS
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    buckets=FAST_BUCKETS
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hashing and verification time, including the wait for a pool worker",
+    ["operation"],
+    buckets=HASH_BUCKETS
+)
+SERIALIZATION_SECONDS = Histogram(
+    "response_serialization_seconds",
+    "Time spent rendering response bodies",
+    ["format"],
+    buckets=FAST_BUCKETS
+)
+
+
+def elapsed_since(started: float) -> float:
+    return time.perf_counter() - started
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,309 @@
+"""
+Opt-in, per-worker profiling: a statistical sampling profiler and a recorder of the
+slowest requests per route. Both live in each worker process, so under gunicorn every
+worker is profiled (and asked for its results) separately.
+
+SamplingProfiler:
+    - Off by default; while off nothing runs
+    - start() launches a daemon thread that every `interval` seconds reads the event
+      loop thread's current stack from sys._current_frames() and counts it, so the
+      profiled code is never instrumented or slowed down beyond the GIL hand-off
+    - Stacks are kept in the collapsed ("folded") format, root first and one
+      "frame;frame;frame count" line per distinct stack, which flamegraph.pl and
+      speedscope read directly; at most `max_stacks` distinct stacks are kept and
+      the rest are counted as dropped
+    - Each sample is also offered to the slow request recorder, which files it under
+      the request whose task was running at the time
+    - toggle() is what PROFILING_SIGNAL does: start, or stop and write the profile to
+      PROFILING_OUTPUT_DIR/profile-<pid>-<time>.folded
+
+RequestTrace:
+    - One request's route, timing, status, SQL statements (constant name, text and
+      duration; at most PROFILING_MAX_QUERIES_PER_REQUEST) and stack samples
+
+SlowRequestRecorder:
+    - begin() / end() bracket a request (ProfilingMiddleware calls them); while it
+      runs, record_query() files every repository query under it through a context
+      variable, which costs one lookup when no request is being traced
+    - Keeps the PROFILING_SLOW_REQUESTS_PER_ROUTE slowest requests of each route that
+      took at least PROFILING_SLOW_REQUEST_MS, in a fixed size heap per route (the
+      fastest kept trace is the one replaced)
+    - slowest(): the kept traces per route, slowest first
+
+install_signal_handler():
+    - Lets `kill -<PROFILING_SIGNAL> <worker pid>` toggle that worker's profiler
+
+profiler, slow_requests:
+    - This worker's instances
+"""
+# Std Library Imports
+import os
+import sys
+import time
+import heapq
+import signal
+import asyncio
+import itertools
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+# Third Party Imports
+
+from app.core.config import (
+    PROFILING_MAX_QUERIES_PER_REQUEST,
+    PROFILING_MAX_STACKS,
+    PROFILING_OUTPUT_DIR,
+    PROFILING_SAMPLE_INTERVAL_MS,
+    PROFILING_SIGNAL,
+    PROFILING_SLOW_REQUEST_MS,
+    PROFILING_SLOW_REQUESTS_PER_ROUTE
+)
+
+# Stack samples kept per request trace
+MAX_SAMPLES_PER_REQUEST = 1000
+
+current_trace: "ContextVar[Optional[RequestTrace]]" = ContextVar("current_trace", default=None)
+
+
+def _frame_label(code: Any, labels: Dict[Any, str]) -> str:
+    label = labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        for prefix in sorted(sys.path, key=len, reverse=True):
+            if prefix and filename.startswith(prefix):
+                filename = filename[len(prefix):].lstrip(os.sep)
+                break
+        label = labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+    return label
+
+
+class RequestTrace:
+    def __init__(self, *, method: str, path: str) -> None:
+        self.method = method
+        self.path = path
+        self.route = "unmatched"
+        self.status = 500
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        # (constant name, statement, seconds); statements are only turned into text when read
+        self.queries: List[Tuple[str, Any, float]] = []
+        self.dropped_queries = 0
+        self.samples: Counter = Counter()
+
+    def add_query(self, name: str, sql: Any, seconds: float) -> None:
+        if len(self.queries) < PROFILING_MAX_QUERIES_PER_REQUEST:
+            self.queries.append((name, sql, seconds))
+        else:
+            self.dropped_queries += 1
+
+    def add_sample(self, stack: str) -> None:
+        if stack in self.samples or len(self.samples) < MAX_SAMPLES_PER_REQUEST:
+            self.samples[stack] += 1
+
+    def dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "query_ms": round(sum(seconds for _, _, seconds in self.queries) * 1000, 3),
+            "queries": [
+                {"name": name, "sql": " ".join(str(sql).split()), "duration_ms": round(seconds * 1000, 3)}
+                for name, sql, seconds in self.queries
+            ],
+            "dropped_queries": self.dropped_queries,
+            "samples": [f"{stack} {count}" for stack, count in self.samples.most_common()]
+        }
+
+
+class SlowRequestRecorder:
+    def __init__(
+        self,
+        *,
+        per_route: int = PROFILING_SLOW_REQUESTS_PER_ROUTE,
+        threshold_ms: float = PROFILING_SLOW_REQUEST_MS
+    ) -> None:
+        self.per_route = per_route
+        self.threshold = threshold_ms / 1000
+        # route -> heap of (duration, sequence, trace); the fastest kept trace is on top
+        self._slowest: Dict[str, List[Tuple[float, int, RequestTrace]]] = {}
+        # task -> the trace of the request it is serving, for the sampler thread
+        self._active: Dict[asyncio.Task, RequestTrace] = {}
+        self._sequence = itertools.count()
+
+    def begin(self, *, method: str, path: str) -> RequestTrace:
+        trace = RequestTrace(method=method, path=path)
+        current_trace.set(trace)
+        task = asyncio.current_task()
+        if task is not None:
+            self._active[task] = trace
+
+        return trace
+
+    def end(self, trace: RequestTrace, *, route: str, status: int) -> None:
+        trace.duration = time.perf_counter() - trace.started
+        trace.route = route
+        trace.status = status
+        current_trace.set(None)
+        task = asyncio.current_task()
+        if task is not None:
+            self._active.pop(task, None)
+
+        if trace.duration < self.threshold:
+            return
+
+        heap = self._slowest.setdefault(route, [])
+        entry = (trace.duration, next(self._sequence), trace)
+        if len(heap) < self.per_route:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def add_sample(self, task: Optional[asyncio.Task], stack: str) -> None:
+        trace = self._active.get(task) if task is not None else None
+        if trace is not None:
+            trace.add_sample(stack)
+
+    def slowest(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            route: [trace.dict() for _, _, trace in sorted(heap, reverse=True)]
+            for route, heap in sorted(self._slowest.items())
+        }
+
+    def clear(self) -> None:
+        self._slowest.clear()
+
+
+def record_query(name: str, sql: Any, seconds: float) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add_query(name, sql, seconds)
+
+
+class SamplingProfiler:
+    def __init__(
+        self,
+        *,
+        interval_ms: float = PROFILING_SAMPLE_INTERVAL_MS,
+        max_stacks: int = PROFILING_MAX_STACKS,
+        recorder: Optional[SlowRequestRecorder] = None
+    ) -> None:
+        self.interval = interval_ms / 1000
+        self.max_stacks = max_stacks
+        self.recorder = recorder
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.dropped = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._labels: Dict[Any, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._target: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, *, interval_ms: Optional[float] = None) -> None:
+        if self.running:
+            return
+        if interval_ms is not None:
+            self.interval = interval_ms / 1000
+
+        # Called from the event loop thread (a route or the signal handler): sample that thread
+        self._target = threading.get_ident()
+        try:
+            self._loop = asyncio.get_event_loop()
+        except RuntimeError:
+            self._loop = None
+        self.stacks = Counter()
+        self.samples = self.dropped = 0
+        self.started_at, self.stopped_at = time.time(), None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.stopped_at = time.time()
+
+    def toggle(self) -> Optional[str]:
+        if not self.running:
+            self.start()
+            return None
+
+        self.stop()
+        path = os.path.join(PROFILING_OUTPUT_DIR, f"profile-{os.getpid()}-{int(time.time())}.folded")
+        with open(path, "w") as profile:
+            profile.write(self.collapsed())
+
+        return path
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        frame = sys._current_frames().get(self._target)
+        if frame is None:
+            return
+
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame.f_code, self._labels))
+            frame = frame.f_back
+        stack = ";".join(reversed(labels))
+
+        self.samples += 1
+        if stack in self.stacks or len(self.stacks) < self.max_stacks:
+            self.stacks[stack] += 1
+        else:
+            self.dropped += 1
+
+        if self.recorder is not None and self._loop is not None:
+            self.recorder.add_sample(asyncio.current_task(self._loop), stack)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "dropped": self.dropped,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at
+        }
+
+
+def install_signal_handler(profiler: "SamplingProfiler", name: str = PROFILING_SIGNAL) -> bool:
+    signum = getattr(signal, name, None) if name else None
+    if signum is None:
+        return False
+
+    try:
+        asyncio.get_event_loop().add_signal_handler(signum, profiler.toggle)
+    except (NotImplementedError, RuntimeError, ValueError):
+        # Not on the main thread or not a Unix event loop (e.g. the test client)
+        return False
+
+    return True
+
+
+slow_requests = SlowRequestRecorder()
+profiler = SamplingProfiler(recorder=slow_requests)
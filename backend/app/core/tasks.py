@@ -2,12 +2,21 @@
 
 create_start_app_handler():
     - Used in startup event handler in app.api.server
-    - Connects to our database
+    - Connects to our database (under gunicorn in each worker, after it was forked)
+    - Lets PROFILING_SIGNAL toggle this worker's sampling profiler
+    - Lets the stream hub start the feeds of /stream subscriptions
     - Returns function to be executed on startup
 
 create_stop_app_handler():
     - Used in shutdown event handler in app.api.server
-    - Closes the database connection
+    - Runs once the server has stopped accepting connections and the requests in flight
+      have finished (under gunicorn, within WEB_GRACEFUL_TIMEOUT of the worker being told
+      to stop), and releases what they used in order:
+    - Stops the sampling profiler if it is running
+    - Stops the stream hub's feeds (they query the database)
+    - Shuts down the password hashing pool, waiting (off the event loop) for hashes
+      still running
+    - Closes the database connection last
     - Returns function to be executed on shutdown
 """
 # Std Library Imports
@@ -16,18 +25,25 @@ from typing import Callable
 # Third Party Imports
 from fastapi import FastAPI
 
+from app.core.profiling import install_signal_handler, profiler
 from app.db.tasks import connect_to_db, close_db_connection
+from app.services import auth_service, stream_hub
 
 # Returns a function that is called when app is started
 def create_start_app_handler(app: FastAPI) -> Callable:
     async def start_app() -> None:
         await connect_to_db(app)
+        install_signal_handler(profiler)
+        stream_hub.start(app.state._db)
     
     return start_app
 
 # Returns a function that is called when app is terminated
 def create_stop_app_handler(app: FastAPI) -> Callable:
     async def stop_app() -> None:
+        profiler.stop()
+        await stream_hub.stop()
+        await auth_service.hashing_pool.async_shutdown()
         await close_db_connection(app)
 
     return stop_app
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+The process model for running the API under gunicorn (gunicorn_conf.py). Workers share
+nothing but the listening socket: each one has its own event loop, database pool,
+caches (verified tokens, revocation filter, forecasts), local rate limiter, profiler
+and metrics files. The app is imported once in the master and forked, so its code and
+module level objects are shared copy-on-write; everything that holds a connection is
+created by the startup handler, which runs in each worker after the fork.
+
+available_cpus():
+    - CPUs this process may run on: the scheduler affinity mask, further capped by a
+      cgroup CPU quota (a container limited to 1.5 CPUs gets 2)
+
+worker_count():
+    - WEB_CONCURRENCY when set, otherwise WEB_WORKERS_PER_CPU workers per available
+      CPU, at most WEB_MAX_WORKERS and never more than DB_CONNECTION_BUDGET (every
+      worker needs a connection)
+
+configure_workers():
+    - Settles the worker count before the app is imported and publishes it as
+      WEB_CONCURRENCY for the workers (get_pool_size() divides the connection budget
+      by worker_count(), so it agrees with the count gunicorn started)
+
+prepare_metrics_dir():
+    - Points PROMETHEUS_MULTIPROC_DIR at a directory for the workers' metric files (a
+      fresh temporary one unless it is set); must run before prometheus_client is imported
+
+clear_metrics_dir():
+    - Removes the metric files a previous master left behind
+"""
+# Std Library Imports
+import os
+import glob
+import math
+import tempfile
+from typing import Optional
+
+# Third Party Imports
+
+from app.core import config
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as cgroup_file:
+            return cgroup_file.read().strip()
+    except OSError:
+        return None
+
+
+# CPUs allowed by the cgroup quota (v2 cpu.max, else v1 cfs quota), None when unlimited
+def cgroup_cpu_limit(root: str = CGROUP_ROOT) -> Optional[float]:
+    cpu_max = _read(os.path.join(root, "cpu.max"))
+    if cpu_max is not None:
+        quota, _, period = cpu_max.partition(" ")
+        return None if quota == "max" else int(quota) / int(period or 100000)
+
+    quota = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us"))
+    period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us"))
+    if quota is None or period is None or int(quota) <= 0:
+        return None
+
+    return int(quota) / int(period)
+
+
+def available_cpus(cgroup_root: str = CGROUP_ROOT) -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - macOS
+        cpus = os.cpu_count() or 1
+
+    limit = cgroup_cpu_limit(cgroup_root)
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+
+    return max(1, cpus)
+
+
+def worker_count(cpus: Optional[int] = None) -> int:
+    if config.WEB_CONCURRENCY > 0:
+        return config.WEB_CONCURRENCY
+
+    cpus = available_cpus() if cpus is None else cpus
+    workers = max(1, math.ceil(cpus * config.WEB_WORKERS_PER_CPU))
+    if config.WEB_MAX_WORKERS > 0:
+        workers = min(workers, config.WEB_MAX_WORKERS)
+
+    return max(1, min(workers, config.DB_CONNECTION_BUDGET))
+
+
+def configure_workers() -> int:
+    workers = worker_count()
+    config.WEB_CONCURRENCY = workers
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+    return workers
+
+
+def prepare_metrics_dir() -> str:
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir")
+    if not path:
+        path = tempfile.mkdtemp(prefix="prometheus-")
+    os.makedirs(path, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+
+    return path
+
+
+def clear_metrics_dir(path: str) -> int:
+    stale = glob.glob(os.path.join(path, "*.db"))
+    for metrics_file in stale:
+        os.remove(metrics_file)
+
+    return len(stale)
@@ -0,0 +1,39 @@
+"""
+The databases Postgres backend with a bounded, timed wait for pool connections.
+databases acquires connections without a timeout, so a saturated pool would queue
+requests indefinitely.
+
+TimedPostgresConnection:
+    - Acquires with DB_ACQUIRE_TIMEOUT (asyncio.TimeoutError once it runs out) and
+      records the wait, whether or not it succeeded, in DB_POOL_WAIT_SECONDS
+
+TimedPostgresBackend:
+    - The backend handing out TimedPostgresConnections; selected by
+      app.db.tasks.PooledDatabase for postgres URLs (by import path, so asyncpg is only
+      imported once a database is created)
+"""
+# Std Library Imports
+import time
+
+# Third Party Imports
+from databases.backends.postgres import PostgresBackend, PostgresConnection
+
+from app.core import config
+from app.core.metrics import DB_POOL_WAIT_SECONDS, elapsed_since
+
+
+class TimedPostgresConnection(PostgresConnection):
+    async def acquire(self) -> None:
+        assert self._connection is None, "Connection is already acquired"
+        assert self._database._pool is not None, "DatabaseBackend is not running"
+
+        started = time.perf_counter()
+        try:
+            self._connection = await self._database._pool.acquire(timeout=config.DB_ACQUIRE_TIMEOUT)
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(elapsed_since(started))
+
+
+class TimedPostgresBackend(PostgresBackend):
+    def connection(self) -> TimedPostgresConnection:
+        return TimedPostgresConnection(self, self._dialect)
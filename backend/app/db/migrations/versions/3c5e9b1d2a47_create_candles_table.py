@@ -0,0 +1,86 @@
+"""create_candles_table
+Revision ID: 3c5e9b1d2a47
+Revises: 7410eb7efa12
+Create Date: 2026-10-18 10:12:31.402113
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = '3c5e9b1d2a47'
+down_revision = '7410eb7efa12'
+branch_labels = None
+depends_on = None
+
+
+def create_candles_table() -> None:
+    # Range partitioned on open_time so old months can be detached/dropped cheaply
+    # and time-bounded reads only touch the partitions they need.
+    # Prices and volume are float8 rather than NUMERIC: fixed width and far cheaper to scan.
+    op.execute(
+        """
+        CREATE TABLE candles (
+            symbol      TEXT NOT NULL,
+            "interval"  TEXT NOT NULL,
+            open_time   TIMESTAMPTZ NOT NULL,
+            open        DOUBLE PRECISION NOT NULL,
+            high        DOUBLE PRECISION NOT NULL,
+            low         DOUBLE PRECISION NOT NULL,
+            close       DOUBLE PRECISION NOT NULL,
+            volume      DOUBLE PRECISION NOT NULL DEFAULT 0,
+            PRIMARY KEY (symbol, "interval", open_time)
+        ) PARTITION BY RANGE (open_time);
+        """
+    )
+    # No DEFAULT partition: once it held rows for a month, creating that month's
+    # partition would fail. Loads call CandlesRepository.ensure_partitions() first.
+
+
+def create_partition_function() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION create_candles_partition(month_start TIMESTAMPTZ)
+            RETURNS VOID AS
+        $$
+        DECLARE
+            -- UTC months with explicit UTC bounds, whatever the session's TimeZone
+            partition_start TIMESTAMP := date_trunc('month', month_start AT TIME ZONE 'UTC');
+            partition_name TEXT := 'candles_' || to_char(partition_start, 'YYYY_MM');
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF candles FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                partition_start::TEXT || '+00',
+                (partition_start + INTERVAL '1 month')::TEXT || '+00'
+            );
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+
+
+def create_initial_partitions() -> None:
+    # One partition per month from the start of 2017 (earliest exchange history we
+    # backfill) through the end of next year; CandlesRepository adds more on demand
+    op.execute(
+        """
+        SELECT create_candles_partition(month AT TIME ZONE 'UTC')
+        FROM generate_series(
+            TIMESTAMP '2017-01-01',
+            date_trunc('year', now() AT TIME ZONE 'UTC') + INTERVAL '2 years' - INTERVAL '1 month',
+            INTERVAL '1 month'
+        ) AS month;
+        """
+    )
+
+
+def upgrade() -> None:
+    create_candles_table()
+    create_partition_function()
+    create_initial_partitions()
+
+    
+def downgrade() -> None:
+    op.drop_table("candles")
+    op.execute("DROP FUNCTION create_candles_partition")
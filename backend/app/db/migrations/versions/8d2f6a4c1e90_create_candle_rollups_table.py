@@ -0,0 +1,65 @@
+"""create_candle_rollups_table
+Revision ID: 8d2f6a4c1e90
+Revises: 3c5e9b1d2a47
+Create Date: 2026-10-18 14:03:52.118734
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = '8d2f6a4c1e90'
+down_revision = '3c5e9b1d2a47'
+branch_labels = None
+depends_on = None
+
+
+def create_candle_rollups_table() -> None:
+    # Coarser candles (5m/1h/1d) aggregated from the stored candles so long chart
+    # ranges are served from a few thousand rows instead of millions
+    op.execute(
+        """
+        CREATE TABLE candle_rollups (
+            symbol      TEXT NOT NULL,
+            "interval"  TEXT NOT NULL,
+            open_time   TIMESTAMPTZ NOT NULL,
+            open        DOUBLE PRECISION NOT NULL,
+            high        DOUBLE PRECISION NOT NULL,
+            low         DOUBLE PRECISION NOT NULL,
+            close       DOUBLE PRECISION NOT NULL,
+            volume      DOUBLE PRECISION NOT NULL DEFAULT 0,
+            PRIMARY KEY (symbol, "interval", open_time)
+        );
+        """
+    )
+
+
+def backfill_candle_rollups() -> None:
+    # Roll up anything ingested before this migration; later candles are rolled up as they arrive
+    for rollup, step in (("5m", 5 * 60), ("1h", 60 * 60), ("1d", 24 * 60 * 60)):
+        op.execute(
+            f"""
+            INSERT INTO candle_rollups (symbol, "interval", open_time, open, high, low, close, volume)
+            SELECT symbol, '{rollup}', bucket,
+                (array_agg(open ORDER BY open_time))[1],
+                max(high),
+                min(low),
+                (array_agg(close ORDER BY open_time DESC))[1],
+                sum(volume)
+            FROM (
+                SELECT *, to_timestamp(floor(extract(epoch FROM open_time) / {step}) * {step}) AS bucket
+                FROM candles
+                WHERE "interval" = '1m'
+            ) AS source_candles
+            GROUP BY symbol, bucket;
+            """
+        )
+
+
+def upgrade() -> None:
+    create_candle_rollups_table()
+    backfill_candle_rollups()
+
+    
+def downgrade() -> None:
+    op.drop_table("candle_rollups")
@@ -0,0 +1,36 @@
+"""create_revoked_tokens_table
+Revision ID: b7e3c1f05d92
+Revises: 8d2f6a4c1e90
+Create Date: 2026-10-18 16:21:07.402915
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'b7e3c1f05d92'
+down_revision = '8d2f6a4c1e90'
+branch_labels = None
+depends_on = None
+
+
+def create_revoked_tokens_table() -> None:
+    # One row per revoked access token (by its jti claim). Rows are only needed until
+    # the token would have expired anyway, so expires_at is indexed for pruning and
+    # revoked_at for the incremental refresh of each worker's Bloom filter
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("jti", sa.Text, primary_key=True),
+        sa.Column("username", sa.Text, nullable=False),
+        sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False, index=True),
+        sa.Column("revoked_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False, index=True)
+    )
+
+
+def upgrade() -> None:
+    create_revoked_tokens_table()
+
+
+def downgrade() -> None:
+    op.drop_table("revoked_tokens")
@@ -0,0 +1,47 @@
+"""create_forecast_models_table
+Revision ID: e4a9c2d7f318
+Revises: b7e3c1f05d92
+Create Date: 2026-10-18 19:02:41.118204
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'e4a9c2d7f318'
+down_revision = 'b7e3c1f05d92'
+branch_labels = None
+depends_on = None
+
+
+def create_forecast_models_table() -> None:
+    # One row per registered forecast model version. The artifact itself is a file under
+    # FORECAST_MODEL_DIR (artifact is its path relative to it) checked against sha256
+    # when loaded. At most one version is active: the partial unique index allows a
+    # single is_active row, and the API workers poll for it
+    op.create_table(
+        "forecast_models",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.Text, nullable=False),
+        sa.Column("version", sa.Text, nullable=False),
+        sa.Column("engine", sa.Text, nullable=False),
+        sa.Column("artifact", sa.Text, nullable=False),
+        sa.Column("sha256", sa.Text, nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("activated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("name", "version")
+    )
+    op.create_index(
+        "ix_forecast_models_active", "forecast_models", ["is_active"],
+        unique=True, postgresql_where=sa.text("is_active")
+    )
+
+
+def upgrade() -> None:
+    create_forecast_models_table()
+
+
+def downgrade() -> None:
+    op.drop_table("forecast_models")
@@ -0,0 +1,23 @@
+"""index_users_updated_at
+Revision ID: f1c3a8e5b260
+Revises: e4a9c2d7f318
+Create Date: 2026-10-18 18:04:52.119307
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = 'f1c3a8e5b260'
+down_revision = 'e4a9c2d7f318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Every worker's token cache asks for the users updated since its last sync
+    op.create_index("ix_users_updated_at", "users", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_updated_at", table_name="users")
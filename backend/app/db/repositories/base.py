@@ -3,15 +3,150 @@ These repositories serve as an abstraction layer over all of our database
 operations. This enables us to split database functionality from the overall
 application functionality (if one fails, the whole thing won't come crashing down).
 
+PreparedQuery:
+    - One of a repository's SQL constants, converted once from :named parameters to
+      the driver's positional $n parameters (the same conversion databases redoes
+      through SQLAlchemy on every call)
+
+TimedDatabase:
+    - Wraps the Database a repository was given and records how long each fetch_one,
+      fetch_all, fetch_val, execute and execute_many call takes in DB_QUERY_SECONDS,
+      labelled with the name of the SQL constant it ran ("unnamed" for SQL built on
+      the fly, so labels stay bounded); everything else passes straight through
+    - Each timed query is also handed to the slow request recorder (app.core.profiling),
+      which keeps it when a request is being traced
+
 BaseRepository:
-    - Maintains a connection to our database
+    - Maintains a connection to our database (through TimedDatabase)
+    - The SQL constants of a subclass's module are indexed by their text when the
+      subclass is defined, so naming a query is one dict lookup
+    - Subclasses register their hot queries by name in `prepared_queries`; they are
+      compiled to PreparedQuery objects once, when the subclass is defined
+    - fetch_one_prepared(), fetch_all_prepared(), fetch_val_prepared():
+        - Run a registered query straight on the pooled asyncpg connection of the
+          current task (so it joins any open transaction), skipping the SQLAlchemy
+          build databases does on every call (30-50us of CPU per query, see
+          benchmarks/prepared_queries.py). asyncpg caches the prepared statement
+          per connection (DB_STATEMENT_CACHE_SIZE) either way.
+        - Tasks gathered from one task share its connection, so the query holds
+          databases' per-connection query lock like databases' own queries do; asyncpg
+          refuses a second operation on a busy connection
+        - With DB_PREPARED_STATEMENTS off, the query goes through databases as before
+        - Timed under the same constant name either way
 """
 # Std Library Imports
+import re
+import sys
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 # Third Party Imports
 from databases import Database
 
+from app.core.config import DB_PREPARED_STATEMENTS
+from app.core.metrics import DB_QUERY_SECONDS, elapsed_since
+from app.core.profiling import record_query
+
+# SQLAlchemy's bind parameter pattern for text(): skips "::" casts and escaped "\:"
+BIND_PARAM = re.compile(r"(?<![:\w\x5c]):(\w+)(?!:)")
+
+# databases method -> asyncpg connection method
+DRIVER_METHODS = {"fetch_one": "fetchrow", "fetch_all": "fetch", "fetch_val": "fetchval"}
+
+
+class PreparedQuery:
+    def __init__(self, name: str, sql: str) -> None:
+        self.name = name
+        self.sql = sql
+        params: List[str] = []
+
+        def to_positional(match: "re.Match") -> str:
+            if match.group(1) not in params:
+                params.append(match.group(1))
+            return f"${params.index(match.group(1)) + 1}"
+
+        self.positional_sql = BIND_PARAM.sub(to_positional, sql).replace("\\:", ":")
+        self.params: Tuple[str, ...] = tuple(params)
+
+    def args(self, values: Optional[Mapping[str, Any]]) -> List[Any]:
+        values = values or {}
+        return [values[param] for param in self.params]
+
+
+class TimedDatabase:
+    def __init__(self, db: Database, query_names: Mapping[str, str]) -> None:
+        self._db = db
+        self._query_names = query_names
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._db, attribute)
+
+    def query_name(self, query: Any) -> str:
+        return self._query_names.get(query, "unnamed") if isinstance(query, str) else "unnamed"
+
+    def observe(self, query: Any, started: float) -> None:
+        name, elapsed = self.query_name(query), elapsed_since(started)
+        DB_QUERY_SECONDS.labels(name).observe(elapsed)
+        record_query(name, query, elapsed)
+
+    async def _timed(self, method: str, query: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await getattr(self._db, method)(query=query, **kwargs)
+        finally:
+            self.observe(query, started)
+
+    async def fetch_one(self, query: Any, values: Optional[dict] = None) -> Any:
+        return await self._timed("fetch_one", query, values=values)
+
+    async def fetch_all(self, query: Any, values: Optional[dict] = None) -> List[Any]:
+        return await self._timed("fetch_all", query, values=values)
+
+    async def fetch_val(self, query: Any, values: Optional[dict] = None, column: Any = 0) -> Any:
+        return await self._timed("fetch_val", query, values=values, column=column)
+
+    async def execute(self, query: Any, values: Optional[dict] = None) -> Any:
+        return await self._timed("execute", query, values=values)
+
+    async def execute_many(self, query: Any, values: List[dict]) -> None:
+        return await self._timed("execute_many", query, values=values)
+
 
 class BaseRepository:
+    prepared_queries: Dict[str, str] = {}
+    _query_names: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._prepared = {name: PreparedQuery(name, sql) for name, sql in cls.prepared_queries.items()}
+        # SQL text -> constant name, from the module the repository is defined in
+        module = vars(sys.modules[cls.__module__])
+        cls._query_names = {
+            value: name for name, value in module.items() if name.isupper() and isinstance(value, str)
+        }
+
     def __init__(self, db: Database) -> None:
-        self.db = db
\ No newline at end of file
+        # Another repository's db may be handed on; time it under this repository's names
+        self.db = TimedDatabase(db._db if isinstance(db, TimedDatabase) else db, self._query_names)
+
+    async def _run_prepared(self, method: str, name: str, values: Optional[Mapping[str, Any]]) -> Any:
+        query = self._prepared[name]
+        if not DB_PREPARED_STATEMENTS:
+            return await getattr(self.db, method)(query=query.sql, values=values)
+
+        started = time.perf_counter()
+        try:
+            async with self.db.connection() as connection, connection._query_lock:
+                driver_method = getattr(connection.raw_connection, DRIVER_METHODS[method])
+                return await driver_method(query.positional_sql, *query.args(values))
+        finally:
+            self.db.observe(query.sql, started)
+
+    async def fetch_one_prepared(self, name: str, values: Optional[Mapping[str, Any]] = None) -> Any:
+        return await self._run_prepared("fetch_one", name, values)
+
+    async def fetch_all_prepared(self, name: str, values: Optional[Mapping[str, Any]] = None) -> List[Any]:
+        return await self._run_prepared("fetch_all", name, values)
+
+    async def fetch_val_prepared(self, name: str, values: Optional[Mapping[str, Any]] = None) -> Any:
+        return await self._run_prepared("fetch_val", name, values)
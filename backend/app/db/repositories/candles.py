@@ -0,0 +1,335 @@
+"""
+Candles repository storing OHLCV market data. Candles arrive in large batches
+(exchange backfills, streaming ingestion), so writes are always set based rather
+than one fetch_one per row.
+
+Records:
+    - Bulk methods take plain tuples in CANDLE_COLUMNS order instead of models, so
+      millions of rows can be loaded without building a pydantic object per row
+
+upsert_candles():
+    - Writes a batch with a single INSERT ... SELECT FROM unnest(...) ON CONFLICT
+      statement (one round trip, one plan, whatever the batch size)
+    - Best for the small, frequent batches produced by live ingestion
+
+copy_candles():
+    - COPYs a batch into a temporary staging table and merges it into candles
+      with one INSERT ... ON CONFLICT, all inside a transaction
+    - Best for backfills of hundreds of thousands of rows and more
+
+ensure_partitions():
+    - Creates the monthly (UTC) partitions covering a time range before loading into it;
+      candles has no DEFAULT partition, so rows outside every partition are refused
+
+get_latest_open_time():
+    - Newest stored open_time for a (symbol, interval), used to resume ingestion
+
+get_candles():
+    - Candles for a (symbol, interval) within a time range, oldest first
+
+get_recent_closes():
+    - Open times and closes of the newest `limit` candles, oldest first (model input)
+
+get_recent_candles():
+    - The newest `limit` candles as get_series() columns, oldest first (seeds the
+      candle cache)
+
+refresh_rollups():
+    - Re-aggregates the 5m/1h/1d candle_rollups buckets touched by a time range of
+      newly stored 1m candles, so rollups stay current as candles arrive
+    - Only the touched buckets are recomputed (from their source candles, so a
+      partially filled bucket is simply updated when the rest of it lands)
+
+get_series():
+    - Candles of a (symbol, interval) within a time range as column arrays (NumPy),
+      read from candles for 1m and from candle_rollups for the rollup intervals
+      (falling back to candles when that interval was ingested directly)
+"""
+# Std Library Imports
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Third Party Imports
+import numpy as np
+
+from app.db.repositories.base import BaseRepository
+from app.models.candle import CandleCreate, CandleInDB, CandleInterval, CANDLE_INTERVAL_SECONDS
+
+
+# (symbol, interval, open_time, open, high, low, close, volume)
+CandleRecord = Tuple[str, str, datetime, float, float, float, float, float]
+
+CANDLE_COLUMNS = ("symbol", "interval", "open_time", "open", "high", "low", "close", "volume")
+
+UPSERT_CANDLES = """
+    INSERT INTO candles (symbol, "interval", open_time, open, high, low, close, volume)
+    SELECT *
+    FROM unnest(
+        CAST(:symbols AS TEXT[]),
+        CAST(:intervals AS TEXT[]),
+        CAST(:open_times AS TIMESTAMPTZ[]),
+        CAST(:opens AS FLOAT8[]),
+        CAST(:highs AS FLOAT8[]),
+        CAST(:lows AS FLOAT8[]),
+        CAST(:closes AS FLOAT8[]),
+        CAST(:volumes AS FLOAT8[])
+    )
+    ON CONFLICT (symbol, "interval", open_time) DO UPDATE
+    SET open = EXCLUDED.open,
+        high = EXCLUDED.high,
+        low = EXCLUDED.low,
+        close = EXCLUDED.close,
+        volume = EXCLUDED.volume;
+"""
+
+CREATE_CANDLES_STAGING_TABLE = """
+    CREATE TEMPORARY TABLE candles_staging (LIKE candles INCLUDING DEFAULTS) ON COMMIT DROP;
+"""
+
+MERGE_CANDLES_STAGING_TABLE = """
+    INSERT INTO candles (symbol, "interval", open_time, open, high, low, close, volume)
+    SELECT symbol, "interval", open_time, open, high, low, close, volume
+    FROM candles_staging
+    ON CONFLICT (symbol, "interval", open_time) DO UPDATE
+    SET open = EXCLUDED.open,
+        high = EXCLUDED.high,
+        low = EXCLUDED.low,
+        close = EXCLUDED.close,
+        volume = EXCLUDED.volume;
+"""
+
+ENSURE_CANDLE_PARTITIONS = """
+    SELECT create_candles_partition(month AT TIME ZONE 'UTC')
+    FROM generate_series(
+        date_trunc('month', CAST(:start AS TIMESTAMPTZ) AT TIME ZONE 'UTC'),
+        CAST(:end AS TIMESTAMPTZ) AT TIME ZONE 'UTC',
+        INTERVAL '1 month'
+    ) AS month;
+"""
+
+GET_LATEST_OPEN_TIME = """
+    SELECT max(open_time) AS open_time
+    FROM candles
+    WHERE symbol = :symbol AND "interval" = :interval;
+"""
+
+GET_CANDLES = """
+    SELECT symbol, "interval", open_time, open, high, low, close, volume
+    FROM candles
+    WHERE symbol = :symbol AND "interval" = :interval AND open_time >= :start AND open_time < :end
+    ORDER BY open_time
+    LIMIT :limit;
+"""
+
+GET_RECENT_CLOSES = """
+    SELECT open_time, close
+    FROM candles
+    WHERE symbol = :symbol AND "interval" = :interval
+    ORDER BY open_time DESC
+    LIMIT :limit;
+"""
+
+GET_RECENT_CANDLES = """
+    SELECT extract(epoch FROM open_time) AS open_time, open, high, low, close, volume
+    FROM candles
+    WHERE symbol = :symbol AND "interval" = :interval
+    ORDER BY open_time DESC
+    LIMIT :limit;
+"""
+
+# Intervals kept in candle_rollups, aggregated from ROLLUP_SOURCE_INTERVAL candles
+ROLLUP_SOURCE_INTERVAL = CandleInterval.one_minute
+ROLLUP_INTERVALS = (CandleInterval.five_minutes, CandleInterval.one_hour, CandleInterval.one_day)
+
+REFRESH_CANDLE_ROLLUPS = """
+    INSERT INTO candle_rollups (symbol, "interval", open_time, open, high, low, close, volume)
+    SELECT symbol, :rollup, bucket,
+        (array_agg(open ORDER BY open_time))[1],
+        max(high),
+        min(low),
+        (array_agg(close ORDER BY open_time DESC))[1],
+        sum(volume)
+    FROM (
+        SELECT symbol, open_time, open, high, low, close, volume,
+            to_timestamp(floor(extract(epoch FROM open_time) / CAST(:step AS INTEGER)) * CAST(:step AS INTEGER)) AS bucket
+        FROM candles
+        WHERE symbol = :symbol
+            AND "interval" = :source
+            AND open_time >= to_timestamp(
+                floor(extract(epoch FROM CAST(:start AS TIMESTAMPTZ)) / CAST(:step AS INTEGER)) * CAST(:step AS INTEGER)
+            )
+            AND open_time < to_timestamp(
+                floor(extract(epoch FROM CAST(:end AS TIMESTAMPTZ)) / CAST(:step AS INTEGER)) * CAST(:step AS INTEGER)
+                + CAST(:step AS INTEGER)
+            )
+    ) AS source_candles
+    GROUP BY symbol, bucket
+    ON CONFLICT (symbol, "interval", open_time) DO UPDATE
+    SET open = EXCLUDED.open,
+        high = EXCLUDED.high,
+        low = EXCLUDED.low,
+        close = EXCLUDED.close,
+        volume = EXCLUDED.volume;
+"""
+
+GET_SERIES = """
+    SELECT extract(epoch FROM open_time) AS open_time, open, high, low, close, volume
+    FROM candles
+    WHERE symbol = :symbol AND "interval" = :interval AND open_time >= :start AND open_time < :end
+    ORDER BY open_time;
+"""
+
+GET_ROLLUP_SERIES = """
+    SELECT extract(epoch FROM open_time) AS open_time, open, high, low, close, volume
+    FROM candle_rollups
+    WHERE symbol = :symbol AND "interval" = :interval AND open_time >= :start AND open_time < :end
+    ORDER BY open_time;
+"""
+
+
+def series_columns(records: Sequence[Any]) -> Dict[str, np.ndarray]:
+    columns = np.array([tuple(record.values()) for record in records], dtype=np.float64).reshape(-1, 6)
+    return {
+        "open_times": columns[:, 0],
+        "open": columns[:, 1],
+        "high": columns[:, 2],
+        "low": columns[:, 3],
+        "close": columns[:, 4],
+        "volume": columns[:, 5]
+    }
+
+
+def candle_to_record(candle: CandleCreate) -> CandleRecord:
+    return (
+        candle.symbol, candle.interval.value, candle.open_time,
+        candle.open, candle.high, candle.low, candle.close, candle.volume
+    )
+
+
+class CandlesRepository(BaseRepository):
+    """
+    All database actions associated with candles occur here.
+    """
+    # Read on every forecast request
+    prepared_queries = {
+        "get_latest_open_time": GET_LATEST_OPEN_TIME,
+        "get_recent_closes": GET_RECENT_CLOSES
+    }
+
+    async def upsert_candles(self, *, records: Sequence[CandleRecord]) -> int:
+        if not records:
+            return 0
+
+        # Transpose rows into one array per column for unnest
+        columns = list(zip(*records))
+        await self.db.execute(
+            query=UPSERT_CANDLES,
+            values={
+                "symbols": list(columns[0]),
+                "intervals": list(columns[1]),
+                "open_times": list(columns[2]),
+                "opens": list(columns[3]),
+                "highs": list(columns[4]),
+                "lows": list(columns[5]),
+                "closes": list(columns[6]),
+                "volumes": list(columns[7])
+            }
+        )
+
+        return len(records)
+
+    async def copy_candles(self, *, records: Iterable[CandleRecord]) -> int:
+        records = list(records)
+        if not records:
+            return 0
+
+        async with self.db.connection() as connection:
+            async with connection.transaction():
+                raw_connection = connection.raw_connection
+                await raw_connection.execute(CREATE_CANDLES_STAGING_TABLE)
+                await raw_connection.copy_records_to_table(
+                    "candles_staging", records=records, columns=CANDLE_COLUMNS
+                )
+                await raw_connection.execute(MERGE_CANDLES_STAGING_TABLE)
+
+        return len(records)
+
+    async def ensure_partitions(self, *, start: datetime, end: datetime) -> None:
+        # One row per month: execute() would only fetch the first, and postgres stops
+        # creating partitions there
+        await self.db.fetch_all(query=ENSURE_CANDLE_PARTITIONS, values={"start": start, "end": end})
+
+    async def get_latest_open_time(self, *, symbol: str, interval: CandleInterval) -> Optional[datetime]:
+        return await self.fetch_val_prepared(
+            "get_latest_open_time", {"symbol": symbol, "interval": CandleInterval(interval).value}
+        )
+
+    async def get_candles(
+        self,
+        *,
+        symbol: str,
+        interval: CandleInterval,
+        start: datetime,
+        end: datetime,
+        limit: int = 10000
+    ) -> List[CandleInDB]:
+        records = await self.db.fetch_all(
+            query=GET_CANDLES,
+            values={
+                "symbol": symbol,
+                "interval": CandleInterval(interval).value,
+                "start": start,
+                "end": end,
+                "limit": limit
+            }
+        )
+
+        return [CandleInDB(**record) for record in records]
+
+    async def get_recent_closes(
+        self, *, symbol: str, interval: CandleInterval, limit: int
+    ) -> Tuple[List[datetime], List[float]]:
+        records = await self.fetch_all_prepared(
+            "get_recent_closes", {"symbol": symbol, "interval": CandleInterval(interval).value, "limit": limit}
+        )
+        records = records[::-1]
+
+        return [record["open_time"] for record in records], [record["close"] for record in records]
+
+    async def get_recent_candles(
+        self, *, symbol: str, interval: CandleInterval, limit: int
+    ) -> Dict[str, np.ndarray]:
+        records = await self.db.fetch_all(
+            query=GET_RECENT_CANDLES,
+            values={"symbol": symbol, "interval": CandleInterval(interval).value, "limit": limit}
+        )
+
+        return series_columns(records[::-1])
+
+    async def refresh_rollups(self, *, symbol: str, start: datetime, end: datetime) -> None:
+        for rollup in ROLLUP_INTERVALS:
+            await self.db.execute(
+                query=REFRESH_CANDLE_ROLLUPS,
+                values={
+                    "rollup": rollup.value,
+                    "step": CANDLE_INTERVAL_SECONDS[rollup],
+                    "symbol": symbol,
+                    "source": ROLLUP_SOURCE_INTERVAL.value,
+                    "start": start,
+                    "end": end
+                }
+            )
+
+    async def get_series(
+        self, *, symbol: str, interval: CandleInterval, start: datetime, end: datetime
+    ) -> Dict[str, np.ndarray]:
+        interval = CandleInterval(interval)
+        values = {"symbol": symbol, "interval": interval.value, "start": start, "end": end}
+
+        records = []
+        if interval in ROLLUP_INTERVALS:
+            records = await self.db.fetch_all(query=GET_ROLLUP_SERIES, values=values)
+        if not records:
+            records = await self.db.fetch_all(query=GET_SERIES, values=values)
+
+        return series_columns(records)
@@ -13,8 +13,10 @@ class DummyRepository(BaseRepository):
     """
     All database actions associated with Dummys occur here.
     """
+    prepared_queries = {"create_dummy": CREATE_DUMMY_QUERY}
+
     async def create_dummy(self, *, new_dummy: DummyCreate) -> DummyInDB:
         query_values = new_dummy.dict()
-        dummy = await self.db.fetch_one(query=CREATE_DUMMY_QUERY, values=query_values)
+        dummy = await self.fetch_one_prepared("create_dummy", query_values)
 
         return DummyInDB(**dummy)
\ No newline at end of file
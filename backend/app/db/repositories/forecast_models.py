@@ -0,0 +1,108 @@
+"""
+Forecast models repository: the registry of trained forecast model versions. The
+artifacts themselves live under FORECAST_MODEL_DIR; rows point at them.
+
+register_model():
+    - Records a new version (inactive); a (name, version) can only be registered once
+
+get_model():
+    - One version by name and version, None when it isn't registered
+
+get_active_model():
+    - The version the API should serve, None until one is activated (polled by every
+      worker, so it's a prepared statement on the partial index of the active row)
+
+activate_model():
+    - Makes a version the only active one, in one transaction so readers never see
+      two or none in between; None (and nothing changed) when it isn't registered
+
+list_models():
+    - Every registered version, newest first
+"""
+# Std Library Imports
+from typing import List, Optional
+
+# Third Party Imports
+
+from app.db.repositories.base import BaseRepository
+from app.models.forecast import ForecastModelCreate, ForecastModelInDB
+
+
+REGISTER_FORECAST_MODEL = """
+    INSERT INTO forecast_models (name, version, engine, artifact, sha256)
+    VALUES (:name, :version, :engine, :artifact, :sha256)
+    RETURNING id, name, version, engine, artifact, sha256, is_active, activated_at, created_at;
+"""
+
+GET_FORECAST_MODEL = """
+    SELECT id, name, version, engine, artifact, sha256, is_active, activated_at, created_at
+    FROM forecast_models
+    WHERE name = :name AND version = :version;
+"""
+
+GET_ACTIVE_FORECAST_MODEL = """
+    SELECT id, name, version, engine, artifact, sha256, is_active, activated_at, created_at
+    FROM forecast_models
+    WHERE is_active;
+"""
+
+LOCK_FORECAST_MODEL = """
+    SELECT id FROM forecast_models
+    WHERE name = :name AND version = :version
+    FOR UPDATE;
+"""
+
+DEACTIVATE_FORECAST_MODELS = """
+    UPDATE forecast_models
+    SET is_active = FALSE
+    WHERE is_active AND id <> :id;
+"""
+
+ACTIVATE_FORECAST_MODEL = """
+    UPDATE forecast_models
+    SET is_active = TRUE, activated_at = now()
+    WHERE id = :id
+    RETURNING id, name, version, engine, artifact, sha256, is_active, activated_at, created_at;
+"""
+
+LIST_FORECAST_MODELS = """
+    SELECT id, name, version, engine, artifact, sha256, is_active, activated_at, created_at
+    FROM forecast_models
+    ORDER BY created_at DESC, id DESC;
+"""
+
+
+class ForecastModelsRepository(BaseRepository):
+    """
+    All database actions associated with registered forecast models occur here.
+    """
+    prepared_queries = {
+        "get_active_forecast_model": GET_ACTIVE_FORECAST_MODEL
+    }
+
+    async def register_model(self, *, new_model: ForecastModelCreate) -> ForecastModelInDB:
+        record = await self.db.fetch_one(query=REGISTER_FORECAST_MODEL, values=new_model.dict())
+        return ForecastModelInDB.from_trusted(record)
+
+    async def get_model(self, *, name: str, version: str) -> Optional[ForecastModelInDB]:
+        record = await self.db.fetch_one(query=GET_FORECAST_MODEL, values={"name": name, "version": version})
+        return ForecastModelInDB.from_trusted(record) if record else None
+
+    async def get_active_model(self) -> Optional[ForecastModelInDB]:
+        record = await self.fetch_one_prepared("get_active_forecast_model")
+        return ForecastModelInDB.from_trusted(record) if record else None
+
+    async def activate_model(self, *, name: str, version: str) -> Optional[ForecastModelInDB]:
+        async with self.db.transaction():
+            model_id = await self.db.fetch_val(query=LOCK_FORECAST_MODEL, values={"name": name, "version": version})
+            if model_id is None:
+                return None
+
+            await self.db.execute(query=DEACTIVATE_FORECAST_MODELS, values={"id": model_id})
+            record = await self.db.fetch_one(query=ACTIVATE_FORECAST_MODEL, values={"id": model_id})
+
+        return ForecastModelInDB.from_trusted(record)
+
+    async def list_models(self) -> List[ForecastModelInDB]:
+        records = await self.db.fetch_all(query=LIST_FORECAST_MODELS)
+        return [ForecastModelInDB.from_trusted(record) for record in records]
@@ -0,0 +1,93 @@
+"""
+Revocations repository for access tokens that were logged out or revoked before
+their exp. Tokens are identified by their jti claim.
+
+revoke_token():
+    - Records a jti as revoked until the token's own expiry (revoking twice is a no-op)
+
+is_revoked():
+    - Authoritative check for one jti; only called when the Bloom filter in front of
+      this table says the jti might be revoked
+
+get_active_revocations():
+    - Every jti whose token hasn't expired yet, with its revoked_at (used to rebuild a
+      worker's Bloom filter)
+
+get_revocations_since():
+    - jtis revoked after a point in time (used to refresh the filter incrementally)
+
+get_database_time():
+    - The database's now(), where a rebuilt filter's refresh watermark starts
+
+prune_expired():
+    - Deletes revocations of tokens that have expired on their own
+"""
+# Std Library Imports
+from datetime import datetime
+from typing import List, Tuple
+
+# Third Party Imports
+
+from app.db.repositories.base import BaseRepository
+
+
+REVOKE_TOKEN = """
+    INSERT INTO revoked_tokens (jti, username, expires_at)
+    VALUES (:jti, :username, :expires_at)
+    ON CONFLICT (jti) DO NOTHING;
+"""
+
+IS_TOKEN_REVOKED = """
+    SELECT EXISTS (SELECT 1 FROM revoked_tokens WHERE jti = :jti);
+"""
+
+GET_ACTIVE_REVOCATIONS = """
+    SELECT jti, revoked_at
+    FROM revoked_tokens
+    WHERE expires_at > now();
+"""
+
+GET_REVOCATIONS_SINCE = """
+    SELECT jti, revoked_at
+    FROM revoked_tokens
+    WHERE revoked_at > :since AND expires_at > now();
+"""
+
+GET_DATABASE_TIME = """
+    SELECT now();
+"""
+
+PRUNE_EXPIRED_REVOCATIONS = """
+    DELETE FROM revoked_tokens
+    WHERE expires_at <= now();
+"""
+
+
+class RevocationsRepository(BaseRepository):
+    """
+    All database actions associated with revoked tokens occur here.
+    """
+    prepared_queries = {
+        "is_token_revoked": IS_TOKEN_REVOKED,
+        "get_revocations_since": GET_REVOCATIONS_SINCE
+    }
+
+    async def revoke_token(self, *, jti: str, username: str, expires_at: datetime) -> None:
+        await self.db.execute(query=REVOKE_TOKEN, values={"jti": jti, "username": username, "expires_at": expires_at})
+
+    async def is_revoked(self, *, jti: str) -> bool:
+        return await self.fetch_val_prepared("is_token_revoked", {"jti": jti})
+
+    async def get_active_revocations(self) -> List[Tuple[str, datetime]]:
+        records = await self.db.fetch_all(query=GET_ACTIVE_REVOCATIONS)
+        return [(record["jti"], record["revoked_at"]) for record in records]
+
+    async def get_revocations_since(self, *, since: datetime) -> List[Tuple[str, datetime]]:
+        records = await self.fetch_all_prepared("get_revocations_since", {"since": since})
+        return [(record["jti"], record["revoked_at"]) for record in records]
+
+    async def get_database_time(self) -> datetime:
+        return await self.db.fetch_val(query=GET_DATABASE_TIME)
+
+    async def prune_expired(self) -> None:
+        await self.db.execute(query=PRUNE_EXPIRED_REVOCATIONS)
@@ -2,38 +2,70 @@
 Users repository dealing with database actions on users. It inherits the
 database connection from BaseRepository. Ensure that anytime the class is
 called, the constructor gives the parent class the database connection.
+Every query below is registered in prepared_queries and run as a prepared statement.
 
 get_user_by_email(), get_user_by_username():
     - Takes an object (provided as a kwarg) and attempts to retrieve the user
       (and all it's attributes) from the database.
-    - If a user is found, all of their attributes are unpacked as keyword
-      arguments and are used to create a UserInDB object.
+    - If a user is found, the row is mapped onto a UserInDB with
+      UserInDB.from_trusted(): the data was validated on its way into the
+      database, so it isn't re-validated on every lookup.
 
 register_new_user():
     - A UserCreate object MUST be passed
-    - Ensure credentials are not already taken or existant
-    - Generate a salt and hash of the users password
+    - Generate a salt and hash of the users password (on the hashing pool)
     - Update the param for the user by copying to a new user
     - Run the query to create a new user by unpacking all of the UserCreate's
       attributes as the values to be inserted with the SQL query
+    - Taken credentials are detected by the INSERT itself (unique violation on the
+      email or username index), so registering is a single round trip and two
+      concurrent signups with the same credentials can't both succeed
     - Return the UserInDB object
 
+raise_for_taken_credentials():
+    - Maps a unique violation to the 400 error for the email or username it hit
+
+update_user(), deactivate_user():
+    - Apply a UserUpdate (email/username) or flip is_active off for a user
+    - Drop the user's entries from this worker's verified token cache so the change
+      is seen on its very next request (other workers drop theirs on their next
+      token cache sync, see get_users_changed_since())
+
+get_users_changed_since():
+    - The database's now() and the ids of users updated after `since` (none when it
+      is None), as one row; polled by every worker's token cache (updated_at is
+      indexed and kept by the update_user_modtime trigger)
+
+copy_new_users():
+    - Bulk insert of already hashed users: COPY into a temporary staging table, then
+      one INSERT ... ON CONFLICT DO NOTHING so taken emails/usernames are skipped
+      instead of failing the whole chunk
+    - Returns how many users were actually created
+
+stream_users():
+    - Yields every user (without password and salt) through a server-side cursor,
+      `prefetch` rows at a time, so an export never holds the whole table in memory
+
 authenticate_user():
     - Checks that user is in database
-    - Verify the users password with our auth service
+    - Verify the users password with our auth service (off the event loop, on the
+      auth service's hashing pool)
     - python-multipart used to retrieve the password from
       the OAuth form
 """
 # Std Library Imports
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 
 # Third Party Imports
 from pydantic import EmailStr
 from databases import Database
+from asyncpg.exceptions import UniqueViolationError
 from fastapi import HTTPException, status
 
 from app.db.repositories.base import BaseRepository
-from app.services import auth_service
-from app.models.user import UserCreate, UserUpdate, UserInDB, UserPublic
+from app.services import auth_service, token_cache
+from app.models.user import UserCreate, UserUpdate, UserInDB
 
 
 GET_USER_BY_EMAIL = """
@@ -54,11 +86,83 @@ REGISTER_NEW_USER = """
     RETURNING id, username, email, email_verified, password, salt, is_active, is_superuser, created_at, updated_at;
 """
 
+UPDATE_USER_BY_USERNAME = """
+    UPDATE users
+    SET email = COALESCE(:email, email),
+        username = COALESCE(:new_username, username)
+    WHERE username = :username
+    RETURNING id, username, email, email_verified, password, salt, is_active, is_superuser, created_at, updated_at;
+"""
+
+DEACTIVATE_USER_BY_USERNAME = """
+    UPDATE users
+    SET is_active = FALSE
+    WHERE username = :username
+    RETURNING id, username, email, email_verified, password, salt, is_active, is_superuser, created_at, updated_at;
+"""
+
+GET_USERS_CHANGED_SINCE = """
+    SELECT now() AS as_of, COALESCE(array_agg(id), '{}') AS user_ids
+    FROM users
+    WHERE updated_at > CAST(:since AS TIMESTAMPTZ);
+"""
+
+NEW_USER_COLUMNS = ["username", "email", "password", "salt"]
+
+CREATE_USERS_STAGING_TABLE = """
+    CREATE TEMPORARY TABLE users_staging (username TEXT, email TEXT, password TEXT, salt TEXT) ON COMMIT DROP;
+"""
+
+MERGE_USERS_STAGING_TABLE = """
+    WITH created AS (
+        INSERT INTO users (username, email, password, salt)
+        SELECT username, email, password, salt
+        FROM users_staging
+        ON CONFLICT DO NOTHING
+        RETURNING 1
+    )
+    SELECT count(*) FROM created;
+"""
+
+EXPORT_USERS = """
+    SELECT id, username, email, email_verified, is_active, is_superuser, created_at, updated_at
+    FROM users
+    ORDER BY id;
+"""
+
+
+def raise_for_taken_credentials(e: UniqueViolationError) -> None:
+    # Unique indexes are named ix_users_email / ix_users_username by the migration
+    constraint = e.constraint_name or ""
+
+    if "email" in constraint:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already exists in database. Login with that email or register with different one."
+        )
+    if "username" in constraint:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username is already taken. Please try a different one."
+        )
+
+    raise e
+
 
 class UsersRepository(BaseRepository):
+    prepared_queries = {
+        "get_user_by_email": GET_USER_BY_EMAIL,
+        "get_user_by_username": GET_USER_BY_USERNAME,
+        "register_new_user": REGISTER_NEW_USER,
+        "update_user_by_username": UPDATE_USER_BY_USERNAME,
+        "deactivate_user_by_username": DEACTIVATE_USER_BY_USERNAME,
+        "get_users_changed_since": GET_USERS_CHANGED_SINCE
+    }
+
     def __init__(self, db: Database) -> None:
         super().__init__(db)
         self.auth_service = auth_service
+        self.token_cache = token_cache
 
     async def authenticate_user(self, *, email: EmailStr, password: str) -> Optional[UserInDB]:
         # Check that user is in db
@@ -66,44 +170,84 @@ class UsersRepository(BaseRepository):
         if not user:
             return None
         # Verify user password
-        if not self.auth_service.verify_password(password=password, salt=user.salt, hashed_pw=user.password):
+        if not await self.auth_service.async_verify_password(password=password, salt=user.salt, hashed_pw=user.password):
             return None
         
         return user
         
     async def get_user_by_email(self, *, email: EmailStr) -> UserInDB:
-        user_record = await self.db.fetch_one(query=GET_USER_BY_EMAIL, values={"email": email})
+        user_record = await self.fetch_one_prepared("get_user_by_email", {"email": email})
 
         if not user_record:
             return None
 
-        return UserInDB(**user_record)
+        return UserInDB.from_trusted(user_record)
     
     async def get_user_by_username(self, *, username: str) -> UserInDB:
-        user_record = await self.db.fetch_one(query=GET_USER_BY_USERNAME, values={"username": username})
+        user_record = await self.fetch_one_prepared("get_user_by_username", {"username": username})
 
         if not user_record:
             return None
 
-        return UserInDB(**user_record)
+        return UserInDB.from_trusted(user_record)
 
     async def register_new_user(self, *, new_user: UserCreate) -> UserInDB:
-        # Ensure email is not already taken
-        if await self.get_user_by_email(email=new_user.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already exists in database. Login with that email or register with different one."
-            )
-        
-        # Ensure username is not already taken
-        if await self.get_user_by_username(username=new_user.username):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username is already taken. Please try a different one."
-            )
-        
-        user_password_update = self.auth_service.create_salt_and_hashed_password(plaintext_password=new_user.password)
+        user_password_update = await self.auth_service.async_create_salt_and_hashed_password(
+            plaintext_password=new_user.password
+        )
         new_user_params = new_user.copy(update=user_password_update.dict())
-        created_user = await self.db.fetch_one(query=REGISTER_NEW_USER, values={new_user_params.dict()})
 
-        return UserInDB(**created_user)
\ No newline at end of file
+        try:
+            created_user = await self.fetch_one_prepared("register_new_user", new_user_params.dict())
+        except UniqueViolationError as e:
+            raise_for_taken_credentials(e)
+
+        return UserInDB.from_trusted(created_user)
+
+    async def update_user(self, *, username: str, user_update: UserUpdate) -> Optional[UserInDB]:
+        try:
+            updated_user = await self.fetch_one_prepared(
+                "update_user_by_username",
+                {"username": username, "email": user_update.email, "new_username": user_update.username}
+            )
+        except UniqueViolationError as e:
+            raise_for_taken_credentials(e)
+        self.token_cache.invalidate_user(username)
+
+        if not updated_user:
+            return None
+
+        return UserInDB.from_trusted(updated_user)
+
+    async def deactivate_user(self, *, username: str) -> Optional[UserInDB]:
+        deactivated_user = await self.fetch_one_prepared("deactivate_user_by_username", {"username": username})
+        self.token_cache.invalidate_user(username)
+
+        if not deactivated_user:
+            return None
+
+        return UserInDB.from_trusted(deactivated_user)
+
+    async def get_users_changed_since(self, *, since: Optional[datetime]) -> Tuple[datetime, List[int]]:
+        record = await self.fetch_one_prepared("get_users_changed_since", {"since": since})
+        return record["as_of"], list(record["user_ids"])
+
+    async def copy_new_users(self, *, records: Sequence[Tuple[str, str, str, str]]) -> int:
+        if not records:
+            return 0
+
+        async with self.db.connection() as connection:
+            async with connection.transaction():
+                raw_connection = connection.raw_connection
+                await raw_connection.execute(CREATE_USERS_STAGING_TABLE)
+                await raw_connection.copy_records_to_table(
+                    "users_staging", records=records, columns=NEW_USER_COLUMNS
+                )
+                return await raw_connection.fetchval(MERGE_USERS_STAGING_TABLE)
+
+    async def stream_users(self, *, prefetch: int) -> AsyncIterator:
+        async with self.db.connection() as connection:
+            # Server-side cursors only live inside a transaction
+            async with connection.transaction():
+                async for record in connection.raw_connection.cursor(EXPORT_USERS, prefetch=prefetch):
+                    yield record
@@ -2,55 +2,138 @@
 
 logger:
     - Creates a logger for database status throughout application runtime
-    
+
+get_pool_size():
+    - Works out the (min, max) pool size for this worker so that every worker's
+      pool together never exceeds DB_CONNECTION_BUDGET connections to RDS
+    - The worker count comes from app.core.workers.worker_count(), the same one
+      gunicorn_conf.py starts (WEB_CONCURRENCY when set, else sized from the CPUs)
+
+PooledDatabase:
+    - databases.Database on the TimedPostgresBackend (app.db.backends), which bounds
+      and times every wait for a pool connection
+
+create_database():
+    - Builds the PooledDatabase with pool sizing, statement timeout, the
+      per-connection prepared statement cache and connection recycling taken from app.core.config
+
 connect_to_db():
     - Retrieves AWS database credentials from app.core.config
-    - Connects to database and attach the connection (as _db) to the app's state object (for constant connection)
-    - Raise error in logger if connection fails
-    - TESTING: If the testing env variable is 1, create a testing database in the db.migrations.env file
+    - TESTING: If the testing env variable is 1, connect to the testing database created in the db.migrations.env file
+    - Opens the pool (min_size connections up front) and runs a round trip so a bad
+      database fails startup loudly
+    - Attach the connection (as _db) to the app's state object (for constant connection)
+    - Log and re-raise if connection fails (the app must not start without a database)
+
+get_pool_stats():
+    - Reports the size, idle connections and saturation of the app's pool
 
 close_db_connection():
     - app.state._db is an established db connection and can
       be closed using databases .diconnect() method
+    - Gives up after WEB_SHUTDOWN_TIMEOUT so a stuck connection can't use up a
+      stopping worker's graceful timeout
     - Raise error in logger if disconnect fails
 """
 # Std Library Imports
 import os
+import asyncio
 import logging
+from typing import Dict, Optional, Tuple
 
 # Third Party Imports
 from databases import Database
 from fastapi import FastAPI
-import boto3
 
 from app.core import config
+from app.core.workers import worker_count
 
 logger = logging.getLogger(__name__)
 
+
+# Split the global connection budget between workers
+def get_pool_size(workers: Optional[int] = None) -> Tuple[int, int]:
+    workers = worker_count() if workers is None else workers
+    per_worker = max(1, config.DB_CONNECTION_BUDGET // max(1, workers))
+    max_size = min(config.DB_MAX_POOL_SIZE, per_worker)
+    min_size = min(config.DB_MIN_POOL_SIZE, max_size)
+
+    return min_size, max_size
+
+
+# A database whose connections wait at most DB_ACQUIRE_TIMEOUT for the pool
+class PooledDatabase(Database):
+    SUPPORTED_BACKENDS = {
+        **Database.SUPPORTED_BACKENDS,
+        "postgresql": "app.db.backends:TimedPostgresBackend",
+        "postgres": "app.db.backends:TimedPostgresBackend"
+    }
+
+
+# Build a database with a sized and tuned connection pool
+def create_database(url: str) -> Database:
+    min_size, max_size = get_pool_size()
+
+    return PooledDatabase(
+        url,
+        min_size=min_size,
+        max_size=max_size,
+        max_queries=config.DB_MAX_QUERIES,
+        max_inactive_connection_lifetime=config.DB_MAX_INACTIVE_CONNECTION_LIFETIME,
+        statement_cache_size=config.DB_STATEMENT_CACHE_SIZE,
+        server_settings={"statement_timeout": str(config.DB_STATEMENT_TIMEOUT)}
+    )
+
+
+# The pool opens its min_size connections on connect; one round trip proves they work
+async def _warm_up_pool(database: Database) -> None:
+    await database.execute("SELECT 1")
+
+
 # Connect to database using credentials from core.config
 async def connect_to_db(app: FastAPI) -> None:
     # Assign testing database when called from conftest
-    DB_URL = f"{config.DATABASE_URL}_test" if os.environ.get("TESTING") else config.DATABASE_URL
-    database = Database(DB_URL)
+    DB_URL = f"{config.DATABASE_URL}_test" if os.environ.get("TESTING") else str(config.DATABASE_URL)
 
     try:
-        # Connect to database
-        database = Database(config.DATABASE_URL)
+        database = create_database(DB_URL)
 
-        # Establish app database connection state
+        # Open the pool and make sure it is usable before serving traffic
         await database.connect()
+        await _warm_up_pool(database)
+
+        # Establish app database connection state
         app.state._db = database
 
     except Exception as e:
         logger.warn("--- DB CONNECTION ERROR ---")
         logger.warn(e)
         logger.warn("--- DB CONNECTION ERROR ---")
+        raise e
+
+
+# Summarise the pool for readiness checks
+def get_pool_stats(database: Database) -> Dict[str, float]:
+    pool = database._backend._pool
+    _, max_size = get_pool_size()
+    size = pool.get_size() if pool is not None else 0
+    idle = pool.get_idle_size() if pool is not None else 0
+    in_use = size - idle
+
+    return {
+        "size": size,
+        "idle": idle,
+        "in_use": in_use,
+        "max_size": max_size,
+        "saturation": round(in_use / max_size, 3) if max_size else 1.0
+    }
+
 
 # Close database connection
 async def close_db_connection(app: FastAPI) -> None:
     try:
-        await app.state._db.disconnect()
+        await asyncio.wait_for(app.state._db.disconnect(), timeout=config.WEB_SHUTDOWN_TIMEOUT)
     except Exception as e:
         logger.warn("--- DB DISCONNECT ERROR ---")
         logger.warn(e)
-        logger.warn("--- DB DISCONNECT ERROR ---")
\ No newline at end of file
+        logger.warn("--- DB DISCONNECT ERROR ---")
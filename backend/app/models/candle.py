@@ -0,0 +1,74 @@
+"""
+Candle (OHLCV) models for market data. A candle summarises every trade of a symbol
+over one interval: the open, high, low and close price plus the traded volume.
+
+CandleInterval:
+    - The candle widths we store and serve
+
+CANDLE_INTERVAL_SECONDS:
+    - Width of each CandleInterval in seconds
+
+CandleBase:
+    - Contains the attributes shared by every candle
+
+CandleCreate:
+    - Attributes required to store a candle (used by ingestion)
+
+CandleInDB:
+    - A candle coming out of the database
+
+CandlePublic:
+    - A candle returned from public-facing endpoints
+"""
+# Std Library Imports
+from enum import Enum
+from datetime import datetime
+
+# Third Party Imports
+
+from app.models.core import CoreModel
+
+
+class CandleInterval(str, Enum):
+    one_minute = "1m"
+    five_minutes = "5m"
+    fifteen_minutes = "15m"
+    one_hour = "1h"
+    four_hours = "4h"
+    one_day = "1d"
+
+
+CANDLE_INTERVAL_SECONDS = {
+    CandleInterval.one_minute: 60,
+    CandleInterval.five_minutes: 5 * 60,
+    CandleInterval.fifteen_minutes: 15 * 60,
+    CandleInterval.one_hour: 60 * 60,
+    CandleInterval.four_hours: 4 * 60 * 60,
+    CandleInterval.one_day: 24 * 60 * 60
+}
+
+
+class CandleBase(CoreModel):
+    """
+    All common attributes of a candle.
+    """
+    symbol: str
+    interval: CandleInterval
+    open_time: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0
+
+
+class CandleCreate(CandleBase):
+    pass
+
+
+class CandleInDB(CandleBase):
+    pass
+
+
+class CandlePublic(CandleBase):
+    pass
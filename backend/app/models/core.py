@@ -12,6 +12,10 @@ CoreModel:
     - All new models we create will inherit from CoreModel, because we can
       add functionality to Pydantic's BaseModel so that all of our new
       models can have shared logic that we define.
+    - from_trusted(): builds a model from data we produced ourselves (database rows,
+      tokens whose signature we just verified) with pydantic's construct(), skipping
+      validation. Only the model's fields are copied and a missing required field
+      raises KeyError. Anything a client sends still goes through normal validation.
 
 DateTimeModelMixin:
     - Takes an optionally provided datetime object and uses a custom validator decorator
@@ -25,18 +29,25 @@ IDModelMixin:
       provided for any new instances
 """
 # Std Library Imports
-from typing import Optional
+from typing import Any, Mapping, Optional, Type, TypeVar
 from datetime import datetime
 
 # Third Party Imports
 from pydantic import BaseModel, validator
 
 
+Model = TypeVar("Model", bound="CoreModel")
+
+
 class CoreModel(BaseModel):
     """
     Any common logic shared amongst all models stored here.
     """
-    pass
+    @classmethod
+    def from_trusted(cls: Type[Model], data: Mapping[str, Any]) -> Model:
+        return cls.construct(**{
+            name: data[name] for name, field in cls.__fields__.items() if field.required or name in data
+        })
 
 
 class DateTimeModelMixin(BaseModel):
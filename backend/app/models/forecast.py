@@ -0,0 +1,74 @@
+"""
+Forecast models returned from the /forecast endpoint.
+
+ForecastPublic:
+    - The predicted closes for the next `horizon` candles of a symbol
+    - Series are stored column-wise (one list of times, one list of values) so
+      they serialize compactly and map straight onto chart libraries
+    - model and model_version identify which estimator produced the forecast
+    - last_open_time is the newest candle the forecast was based on
+    - indicators are the technical indicator features of that candle (None while an
+      indicator's window is longer than the stored history)
+
+ForecastModelCreate:
+    - A model version to register: its name and version, the engine that loads it
+      and its artifact (path under FORECAST_MODEL_DIR) with the artifact's sha256
+
+ForecastModelInDB:
+    - A registered version, whether it's the active one and when it was activated
+
+ForecastModelPublic:
+    - A registered version without where its artifact lives
+
+ForecastModelsPublic:
+    - Every registered version, the model this worker is serving and its registry's
+      swap counters
+"""
+# Std Library Imports
+from typing import Dict, List, Optional
+from datetime import datetime
+
+# Third Party Imports
+
+from app.models.core import CoreModel, IDModelMixin
+from app.models.candle import CandleInterval
+
+
+class ForecastPublic(CoreModel):
+    symbol: str
+    interval: CandleInterval
+    horizon: int
+    model: str
+    model_version: str
+    last_open_time: datetime
+    open_times: List[datetime]
+    predictions: List[float]
+    indicators: Dict[str, Optional[float]] = {}
+
+
+class ForecastModelCreate(CoreModel):
+    name: str
+    version: str
+    engine: str
+    artifact: str
+    sha256: str
+
+
+class ForecastModelPublic(IDModelMixin, CoreModel):
+    name: str
+    version: str
+    engine: str
+    is_active: bool = False
+    activated_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+
+class ForecastModelInDB(ForecastModelPublic):
+    artifact: str
+    sha256: str
+
+
+class ForecastModelsPublic(CoreModel):
+    serving: Dict[str, Optional[str]]
+    registry: Dict[str, Optional[float]]
+    models: List[ForecastModelPublic]
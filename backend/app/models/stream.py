@@ -0,0 +1,56 @@
+"""
+Messages of the /stream WebSocket.
+
+StreamAction:
+    - subscribe / unsubscribe
+
+StreamCommand:
+    - Sent by clients: subscribe to (or unsubscribe from) the candles and forecasts of
+      some symbols at one interval. Symbols are upper-cased like the REST routes do
+
+StreamMessageType:
+    - candle: the newest stored candle of a subscription changed (a new candle, or
+      the newest one was rewritten)
+    - forecast: the forecast after a new candle (same body as GET /forecast/)
+    - error: a command was rejected; the connection stays open
+
+StreamMessage:
+    - Sent to clients: the type, the subscription it belongs to and its data
+"""
+# Std Library Imports
+from enum import Enum
+from typing import Any, List, Optional
+
+# Third Party Imports
+from pydantic import constr, validator
+
+from app.models.core import CoreModel
+from app.models.candle import CandleInterval
+
+
+class StreamAction(str, Enum):
+    subscribe = "subscribe"
+    unsubscribe = "unsubscribe"
+
+
+class StreamCommand(CoreModel):
+    action: StreamAction
+    symbols: List[constr(regex="^[A-Za-z0-9]+-[A-Za-z0-9]+$")]
+    interval: CandleInterval = CandleInterval.one_hour
+
+    @validator("symbols", each_item=True)
+    def upper_case_symbol(cls, value: str) -> str:
+        return value.upper()
+
+
+class StreamMessageType(str, Enum):
+    candle = "candle"
+    forecast = "forecast"
+    error = "error"
+
+
+class StreamMessage(CoreModel):
+    type: StreamMessageType
+    symbol: Optional[str]
+    interval: Optional[CandleInterval]
+    data: Any
@@ -7,6 +7,8 @@ logged in for a defined period of time.
 
 JWTMeta:
     - Contains attributes needed for the payload
+    - jti is a unique id per token so a single token can be revoked (tokens issued
+      before it existed have none and can't be revoked individually)
 JWTCreds:
     - Contains attributes used to identify the user
       (email and username in our case)
@@ -18,8 +20,12 @@ AccessToken:
     - Creates the access token and allows for
       customization of token types
 
+TokenRevocation:
+    - Body of the token revocation route: the (leaked) access token to revoke
+
 """
 # Std Library Imports
+from typing import Optional
 from datetime import datetime, timedelta
 
 # Third Party Imports
@@ -38,6 +44,8 @@ class JWTMeta(CoreModel):
     iat: float = datetime.timestamp(datetime.utcnow())
     # Token Expiration
     exp: float = datetime.timestamp(datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    # JWT ID
+    jti: Optional[str] = None
 
 
 class JWTCreds(CoreModel):
@@ -51,4 +59,8 @@ class JWTPayload(JWTMeta, JWTCreds):
 
 class AccessToken(CoreModel):
     access_token: str
-    token_type: str
\ No newline at end of file
+    token_type: str
+
+
+class TokenRevocation(CoreModel):
+    token: str
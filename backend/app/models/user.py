@@ -36,9 +36,20 @@ UserPublic:
     - Does NOT include password and salt
     - Let UserPublic hold an optional AccessToken allowing a user to
       be returned along with their access token as soon as they've registered
+
+UserBulkFormat:
+    - Body/stream format of the bulk import and export routes (ndjson or csv)
+
+UserBulkImportError:
+    - Line number and reason for one rejected row of a bulk import
+
+UserBulkImportResult:
+    - Summary of a bulk import: rows received, created, skipped because the email or
+      username was taken, rejected as invalid (with the first few errors), and throughput
 """
 # Std Library Imports
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 
 # Third Party Imports
 from pydantic import EmailStr, constr
@@ -53,7 +64,7 @@ class UserBase(CoreModel):
     of any user (email, username, etc.).
     """
     email: Optional[EmailStr]
-    user: Optional[str]
+    username: Optional[str]
     email_verified: bool = False
     is_active: bool = True
     is_superuser: bool = False
@@ -82,4 +93,24 @@ class UserInDB(IDModelMixin, DateTimeModelMixin, UserBase):
 
 
 class UserPublic(IDModelMixin, DateTimeModelMixin, UserBase):
-    access_token = Optional[AccessToken]
\ No newline at end of file
+    access_token: Optional[AccessToken]
+
+
+class UserBulkFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class UserBulkImportError(CoreModel):
+    line: int
+    detail: str
+
+
+class UserBulkImportResult(CoreModel):
+    received: int = 0
+    imported: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    errors: List[UserBulkImportError] = []
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
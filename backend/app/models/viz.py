@@ -0,0 +1,43 @@
+"""
+Chart series returned from the /viz endpoint.
+
+VizChartType:
+    - line: one value (the close) per point, downsampled with LTTB
+    - candles: OHLCV per point, re-bucketed into wider candles
+
+VizSeries:
+    - Column-wise series sized to the requested chart width
+    - timestamps are epoch seconds (compact, and what chart libraries consume)
+    - resolution is the stored candle interval the series was built from
+    - source_points is how many stored candles were read; points is how many are returned
+    - Line charts fill `values`; candle charts fill open/high/low/close/volume
+"""
+# Std Library Imports
+from enum import Enum
+from typing import List, Optional
+
+# Third Party Imports
+
+from app.models.core import CoreModel
+from app.models.candle import CandleInterval
+
+
+class VizChartType(str, Enum):
+    line = "line"
+    candles = "candles"
+
+
+class VizSeries(CoreModel):
+    symbol: str
+    chart: VizChartType
+    resolution: CandleInterval
+    width: int
+    source_points: int
+    points: int
+    timestamps: List[int]
+    values: Optional[List[float]]
+    open: Optional[List[float]]
+    high: Optional[List[float]]
+    low: Optional[List[float]]
+    close: Optional[List[float]]
+    volume: Optional[List[float]]
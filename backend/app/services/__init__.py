@@ -1,6 +1,24 @@
 """
-Create a single instatiation of our AuthService to be used throughout the application.
+Create a single instatiation of our AuthService, TokenCache, RevocationList, CandleCache, ForecastService, ModelRegistry and StreamHub to be used throughout the application.
+
+They are built eagerly on purpose: together they take ~0.1ms, none of them opens a
+file, connection or pool until first used, and the modules they come from (numpy
+included) are imported by the routes anyway. The slow imports under them are deferred
+where they are used instead (passlib and bcrypt in authentication, httpx in the remote
+forecast engine).
 """
 from app.services.authentication import AuthService
+from app.services.candle_cache import CandleCache
+from app.services.token_cache import TokenCache
+from app.services.forecasting import ForecastService
+from app.services.forecasting.registry import ModelRegistry
+from app.services.revocation import RevocationList
+from app.services.streaming import StreamHub
 
-auth_service = AuthService()
\ No newline at end of file
+auth_service = AuthService()
+token_cache = TokenCache()
+revocation_list = RevocationList(on_revoke=token_cache.invalidate_jti)
+candle_cache = CandleCache()
+forecast_service = ForecastService(candle_cache=candle_cache)
+model_registry = ModelRegistry(forecast_service)
+stream_hub = StreamHub(forecast_service)
@@ -15,34 +15,79 @@ hash_password():
 verify_password():
     - Use CryptContexts verify function to verify that a users password is hashed
 
+get_pwd_context():
+    - The bcrypt CryptContext, built on first use: passlib and bcrypt are only imported
+      once a password is hashed or checked, not at startup
+
+HashingPool:
+    - Bounded thread (or process) pool that bcrypt work is handed off to so it never
+      blocks the event loop
+    - Tracks jobs in flight and raises a 503 with a Retry-After header once the pool
+      and its queue are full (backpressure instead of an ever-growing backlog)
+    - Records each job's time, queueing included, in PASSWORD_HASH_SECONDS
+    - shutdown() waits for the jobs still running; async_shutdown() waits for them on a
+      worker thread so the app's shutdown handler doesn't block the event loop
+
+async_create_salt_and_hashed_password(), async_hash_password(), async_verify_password():
+    - Awaitable variants of the functions above that run on the HashingPool
+    - Use these from async routes and repositories
+
 create_access_token_for_user():
     - Takes a user from the db and creates the meta and creds for
       the user with out JWTMeta and JWTCreds classes
+    - Every token gets a random jti so it can be revoked on its own
     - All of those attributes are dumped into a JWTPayload object
     - The payload is the encoded with our algorithm and secret key
 
-get_username_from_token():
+get_payload_from_token():
     - Attempts to decode a token and raises an error if there is an issue
-    - Returns the username if successful
+    - Verified claims are mapped with JWTPayload.from_trusted() rather than re-validated
+    - Returns the whole JWTPayload (username plus exp, used by the token cache)
+
+get_username_from_token():
+    - Returns the username from get_payload_from_token()
 """
 # Std Library Imports
+import time
+import uuid
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 # Third Party Imports
 import jwt
-import bcrypt
-from pydantic import ValidationError
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
 
-from app.models.user import UserPasswordUpdate
 from app.core.config import SECRET_KEY, JWT_AUDIENCE, JWT_ALGORITHM, JWT_TOKEN_PREFIX, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.config import AUTH_HASH_WORKERS, AUTH_HASH_MAX_QUEUE, AUTH_HASH_RETRY_AFTER, AUTH_HASH_EXECUTOR
+from app.core.metrics import PASSWORD_HASH_SECONDS, elapsed_since
 from app.models.token import JWTMeta, JWTCreds, JWTPayload
 from app.models.user import UserPasswordUpdate, UserInDB
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+_pwd_context: Optional["CryptContext"] = None
+
+
+def get_pwd_context() -> "CryptContext":
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Module level so they can be pickled when the pool is a ProcessPoolExecutor
+def _hash(secret: str) -> str:
+    return get_pwd_context().hash(secret)
+
+
+def _verify(secret: str, hashed_pw: str) -> bool:
+    return get_pwd_context().verify(secret, hashed_pw)
 
 
 class AuthException(BaseException):
@@ -52,7 +97,70 @@ class AuthException(BaseException):
     pass
 
 
+class HashingPool:
+    """
+    Bounded pool for CPU heavy password work.
+    """
+    def __init__(
+        self,
+        *,
+        workers: int = AUTH_HASH_WORKERS,
+        max_queue: int = AUTH_HASH_MAX_QUEUE,
+        retry_after: int = AUTH_HASH_RETRY_AFTER,
+        kind: str = AUTH_HASH_EXECUTOR
+    ) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.kind = kind
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    @property
+    def executor(self) -> Executor:
+        # Created on first use so importing the service stays cheap
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="auth-hash")
+        return self._executor
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        if self.pending >= self.capacity:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy. Please try again shortly.",
+                headers={"Retry-After": str(self.retry_after)}
+            )
+
+        # The event loop is single threaded so the counter needs no lock
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_event_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            PASSWORD_HASH_SECONDS.labels(func.__name__.lstrip("_")).observe(elapsed_since(started))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def async_shutdown(self) -> None:
+        if self._executor is not None:
+            await asyncio.get_event_loop().run_in_executor(None, self.shutdown)
+
+
 class AuthService:
+    def __init__(self, hashing_pool: Optional[HashingPool] = None) -> None:
+        self.hashing_pool = hashing_pool or HashingPool()
+
     def create_salt_and_hashed_password(self, *, plaintext_password: str) -> UserPasswordUpdate:
         salt = self.generate_salt()
         hashed_password = self.hash_password(password=plaintext_password, salt=salt)
@@ -60,13 +168,27 @@ class AuthService:
         return UserPasswordUpdate(salt=salt, password=hashed_password)
     
     def generate_salt(self) -> str:
+        import bcrypt
+
         return bcrypt.gensalt().decode()
     
     def hash_password(self, *, password: str, salt: str) -> str:
-        return pwd_context.hash(password + salt)
+        return _hash(password + salt)
     
     def verify_password(self, *, password: str, salt: str, hashed_pw: str) -> bool:
-        return pwd_context.verify(password + salt, hashed_pw)
+        return _verify(password + salt, hashed_pw)
+
+    async def async_create_salt_and_hashed_password(self, *, plaintext_password: str) -> UserPasswordUpdate:
+        salt = self.generate_salt()
+        hashed_password = await self.async_hash_password(password=plaintext_password, salt=salt)
+
+        return UserPasswordUpdate(salt=salt, password=hashed_password)
+
+    async def async_hash_password(self, *, password: str, salt: str) -> str:
+        return await self.hashing_pool.run(_hash, password + salt)
+
+    async def async_verify_password(self, *, password: str, salt: str, hashed_pw: str) -> bool:
+        return await self.hashing_pool.run(_verify, password + salt, hashed_pw)
     
     def create_access_token_for_user(
         self,
@@ -82,7 +204,8 @@ class AuthService:
         jwt_meta = JWTMeta(
             aud=audience,
             iat=datetime.timestamp(datetime.utcnow()),
-            exp=datetime.timestamp(datetime.utcnow() + timedelta(minutes=expires_in))
+            exp=datetime.timestamp(datetime.utcnow() + timedelta(minutes=expires_in)),
+            jti=uuid.uuid4().hex
         )
         jwt_creds = JWTCreds(sub=user.email, username=user.username)
         token_payload = JWTPayload(
@@ -95,14 +218,18 @@ class AuthService:
         return access_token
     
     def get_username_from_token(self, *, token: str, secret_key: str) -> Optional[str]:
+        return self.get_payload_from_token(token=token, secret_key=secret_key).username
+
+    def get_payload_from_token(self, *, token: str, secret_key: str) -> JWTPayload:
         try:
             decoded_token = jwt.decode(token, str(secret_key), audience=JWT_AUDIENCE, algorithms=[JWT_ALGORITHM])
-            payload = JWTPayload(**decoded_token)
-        except (jwt.PyJWTError, ValidationError):
+            # The signature, audience and expiry were just verified, so the claims are our own
+            payload = JWTPayload.from_trusted(decoded_token)
+        except (jwt.PyJWTError, KeyError):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate token credentials.",
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        return payload.username
\ No newline at end of file
+        return payload
\ No newline at end of file
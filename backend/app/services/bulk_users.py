@@ -0,0 +1,183 @@
+"""
+Streaming bulk import and export of users for the superuser-only /users/bulk/ routes.
+
+iter_lines():
+    - Turns the request body's byte chunks into lines (still bytes) as they arrive,
+      holding at most one partial line between chunks
+
+UserImporter:
+    - run():
+        - Reads NDJSON (one {"email", "username", "password"} object per line) or CSV
+          (with an email,username,password header) from the body stream
+        - Every row is validated as a UserCreate, exactly like POST /users/; invalid rows
+          (including lines that aren't UTF-8) are counted and the first
+          USERS_IMPORT_MAX_ERRORS are reported by line number
+        - Valid rows are hashed in parallel on the auth service's hashing pool (never
+          more at once than the pool has workers, leaving its queue to logins and
+          signups) and written with COPY every chunk_size rows
+        - Rows whose email or username is already taken are skipped, not fatal
+        - Memory is bounded by one chunk, whatever the size of the upload
+        - Returns a UserBulkImportResult with counts, elapsed seconds and rows/second
+
+export_users():
+    - Async generator of NDJSON or CSV byte chunks read through a server-side cursor
+      (users only, never password or salt); logs rows/second when done
+"""
+# Std Library Imports
+import csv
+import io
+import json
+import time
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# Third Party Imports
+from pydantic import ValidationError
+
+from app.core.config import USERS_EXPORT_PREFETCH, USERS_IMPORT_CHUNK_SIZE, USERS_IMPORT_MAX_ERRORS
+from app.db.repositories.users import UsersRepository
+from app.models.user import UserBulkFormat, UserBulkImportError, UserBulkImportResult, UserCreate
+from app.services.authentication import AuthService
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ["id", "username", "email", "email_verified", "is_active", "is_superuser", "created_at", "updated_at"]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    partial = b""
+    async for chunk in chunks:
+        lines = (partial + chunk).split(b"\n")
+        partial = lines.pop()
+        for line in lines:
+            yield line.rstrip(b"\r")
+
+    if partial:
+        yield partial.rstrip(b"\r")
+
+
+class UserImporter:
+    def __init__(
+        self,
+        *,
+        users_repo: UsersRepository,
+        auth_service: AuthService,
+        chunk_size: int = USERS_IMPORT_CHUNK_SIZE,
+        max_errors: int = USERS_IMPORT_MAX_ERRORS
+    ) -> None:
+        self.users_repo = users_repo
+        self.auth_service = auth_service
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.result = UserBulkImportResult()
+
+    def reject(self, line: int, detail: str) -> None:
+        self.result.invalid += 1
+        if len(self.result.errors) < self.max_errors:
+            self.result.errors.append(UserBulkImportError(line=line, detail=detail))
+
+    async def parse(self, chunks: AsyncIterator[bytes], bulk_format: UserBulkFormat) -> AsyncIterator[Tuple[int, Dict]]:
+        header: Optional[List[str]] = None
+        line_number = 0
+
+        async for raw_line in iter_lines(chunks):
+            line_number += 1
+            if not raw_line.strip():
+                continue
+
+            try:
+                # UnicodeDecodeError is a ValueError: a bad byte rejects its line only
+                line = raw_line.decode("utf-8")
+                if bulk_format == UserBulkFormat.csv:
+                    values = next(csv.reader([line]))
+                    if header is None:
+                        header = [name.strip().lower() for name in values]
+                        continue
+                    row = dict(zip(header, values))
+                else:
+                    row = json.loads(line)
+                    if not isinstance(row, dict):
+                        raise ValueError("Expected a JSON object.")
+            except ValueError as e:
+                self.reject(line_number, f"Malformed row: {e}")
+                continue
+
+            yield line_number, row
+
+    async def hash_chunk(self, users: List[UserCreate]) -> List[Tuple[str, str, str, str]]:
+        semaphore = asyncio.Semaphore(self.auth_service.hashing_pool.workers)
+
+        async def hash_user(user: UserCreate) -> Tuple[str, str, str, str]:
+            async with semaphore:
+                hashed = await self.auth_service.async_create_salt_and_hashed_password(plaintext_password=user.password)
+            return (user.username, user.email, hashed.password, hashed.salt)
+
+        return await asyncio.gather(*(hash_user(user) for user in users))
+
+    async def write_chunk(self, users: List[UserCreate]) -> None:
+        if not users:
+            return
+
+        created = await self.users_repo.copy_new_users(records=await self.hash_chunk(users))
+        self.result.imported += created
+        self.result.skipped += len(users) - created
+
+    async def run(self, chunks: AsyncIterator[bytes], bulk_format: UserBulkFormat) -> UserBulkImportResult:
+        start = time.perf_counter()
+        pending: List[UserCreate] = []
+
+        async for line_number, row in self.parse(chunks, bulk_format):
+            self.result.received += 1
+            try:
+                pending.append(UserCreate(**row))
+            except (ValidationError, TypeError) as e:
+                self.reject(line_number, str(e))
+                continue
+
+            if len(pending) >= self.chunk_size:
+                await self.write_chunk(pending)
+                pending = []
+
+        await self.write_chunk(pending)
+
+        self.result.seconds = round(time.perf_counter() - start, 3)
+        self.result.rows_per_second = round(self.result.received / self.result.seconds, 1) if self.result.seconds else 0.0
+
+        return self.result
+
+
+def _export_value(value) -> object:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+async def export_users(
+    *, users_repo: UsersRepository, bulk_format: UserBulkFormat, prefetch: int = USERS_EXPORT_PREFETCH
+) -> AsyncIterator[bytes]:
+    start = time.perf_counter()
+    rows = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if bulk_format == UserBulkFormat.csv:
+        writer.writerow(EXPORT_COLUMNS)
+
+    async for record in users_repo.stream_users(prefetch=prefetch):
+        rows += 1
+        if bulk_format == UserBulkFormat.csv:
+            writer.writerow([_export_value(record[column]) for column in EXPORT_COLUMNS])
+        else:
+            buffer.write(json.dumps({column: _export_value(record[column]) for column in EXPORT_COLUMNS}))
+            buffer.write("\n")
+
+        # Hand the client one cursor page at a time
+        if rows % prefetch == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+    seconds = time.perf_counter() - start
+    logger.info(f"Exported {rows} users in {seconds:.2f}s ({rows / seconds if seconds else 0:.0f} rows/s)")
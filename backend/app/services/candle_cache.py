@@ -0,0 +1,320 @@
+"""
+Local columnar cache of the newest candles of every (symbol, interval), so the
+forecast and chart hot paths can read a recent window without a Postgres round trip
+and a row by row conversion. Ingestion writes the cache right after it writes the
+candles table; the API workers only read it.
+
+CandleRing:
+    - One file per (symbol, interval): a 64 byte header, then the six columns of
+      get_series() (open_times as epoch seconds, open, high, low, close, volume) as
+      float64, each 2 * capacity long. Candle i goes to slot i % capacity and again
+      to that slot + capacity, so the newest n <= capacity candles are always one
+      contiguous run: a window is a single slice copy per column
+    - The file is mapped (mmap) by every process that uses it, so gunicorn workers
+      share the same page cache pages instead of each holding a copy
+    - Header: capacity, candles written so far, a sequence number (odd while a write
+      is in progress) and whether the ring holds every stored candle (seeded from a
+      history shorter than its capacity)
+    - Writers serialize on flock and bump the sequence around every write; readers
+      never lock (a seqlock). A read copies the window out of the mapping and only
+      returns the copy when the sequence was even and unchanged from before the copy
+      to after it, so a window is never torn and later writes never change it
+    - write(): appends candles newer than the newest held and overwrites held ones;
+      refuses a batch (writes nothing, returns False) holding an older candle it
+      doesn't have, which the caller fixes by reseeding
+    - reset(): replaces the contents (seeding)
+    - recent(): the newest n candles; None while the ring holds fewer (unless it
+      holds all of them)
+    - between(): the candles in [start, end); None unless the ring reaches
+      back to start (or holds all of them) and, when `newest` is given, its newest
+      candle opened then
+
+CandleCache:
+    - The ring files under CANDLE_CACHE_DIR (disabled unless CANDLE_CACHE_ENABLED),
+      each opened once per process on first use
+    - recent(), series():
+        - The ring's window, but only when its newest open_time is the
+          `last_open_time` the caller read from the candles table (the index-only
+          query the forecast and chart paths run anyway); a ring that is behind,
+          missing or being reseeded gives None and the caller reads Postgres
+    - write(): candle records (CANDLE_COLUMNS tuples) as ingestion stores them;
+      False when a ring needs reseeding
+    - needs_seed(), seed(): a ring that doesn't exist yet or was never filled is
+      seeded from the newest `capacity` stored candles
+    - stats(): hits, misses and open rings
+"""
+# Std Library Imports
+import os
+import mmap
+import time
+import fcntl
+import tempfile
+import contextlib
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple, TypeVar
+
+# Third Party Imports
+import numpy as np
+
+from app.core.config import CANDLE_CACHE_CAPACITY, CANDLE_CACHE_DIR, CANDLE_CACHE_ENABLED
+from app.db.repositories.candles import CandleRecord
+from app.models.candle import CandleInterval
+
+Columns = Dict[str, np.ndarray]
+Result = TypeVar("Result")
+
+COLUMNS = ("open_times", "open", "high", "low", "close", "volume")
+
+HEADER_SIZE = 64
+MAGIC = 0x31454C444E4143  # "CANDLE1"
+# int64 header fields
+MAGIC_FIELD, CAPACITY, COUNT, SEQUENCE, COMPLETE = range(5)
+
+# Reads retried while they keep overlapping writes, before giving up (the caller reads Postgres)
+READ_ATTEMPTS = 100
+
+
+def records_to_columns(records: Sequence[CandleRecord]) -> Columns:
+    values = np.array([record[3:] for record in records], dtype=np.float64).reshape(-1, 5)
+    return {
+        "open_times": np.array([record[2].timestamp() for record in records], dtype=np.float64),
+        **{name: values[:, i] for i, name in enumerate(COLUMNS[1:])}
+    }
+
+
+class CandleRing:
+    def __init__(self, path: str, *, writable: bool = False, capacity: int = CANDLE_CACHE_CAPACITY) -> None:
+        if writable and not os.path.exists(path):
+            self.create(path, capacity)
+
+        self.path = path
+        self.writable = writable
+        self._file = open(path, "r+b" if writable else "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        self.header = np.frombuffer(self._map, dtype=np.int64, count=HEADER_SIZE // 8)
+        if self.header[MAGIC_FIELD] != MAGIC:
+            raise ValueError(f"{path} is not a candle ring")
+
+        self.capacity = int(self.header[CAPACITY])
+        self.data = np.frombuffer(
+            self._map, dtype=np.float64, offset=HEADER_SIZE, count=len(COLUMNS) * 2 * self.capacity
+        ).reshape(len(COLUMNS), 2 * self.capacity)
+
+    @staticmethod
+    def create(path: str, capacity: int) -> None:
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+
+        header = np.zeros(HEADER_SIZE // 8, dtype=np.int64)
+        header[MAGIC_FIELD], header[CAPACITY] = MAGIC, capacity
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix=".ring-")
+        try:
+            with os.fdopen(fd, "wb") as ring_file:
+                ring_file.write(header.tobytes())
+                ring_file.truncate(HEADER_SIZE + len(COLUMNS) * 2 * capacity * 8)
+            # Publish the finished file atomically; if another writer got there first, use theirs
+            with contextlib.suppress(FileExistsError):
+                os.link(temporary, path)
+        finally:
+            os.remove(temporary)
+
+    def close(self) -> None:
+        self.header = self.data = None
+        # Windows still in use keep the mapping alive; it is unmapped once they're gone
+        with contextlib.suppress(BufferError):
+            self._map.close()
+        self._file.close()
+
+    @property
+    def count(self) -> int:
+        return int(self.header[COUNT])
+
+    def _held(self) -> int:
+        return min(int(self.header[COUNT]), self.capacity)
+
+    # Holds every stored candle: seeded from a shorter history and not wrapped since
+    def _complete(self) -> bool:
+        return bool(self.header[COMPLETE]) and int(self.header[COUNT]) <= self.capacity
+
+    def _columns(self, n: int) -> Columns:
+        end = (int(self.header[COUNT]) - 1) % self.capacity + self.capacity + 1
+        return {name: self.data[i, end - n:end] for i, name in enumerate(COLUMNS)}
+
+    # read() must copy what it returns out of the mapping: the sequence check only
+    # covers what was read before it
+    def _consistent(self, read: Callable[[], Result]) -> Optional[Result]:
+        for _ in range(READ_ATTEMPTS):
+            sequence = int(self.header[SEQUENCE])
+            if sequence % 2 == 0:
+                result = read()
+                if int(self.header[SEQUENCE]) == sequence:
+                    return result
+            time.sleep(0)
+
+        return None
+
+    def recent(self, n: int) -> Optional[Columns]:
+        def read() -> Optional[Columns]:
+            held = self._held()
+            if held == 0 or (n > held and not self._complete()):
+                return None
+            return {name: values.copy() for name, values in self._columns(min(n, held)).items()}
+
+        return self._consistent(read)
+
+    def between(self, start: float, end: float, *, newest: Optional[float] = None) -> Optional[Columns]:
+        def read() -> Optional[Columns]:
+            held = self._held()
+            if held == 0:
+                return None
+            columns = self._columns(held)
+            if columns["open_times"][0] > start and not self._complete():
+                return None
+            if newest is not None and columns["open_times"][-1] != newest:
+                return None
+            lo, hi = np.searchsorted(columns["open_times"], [start, end])
+            return {name: values[lo:hi].copy() for name, values in columns.items()}
+
+        return self._consistent(read)
+
+    @contextlib.contextmanager
+    def _writing(self) -> Iterator[None]:
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        self.header[SEQUENCE] += 1
+        try:
+            yield
+        finally:
+            self.header[SEQUENCE] += 1
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def _store(self, positions: np.ndarray, columns: Columns) -> None:
+        slots = positions % self.capacity
+        for i, name in enumerate(COLUMNS):
+            self.data[i, slots] = columns[name]
+            self.data[i, slots + self.capacity] = columns[name]
+
+    def write(self, columns: Columns) -> bool:
+        order = np.argsort(columns["open_times"], kind="stable")
+        columns = {name: np.asarray(columns[name], dtype=np.float64)[order] for name in COLUMNS}
+        times = columns["open_times"]
+
+        with self._writing():
+            count, held = int(self.header[COUNT]), self._held()
+            existing = self._columns(held)["open_times"] if held else times[:0]
+            old = times <= existing[-1] if held else np.zeros(len(times), dtype=bool)
+
+            if old.any():
+                found = np.minimum(np.searchsorted(existing, times[old]), held - 1)
+                if not np.array_equal(existing[found], times[old]):
+                    return False
+                self._store(count - held + found, {name: values[old] for name, values in columns.items()})
+
+            new = {name: values[~old][-self.capacity:] for name, values in columns.items()}
+            appended = int((~old).sum())
+            self._store(np.arange(count + appended - len(new["open_times"]), count + appended), new)
+            self.header[COUNT] = count + appended
+
+        return True
+
+    def reset(self, columns: Columns, *, complete: bool) -> None:
+        with self._writing():
+            newest = {name: np.asarray(columns[name], dtype=np.float64)[-self.capacity:] for name in COLUMNS}
+            self._store(np.arange(len(newest["open_times"])), newest)
+            self.header[COUNT] = len(newest["open_times"])
+            self.header[COMPLETE] = int(complete)
+
+
+class CandleCache:
+    def __init__(
+        self,
+        directory: str = CANDLE_CACHE_DIR,
+        *,
+        capacity: int = CANDLE_CACHE_CAPACITY,
+        enabled: bool = CANDLE_CACHE_ENABLED
+    ) -> None:
+        self.directory = directory
+        self.capacity = capacity
+        self.enabled = enabled
+        self._readers: Dict[Tuple[str, str], CandleRing] = {}
+        self._writers: Dict[Tuple[str, str], CandleRing] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, symbol: str, interval: CandleInterval) -> str:
+        return os.path.join(self.directory, f"{symbol}.{CandleInterval(interval).value}.ring")
+
+    def ring(self, symbol: str, interval: CandleInterval, *, writable: bool = False) -> Optional[CandleRing]:
+        key = (symbol, CandleInterval(interval).value)
+        rings = self._writers if writable else self._readers
+        if key not in rings:
+            path = self.path(symbol, interval)
+            if not writable and not os.path.exists(path):
+                return None
+            rings[key] = CandleRing(path, writable=writable, capacity=self.capacity)
+
+        return rings[key]
+
+    def _current(self, window: Optional[Columns], last_open_time: datetime) -> Optional[Columns]:
+        if window is None or not len(window["open_times"]) or window["open_times"][-1] != last_open_time.timestamp():
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return window
+
+    def recent(
+        self, *, symbol: str, interval: CandleInterval, n: int, last_open_time: datetime
+    ) -> Optional[Columns]:
+        ring = self.ring(symbol, interval) if self.enabled else None
+        if ring is None:
+            return None
+
+        return self._current(ring.recent(n), last_open_time)
+
+    def series(
+        self, *, symbol: str, interval: CandleInterval, start: datetime, end: datetime, last_open_time: datetime
+    ) -> Optional[Columns]:
+        ring = self.ring(symbol, interval) if self.enabled else None
+        if ring is None:
+            return None
+
+        # The ring is current when its newest candle is the stored newest one, even if the range ends earlier
+        window = ring.between(start.timestamp(), end.timestamp(), newest=last_open_time.timestamp())
+        if window is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return window
+
+    def write(self, records: Sequence[CandleRecord]) -> bool:
+        written = True
+        groups: Dict[Tuple[str, str], list] = {}
+        for record in records:
+            groups.setdefault((record[0], record[1]), []).append(record)
+        for (symbol, interval), group in groups.items():
+            written &= self.ring(symbol, interval, writable=True).write(records_to_columns(group))
+
+        return written
+
+    def needs_seed(self, *, symbol: str, interval: CandleInterval) -> bool:
+        return not os.path.exists(self.path(symbol, interval)) or self.ring(symbol, interval, writable=True).count == 0
+
+    def seed(self, *, symbol: str, interval: CandleInterval, columns: Columns, complete: bool) -> None:
+        self.ring(symbol, interval, writable=True).reset(columns, complete=complete)
+
+    def close(self) -> None:
+        for ring in [*self._readers.values(), *self._writers.values()]:
+            ring.close()
+        self._readers.clear()
+        self._writers.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "open_rings": len(self._readers)
+        }
@@ -0,0 +1,104 @@
+"""
+Downsampling of price series for charts. A chart can't show more points than it
+has pixels, so series are reduced on the server to roughly the requested width
+before they are sent to the browser.
+
+lttb():
+    - Largest-Triangle-Three-Buckets: picks `threshold` points of a line series
+      that preserve its visual shape (peaks and troughs survive, unlike
+      averaging or taking every nth point)
+    - The first and last points are always kept
+
+rebucket_ohlc():
+    - Merges consecutive candles into `buckets` equal-time candles: first open,
+      max high, min low, last close, summed volume
+    - Fully vectorized with NumPy reduceat
+
+choose_resolution():
+    - Picks the coarsest stored candle interval that still has at least `points`
+      candles over the requested range, so as few rows as possible are read
+      while there is still enough detail to fill the chart
+"""
+# Std Library Imports
+from typing import Dict, Tuple
+
+# Third Party Imports
+import numpy as np
+
+from app.models.candle import CandleInterval, CANDLE_INTERVAL_SECONDS
+
+# Intervals that can be read for charts (1m candles plus their rollups), coarsest first
+CHART_RESOLUTIONS = (
+    CandleInterval.one_day,
+    CandleInterval.one_hour,
+    CandleInterval.five_minutes,
+    CandleInterval.one_minute
+)
+
+
+def choose_resolution(span_seconds: float, points: int) -> CandleInterval:
+    for resolution in CHART_RESOLUTIONS:
+        if span_seconds / CANDLE_INTERVAL_SECONDS[resolution] >= points:
+            return resolution
+
+    return CHART_RESOLUTIONS[-1]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket edges for the n - 2 points between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return x[selected], y[selected]
+
+
+def rebucket_ohlc(
+    open_times: np.ndarray,
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    volumes: np.ndarray,
+    buckets: int
+) -> Dict[str, np.ndarray]:
+    n = len(open_times)
+    if buckets >= n or buckets < 1:
+        return {"open_times": open_times, "open": opens, "high": highs, "low": lows, "close": closes, "volume": volumes}
+
+    # Equal-time buckets over the covered range; empty buckets are dropped
+    edges = np.linspace(open_times[0], open_times[-1], buckets + 1)[:-1]
+    starts = np.unique(np.searchsorted(open_times, edges, side="left"))
+    ends = np.append(starts[1:], n) - 1
+
+    return {
+        "open_times": open_times[starts],
+        "open": opens[starts],
+        "high": np.maximum.reduceat(highs, starts),
+        "low": np.minimum.reduceat(lows, starts),
+        "close": closes[ends],
+        "volume": np.add.reduceat(volumes, starts)
+    }
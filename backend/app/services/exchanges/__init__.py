@@ -0,0 +1,12 @@
+"""
+Registry of market data sources, keyed by the name used on the command line and in config.
+"""
+from app.services.exchanges.base import ExchangeAdapter, IngestionError, TokenBucket
+from app.services.exchanges.bravenewcoin import BraveNewCoinAdapter
+from app.services.exchanges.cryptocompare import CryptoCompareAdapter
+from app.services.exchanges.poloniex import PoloniexAdapter
+
+EXCHANGE_ADAPTERS = {
+    adapter.name: adapter
+    for adapter in (CryptoCompareAdapter, PoloniexAdapter, BraveNewCoinAdapter)
+}
@@ -0,0 +1,109 @@
+"""
+Shared pieces for exchange adapters (the classes that fetch candles from one
+market data source each).
+
+IngestionError:
+    - Raised when a source answers with an error payload
+
+TokenBucket:
+    - Per-source rate limiter; every request takes a token and tokens refill at
+      a fixed rate up to a burst capacity
+    - Waiters are served in order so one busy symbol can't starve the others
+
+ExchangeAdapter:
+    - Base class every source subclasses
+    - Holds the shared httpx.AsyncClient (one connection pool for all sources)
+      and the source's TokenBucket
+    - fetch_candles() returns at most one page of candles, oldest first, with
+      open_time in [start, end), as CandleRecord tuples ready for the repository
+
+split_symbol():
+    - "BTC-USD" -> ("BTC", "USD"); our symbols are always BASE-QUOTE
+"""
+# Std Library Imports
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# Third Party Imports
+import httpx
+
+from app.db.repositories.candles import CandleRecord
+from app.models.candle import CandleInterval
+
+
+class IngestionError(Exception):
+    """
+    A market data source rejected a request.
+    """
+    pass
+
+
+class TokenBucket:
+    def __init__(self, *, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 1) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+def split_symbol(symbol: str) -> Tuple[str, str]:
+    base, quote = symbol.upper().split("-", 1)
+    return base, quote
+
+
+def from_timestamp(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+class ExchangeAdapter:
+    # Overridden by each source
+    name = ""
+    base_url = ""
+    rate_limit = 1.0 # requests per second
+    burst = 1
+    page_size = 1000
+    intervals: Dict[CandleInterval, Any] = {}
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        rate_limit: Optional[float] = None,
+        burst: Optional[int] = None
+    ) -> None:
+        self.client = client
+        self.bucket = TokenBucket(rate=rate_limit or self.rate_limit, capacity=burst or self.burst)
+        self.requests = 0
+
+    def supports(self, interval: CandleInterval) -> bool:
+        return CandleInterval(interval) in self.intervals
+
+    async def get_json(self, path: str, *, params: Optional[dict] = None, headers: Optional[dict] = None) -> Any:
+        await self.bucket.acquire()
+        self.requests += 1
+
+        res = await self.client.get(f"{self.base_url}{path}", params=params, headers=headers)
+        res.raise_for_status()
+
+        return res.json()
+
+    async def fetch_candles(
+        self, *, symbol: str, interval: CandleInterval, start: datetime, end: datetime
+    ) -> List[CandleRecord]:
+        raise NotImplementedError
@@ -0,0 +1,76 @@
+"""
+BraveNewCoin (https://bravenewcoin.com/developers, served through RapidAPI) daily
+OHLCV for its Global Weighted Average (GWA) indices.
+
+Only daily candles are offered. Prices are indexed by asset id rather than by
+ticker, so the id for each base asset is looked up once and remembered. Pages are
+requested backwards from a timestamp, newest first.
+"""
+# Std Library Imports
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# Third Party Imports
+
+from app.core.config import BRAVENEWCOIN_API_KEY
+from app.db.repositories.candles import CandleRecord
+from app.models.candle import CandleInterval
+from app.services.exchanges.base import ExchangeAdapter, IngestionError, split_symbol
+
+
+class BraveNewCoinAdapter(ExchangeAdapter):
+    name = "bravenewcoin"
+    base_url = "https://bravenewcoin.p.rapidapi.com"
+    rate_limit = 2.0
+    burst = 2
+    page_size = 100
+    intervals = {CandleInterval.one_day: "1d"}
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._asset_ids: Dict[str, str] = {}
+
+    @property
+    def headers(self) -> dict:
+        return {"x-rapidapi-key": str(BRAVENEWCOIN_API_KEY), "x-rapidapi-host": "bravenewcoin.p.rapidapi.com"}
+
+    async def get_asset_id(self, base: str) -> str:
+        if base not in self._asset_ids:
+            payload = await self.get_json("/asset", params={"symbol": base, "status": "ACTIVE"}, headers=self.headers)
+            content = payload.get("content") or []
+            if not content:
+                raise IngestionError(f"{self.name}: unknown asset {base}")
+            self._asset_ids[base] = content[0]["id"]
+
+        return self._asset_ids[base]
+
+    async def fetch_candles(
+        self, *, symbol: str, interval: CandleInterval, start: datetime, end: datetime
+    ) -> List[CandleRecord]:
+        interval = CandleInterval(interval)
+        base, _ = split_symbol(symbol)
+        index_id = await self.get_asset_id(base)
+        page_end = min(end, start + timedelta(days=self.page_size))
+
+        payload = await self.get_json(
+            "/ohlcv",
+            params={
+                "indexId": index_id,
+                "indexType": "GWA",
+                "timestamp": page_end.isoformat(),
+                "size": self.page_size
+            },
+            headers=self.headers
+        )
+
+        records = []
+        for row in payload.get("content") or []:
+            open_time = datetime.fromisoformat(row["timestamp"].replace("Z", "+00:00"))
+            if start <= open_time < end:
+                records.append((
+                    symbol, interval.value, open_time,
+                    float(row["open"]), float(row["high"]), float(row["low"]), float(row["close"]),
+                    float(row["volume"])
+                ))
+
+        return sorted(records, key=lambda record: record[2])
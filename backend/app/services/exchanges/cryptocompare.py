@@ -0,0 +1,71 @@
+"""
+CryptoCompare (https://min-api.cryptocompare.com/) historical OHLCV.
+
+The histo* endpoints page backwards from toTs, so a forward page starting at
+`start` is requested by asking for the `page_size` candles that end at
+start + page span. Aggregated intervals (5m, 15m, 4h) use the aggregate parameter.
+"""
+# Std Library Imports
+from datetime import datetime
+from typing import List
+
+# Third Party Imports
+
+from app.core.config import CRYPTOCOMPARE_API_KEY
+from app.db.repositories.candles import CandleRecord
+from app.models.candle import CandleInterval, CANDLE_INTERVAL_SECONDS
+from app.services.exchanges.base import ExchangeAdapter, IngestionError, split_symbol, from_timestamp
+
+
+class CryptoCompareAdapter(ExchangeAdapter):
+    name = "cryptocompare"
+    base_url = "https://min-api.cryptocompare.com"
+    rate_limit = 20.0
+    burst = 20
+    page_size = 2000
+    # interval -> (endpoint, aggregate)
+    intervals = {
+        CandleInterval.one_minute: ("histominute", 1),
+        CandleInterval.five_minutes: ("histominute", 5),
+        CandleInterval.fifteen_minutes: ("histominute", 15),
+        CandleInterval.one_hour: ("histohour", 1),
+        CandleInterval.four_hours: ("histohour", 4),
+        CandleInterval.one_day: ("histoday", 1)
+    }
+
+    async def fetch_candles(
+        self, *, symbol: str, interval: CandleInterval, start: datetime, end: datetime
+    ) -> List[CandleRecord]:
+        interval = CandleInterval(interval)
+        endpoint, aggregate = self.intervals[interval]
+        step = CANDLE_INTERVAL_SECONDS[interval]
+        base, quote = split_symbol(symbol)
+        start_ts = int(start.timestamp())
+        end_ts = int(end.timestamp())
+        to_ts = min(end_ts - step, start_ts + (self.page_size - 1) * step)
+
+        headers = {"authorization": f"Apikey {CRYPTOCOMPARE_API_KEY}"} if str(CRYPTOCOMPARE_API_KEY) else None
+        payload = await self.get_json(
+            f"/data/v2/{endpoint}",
+            params={
+                "fsym": base,
+                "tsym": quote,
+                "aggregate": aggregate,
+                "limit": self.page_size - 1,
+                "toTs": to_ts
+            },
+            headers=headers
+        )
+        if payload.get("Response") == "Error":
+            raise IngestionError(f"{self.name}: {payload.get('Message')}")
+
+        return [
+            (
+                symbol, interval.value, from_timestamp(row["time"]),
+                float(row["open"]), float(row["high"]), float(row["low"]), float(row["close"]),
+                float(row["volumefrom"])
+            )
+            for row in payload["Data"]["Data"]
+            # Empty candles (before listing) come back as all zeros
+            if start_ts <= row["time"] < end_ts and row["close"]
+        ]
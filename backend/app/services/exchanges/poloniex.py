@@ -0,0 +1,65 @@
+"""
+Poloniex (https://api.poloniex.com) spot candles.
+
+Candles are returned as arrays:
+    [low, high, open, close, amount, quantity, buyTakerAmount, buyTakerQuantity,
+     tradeCount, ts, weightedAverage, interval, startTime, closeTime]
+Poloniex quotes dollar pairs in USDT, so a USD quote is mapped onto it.
+"""
+# Std Library Imports
+from datetime import datetime
+from typing import List
+
+# Third Party Imports
+
+from app.db.repositories.candles import CandleRecord
+from app.models.candle import CandleInterval
+from app.services.exchanges.base import ExchangeAdapter, IngestionError, split_symbol, from_timestamp
+
+
+class PoloniexAdapter(ExchangeAdapter):
+    name = "poloniex"
+    base_url = "https://api.poloniex.com"
+    rate_limit = 10.0
+    burst = 10
+    page_size = 500
+    intervals = {
+        CandleInterval.one_minute: "MINUTE_1",
+        CandleInterval.five_minutes: "MINUTE_5",
+        CandleInterval.fifteen_minutes: "MINUTE_15",
+        CandleInterval.one_hour: "HOUR_1",
+        CandleInterval.four_hours: "HOUR_4",
+        CandleInterval.one_day: "DAY_1"
+    }
+    quote_aliases = {"USD": "USDT"}
+
+    async def fetch_candles(
+        self, *, symbol: str, interval: CandleInterval, start: datetime, end: datetime
+    ) -> List[CandleRecord]:
+        interval = CandleInterval(interval)
+        base, quote = split_symbol(symbol)
+        start_ms = int(start.timestamp() * 1000)
+        end_ms = int(end.timestamp() * 1000)
+
+        payload = await self.get_json(
+            f"/markets/{base}_{self.quote_aliases.get(quote, quote)}/candles",
+            params={
+                "interval": self.intervals[interval],
+                "startTime": start_ms,
+                "endTime": end_ms - 1,
+                "limit": self.page_size
+            }
+        )
+        if isinstance(payload, dict):
+            raise IngestionError(f"{self.name}: {payload.get('message', payload)}")
+
+        records = [
+            (
+                symbol, interval.value, from_timestamp(row[12] / 1000),
+                float(row[2]), float(row[1]), float(row[0]), float(row[3]), float(row[5])
+            )
+            for row in payload
+            if start_ms <= row[12] < end_ms
+        ]
+
+        return sorted(records, key=lambda record: record[2])
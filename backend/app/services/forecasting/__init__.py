@@ -0,0 +1,22 @@
+"""
+Forecasting: inference engines, request micro-batching, the forecast cache, the
+technical indicator feature engine and the service the /forecast route calls.
+Walk-forward backtesting is the command line module
+app.services.forecasting.backtesting and isn't imported here.
+"""
+from app.services.forecasting.batching import MicroBatcher
+from app.services.forecasting.cache import (
+    ForecastCache,
+    ForecastCacheBackend,
+    LocalForecastCacheBackend,
+    RedisForecastCacheBackend,
+    create_forecast_cache
+)
+from app.services.forecasting.engines import (
+    InferenceEngine,
+    ExponentialSmoothingEngine,
+    RemoteEngine,
+    create_engine
+)
+from app.services.forecasting.features import FEATURE_NAMES, FeatureEngine, FeatureState
+from app.services.forecasting.service import ForecastService
@@ -0,0 +1,431 @@
+"""
+Offline training and walk-forward backtesting of forecast models over the stored
+candle history. Every symbol's history is cut into forecast origins (every `step`
+candles); the origins are split into consecutive folds, and for each fold the models
+are fitted on the candles before it only and then forecast `horizon` candles from each
+of its origins. The (symbol, fold) tasks run on a process pool.
+
+SharedCandles:
+    - The closes of every symbol back to back in one memory-mapped file (under
+      BACKTEST_SHARED_DIR, /dev/shm when there is one, so it never touches a disk); a
+      pool worker maps it once and reads the same pages as every other worker. Only the
+      path and the per-symbol offsets are pickled to the workers, never the candles
+    - create() writes the file, closes() is a read-only view of one symbol, close()
+      removes the file
+
+BacktestModel and MODELS:
+    - fit() sees the candles before the fold, predict() forecasts a batch of origins
+    - naive:     the last close for every future candle (the baseline)
+    - drift:     the last close continued by the mean log return of the window
+    - holt:      the served model (ExponentialSmoothingEngine) as configured
+    - holt-fit:  Holt with alpha and beta chosen per fold by grid search on the
+                 training history
+    - features:  per-step least squares of the future log return on the indicator
+                 features (FeatureEngine) of the last known candle, fitted per fold
+
+make_folds():
+    - (start, stop, step) origin ranges of every fold of a history; the first origin
+      has `window` candles before it and the last one `horizon` candles after it
+
+evaluate_fold():
+    - Runs one (symbol, fold) task and returns sums of absolute, squared and percentage
+      errors and of correctly forecast directions per model (sums combine exactly
+      across tasks) with its fit and predict seconds
+
+run_backtest():
+    - Spreads the tasks over `workers` processes (inline for one) and combines them:
+      MAE, RMSE, MAPE (%), directional accuracy and MAE relative to naive per model and
+      symbol, fit and predict seconds and forecasts per CPU second per model, plus the
+      wall clock seconds and forecasts per second of the whole run
+
+main():
+    - Command line entry point; reads the closes from the candles store
+    > python -m app.services.forecasting.backtesting --interval 1h --start 2021-01-01 BTC-USD ETH-USD
+    > python -m app.services.forecasting.backtesting --models naive holt-fit --workers 4 --output backtest.json BTC-USD
+"""
+# Std Library Imports
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Third Party Imports
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.core.config import (
+    BACKTEST_FOLDS,
+    BACKTEST_HORIZON,
+    BACKTEST_SHARED_DIR,
+    BACKTEST_STEP,
+    BACKTEST_WORKERS,
+    DATABASE_URL,
+    FORECAST_WINDOW
+)
+from app.core.workers import available_cpus
+from app.db.repositories.candles import CandlesRepository
+from app.db.tasks import create_database
+from app.models.candle import CandleInterval
+from app.services.forecasting.engines import ExponentialSmoothingEngine
+from app.services.forecasting.features import FeatureEngine
+
+logger = logging.getLogger(__name__)
+
+Fold = Tuple[int, int, int]
+
+HOLT_ALPHAS = (0.1, 0.3, 0.5, 0.7, 0.9)
+HOLT_BETAS = (0.01, 0.05, 0.1, 0.2)
+HOLT_FIT_ORIGINS = 64  # most recent training origins the grid search scores
+
+ERROR_SUMS = ("absolute", "squared", "percentage", "direction", "count")
+
+# Maps opened by this process, by path
+_mapped: Dict[str, np.memmap] = {}
+
+
+class SharedCandles:
+    def __init__(self, path: str, offsets: Dict[str, Tuple[int, int]]) -> None:
+        self.path = path
+        self.offsets = offsets
+
+    @classmethod
+    def create(cls, series: Dict[str, np.ndarray], directory: str = BACKTEST_SHARED_DIR) -> "SharedCandles":
+        fd, path = tempfile.mkstemp(prefix="backtest-", suffix=".f8", dir=directory if os.path.isdir(directory) else None)
+        os.close(fd)
+
+        total = sum(len(closes) for closes in series.values())
+        buffer = np.memmap(path, dtype=np.float64, mode="w+", shape=(max(1, total),))
+        offsets, position = {}, 0
+        for symbol, closes in series.items():
+            buffer[position:position + len(closes)] = closes
+            offsets[symbol] = (position, len(closes))
+            position += len(closes)
+        buffer.flush()
+        del buffer
+
+        return cls(path, offsets)
+
+    def closes(self, symbol: str) -> np.ndarray:
+        if self.path not in _mapped:
+            _mapped[self.path] = np.memmap(self.path, dtype=np.float64, mode="r")
+        start, length = self.offsets[symbol]
+        return _mapped[self.path][start:start + length]
+
+    def close(self) -> None:
+        _mapped.pop(self.path, None)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _windows(closes: np.ndarray, origins: np.ndarray, window: int) -> np.ndarray:
+    return sliding_window_view(closes, window)[origins - window]
+
+
+class BacktestModel:
+    name = ""
+
+    def __init__(self, *, window: int = FORECAST_WINDOW) -> None:
+        self.window = window
+
+    # Only closes[:end] may be used
+    def fit(self, closes: np.ndarray, end: int, horizon: int) -> None:
+        pass
+
+    # Only closes[:origin] may be used for an origin; returns (origins, horizon) closes
+    def predict(self, closes: np.ndarray, origins: np.ndarray, horizon: int) -> np.ndarray:
+        raise NotImplementedError
+
+
+class NaiveModel(BacktestModel):
+    name = "naive"
+
+    def predict(self, closes: np.ndarray, origins: np.ndarray, horizon: int) -> np.ndarray:
+        return np.repeat(closes[origins - 1][:, None], horizon, axis=1)
+
+
+class DriftModel(BacktestModel):
+    name = "drift"
+
+    def predict(self, closes: np.ndarray, origins: np.ndarray, horizon: int) -> np.ndarray:
+        last = closes[origins - 1]
+        drift = np.log(last / closes[origins - self.window]) / max(1, self.window - 1)
+        steps = np.arange(1, horizon + 1, dtype=np.float64)
+        return last[:, None] * np.exp(drift[:, None] * steps[None, :])
+
+
+class HoltModel(BacktestModel):
+    name = "holt"
+
+    def __init__(self, *, window: int = FORECAST_WINDOW) -> None:
+        super().__init__(window=window)
+        self.engine = ExponentialSmoothingEngine()
+
+    def predict(self, closes: np.ndarray, origins: np.ndarray, horizon: int) -> np.ndarray:
+        return self.engine.predict_sync(_windows(closes, origins, self.window), horizon)
+
+
+class FittedHoltModel(HoltModel):
+    name = "holt-fit"
+
+    def fit(self, closes: np.ndarray, end: int, horizon: int) -> None:
+        origins = np.arange(self.window, end - horizon + 1)[-HOLT_FIT_ORIGINS:]
+        if len(origins) == 0:
+            return
+
+        windows = _windows(closes, origins, self.window)
+        actual = sliding_window_view(closes, horizon)[origins]
+        best = np.inf
+        for alpha in HOLT_ALPHAS:
+            for beta in HOLT_BETAS:
+                engine = ExponentialSmoothingEngine(alpha=alpha, beta=beta)
+                error = np.mean(np.abs(engine.predict_sync(windows, horizon) - actual))
+                if error < best:
+                    best, self.engine = error, engine
+
+
+class FeatureRegressionModel(BacktestModel):
+    name = "features"
+
+    def __init__(self, *, window: int = FORECAST_WINDOW) -> None:
+        super().__init__(window=window)
+        self.inputs = None
+        self.weights = None
+
+    # Scale free inputs per candle (rows), with a constant column; every feature at t
+    # only depends on closes up to t, so computing them over the whole series is causal
+    def _inputs(self, closes: np.ndarray) -> np.ndarray:
+        features, _ = FeatureEngine().compute(closes)
+        features = {name: values[0] for name, values in features.items()}
+        return np.column_stack([
+            np.ones(len(closes)),
+            features["log_return"],
+            features["volatility"],
+            features["rsi"] / 100 - 0.5,
+            features["macd_histogram"] / closes,
+            closes / features["sma"] - 1,
+            closes / features["ema"] - 1,
+            features["bollinger_width"]
+        ])
+
+    def fit(self, closes: np.ndarray, end: int, horizon: int) -> None:
+        self.inputs = self._inputs(closes)
+        rows = np.arange(0, end - horizon)
+        rows = rows[np.isfinite(self.inputs[rows]).all(axis=1)]
+        if len(rows) <= self.inputs.shape[1]:
+            return
+
+        targets = np.log(sliding_window_view(closes, horizon)[rows + 1] / closes[rows, None])
+        self.weights, *_ = np.linalg.lstsq(self.inputs[rows], targets, rcond=None)
+
+    def predict(self, closes: np.ndarray, origins: np.ndarray, horizon: int) -> np.ndarray:
+        last = closes[origins - 1]
+        if self.weights is None:
+            return np.repeat(last[:, None], horizon, axis=1)
+
+        inputs = np.nan_to_num(self.inputs[origins - 1], nan=0.0, posinf=0.0, neginf=0.0)
+        return last[:, None] * np.exp(inputs @ self.weights)
+
+
+MODELS = {model.name: model for model in (NaiveModel, DriftModel, HoltModel, FittedHoltModel, FeatureRegressionModel)}
+
+
+def make_folds(length: int, *, window: int, horizon: int, step: int, folds: int) -> List[Fold]:
+    origins = np.arange(window, length - horizon + 1, step)
+    if len(origins) == 0:
+        return []
+
+    return [
+        (int(block[0]), int(block[-1]) + 1, step)
+        for block in np.array_split(origins, min(folds, len(origins)))
+        if len(block)
+    ]
+
+
+def evaluate_fold(
+    candles: SharedCandles, symbol: str, fold: Fold, models: Sequence[str], *, window: int, horizon: int
+) -> Dict[str, Any]:
+    closes = candles.closes(symbol)
+    origins = np.arange(*fold)
+    actual = sliding_window_view(closes, horizon)[origins]
+    actual_direction = np.sign(actual - closes[origins - 1, None])
+
+    results = {}
+    for name in models:
+        model = MODELS[name](window=window)
+        started = time.perf_counter()
+        model.fit(closes, fold[0], horizon)
+        fitted = time.perf_counter()
+        predicted = model.predict(closes, origins, horizon)
+        predicted_at = time.perf_counter()
+
+        errors = np.abs(predicted - actual)
+        results[name] = {
+            "absolute": float(errors.sum()),
+            "squared": float(np.square(errors).sum()),
+            "percentage": float((errors / np.abs(actual)).sum()),
+            "direction": int((np.sign(predicted - closes[origins - 1, None]) == actual_direction).sum()),
+            "count": int(errors.size),
+            "fit_seconds": fitted - started,
+            "predict_seconds": predicted_at - fitted
+        }
+
+    return {"symbol": symbol, "forecasts": len(origins), "models": results}
+
+
+def _summarize(sums: Dict[str, float]) -> Dict[str, float]:
+    count = max(1, sums["count"])
+    return {
+        "mae": sums["absolute"] / count,
+        "rmse": float(np.sqrt(sums["squared"] / count)),
+        "mape": 100 * sums["percentage"] / count,
+        "direction": sums["direction"] / count
+    }
+
+
+def run_backtest(
+    series: Dict[str, np.ndarray],
+    *,
+    models: Sequence[str] = tuple(MODELS),
+    window: int = FORECAST_WINDOW,
+    horizon: int = BACKTEST_HORIZON,
+    step: int = BACKTEST_STEP,
+    folds: int = BACKTEST_FOLDS,
+    workers: int = BACKTEST_WORKERS
+) -> Dict[str, Any]:
+    unknown = set(models) - set(MODELS)
+    if unknown:
+        raise ValueError(f"Unknown models: {', '.join(sorted(unknown))}")
+    workers = workers or available_cpus()
+
+    started = time.perf_counter()
+    candles = SharedCandles.create(series)
+    try:
+        tasks = [
+            (symbol, fold)
+            for symbol, closes in series.items()
+            for fold in make_folds(len(closes), window=window, horizon=horizon, step=step, folds=folds)
+        ]
+        options = {"window": window, "horizon": horizon}
+        if workers == 1 or len(tasks) <= 1:
+            results = [evaluate_fold(candles, symbol, fold, models, **options) for symbol, fold in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                futures = [pool.submit(evaluate_fold, candles, symbol, fold, models, **options) for symbol, fold in tasks]
+                results = [future.result() for future in futures]
+    finally:
+        candles.close()
+    wall_seconds = time.perf_counter() - started
+
+    totals = {name: dict.fromkeys(ERROR_SUMS + ("fit_seconds", "predict_seconds"), 0.0) for name in models}
+    per_symbol: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for result in results:
+        symbol_totals = per_symbol.setdefault(result["symbol"], {name: dict.fromkeys(ERROR_SUMS, 0.0) for name in models})
+        for name, sums in result["models"].items():
+            for key, value in sums.items():
+                totals[name][key] += value
+                if key in ERROR_SUMS:
+                    symbol_totals[name][key] += value
+
+    report_models = {}
+    for name, sums in totals.items():
+        summary = _summarize(sums)
+        seconds = sums["fit_seconds"] + sums["predict_seconds"]
+        summary.update({
+            "fit_seconds": sums["fit_seconds"],
+            "predict_seconds": sums["predict_seconds"],
+            "forecasts_per_cpu_second": sums["count"] / horizon / seconds if seconds else 0.0
+        })
+        report_models[name] = summary
+    if "naive" in report_models and report_models["naive"]["mae"]:
+        for summary in report_models.values():
+            summary["mae_vs_naive"] = summary["mae"] / report_models["naive"]["mae"]
+
+    forecasts = sum(result["forecasts"] for result in results)
+    return {
+        "symbols": len(series),
+        "tasks": len(tasks),
+        "workers": workers,
+        "window": window,
+        "horizon": horizon,
+        "step": step,
+        "forecasts": forecasts,
+        "wall_seconds": wall_seconds,
+        "forecasts_per_second": forecasts * len(models) / wall_seconds if wall_seconds else 0.0,
+        "models": report_models,
+        "per_symbol": {
+            symbol: {name: _summarize(sums) for name, sums in symbol_totals.items()}
+            for symbol, symbol_totals in per_symbol.items()
+        }
+    }
+
+
+async def load_closes(
+    symbols: Sequence[str], *, interval: str, start: datetime, end: datetime
+) -> Dict[str, np.ndarray]:
+    database = create_database(str(DATABASE_URL))
+    await database.connect()
+    try:
+        candles_repo = CandlesRepository(database)
+        return {
+            symbol: (await candles_repo.get_series(symbol=symbol, interval=interval, start=start, end=end))["close"]
+            for symbol in symbols
+        }
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("symbols", nargs="+", help="Symbols as BASE-QUOTE, e.g. BTC-USD")
+    parser.add_argument("--interval", choices=[interval.value for interval in CandleInterval], default="1h")
+    parser.add_argument("--start", default=(datetime.utcnow() - timedelta(days=365)).date().isoformat())
+    parser.add_argument("--end", default=None, help="defaults to now")
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=list(MODELS))
+    parser.add_argument("--window", type=int, default=FORECAST_WINDOW)
+    parser.add_argument("--horizon", type=int, default=BACKTEST_HORIZON)
+    parser.add_argument("--step", type=int, default=BACKTEST_STEP)
+    parser.add_argument("--folds", type=int, default=BACKTEST_FOLDS)
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS, help="0: one per available CPU")
+    parser.add_argument("--output", help="write the report here (JSON)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = datetime.fromisoformat(args.start).replace(tzinfo=timezone.utc)
+    end = datetime.fromisoformat(args.end).replace(tzinfo=timezone.utc) if args.end else datetime.now(timezone.utc)
+
+    loading = time.perf_counter()
+    series = asyncio.get_event_loop().run_until_complete(
+        load_closes(args.symbols, interval=args.interval, start=start, end=end)
+    )
+    logger.info("Loaded %d candles in %.2fs", sum(map(len, series.values())), time.perf_counter() - loading)
+
+    report = run_backtest(
+        series, models=args.models, window=args.window, horizon=args.horizon,
+        step=args.step, folds=args.folds, workers=args.workers
+    )
+
+    print(
+        f"{report['symbols']} symbols, {report['tasks']} folds, {report['forecasts']} origins x "
+        f"{len(args.models)} models on {report['workers']} workers: {report['wall_seconds']:.2f}s "
+        f"({report['forecasts_per_second']:.0f} forecasts/s)"
+    )
+    for name, summary in report["models"].items():
+        print(
+            f"  {name:<10} MAE {summary['mae']:12.4f}  RMSE {summary['rmse']:12.4f}  MAPE {summary['mape']:7.3f}%  "
+            f"direction {summary['direction']:6.1%}  vs naive {summary.get('mae_vs_naive', float('nan')):5.3f}  "
+            f"fit {summary['fit_seconds']:7.2f}s  {summary['forecasts_per_cpu_second']:9.0f} forecasts/cpu s"
+        )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Dynamic micro-batching for inference.
+
+MicroBatcher:
+    - Requests submitted within max_wait_ms of each other are coalesced into a
+      single engine.predict() call (one vectorized model call instead of many)
+    - A batch is dispatched as soon as it reaches max_batch_size, or when the
+      oldest request in it has waited max_wait_ms, whichever comes first
+    - Only requests with the same window length and horizon can share a batch,
+      so pending requests are grouped by that key
+    - If the engine fails, every request in the batch receives the error
+    - batches/requests counters give the achieved mean batch size
+"""
+# Std Library Imports
+import asyncio
+from typing import Dict, List, Tuple
+
+# Third Party Imports
+import numpy as np
+
+from app.core.config import FORECAST_BATCH_MAX_SIZE, FORECAST_BATCH_WAIT_MS
+from app.services.forecasting.engines import InferenceEngine
+
+BatchKey = Tuple[int, int]
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        engine: InferenceEngine,
+        *,
+        max_batch_size: int = FORECAST_BATCH_MAX_SIZE,
+        max_wait_ms: float = FORECAST_BATCH_WAIT_MS
+    ) -> None:
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: Dict[BatchKey, List[Tuple[np.ndarray, asyncio.Future]]] = {}
+        self._timers: Dict[BatchKey, asyncio.TimerHandle] = {}
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, series: np.ndarray, horizon: int) -> np.ndarray:
+        loop = asyncio.get_event_loop()
+        key = (len(series), horizon)
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append((series, future))
+        self.requests += 1
+
+        if len(self._pending[key]) >= self.max_batch_size or self.max_wait_ms <= 0:
+            self._dispatch(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait_ms / 1000, self._dispatch, key)
+
+        return await future
+
+    def _dispatch(self, key: BatchKey) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        items = self._pending.pop(key, [])
+        if items:
+            self.batches += 1
+            asyncio.ensure_future(self._run(key, items))
+
+    async def _run(self, key: BatchKey, items: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        _, horizon = key
+        try:
+            predictions = await self.engine.predict(np.stack([series for series, _ in items]), horizon)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), prediction in zip(items, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0
+        }
@@ -0,0 +1,219 @@
+"""
+Forecast result cache. A forecast for (symbol, interval, horizon, model) can only
+change when a new candle lands or the model changes, so both the newest candle's
+open_time and the model version are part of the key: a new candle or model simply
+produces a new key and old entries age out of the LRU.
+
+ForecastCacheBackend:
+    - Interface for a store shared between workers (get/set of serialized forecasts)
+
+LocalForecastCacheBackend:
+    - In-process dict implementing the backend interface; the stand-in for a
+      shared store in tests and single-process deployments
+
+RedisForecastCacheBackend:
+    - Shares forecasts between gunicorn workers and hosts through Redis
+    - The redis package is optional and only imported when this backend is used
+
+ForecastCache:
+    - In-process LRU in front of the (optional) shared backend
+    - get_or_compute():
+        - Returns the cached forecast, or computes it once even when many
+          requests miss the same key at the same time (single-flight: the first
+          caller computes, the rest await its result)
+        - If the first caller is cancelled, the others don't wait forever: one of
+          them takes over the computation
+    - stats():
+        - Hits, misses, hit rate, computations and the compute time saved by hits
+
+create_forecast_cache():
+    - Builds the cache selected by FORECAST_CACHE_BACKEND
+"""
+# Std Library Imports
+import time
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+# Third Party Imports
+
+from app.core.config import (
+    FORECAST_CACHE_BACKEND,
+    FORECAST_CACHE_MAX_ENTRIES,
+    FORECAST_CACHE_REDIS_URL,
+    FORECAST_CACHE_TTL_SECONDS
+)
+from app.models.forecast import ForecastPublic
+
+
+class ForecastCacheBackend:
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+
+class LocalForecastCacheBackend(ForecastCacheBackend):
+    def __init__(self) -> None:
+        self.values: Dict[str, Tuple[float, str]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self.values.get(key)
+        if entry is None or entry[0] <= time.time():
+            self.values.pop(key, None)
+            return None
+
+        return entry[1]
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self.values[key] = (time.time() + ttl_seconds, value)
+
+
+class RedisForecastCacheBackend(ForecastCacheBackend):
+    def __init__(self, url: str = FORECAST_CACHE_REDIS_URL) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("FORECAST_CACHE_BACKEND=redis requires the redis package (pip install redis)")
+
+        self.redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.redis.get(key)
+        return value.decode() if value is not None else None
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        await self.redis.set(key, value, ex=ttl_seconds)
+
+
+class ForecastCache:
+    def __init__(
+        self,
+        *,
+        backend: Optional[ForecastCacheBackend] = None,
+        max_entries: int = FORECAST_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = FORECAST_CACHE_TTL_SECONDS
+    ) -> None:
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (forecast, seconds it took to compute)
+        self._entries: "OrderedDict[str, Tuple[ForecastPublic, float]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.computations = 0
+        self.compute_seconds = 0.0
+        self.compute_seconds_saved = 0.0
+
+    @staticmethod
+    def make_key(
+        *, symbol: str, interval: str, horizon: int, model: str, model_version: str, last_open_time: datetime
+    ) -> str:
+        return f"forecast:{symbol}:{interval}:{horizon}:{model}:{model_version}:{int(last_open_time.timestamp())}"
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Optional[ForecastPublic]]]
+    ) -> Optional[ForecastPublic]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._record_hit(entry[1])
+            return entry[0]
+
+        # Someone is already computing this key; share their result
+        in_flight = self._in_flight.get(key)
+        while in_flight is not None:
+            try:
+                forecast = await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                # Only the computing caller was cancelled, not us: take over
+                if not in_flight.cancelled():
+                    raise
+                in_flight = self._in_flight.get(key)
+                continue
+            self._record_hit(self._entries[key][1] if key in self._entries else 0.0)
+            return forecast
+
+        future = asyncio.get_event_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            forecast = await self._load_or_compute(key, compute)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelled: wake the callers sharing this computation
+            future.cancel()
+            raise
+        else:
+            future.set_result(forecast)
+        finally:
+            del self._in_flight[key]
+
+        return forecast
+
+    async def _load_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Optional[ForecastPublic]]]
+    ) -> Optional[ForecastPublic]:
+        if self.backend is not None:
+            shared = await self.backend.get(key)
+            if shared is not None:
+                forecast = ForecastPublic.parse_raw(shared)
+                self._store(key, forecast, 0.0)
+                self._record_hit(0.0)
+                return forecast
+
+        self.misses += 1
+        started = time.perf_counter()
+        forecast = await compute()
+        elapsed = time.perf_counter() - started
+        self.computations += 1
+        self.compute_seconds += elapsed
+
+        if forecast is not None:
+            self._store(key, forecast, elapsed)
+            if self.backend is not None:
+                await self.backend.set(key, forecast.json(), self.ttl_seconds)
+
+        return forecast
+
+    def _store(self, key: str, forecast: ForecastPublic, elapsed: float) -> None:
+        self._entries[key] = (forecast, elapsed)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _record_hit(self, compute_seconds: float) -> None:
+        self.hits += 1
+        # A hit on an entry that took no measured time saves the average compute time
+        self.compute_seconds_saved += compute_seconds or self._average_compute_seconds()
+
+    def _average_compute_seconds(self) -> float:
+        return self.compute_seconds / self.computations if self.computations else 0.0
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "computations": self.computations,
+            "compute_seconds": round(self.compute_seconds, 6),
+            "compute_seconds_saved": round(self.compute_seconds_saved, 6)
+        }
+
+
+def create_forecast_cache(kind: str = FORECAST_CACHE_BACKEND) -> ForecastCache:
+    if kind == "redis":
+        return ForecastCache(backend=RedisForecastCacheBackend())
+
+    return ForecastCache()
@@ -0,0 +1,95 @@
+"""
+Inference backends for forecasting. Every engine takes a batch of equally long
+price histories and returns a batch of predictions, so one call can serve many
+requests at once.
+
+InferenceEngine:
+    - Interface every backend implements
+    - predict() takes a (batch, window) float array and a horizon and returns a
+      (batch, horizon) array of predicted closes
+
+ExponentialSmoothingEngine:
+    - In-process Holt linear trend (double exponential smoothing) model
+    - Runs in log-price space so the trend is a growth rate, and smooths every
+      series of the batch at once with NumPy (one pass over the window for the
+      whole batch instead of one per request)
+    - The NumPy work runs on a worker thread so the event loop stays free
+
+RemoteEngine:
+    - Posts the batch to a hosted model endpoint (SageMaker style invocations
+      route) as {"instances": [...], "horizon": h} and reads {"predictions": [...]}
+    - httpx is only imported when a remote engine is built, so the default local
+      engine doesn't pay for it at startup
+
+create_engine():
+    - Builds the engine selected by FORECAST_ENGINE
+"""
+# Std Library Imports
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+# Third Party Imports
+import numpy as np
+
+from app.core.config import FORECAST_ENGINE, FORECAST_REMOTE_URL, FORECAST_REMOTE_TIMEOUT
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class InferenceEngine:
+    name = ""
+    version = ""
+
+    async def predict(self, batch: np.ndarray, horizon: int) -> np.ndarray:
+        raise NotImplementedError
+
+
+class ExponentialSmoothingEngine(InferenceEngine):
+    name = "holt"
+    version = "1"
+
+    def __init__(self, *, alpha: float = 0.5, beta: float = 0.1) -> None:
+        self.alpha = alpha
+        self.beta = beta
+
+    def predict_sync(self, batch: np.ndarray, horizon: int) -> np.ndarray:
+        series = np.log(np.asarray(batch, dtype=np.float64))
+        level = series[:, 0].copy()
+        trend = series[:, 1] - series[:, 0]
+
+        for t in range(1, series.shape[1]):
+            previous_level = level
+            level = self.alpha * series[:, t] + (1 - self.alpha) * (level + trend)
+            trend = self.beta * (level - previous_level) + (1 - self.beta) * trend
+
+        steps = np.arange(1, horizon + 1, dtype=np.float64)
+        return np.exp(level[:, None] + trend[:, None] * steps[None, :])
+
+    async def predict(self, batch: np.ndarray, horizon: int) -> np.ndarray:
+        return await asyncio.get_event_loop().run_in_executor(None, self.predict_sync, batch, horizon)
+
+
+class RemoteEngine(InferenceEngine):
+    name = "remote"
+    version = "1"
+
+    def __init__(self, *, url: str = FORECAST_REMOTE_URL, client: Optional["httpx.AsyncClient"] = None) -> None:
+        self.url = url
+        if client is None:
+            import httpx
+            client = httpx.AsyncClient(timeout=FORECAST_REMOTE_TIMEOUT)
+        self.client = client
+
+    async def predict(self, batch: np.ndarray, horizon: int) -> np.ndarray:
+        res = await self.client.post(self.url, json={"instances": np.asarray(batch).tolist(), "horizon": horizon})
+        res.raise_for_status()
+
+        return np.asarray(res.json()["predictions"], dtype=np.float64)
+
+
+def create_engine(kind: str = FORECAST_ENGINE) -> InferenceEngine:
+    if kind == "remote":
+        return RemoteEngine()
+
+    return ExponentialSmoothingEngine()
@@ -0,0 +1,373 @@
+"""
+Technical indicator features over closes, computed for many symbols at once. Closes
+are a (symbols, time) array (one row per symbol, all rows advancing candle by candle
+together); every feature is returned in the same shape, NaN while its window is still
+filling up.
+
+FEATURE_NAMES:
+    - return, log_return:       candle over candle change
+    - volatility:               sample standard deviation of the last `window` log returns
+    - sma, ema:                 simple (`window`) and exponential (`ema_span`) moving averages
+    - rsi:                      Wilder's relative strength index over `rsi_period` changes
+                                (seeded with the simple average of the first period)
+    - macd, macd_signal, macd_histogram:
+                                EMA(`macd_fast`) - EMA(`macd_slow`), its EMA(`macd_signal`)
+                                and the difference of the two
+    - bollinger_upper, bollinger_lower, bollinger_width:
+                                sma +- `bollinger_stddevs` population standard deviations
+                                of the last `window` closes, and the band's width over sma
+
+FeatureEngine:
+    - compute(): every feature for a whole history. Rolling windows come from
+      cumulative sums (O(time), no loop over the window); the recursive indicators
+      (EMAs, MACD signal, RSI averages) are linear recurrences, solved RECURRENCE_CHUNK
+      candles at a time with one matrix product per chunk instead of a step per candle
+    - Also returns a FeatureState, the minimum needed to carry on from the last candle
+    - update(): advances a FeatureState by one new close per symbol in O(1) per symbol
+      (independent of the window and the length of the history) and returns the
+      features of that candle, the same values compute() gives for the extended history
+    - latest(): the last candle's features of one symbol, with None for NaN (for JSON)
+
+FeatureState:
+    - Last close, EMA and RSI averages, and ring buffers of the last `window` closes and
+      log returns with their running sums (re-summed from the rings every
+      RESYNC_UPDATES updates so floating point error can't build up)
+    - arrays() / from_arrays(): a flat dict of arrays, e.g. for np.savez
+"""
+# Std Library Imports
+import functools
+from typing import Dict, Optional, Tuple
+
+# Third Party Imports
+import numpy as np
+
+from app.core.config import (
+    FEATURE_BOLLINGER_STDDEVS,
+    FEATURE_EMA_SPAN,
+    FEATURE_MACD_FAST,
+    FEATURE_MACD_SIGNAL,
+    FEATURE_MACD_SLOW,
+    FEATURE_RSI_PERIOD,
+    FEATURE_WINDOW
+)
+
+FEATURE_NAMES = (
+    "return",
+    "log_return",
+    "volatility",
+    "sma",
+    "ema",
+    "rsi",
+    "macd",
+    "macd_signal",
+    "macd_histogram",
+    "bollinger_upper",
+    "bollinger_lower",
+    "bollinger_width"
+)
+RECURSIVE_FIELDS = ("ema", "ema_fast", "ema_slow", "macd_signal", "gain", "loss")
+# Incremental updates re-sum the rolling windows from their ring buffers this often
+RESYNC_UPDATES = 1024
+# Candles per matrix product when solving a recurrence over a whole history
+RECURRENCE_CHUNK = 64
+
+
+class FeatureState:
+    def __init__(self, *, count: int, last_close: np.ndarray, center: np.ndarray, window: int) -> None:
+        symbols = len(last_close)
+        # Candles seen so far (the same for every symbol)
+        self.count = count
+        self.last_close = last_close
+        # Closes are kept relative to a per symbol center so the sums of squares stay small
+        self.center = center
+        self.closes = np.zeros((symbols, window))
+        self.close_sum = np.zeros(symbols)
+        self.close_sumsq = np.zeros(symbols)
+        self.returns = np.zeros((symbols, window))
+        self.return_sum = np.zeros(symbols)
+        self.return_sumsq = np.zeros(symbols)
+        # EMAs, the MACD signal line and RSI's average gain and loss (sums while seeding)
+        for field in RECURSIVE_FIELDS:
+            setattr(self, field, np.zeros(symbols))
+
+    @property
+    def symbols(self) -> int:
+        return len(self.last_close)
+
+    @property
+    def window(self) -> int:
+        return self.closes.shape[1]
+
+    def resync(self) -> None:
+        # Re-center on the last close, then re-sum the windows exactly
+        if self.count >= self.window:
+            shift = self.last_close - self.center
+            self.closes -= shift[:, None]
+            self.center = self.last_close.copy()
+        self.close_sum = self.closes.sum(axis=1)
+        self.close_sumsq = np.square(self.closes).sum(axis=1)
+        self.return_sum = self.returns.sum(axis=1)
+        self.return_sumsq = np.square(self.returns).sum(axis=1)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "count": np.array(self.count),
+            "last_close": self.last_close,
+            "center": self.center,
+            "closes": self.closes,
+            "returns": self.returns,
+            **{field: getattr(self, field) for field in RECURSIVE_FIELDS}
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "FeatureState":
+        closes = np.asarray(arrays["closes"], dtype=np.float64)
+        state = cls(
+            count=int(arrays["count"]),
+            last_close=np.asarray(arrays["last_close"], dtype=np.float64),
+            center=np.asarray(arrays["center"], dtype=np.float64),
+            window=closes.shape[1]
+        )
+        state.closes = closes.copy()
+        state.returns = np.asarray(arrays["returns"], dtype=np.float64).copy()
+        for field in RECURSIVE_FIELDS:
+            setattr(state, field, np.asarray(arrays[field], dtype=np.float64).copy())
+        state.resync()
+
+        return state
+
+
+def _ema_alpha(span: int) -> float:
+    return 2 / (span + 1)
+
+
+@functools.lru_cache(maxsize=64)
+def _kernel(decay: float, weight: float, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    # y[t] = decay * y[t - 1] + weight * x[t] unrolled over a chunk: y = x @ kernel + y[-1] * carry
+    lags = np.arange(length)[None, :] - np.arange(length)[:, None]
+    kernel = np.where(lags >= 0, weight * decay ** np.maximum(lags, 0), 0.0)
+
+    return kernel, decay ** np.arange(1, length + 1)
+
+
+def _recurrence(values: np.ndarray, initial: np.ndarray, decay: float, weight: float) -> np.ndarray:
+    solved = np.empty_like(values)
+    previous = initial
+    for start in range(0, values.shape[1], RECURRENCE_CHUNK):
+        chunk = values[:, start:start + RECURRENCE_CHUNK]
+        kernel, carry = _kernel(decay, weight, chunk.shape[1])
+        solved[:, start:start + chunk.shape[1]] = chunk @ kernel + previous[:, None] * carry[None, :]
+        previous = solved[:, start + chunk.shape[1] - 1]
+
+    return solved
+
+
+class FeatureEngine:
+    def __init__(
+        self,
+        *,
+        window: int = FEATURE_WINDOW,
+        ema_span: int = FEATURE_EMA_SPAN,
+        rsi_period: int = FEATURE_RSI_PERIOD,
+        macd_fast: int = FEATURE_MACD_FAST,
+        macd_slow: int = FEATURE_MACD_SLOW,
+        macd_signal: int = FEATURE_MACD_SIGNAL,
+        bollinger_stddevs: float = FEATURE_BOLLINGER_STDDEVS
+    ) -> None:
+        if window < 2:
+            raise ValueError("The feature window needs at least 2 candles")
+        self.window = window
+        self.rsi_period = rsi_period
+        self.bollinger_stddevs = bollinger_stddevs
+        self.alphas = {
+            "ema": _ema_alpha(ema_span),
+            "ema_fast": _ema_alpha(macd_fast),
+            "ema_slow": _ema_alpha(macd_slow),
+            "macd_signal": _ema_alpha(macd_signal)
+        }
+
+    def _step(self, state: FeatureState, close: np.ndarray, change: Optional[np.ndarray]) -> Dict[str, np.ndarray]:
+        # One candle of the recursive indicators; state.count is this candle's index
+        alphas = self.alphas
+        if change is None:
+            state.ema, state.ema_fast, state.ema_slow = close.copy(), close.copy(), close.copy()
+            state.macd_signal = np.zeros_like(close)
+        else:
+            for field in ("ema", "ema_fast", "ema_slow"):
+                previous = getattr(state, field)
+                setattr(state, field, previous + alphas[field] * (close - previous))
+            macd = state.ema_fast - state.ema_slow
+            state.macd_signal = state.macd_signal + alphas["macd_signal"] * (macd - state.macd_signal)
+
+            gain, loss = np.maximum(change, 0.0), np.maximum(-change, 0.0)
+            period = self.rsi_period
+            if state.count <= period:
+                state.gain, state.loss = state.gain + gain, state.loss + loss
+                if state.count == period:
+                    state.gain, state.loss = state.gain / period, state.loss / period
+            else:
+                state.gain = (state.gain * (period - 1) + gain) / period
+                state.loss = (state.loss * (period - 1) + loss) / period
+
+        macd = state.ema_fast - state.ema_slow
+        if state.count >= self.rsi_period:
+            rsi = self._rsi(state.gain, state.loss)
+        else:
+            rsi = np.full_like(close, np.nan)
+
+        return {
+            "ema": state.ema,
+            "rsi": rsi,
+            "macd": macd,
+            "macd_signal": state.macd_signal,
+            "macd_histogram": macd - state.macd_signal
+        }
+
+    @staticmethod
+    def _rsi(gain: np.ndarray, loss: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(loss > 0, 100 - 100 / (1 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+
+    def _bands(self, sma: np.ndarray, variance: np.ndarray) -> Dict[str, np.ndarray]:
+        spread = self.bollinger_stddevs * np.sqrt(np.maximum(variance, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            width = 2 * spread / sma
+
+        return {"sma": sma, "bollinger_upper": sma + spread, "bollinger_lower": sma - spread, "bollinger_width": width}
+
+    def compute(self, closes: np.ndarray) -> Tuple[Dict[str, np.ndarray], FeatureState]:
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+        symbols, length = closes.shape
+        if length == 0:
+            raise ValueError("Features need at least one candle")
+        window = self.window
+        features = {name: np.full((symbols, length), np.nan) for name in FEATURE_NAMES}
+
+        # Changes
+        log_returns = np.log(closes[:, 1:] / closes[:, :-1])
+        features["log_return"][:, 1:] = log_returns
+        features["return"][:, 1:] = closes[:, 1:] / closes[:, :-1] - 1
+
+        # Rolling windows from cumulative sums: sum over (t - window, t] = cumsum[t + 1] - cumsum[t + 1 - window]
+        center = closes[:, 0].copy()
+        relative = closes - center[:, None]
+        if length >= window:
+            sums = np.zeros((symbols, length + 1))
+            sumsq = np.zeros((symbols, length + 1))
+            np.cumsum(relative, axis=1, out=sums[:, 1:])
+            np.cumsum(np.square(relative), axis=1, out=sumsq[:, 1:])
+            mean = (sums[:, window:] - sums[:, :-window]) / window
+            variance = (sumsq[:, window:] - sumsq[:, :-window]) / window - np.square(mean)
+            for name, values in self._bands(center[:, None] + mean, variance).items():
+                features[name][:, window - 1:] = values
+
+        if length > window:
+            sums = np.zeros((symbols, length))
+            sumsq = np.zeros((symbols, length))
+            np.cumsum(log_returns, axis=1, out=sums[:, 1:])
+            np.cumsum(np.square(log_returns), axis=1, out=sumsq[:, 1:])
+            total = sums[:, window:] - sums[:, :-window]
+            variance = ((sumsq[:, window:] - sumsq[:, :-window]) - np.square(total) / window) / (window - 1)
+            features["volatility"][:, window:] = np.sqrt(np.maximum(variance, 0.0))
+
+        # Recursive indicators: EMAs start at the first close, the signal line at MACD's first value (0)
+        state = FeatureState(count=length, last_close=closes[:, -1].copy(), center=center, window=window)
+        emas = {}
+        for field in ("ema", "ema_fast", "ema_slow"):
+            alpha = self.alphas[field]
+            emas[field] = np.empty_like(closes)
+            emas[field][:, 0] = closes[:, 0]
+            emas[field][:, 1:] = _recurrence(closes[:, 1:], closes[:, 0], 1 - alpha, alpha)
+        macd = emas["ema_fast"] - emas["ema_slow"]
+        alpha = self.alphas["macd_signal"]
+        signal = np.zeros_like(closes)
+        signal[:, 1:] = _recurrence(macd[:, 1:], signal[:, 0], 1 - alpha, alpha)
+        features.update({
+            "ema": emas["ema"], "macd": macd, "macd_signal": signal, "macd_histogram": macd - signal
+        })
+        for field, values in emas.items():
+            setattr(state, field, values[:, -1].copy())
+        state.macd_signal = signal[:, -1].copy()
+
+        # RSI: gains and losses are summed over the first `period` changes, then Wilder smoothed
+        period = self.rsi_period
+        changes = np.diff(closes, axis=1)
+        gains, losses = np.maximum(changes, 0.0), np.maximum(-changes, 0.0)
+        if length - 1 < period:
+            state.gain, state.loss = gains.sum(axis=1), losses.sum(axis=1)
+        else:
+            averages = []
+            for moves in (gains, losses):
+                seed = moves[:, :period].mean(axis=1)
+                smoothed = np.empty((symbols, length - period))
+                smoothed[:, 0] = seed
+                smoothed[:, 1:] = _recurrence(moves[:, period:], seed, (period - 1) / period, 1 / period)
+                averages.append(smoothed)
+            gain, loss = averages
+            features["rsi"][:, period:] = self._rsi(gain, loss)
+            state.gain, state.loss = gain[:, -1].copy(), loss[:, -1].copy()
+
+        # The last `window` closes and returns, where update() expects them (index % window)
+        recent = np.arange(max(0, length - window), length)
+        state.closes[:, recent % window] = relative[:, recent]
+        recent = np.arange(max(0, length - 1 - window), length - 1)
+        state.returns[:, recent % window] = log_returns[:, recent]
+        state.resync()
+
+        return features, state
+
+    def update(self, state: FeatureState, closes: np.ndarray) -> Dict[str, np.ndarray]:
+        closes = np.asarray(closes, dtype=np.float64).reshape(state.symbols)
+        window = self.window
+        t = state.count
+
+        # Close window: the close `window` candles back leaves as this one enters
+        slot = t % window
+        relative = closes - state.center
+        leaving = state.closes[:, slot]
+        state.close_sum += relative - leaving
+        state.close_sumsq += np.square(relative) - np.square(leaving)
+        state.closes[:, slot] = relative
+
+        # Return window (return j is the change into candle j + 1)
+        change = closes - state.last_close
+        log_return = np.log(closes / state.last_close)
+        slot = (t - 1) % window
+        leaving = state.returns[:, slot]
+        state.return_sum += log_return - leaving
+        state.return_sumsq += np.square(log_return) - np.square(leaving)
+        state.returns[:, slot] = log_return
+
+        features = self._step(state, closes, change)
+        features = {name: values.copy() for name, values in features.items()}
+        features["return"] = closes / state.last_close - 1
+        features["log_return"] = log_return
+
+        nan = np.full(state.symbols, np.nan)
+        if t + 1 >= window:
+            mean = state.close_sum / window
+            features.update(self._bands(state.center + mean, state.close_sumsq / window - np.square(mean)))
+        else:
+            features.update({name: nan for name in ("sma", "bollinger_upper", "bollinger_lower", "bollinger_width")})
+        if t >= window:
+            variance = (state.return_sumsq - np.square(state.return_sum) / window) / (window - 1)
+            features["volatility"] = np.sqrt(np.maximum(variance, 0.0))
+        else:
+            features["volatility"] = nan
+
+        state.count = t + 1
+        state.last_close = closes.copy()
+        if state.count % RESYNC_UPDATES == 0:
+            state.resync()
+
+        return features
+
+    @staticmethod
+    def latest(features: Dict[str, np.ndarray], symbol: int = 0) -> Dict[str, Optional[float]]:
+        latest = {}
+        for name in FEATURE_NAMES:
+            values = features[name]
+            value = float(values[symbol, -1] if values.ndim == 2 else values[symbol])
+            latest[name] = None if np.isnan(value) else value
+
+        return latest
@@ -0,0 +1,270 @@
+"""
+Registry of trained forecast model versions, and hot-swapping the version the
+/forecast route serves without restarting the workers.
+
+A version is a row in forecast_models plus an artifact file under FORECAST_MODEL_DIR:
+a JSON object of the engine's parameters (e.g. {"alpha": 0.3, "beta": 0.05} for holt,
+{"url": ...} for remote). Activating a version only flips the row; every worker
+notices on its next refresh and swaps on its own.
+
+ENGINE_LOADERS:
+    - Engine kind (forecast_models.engine) -> builds that engine from the parameters
+
+load_engine():
+    - Reads and checks an artifact against its sha256, builds its engine and names it
+      after the version (the forecast cache keys on the name and version, so a swap
+      never serves forecasts cached for another version)
+
+warm_up():
+    - Runs a new engine on FORECAST_MODEL_WARMUP_BATCHES synthetic full-size batches
+      (random walks) before it serves, so first requests don't pay for lazy
+      initialization, and rejects one that doesn't return a finite (batch, horizon) array
+
+ModelRegistry:
+    - maybe_refresh():
+        - Called by the forecast route; at most every FORECAST_MODEL_REFRESH_SECONDS it
+          starts a background check for a newly activated version, so no request waits
+          on the query, the artifact or the warm-up
+    - refresh():
+        - Deploys the active version when it isn't the one being served; a version
+          that failed to load is not retried until it is activated again
+    - prepare() / swap():
+        - Loading (on a worker thread) and warming up happen while the current engine
+          keeps serving; swap() then replaces it in one assignment
+          (ForecastService.swap_engine). Requests in flight keep the engine they
+          started with, and the previous engine stays referenced until they finish
+    - stats(): swaps, failures and how long the last load and warm-up took
+
+main():
+    - Command line entry point: copies an artifact into FORECAST_MODEL_DIR and registers
+      it (optionally activating it), activates a registered version, or lists them
+    > python -m app.services.forecasting.registry register holt-hourly 2021-06-01 holt.json --engine holt --activate
+    > python -m app.services.forecasting.registry activate holt-hourly 2021-05-01
+    > python -m app.services.forecasting.registry list
+"""
+# Std Library Imports
+import os
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import logging
+import argparse
+from typing import Any, Callable, Dict, Optional
+
+# Third Party Imports
+import numpy as np
+
+from app.core.config import (
+    DATABASE_URL,
+    FORECAST_BATCH_MAX_SIZE,
+    FORECAST_MAX_HORIZON,
+    FORECAST_MODEL_DIR,
+    FORECAST_MODEL_REFRESH_SECONDS,
+    FORECAST_MODEL_WARMUP_BATCHES,
+    FORECAST_WINDOW
+)
+from app.db.repositories.forecast_models import ForecastModelsRepository
+from app.db.tasks import create_database
+from app.models.forecast import ForecastModelCreate, ForecastModelInDB
+from app.services.forecasting.engines import ExponentialSmoothingEngine, InferenceEngine, RemoteEngine
+from app.services.forecasting.service import ForecastService
+
+logger = logging.getLogger(__name__)
+
+ENGINE_LOADERS: Dict[str, Callable[[Dict[str, Any]], InferenceEngine]] = {
+    "holt": lambda params: ExponentialSmoothingEngine(**params),
+    "remote": lambda params: RemoteEngine(**params)
+}
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as artifact:
+        for chunk in iter(lambda: artifact.read(1 << 20), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def load_engine(model: ForecastModelInDB, directory: str = FORECAST_MODEL_DIR) -> InferenceEngine:
+    if model.engine not in ENGINE_LOADERS:
+        raise ValueError(f"Unknown engine {model.engine!r} for {model.name} {model.version}")
+
+    path = os.path.join(directory, model.artifact)
+    if file_sha256(path) != model.sha256:
+        raise ValueError(f"Artifact {path} doesn't match the sha256 registered for {model.name} {model.version}")
+
+    with open(path) as artifact:
+        engine = ENGINE_LOADERS[model.engine](json.load(artifact))
+    engine.name = model.name
+    engine.version = model.version
+
+    return engine
+
+
+async def warm_up(
+    engine: InferenceEngine,
+    *,
+    batches: int = FORECAST_MODEL_WARMUP_BATCHES,
+    batch_size: int = FORECAST_BATCH_MAX_SIZE,
+    window: int = FORECAST_WINDOW,
+    horizon: int = FORECAST_MAX_HORIZON
+) -> None:
+    rng = np.random.default_rng(0)
+    batch = 100 * np.exp(rng.normal(0, 0.01, (batch_size, window)).cumsum(axis=1))
+
+    for _ in range(batches):
+        predictions = np.asarray(await engine.predict(batch, horizon))
+        if predictions.shape != (batch_size, horizon) or not np.isfinite(predictions).all():
+            raise ValueError(f"Warm up of {engine.name} {engine.version} returned unusable predictions")
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        service: ForecastService,
+        *,
+        directory: str = FORECAST_MODEL_DIR,
+        refresh_seconds: float = FORECAST_MODEL_REFRESH_SECONDS,
+        warmup_batches: int = FORECAST_MODEL_WARMUP_BATCHES
+    ) -> None:
+        self.service = service
+        self.directory = directory
+        self.refresh_seconds = refresh_seconds
+        self.warmup_batches = warmup_batches
+        self.active: Optional[ForecastModelInDB] = None
+        self.rejected: Optional[ForecastModelInDB] = None
+        self.checked_at: Optional[float] = None
+        self._in_flight: Optional[asyncio.Future] = None
+        self.swaps = 0
+        self.failures = 0
+        self.last_prepare_seconds: Optional[float] = None
+
+    @staticmethod
+    def _same(model: Optional[ForecastModelInDB], other: Optional[ForecastModelInDB]) -> bool:
+        return model is not None and other is not None and (
+            (model.name, model.version, model.activated_at) == (other.name, other.version, other.activated_at)
+        )
+
+    async def prepare(self, model: ForecastModelInDB) -> InferenceEngine:
+        started = time.perf_counter()
+        engine = await asyncio.get_event_loop().run_in_executor(None, load_engine, model, self.directory)
+        await warm_up(engine, batches=self.warmup_batches)
+        self.last_prepare_seconds = time.perf_counter() - started
+
+        return engine
+
+    def swap(self, model: ForecastModelInDB, engine: InferenceEngine) -> InferenceEngine:
+        previous = self.service.swap_engine(engine)
+        self.active = model
+        self.swaps += 1
+        logger.info("Serving forecast model %s %s (was %s %s)", model.name, model.version, previous.name, previous.version)
+
+        return previous
+
+    async def deploy(self, model: ForecastModelInDB) -> InferenceEngine:
+        try:
+            engine = await self.prepare(model)
+        except Exception:
+            self.failures += 1
+            self.rejected = model
+            raise
+
+        return self.swap(model, engine)
+
+    async def refresh(self, models_repo: ForecastModelsRepository) -> bool:
+        self.checked_at = time.monotonic()
+        model = await models_repo.get_active_model()
+        if model is None or self._same(model, self.active) or self._same(model, self.rejected):
+            return False
+
+        await self.deploy(model)
+        return True
+
+    async def _refresh_in_background(self, models_repo: ForecastModelsRepository) -> None:
+        try:
+            await self.refresh(models_repo)
+        except Exception:
+            logger.exception("Couldn't refresh the forecast model; the current one keeps serving")
+        finally:
+            self._in_flight = None
+
+    def maybe_refresh(self, models_repo: ForecastModelsRepository) -> None:
+        if self._in_flight is not None:
+            return
+        if self.checked_at is not None and time.monotonic() - self.checked_at < self.refresh_seconds:
+            return
+
+        self.checked_at = time.monotonic()
+        self._in_flight = asyncio.ensure_future(self._refresh_in_background(models_repo))
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        return {
+            "swaps": self.swaps,
+            "failures": self.failures,
+            "last_prepare_seconds": self.last_prepare_seconds,
+            "refresh_seconds": self.refresh_seconds
+        }
+
+
+async def run(args: argparse.Namespace) -> None:
+    database = create_database(str(DATABASE_URL))
+    await database.connect()
+
+    try:
+        models_repo = ForecastModelsRepository(database)
+        if args.command == "register":
+            # Fail here rather than in every worker
+            with open(args.artifact) as artifact_file:
+                ENGINE_LOADERS[args.engine](json.load(artifact_file))
+
+            artifact = os.path.join(args.name, args.version, os.path.basename(args.artifact))
+            destination = os.path.join(FORECAST_MODEL_DIR, artifact)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copyfile(args.artifact, destination)
+
+            model = await models_repo.register_model(new_model=ForecastModelCreate(
+                name=args.name, version=args.version, engine=args.engine,
+                artifact=artifact, sha256=file_sha256(destination)
+            ))
+            print(f"Registered {model.name} {model.version} ({destination})")
+
+        if args.command == "activate" or getattr(args, "activate", False):
+            model = await models_repo.activate_model(name=args.name, version=args.version)
+            if model is None:
+                raise SystemExit(f"{args.name} {args.version} isn't registered")
+            print(f"Activated {model.name} {model.version}; workers swap within {FORECAST_MODEL_REFRESH_SECONDS}s")
+
+        if args.command == "list":
+            for model in await models_repo.list_models():
+                print(f"{'*' if model.is_active else ' '} {model.name:<24} {model.version:<16} {model.engine:<8} {model.artifact}")
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Register and activate forecast model versions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    register = commands.add_parser("register", help="Copy an artifact into FORECAST_MODEL_DIR and register it")
+    register.add_argument("name")
+    register.add_argument("version")
+    register.add_argument("artifact", help="JSON file of the engine's parameters")
+    register.add_argument("--engine", choices=sorted(ENGINE_LOADERS), default="holt")
+    register.add_argument("--activate", action="store_true")
+
+    activate = commands.add_parser("activate", help="Make a registered version the one the API serves")
+    activate.add_argument("name")
+    activate.add_argument("version")
+
+    commands.add_parser("list", help="List the registered versions (* marks the active one)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
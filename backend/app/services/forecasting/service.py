@@ -0,0 +1,215 @@
+"""
+Forecasting service used by the /forecast route.
+
+ServingModel:
+    - The inference engine being served and the micro-batcher in front of it, replaced
+      together so a batch never mixes two model versions
+
+ForecastService:
+    - Owns the serving model, the forecast cache and the feature engine
+    - swap_engine():
+        - Puts a new engine (with a batcher of its own) in service with one assignment.
+          A request reads the serving model once, when it starts, so requests already
+          in flight finish on the previous engine while new ones use the new one
+    - forecast():
+        - Looks up the newest candle's open_time (an index-only query) to build the
+          cache key; a cached forecast for that candle and model version is returned as is
+        - On a miss, computes the forecast through the cache so concurrent misses
+          for the same key share one computation
+        - Returns None when there isn't at least FORECAST_MIN_HISTORY candles of history
+    - compute():
+        - Reads the newest FORECAST_WINDOW closes for the (symbol, interval), submits
+          them to the batcher and returns a ForecastPublic with one prediction per
+          future candle and the newest candle's indicators
+    - recent_closes():
+        - The window from the memory-mapped candle cache when it is current (its newest candle is the one forecast() looked up), otherwise read
+          from the candles table
+    - indicators():
+        - Keeps the feature state of the last FORECAST_FEATURE_STATES (symbol, interval)
+          pairs (LRU); when exactly one candle has landed since, the state is advanced
+          by that candle alone, otherwise the features are computed over the window
+"""
+# Std Library Imports
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Third Party Imports
+import numpy as np
+
+from app.core.config import FORECAST_FEATURE_STATES, FORECAST_WINDOW, FORECAST_MIN_HISTORY
+from app.db.repositories.candles import CandlesRepository
+from app.models.candle import CandleInterval, CANDLE_INTERVAL_SECONDS
+from app.models.forecast import ForecastPublic
+from app.services.candle_cache import CandleCache
+from app.services.forecasting.batching import MicroBatcher
+from app.services.forecasting.cache import ForecastCache, create_forecast_cache
+from app.services.forecasting.engines import InferenceEngine, create_engine
+from app.services.forecasting.features import FeatureEngine, FeatureState
+
+Indicators = Dict[str, Optional[float]]
+
+
+class ServingModel(NamedTuple):
+    engine: InferenceEngine
+    batcher: MicroBatcher
+
+
+class ForecastService:
+    def __init__(
+        self,
+        engine: Optional[InferenceEngine] = None,
+        *,
+        cache: Optional[ForecastCache] = None,
+        features: Optional[FeatureEngine] = None,
+        candle_cache: Optional[CandleCache] = None,
+        window: int = FORECAST_WINDOW,
+        min_history: int = FORECAST_MIN_HISTORY,
+        max_feature_states: int = FORECAST_FEATURE_STATES
+    ) -> None:
+        engine = engine or create_engine()
+        self.serving = ServingModel(engine, MicroBatcher(engine))
+        self.cache = cache or create_forecast_cache()
+        self.features = features or FeatureEngine()
+        self.candle_cache = candle_cache
+        self.window = window
+        self.min_history = min_history
+        self.max_feature_states = max_feature_states
+        # (symbol, interval) -> (open_time of the newest candle, its state, its indicators)
+        self._feature_states: "OrderedDict[Tuple[str, str], Tuple[datetime, FeatureState, Indicators]]" = OrderedDict()
+        self.incremental_updates = 0
+        self.full_computations = 0
+
+    @property
+    def engine(self) -> InferenceEngine:
+        return self.serving.engine
+
+    @property
+    def batcher(self) -> MicroBatcher:
+        return self.serving.batcher
+
+    def swap_engine(self, engine: InferenceEngine) -> InferenceEngine:
+        previous = self.serving
+        self.serving = ServingModel(
+            engine,
+            MicroBatcher(
+                engine, max_batch_size=previous.batcher.max_batch_size, max_wait_ms=previous.batcher.max_wait_ms
+            )
+        )
+
+        return previous.engine
+
+    async def forecast(
+        self,
+        *,
+        candles_repo: CandlesRepository,
+        symbol: str,
+        interval: CandleInterval,
+        horizon: int
+    ) -> Optional[ForecastPublic]:
+        interval = CandleInterval(interval)
+        serving = self.serving
+        last_open_time = await candles_repo.get_latest_open_time(symbol=symbol, interval=interval)
+        if last_open_time is None:
+            return None
+
+        key = ForecastCache.make_key(
+            symbol=symbol,
+            interval=interval.value,
+            horizon=horizon,
+            model=serving.engine.name,
+            model_version=serving.engine.version,
+            last_open_time=last_open_time
+        )
+
+        return await self.cache.get_or_compute(
+            key,
+            lambda: self.compute(
+                candles_repo=candles_repo, symbol=symbol, interval=interval, horizon=horizon,
+                serving=serving, last_open_time=last_open_time
+            )
+        )
+
+    async def compute(
+        self,
+        *,
+        candles_repo: CandlesRepository,
+        symbol: str,
+        interval: CandleInterval,
+        horizon: int,
+        serving: Optional[ServingModel] = None,
+        last_open_time: Optional[datetime] = None
+    ) -> Optional[ForecastPublic]:
+        serving = serving or self.serving
+        open_times, closes = await self.recent_closes(
+            candles_repo=candles_repo, symbol=symbol, interval=interval, last_open_time=last_open_time
+        )
+        if len(closes) < self.min_history:
+            return None
+
+        predictions = await serving.batcher.submit(np.asarray(closes, dtype=np.float64), horizon)
+        step = timedelta(seconds=CANDLE_INTERVAL_SECONDS[interval])
+        last_open_time = open_times[-1]
+
+        return ForecastPublic(
+            symbol=symbol,
+            interval=interval,
+            horizon=horizon,
+            model=serving.engine.name,
+            model_version=serving.engine.version,
+            last_open_time=last_open_time,
+            open_times=[last_open_time + step * i for i in range(1, horizon + 1)],
+            predictions=predictions.tolist(),
+            indicators=self.indicators(symbol=symbol, interval=interval, open_times=open_times, closes=closes)
+        )
+
+    async def recent_closes(
+        self,
+        *,
+        candles_repo: CandlesRepository,
+        symbol: str,
+        interval: CandleInterval,
+        last_open_time: Optional[datetime] = None
+    ) -> Tuple[List[datetime], Sequence[float]]:
+        if self.candle_cache is not None and last_open_time is not None:
+            window = self.candle_cache.recent(
+                symbol=symbol, interval=interval, n=self.window, last_open_time=last_open_time
+            )
+            if window is not None:
+                # Only the newest two open times are used (the forecast's and the indicators' incremental update)
+                open_times = [datetime.fromtimestamp(open_time, timezone.utc) for open_time in window["open_times"][-2:]]
+                return open_times, window["close"]
+
+        return await candles_repo.get_recent_closes(symbol=symbol, interval=interval, limit=self.window)
+
+    def indicators(
+        self,
+        *,
+        symbol: str,
+        interval: CandleInterval,
+        open_times: List[datetime],
+        closes: Sequence[float]
+    ) -> Indicators:
+        key = (symbol, interval.value)
+        saved = self._feature_states.get(key)
+
+        if saved is not None and saved[0] == open_times[-1]:
+            indicators = saved[2]
+            self._feature_states.move_to_end(key)
+            return indicators
+
+        if saved is not None and len(open_times) > 1 and saved[0] == open_times[-2]:
+            state = saved[1]
+            indicators = self.features.latest(self.features.update(state, np.array([closes[-1]], dtype=np.float64)))
+            self.incremental_updates += 1
+        else:
+            features, state = self.features.compute(np.asarray(closes, dtype=np.float64)[None, :])
+            indicators = self.features.latest(features)
+            self.full_computations += 1
+
+        self._feature_states[key] = (open_times[-1], state, indicators)
+        self._feature_states.move_to_end(key)
+        while len(self._feature_states) > self.max_feature_states:
+            self._feature_states.popitem(last=False)
+
+        return indicators
@@ -0,0 +1,258 @@
+"""
+Streams candles from a market data source into the candles store.
+
+create_http_client():
+    - One httpx.AsyncClient (and so one keep-alive connection pool) shared by
+      every adapter and every symbol
+
+IngestionPipeline:
+    - backfill():
+        - Ingests many symbols concurrently, at most max_parallel at a time
+        - A symbol that fails is logged and listed under "failed"; the others still
+          finish and are counted
+        - Returns counts of rows written and requests made plus the elapsed time
+    - ingest_symbol():
+        - Resumes from the newest stored open_time for the (symbol, interval) so a
+          restart never refetches what is already stored
+        - Pages through the source oldest first and writes every batch_size
+          candles, so memory stays bounded by max_parallel * (batch_size + page)
+          no matter how long the backfill is
+    - flush():
+        - Writes a batch and, for 1m candles, refreshes the 5m/1h/1d rollup
+          buckets the batch touched
+        - With a candle cache, writes the batch to its ring file too (after the
+          candles table, so the cache is never ahead of it); a ring that doesn't exist
+          yet or can't take the batch (an older candle it doesn't hold) is reseeded
+          from the newest stored candles
+    - follow():
+        - Keeps the store current by re-running the incremental backfill every
+          poll interval until cancelled
+        - Any error (or a symbol failing) is logged and the wait doubles after each
+          failed poll, up to INGEST_MAX_BACKOFF_SECONDS; a clean poll resets it
+
+main():
+    - Command line entry point
+    > python -m app.services.ingestion --source cryptocompare --interval 1m --start 2021-05-01 BTC-USD ETH-USD
+    > python -m app.services.ingestion --source poloniex --interval 5m --follow BTC-USD
+"""
+# Std Library Imports
+import time
+import asyncio
+import logging
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+# Third Party Imports
+import httpx
+
+from app.core.config import (
+    CANDLE_CACHE_ENABLED,
+    DATABASE_URL,
+    INGEST_BATCH_SIZE,
+    INGEST_HTTP_MAX_CONNECTIONS,
+    INGEST_HTTP_TIMEOUT,
+    INGEST_MAX_BACKOFF_SECONDS,
+    INGEST_MAX_PARALLEL_SYMBOLS,
+    INGEST_POLL_SECONDS
+)
+from app.db.repositories.candles import CandlesRepository, CandleRecord, ROLLUP_SOURCE_INTERVAL
+from app.db.tasks import create_database
+from app.models.candle import CandleInterval, CANDLE_INTERVAL_SECONDS
+from app.services.candle_cache import CandleCache
+from app.services.exchanges import EXCHANGE_ADAPTERS, ExchangeAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=INGEST_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=INGEST_HTTP_MAX_CONNECTIONS
+        ),
+        timeout=INGEST_HTTP_TIMEOUT,
+        **kwargs
+    )
+
+
+class IngestionPipeline:
+    def __init__(
+        self,
+        *,
+        candles_repo: CandlesRepository,
+        adapter: ExchangeAdapter,
+        max_parallel: int = INGEST_MAX_PARALLEL_SYMBOLS,
+        batch_size: int = INGEST_BATCH_SIZE,
+        candle_cache: Optional[CandleCache] = None
+    ) -> None:
+        self.candles_repo = candles_repo
+        self.adapter = adapter
+        self.max_parallel = max_parallel
+        self.batch_size = batch_size
+        self.candle_cache = candle_cache
+        self.rows_written = 0
+
+    async def backfill(
+        self,
+        *,
+        symbols: Sequence[str],
+        interval: CandleInterval,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        interval = CandleInterval(interval)
+        if not self.adapter.supports(interval):
+            raise ValueError(f"{self.adapter.name} does not provide {interval.value} candles")
+
+        end = end or datetime.now(timezone.utc)
+        await self.candles_repo.ensure_partitions(start=start, end=end)
+
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        requests_before = self.adapter.requests
+        started = time.perf_counter()
+
+        async def bounded(symbol: str) -> int:
+            async with semaphore:
+                return await self.ingest_symbol(symbol=symbol, interval=interval, start=start, end=end)
+
+        results = await asyncio.gather(*(bounded(symbol) for symbol in symbols), return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+        rows, failed = 0, []
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    f"{self.adapter.name}: couldn't ingest {symbol} {interval.value}", exc_info=result
+                )
+                failed.append(symbol)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                rows += result
+
+        return {
+            "rows": rows,
+            "failed": failed,
+            "requests": self.adapter.requests - requests_before,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0
+        }
+
+    async def ingest_symbol(self, *, symbol: str, interval: CandleInterval, start: datetime, end: datetime) -> int:
+        step = timedelta(seconds=CANDLE_INTERVAL_SECONDS[interval])
+        latest = await self.candles_repo.get_latest_open_time(symbol=symbol, interval=interval)
+        cursor = max(start, latest + step) if latest else start
+
+        written = 0
+        buffer: List[CandleRecord] = []
+        while cursor < end:
+            page = await self.adapter.fetch_candles(symbol=symbol, interval=interval, start=cursor, end=end)
+
+            if not page:
+                # Nothing traded (or not listed yet) in this window; skip past it
+                cursor += step * self.adapter.page_size
+                continue
+
+            buffer.extend(page)
+            cursor = page[-1][2] + step
+
+            if len(buffer) >= self.batch_size:
+                written += await self.flush(buffer)
+                buffer = []
+
+        written += await self.flush(buffer)
+        logger.info(f"{self.adapter.name}: {symbol} {interval.value} +{written} candles")
+
+        return written
+
+    async def flush(self, records: List[CandleRecord]) -> int:
+        if not records:
+            return 0
+
+        written = await self.candles_repo.upsert_candles(records=records)
+        self.rows_written += written
+
+        symbol, interval = records[0][0], records[0][1]
+        if interval == ROLLUP_SOURCE_INTERVAL.value:
+            open_times = [record[2] for record in records]
+            await self.candles_repo.refresh_rollups(symbol=symbol, start=min(open_times), end=max(open_times))
+
+        if self.candle_cache is not None:
+            if self.candle_cache.needs_seed(symbol=symbol, interval=interval) or not self.candle_cache.write(records):
+                await self.seed_cache(symbol=symbol, interval=interval)
+
+        return written
+
+    async def seed_cache(self, *, symbol: str, interval: CandleInterval) -> None:
+        capacity = self.candle_cache.capacity
+        columns = await self.candles_repo.get_recent_candles(symbol=symbol, interval=interval, limit=capacity)
+        self.candle_cache.seed(
+            symbol=symbol, interval=interval, columns=columns, complete=len(columns["open_times"]) < capacity
+        )
+
+    async def follow(
+        self,
+        *,
+        symbols: Sequence[str],
+        interval: CandleInterval,
+        start: datetime,
+        poll_seconds: float = INGEST_POLL_SECONDS,
+        max_backoff: float = INGEST_MAX_BACKOFF_SECONDS
+    ) -> None:
+        failures = 0
+        while True:
+            try:
+                report = await self.backfill(symbols=symbols, interval=interval, start=start)
+                failures = failures + 1 if report["failed"] else 0
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"--- INGESTION ERROR ({self.adapter.name}) ---")
+                failures += 1
+            await asyncio.sleep(min(poll_seconds * 2 ** min(failures, 16), max(poll_seconds, max_backoff)))
+
+
+async def run(args: argparse.Namespace) -> None:
+    database = create_database(str(DATABASE_URL))
+    await database.connect()
+
+    try:
+        async with create_http_client() as client:
+            pipeline = IngestionPipeline(
+                candles_repo=CandlesRepository(database),
+                adapter=EXCHANGE_ADAPTERS[args.source](client),
+                max_parallel=args.max_parallel,
+                candle_cache=CandleCache() if args.cache else None
+            )
+            start = datetime.fromisoformat(args.start).replace(tzinfo=timezone.utc)
+
+            if args.follow:
+                await pipeline.follow(symbols=args.symbols, interval=args.interval, start=start)
+            else:
+                print(await pipeline.backfill(symbols=args.symbols, interval=args.interval, start=start))
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest candles from a market data source.")
+    parser.add_argument("symbols", nargs="+", help="Symbols as BASE-QUOTE, e.g. BTC-USD")
+    parser.add_argument("--source", choices=sorted(EXCHANGE_ADAPTERS), default="cryptocompare")
+    parser.add_argument("--interval", choices=[interval.value for interval in CandleInterval], default="1m")
+    parser.add_argument("--start", default=(datetime.utcnow() - timedelta(days=7)).date().isoformat())
+    parser.add_argument("--max-parallel", type=int, default=INGEST_MAX_PARALLEL_SYMBOLS)
+    parser.add_argument("--follow", action="store_true", help="Keep polling for new candles")
+    parser.add_argument(
+        "--cache", action="store_true", default=CANDLE_CACHE_ENABLED,
+        help="Keep the memory-mapped candle cache (CANDLE_CACHE_DIR) current (default: CANDLE_CACHE_ENABLED)"
+    )
+    parser.add_argument("--no-cache", dest="cache", action="store_false")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
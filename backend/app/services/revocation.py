@@ -0,0 +1,195 @@
+"""
+Per-process revocation list for access tokens, fronted by a Bloom filter so that the
+database is only consulted for tokens that might actually be revoked.
+
+BloomFilter:
+    - Sized from the expected number of entries and the target false positive rate
+      (m = -n ln p / ln(2)^2 bits, k = m / n ln 2 hash functions)
+    - Positions come from double hashing one BLAKE2b digest, so each lookup costs a
+      single hash however many functions are used
+    - Never gives a false negative; false_positive_rate() estimates the current rate
+      from how full the filter is
+
+RevocationList:
+    - Holds the filter for every unexpired revoked jti
+    - is_revoked():
+        - A jti the filter doesn't contain is not revoked; no database hit
+        - A filter positive is confirmed against the revoked_tokens table
+    - revoke():
+        - Records a token's jti in the table and adds it to this process's filter at once
+    - add():
+        - Adds a jti to the filter (and drops it from the token cache)
+    - maybe_refresh():
+        - Builds the filter from the table on first use (requests wait for it), then every
+          REVOCATION_REFRESH_SECONDS pulls only the rows revoked since the last refresh
+          (with a small overlap so rows committed late aren't missed), so revocations
+          made by other workers take effect within one refresh interval
+        - The watermark starts at the database's clock as of the build, so an empty
+          table is refreshed incrementally too
+        - Rebuilds from scratch once the filter holds more than its capacity, leaving out
+          revocations of tokens that have since expired; deleting those rows runs in the
+          background, off the request path
+    - Every newly seen jti is passed to `on_revoke` (the token cache drops the entry)
+    - stats(): filter size, fill, estimated false positive rate and positive counts
+"""
+# Std Library Imports
+import math
+import time
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+# Third Party Imports
+
+from app.core.config import REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE, REVOCATION_REFRESH_SECONDS
+from app.db.repositories.revocations import RevocationsRepository
+
+logger = logging.getLogger(__name__)
+
+# Re-read this much before the last watermark on every incremental refresh
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+    def __init__(self, *, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def false_positive_rate(self) -> float:
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+
+class RevocationList:
+    def __init__(
+        self,
+        *,
+        capacity: int = REVOCATION_BLOOM_CAPACITY,
+        error_rate: float = REVOCATION_BLOOM_ERROR_RATE,
+        refresh_seconds: float = REVOCATION_REFRESH_SECONDS,
+        on_revoke: Optional[Callable[[str], None]] = None
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self.on_revoke = on_revoke
+        self.filter = BloomFilter(capacity=capacity, error_rate=error_rate)
+        self.watermark: Optional[datetime] = None
+        self.refreshed_at = 0.0
+        self.built = False
+        self._in_flight: Optional[asyncio.Future] = None
+        self._pruning: Optional[asyncio.Future] = None
+        self.checks = 0
+        self.filter_positives = 0
+        self.confirmed = 0
+
+    def add(self, jti: str) -> None:
+        if jti not in self.filter:
+            self.filter.add(jti)
+        if self.on_revoke is not None:
+            self.on_revoke(jti)
+
+    async def revoke(
+        self, *, jti: str, username: str, expires_at: datetime, revocations_repo: RevocationsRepository
+    ) -> None:
+        await revocations_repo.revoke_token(jti=jti, username=username, expires_at=expires_at)
+        self.add(jti)
+
+    async def is_revoked(self, jti: Optional[str], revocations_repo: RevocationsRepository) -> bool:
+        self.checks += 1
+        if jti is None or jti not in self.filter:
+            return False
+
+        self.filter_positives += 1
+        revoked = await revocations_repo.is_revoked(jti=jti)
+        self.confirmed += revoked
+
+        return revoked
+
+    async def _prune_in_background(self, revocations_repo: RevocationsRepository) -> None:
+        try:
+            await revocations_repo.prune_expired()
+        except Exception:
+            logger.exception("Couldn't prune expired revocations; the next rebuild retries")
+        finally:
+            self._pruning = None
+
+    async def rebuild(self, revocations_repo: RevocationsRepository, *, prune: bool = False) -> None:
+        # Read before the rows, so anything revoked meanwhile is picked up by the next refresh
+        as_of = await revocations_repo.get_database_time()
+        revocations = await revocations_repo.get_active_revocations()
+
+        bloom = BloomFilter(capacity=max(self.capacity, len(revocations) * 2), error_rate=self.error_rate)
+        for jti, _ in revocations:
+            bloom.add(jti)
+            if self.on_revoke is not None and jti not in self.filter:
+                self.on_revoke(jti)
+
+        self.filter = bloom
+        self.built = True
+        self.watermark = as_of
+        self.refreshed_at = time.monotonic()
+
+        if prune and self._pruning is None:
+            self._pruning = asyncio.ensure_future(self._prune_in_background(revocations_repo))
+
+    async def refresh(self, revocations_repo: RevocationsRepository) -> None:
+        if not self.built or self.filter.count > self.filter.capacity:
+            await self.rebuild(revocations_repo, prune=self.built)
+            return
+
+        for jti, revoked_at in await revocations_repo.get_revocations_since(since=self.watermark - REFRESH_OVERLAP):
+            if jti not in self.filter:
+                self.add(jti)
+            self.watermark = max(self.watermark, revoked_at)
+        self.refreshed_at = time.monotonic()
+
+    async def maybe_refresh(self, revocations_repo: RevocationsRepository) -> None:
+        if self.built and time.monotonic() - self.refreshed_at < self.refresh_seconds:
+            return
+
+        if self._in_flight is not None:
+            # A refresh is already running. Once built, the current filter serves meanwhile;
+            # before the first build nothing may be checked, so wait for it
+            if not self.built:
+                await self._in_flight
+                await self.maybe_refresh(revocations_repo)
+            return
+
+        self._in_flight = asyncio.get_event_loop().create_future()
+        try:
+            await self.refresh(revocations_repo)
+        finally:
+            self._in_flight.set_result(None)
+            self._in_flight = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entries": self.filter.count,
+            "capacity": self.filter.capacity,
+            "bits": self.filter.size,
+            "hashes": self.filter.hashes,
+            "estimated_false_positive_rate": self.filter.false_positive_rate(),
+            "checks": self.checks,
+            "filter_positives": self.filter_positives,
+            "confirmed": self.confirmed
+        }
@@ -0,0 +1,250 @@
+"""
+Fan-out of candle and forecast updates to the /stream WebSocket clients of a worker.
+
+StreamClient:
+    - One connected client: its subscriptions and a bounded queue of unsent messages
+    - offer() never blocks the publisher. Messages are keyed by (type, symbol,
+      interval), and a newer message replaces an unsent one with the same key (a slow
+      client skips intermediate candles but always gets the newest). When the queue
+      still holds STREAM_CLIENT_QUEUE_SIZE distinct keys, the oldest is dropped
+    - run(): sends queued messages in order until cancelled; a client that takes longer
+      than STREAM_SEND_TIMEOUT to accept one message raises asyncio.TimeoutError, so
+      the route can disconnect it instead of holding its queue forever
+
+StreamHub:
+    - Subscriptions of every client of this worker, per (symbol, interval)
+    - The first subscriber of a (symbol, interval) starts one upstream feed for it; the
+      last one leaving stops it. However many clients watch a symbol, it costs one
+      query every STREAM_POLL_SECONDS (and one forecast per new candle)
+    - poll(): reads the newest stored candle; publishes it when it changed and, when a
+      new candle opened, the forecast from it (the forecast service caches it, so REST
+      requests for the same forecast reuse it)
+    - publish(): encodes a message once and offers the same text to every subscriber;
+      the newest message of each type is kept so new subscribers get it right away
+    - start() / stop(): called by the app's startup and shutdown handlers; feeds only
+      run between them
+    - stats(): clients, subscriptions, feeds and how many messages were sent,
+      coalesced and dropped
+"""
+# Std Library Imports
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+# Third Party Imports
+from databases import Database
+
+from app.core.config import (
+    STREAM_CLIENT_QUEUE_SIZE,
+    STREAM_FORECAST_HORIZON,
+    STREAM_MAX_SUBSCRIPTIONS,
+    STREAM_POLL_SECONDS,
+    STREAM_SEND_TIMEOUT
+)
+from app.db.repositories.candles import CandlesRepository
+from app.models.candle import CandleInterval, CandlePublic
+from app.models.stream import StreamMessage, StreamMessageType
+from app.services.forecasting import ForecastService
+
+logger = logging.getLogger(__name__)
+
+# (symbol, interval)
+Subscription = Tuple[str, str]
+
+
+class StreamClient:
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        *,
+        max_pending: int = STREAM_CLIENT_QUEUE_SIZE,
+        send_timeout: float = STREAM_SEND_TIMEOUT
+    ) -> None:
+        self.send = send
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.subscriptions: Set[Subscription] = set()
+        self.pending: "OrderedDict[Tuple[str, ...], str]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.timed_out = False
+
+    def offer(self, key: Tuple[str, ...], text: str) -> None:
+        if key in self.pending:
+            self.coalesced += 1
+        elif len(self.pending) >= self.max_pending:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+        self.pending[key] = text
+        self._ready.set()
+
+    def _time_out(self, task: asyncio.Task) -> None:
+        self.timed_out = True
+        task.cancel()
+
+    async def run(self) -> None:
+        # A timer cancelling this task rather than asyncio.wait_for() around every send:
+        # no task per message, and (before Python 3.12) wait_for can swallow a cancellation
+        # arriving as the send completes, which would leave run() waiting forever
+        loop, task = asyncio.get_event_loop(), asyncio.current_task()
+        try:
+            while True:
+                await self._ready.wait()
+                while self.pending:
+                    _, text = self.pending.popitem(last=False)
+                    timer = loop.call_later(self.send_timeout, self._time_out, task)
+                    try:
+                        await self.send(text)
+                    finally:
+                        timer.cancel()
+                    self.sent += 1
+                self._ready.clear()
+        except asyncio.CancelledError:
+            if self.timed_out:
+                raise asyncio.TimeoutError()
+            raise
+
+
+class StreamHub:
+    def __init__(
+        self,
+        forecast_service: ForecastService,
+        *,
+        poll_seconds: float = STREAM_POLL_SECONDS,
+        forecast_horizon: int = STREAM_FORECAST_HORIZON,
+        max_subscriptions: int = STREAM_MAX_SUBSCRIPTIONS
+    ) -> None:
+        self.forecast_service = forecast_service
+        self.poll_seconds = poll_seconds
+        self.forecast_horizon = forecast_horizon
+        self.max_subscriptions = max_subscriptions
+        self.database: Optional[Database] = None
+        self.running = False
+        self.clients: Set[StreamClient] = set()
+        self.subscribers: Dict[Subscription, Set[StreamClient]] = {}
+        self.feeds: Dict[Subscription, asyncio.Future] = {}
+        self.latest: Dict[Subscription, Dict[str, str]] = {}
+        self.candles: Dict[Subscription, Dict[str, float]] = {}
+        self.published = 0
+
+    def start(self, database: Optional[Database]) -> None:
+        self.database = database
+        self.running = True
+        for subscription in self.subscribers:
+            self._start_feed(subscription)
+
+    async def stop(self) -> None:
+        self.running = False
+        feeds = list(self.feeds.values())
+        self.feeds.clear()
+        for feed in feeds:
+            feed.cancel()
+        await asyncio.gather(*feeds, return_exceptions=True)
+
+    def add(self, client: StreamClient) -> None:
+        self.clients.add(client)
+
+    def remove(self, client: StreamClient) -> None:
+        for symbol, interval in list(client.subscriptions):
+            self.unsubscribe(client, symbol=symbol, interval=interval)
+        self.clients.discard(client)
+
+    def subscribe(self, client: StreamClient, *, symbol: str, interval: CandleInterval) -> bool:
+        subscription = (symbol, CandleInterval(interval).value)
+        if subscription in client.subscriptions:
+            return True
+        if len(client.subscriptions) >= self.max_subscriptions:
+            return False
+
+        client.subscriptions.add(subscription)
+        self.subscribers.setdefault(subscription, set()).add(client)
+        for message_type, text in self.latest.get(subscription, {}).items():
+            client.offer((message_type, *subscription), text)
+        self._start_feed(subscription)
+
+        return True
+
+    def unsubscribe(self, client: StreamClient, *, symbol: str, interval: CandleInterval) -> None:
+        subscription = (symbol, CandleInterval(interval).value)
+        client.subscriptions.discard(subscription)
+        subscribers = self.subscribers.get(subscription)
+        if subscribers is None:
+            return
+
+        subscribers.discard(client)
+        if not subscribers:
+            del self.subscribers[subscription]
+            self.latest.pop(subscription, None)
+            self.candles.pop(subscription, None)
+            feed = self.feeds.pop(subscription, None)
+            if feed is not None:
+                feed.cancel()
+
+    def publish(self, subscription: Subscription, message_type: StreamMessageType, data: Any) -> int:
+        symbol, interval = subscription
+        text = StreamMessage(type=message_type, symbol=symbol, interval=interval, data=data).json()
+        self.latest.setdefault(subscription, {})[message_type.value] = text
+        self.published += 1
+
+        key = (message_type.value, *subscription)
+        subscribers = self.subscribers.get(subscription, ())
+        for client in subscribers:
+            client.offer(key, text)
+
+        return len(subscribers)
+
+    def _start_feed(self, subscription: Subscription) -> None:
+        if self.running and subscription not in self.feeds:
+            self.feeds[subscription] = asyncio.ensure_future(self._follow(subscription))
+
+    async def _follow(self, subscription: Subscription) -> None:
+        while True:
+            try:
+                await self.poll(subscription)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Couldn't poll %s %s for the stream; retrying", *subscription)
+            await asyncio.sleep(self.poll_seconds)
+
+    async def poll(self, subscription: Subscription) -> None:
+        symbol, interval = subscription
+        candles_repo = CandlesRepository(self.database)
+        columns = await candles_repo.get_recent_candles(symbol=symbol, interval=interval, limit=1)
+        if not len(columns["open_times"]):
+            return
+
+        candle = {name: float(values[-1]) for name, values in columns.items()}
+        previous = self.candles.get(subscription)
+        if candle == previous or subscription not in self.subscribers:
+            return
+
+        self.candles[subscription] = candle
+        self.publish(subscription, StreamMessageType.candle, CandlePublic(
+            symbol=symbol,
+            interval=interval,
+            open_time=datetime.fromtimestamp(candle["open_times"], timezone.utc),
+            **{name: candle[name] for name in ("open", "high", "low", "close", "volume")}
+        ))
+
+        if previous is None or previous["open_times"] != candle["open_times"]:
+            forecast = await self.forecast_service.forecast(
+                candles_repo=candles_repo, symbol=symbol, interval=CandleInterval(interval), horizon=self.forecast_horizon
+            )
+            if forecast is not None and subscription in self.subscribers:
+                self.publish(subscription, StreamMessageType.forecast, forecast)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "clients": len(self.clients),
+            "subscriptions": sum(len(subscribers) for subscribers in self.subscribers.values()),
+            "feeds": len(self.feeds),
+            "published": self.published,
+            "sent": sum(client.sent for client in self.clients),
+            "coalesced": sum(client.coalesced for client in self.clients),
+            "dropped": sum(client.dropped for client in self.clients)
+        }
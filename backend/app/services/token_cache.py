@@ -0,0 +1,200 @@
+"""
+In-process cache of verified access tokens so authenticated requests can skip the
+JWT decode and the user lookup in the database.
+
+TokenCache:
+    - Keyed by a SHA-256 hash of the token (raw tokens are never kept in memory)
+    - Each entry holds the decoded username, the token's jti and the UserInDB row
+    - Entries expire after the configured TTL or at the token's own exp claim,
+      whichever comes first
+    - Bounded by entry count; the least recently used entry is evicted first
+    - Hit, miss and eviction counters are available from stats()
+
+get():
+    - Returns the cached user for a token, or None on a miss or an expired entry
+
+set():
+    - Stores the user for a token along with the token's expiry timestamp
+
+peek_username():
+    - Returns the username for a cached, unexpired token without touching the LRU
+      order or the counters (the rate limiter uses it to identify callers)
+
+invalidate_user():
+    - Drops every cached token belonging to a username; call this whenever a
+      user is updated or deactivated (it only reaches this worker's cache)
+
+invalidate_user_ids():
+    - Drops every cached token of the given user ids (one pass over the cache)
+
+maybe_sync():
+    - Shares user changes between workers: every TOKEN_CACHE_SYNC_SECONDS it asks for
+      the users updated since its last sync (with a small overlap so rows committed
+      late aren't missed) and drops their tokens, so a user updated or deactivated
+      through another worker is served stale for at most one sync interval rather
+      than the cache TTL. The first sync only records the database's clock
+
+invalidate_jti():
+    - Drops the cached token with this jti; called for every token the revocation
+      list learns has been revoked
+"""
+# Std Library Imports
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Set, Tuple
+
+# Third Party Imports
+
+from app.core.config import TOKEN_CACHE_MAX_ENTRIES, TOKEN_CACHE_SYNC_SECONDS, TOKEN_CACHE_TTL_SECONDS
+from app.models.user import UserInDB
+
+if TYPE_CHECKING:
+    from app.db.repositories.users import UsersRepository
+
+# Re-read this much before the last sync, for updates whose transaction committed after it
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class TokenCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = TOKEN_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = TOKEN_CACHE_TTL_SECONDS,
+        sync_seconds: float = TOKEN_CACHE_SYNC_SECONDS
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sync_seconds = sync_seconds
+        # Database time of the last sync, and when (locally) it ran
+        self.watermark: Optional[datetime] = None
+        self.synced_at = 0.0
+        self._syncing = False
+        # token hash -> (expires_at, username, user, jti)
+        self._entries: "OrderedDict[str, Tuple[float, str, UserInDB, Optional[str]]]" = OrderedDict()
+        # username -> token hashes, so a user can be invalidated without a full scan
+        self._by_username: Dict[str, Set[str]] = {}
+        # jti -> token hash, so a revoked token can be dropped without a full scan
+        self._by_jti: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[UserInDB]:
+        if not self.enabled or not token:
+            return None
+
+        key = self.hash_token(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, username, user, jti = entry
+        if expires_at <= time.time():
+            self._remove(key, username, jti)
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user
+
+    def peek_username(self, token: str) -> Optional[str]:
+        entry = self._entries.get(self.hash_token(token)) if self.enabled and token else None
+        if entry is None or entry[0] <= time.time():
+            return None
+
+        return entry[1]
+
+    def set(
+        self, token: str, *, user: UserInDB, username: str, token_exp: float, jti: Optional[str] = None
+    ) -> None:
+        if not self.enabled or not token or user is None:
+            return
+
+        expires_at = min(time.time() + self.ttl_seconds, token_exp)
+        key = self.hash_token(token)
+        self._entries[key] = (expires_at, username, user, jti)
+        self._entries.move_to_end(key)
+        self._by_username.setdefault(username, set()).add(key)
+        if jti is not None:
+            self._by_jti[jti] = key
+
+        while len(self._entries) > self.max_entries:
+            old_key, (_, old_username, _, old_jti) = self._entries.popitem(last=False)
+            self._discard_username_key(old_username, old_key)
+            self._by_jti.pop(old_jti, None)
+            self.evictions += 1
+
+    def invalidate_user(self, username: str) -> None:
+        for key in self._by_username.pop(username, set()):
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._by_jti.pop(entry[3], None)
+
+    def invalidate_user_ids(self, user_ids: Iterable[int]) -> None:
+        user_ids = set(user_ids)
+        for key, (_, username, user, jti) in list(self._entries.items()):
+            if user.id in user_ids:
+                self._remove(key, username, jti)
+
+    async def sync(self, users_repo: "UsersRepository") -> None:
+        since = self.watermark - SYNC_OVERLAP if self.watermark is not None else None
+        self.watermark, user_ids = await users_repo.get_users_changed_since(since=since)
+        if user_ids:
+            self.invalidate_user_ids(user_ids)
+        self.synced_at = time.monotonic()
+
+    async def maybe_sync(self, users_repo: "UsersRepository") -> None:
+        if not self.enabled or self._syncing or time.monotonic() - self.synced_at < self.sync_seconds:
+            return
+
+        # Requests arriving meanwhile are served from the cache as it is
+        self._syncing = True
+        try:
+            await self.sync(users_repo)
+        finally:
+            self._syncing = False
+
+    def invalidate_jti(self, jti: str) -> None:
+        key = self._by_jti.pop(jti, None)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is not None:
+            self._remove(key, entry[1], jti)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_username.clear()
+        self._by_jti.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def _remove(self, key: str, username: str, jti: Optional[str]) -> None:
+        self._entries.pop(key, None)
+        self._discard_username_key(username, key)
+        self._by_jti.pop(jti, None)
+
+    def _discard_username_key(self, username: str, key: str) -> None:
+        keys = self._by_username.get(username)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_username[username]
@@ -0,0 +1,11 @@
+"""
+Performance benchmarks for the backend. Each module can be run on its own from the
+backend directory (where the .env file lives), e.g.
+
+> python -m benchmarks.auth_pool
+
+benchmarks.load_test drives the main routes together and writes a JSON result; its
+--compare mode exits non-zero when a run regresses against a stored baseline.
+benchmarks.startup does the same for the import time of a fresh process
+(--max-import-seconds).
+"""
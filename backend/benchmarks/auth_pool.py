@@ -0,0 +1,98 @@
+"""
+Latency of unrelated endpoints while logins are hashing passwords.
+
+A tiny app is built with two routes:
+    - /login runs bcrypt verification either inline (blocking the event loop)
+      or through the AuthService hashing pool
+    - /ping does no work at all
+
+Many concurrent logins are fired while /ping is polled, and the p50/p99 latency of
+/ping is reported for both modes. With the pool, /ping should stay in the low
+milliseconds; inline, it queues behind every bcrypt call.
+
+> python -m benchmarks.auth_pool --logins 200 --concurrency 50
+"""
+# Std Library Imports
+import time
+import asyncio
+import argparse
+import statistics
+from typing import List
+
+# Third Party Imports
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.services.authentication import AuthService, HashingPool
+
+
+def build_app(service: AuthService, salt: str, hashed_pw: str, offload: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login() -> dict:
+        if offload:
+            ok = await service.async_verify_password(password="benchmark-pw", salt=salt, hashed_pw=hashed_pw)
+        else:
+            ok = service.verify_password(password="benchmark-pw", salt=salt, hashed_pw=hashed_pw)
+        return {"ok": ok}
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    return app
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(offload: bool, logins: int, concurrency: int, workers: int) -> List[float]:
+    service = AuthService(hashing_pool=HashingPool(workers=workers, max_queue=logins))
+    update = service.create_salt_and_hashed_password(plaintext_password="benchmark-pw")
+    app = build_app(service, update.salt, update.password, offload)
+    semaphore = asyncio.Semaphore(concurrency)
+    ping_latencies: List[float] = []
+
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        async def login() -> None:
+            async with semaphore:
+                await client.post("/login")
+
+        async def ping_until(done: asyncio.Future) -> None:
+            while not done.done():
+                start = time.perf_counter()
+                await client.get("/ping")
+                ping_latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.005)
+
+        logins_done = asyncio.ensure_future(asyncio.gather(*(login() for _ in range(logins))))
+        await ping_until(logins_done)
+        await logins_done
+
+    service.hashing_pool.shutdown()
+    return ping_latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    for offload in (False, True):
+        latencies = asyncio.get_event_loop().run_until_complete(
+            run(offload, args.logins, args.concurrency, args.workers)
+        )
+        label = "pool" if offload else "inline"
+        print(
+            f"{label:>6}: /ping samples={len(latencies)} "
+            f"p50={statistics.median(latencies):.1f}ms p99={percentile(latencies, 99):.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
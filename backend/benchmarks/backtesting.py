@@ -0,0 +1,65 @@
+"""
+Walk-forward backtesting throughput as the number of pool workers grows.
+
+Random walks of --candles closes for --symbols symbols are backtested with --models at
+every --workers count, reporting the wall clock seconds, forecasts per second, and the
+speedup and efficiency over the first count. The bytes pickled per task are printed
+once for the shared candle file (path and offsets) next to what sending the task's
+closes instead would cost.
+
+> python -m benchmarks.backtesting --symbols 50 --candles 20000 --workers 1 2 4
+> python -m benchmarks.backtesting --models naive holt --step 1
+"""
+# Std Library Imports
+import pickle
+import argparse
+
+# Third Party Imports
+import numpy as np
+
+from app.core.workers import available_cpus
+from app.services.forecasting.backtesting import MODELS, SharedCandles, run_backtest
+
+
+def main() -> None:
+    cpus = available_cpus()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--candles", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, max(1, cpus // 2), cpus}))
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=list(MODELS))
+    parser.add_argument("--window", type=int, default=256)
+    parser.add_argument("--horizon", type=int, default=24)
+    parser.add_argument("--step", type=int, default=6)
+    parser.add_argument("--folds", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(5)
+    series = {
+        f"SYM{symbol}-USD": 100 * np.exp(rng.normal(0, 0.01, args.candles).cumsum())
+        for symbol in range(args.symbols)
+    }
+
+    candles = SharedCandles.create(series)
+    candles.close()
+    print(
+        f"pickled per task: {len(pickle.dumps(candles))} bytes shared, "
+        f"{len(pickle.dumps(next(iter(series.values()))))} bytes for the closes"
+    )
+
+    base = None
+    for workers in args.workers:
+        report = run_backtest(
+            series, models=args.models, window=args.window, horizon=args.horizon,
+            step=args.step, folds=args.folds, workers=workers
+        )
+        base = base or report
+        speedup = base["wall_seconds"] / report["wall_seconds"]
+        print(
+            f"{workers:>3} workers: {report['wall_seconds']:8.2f}s  {report['forecasts_per_second']:10.0f} forecasts/s  "
+            f"x{speedup:.2f} ({speedup / (workers / base['workers']):.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
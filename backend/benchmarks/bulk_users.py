@@ -0,0 +1,100 @@
+"""
+Bulk user import throughput (rows/sec) and memory ceiling.
+
+Streams a generated NDJSON upload of --rows users through the UserImporter in
+64KiB body chunks, the way the /users/bulk/import/ route receives it. By default
+rows go to a sink that only counts them; pass --sink db to COPY them into the
+database in .env (the users are deleted afterwards). bcrypt dominates the run, so
+--workers sets the hashing pool size. Peak Python heap usage is tracked with
+tracemalloc and should stay flat as --rows grows (it's bounded by --chunk-size).
+
+> python -m benchmarks.bulk_users --rows 2000 --workers 8 --chunk-size 500
+"""
+# Std Library Imports
+import json
+import uuid
+import asyncio
+import argparse
+import tracemalloc
+from typing import AsyncIterator, Sequence, Tuple
+
+# Third Party Imports
+
+from app.db.repositories.users import UsersRepository
+from app.models.user import UserBulkFormat
+from app.services.authentication import AuthService, HashingPool
+from app.services.bulk_users import UserImporter
+
+BODY_CHUNK = 64 * 1024
+
+
+class CountingSink:
+    """
+    Stands in for UsersRepository and drops every chunk after counting it.
+    """
+    def __init__(self) -> None:
+        self.rows = 0
+
+    async def copy_new_users(self, *, records: Sequence[Tuple[str, str, str, str]]) -> int:
+        self.rows += len(records)
+        return len(records)
+
+
+async def generate_upload(rows: int, prefix: str) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    for i in range(rows):
+        buffer += json.dumps({
+            "email": f"{prefix}{i}@bench.io", "username": f"{prefix}{i}", "password": "benchpassword"
+        }).encode() + b"\n"
+        if len(buffer) >= BODY_CHUNK:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def run(args: argparse.Namespace) -> None:
+    database = None
+    if args.sink == "db":
+        from app.core.config import DATABASE_URL
+        from databases import Database
+
+        database = Database(str(DATABASE_URL))
+        await database.connect()
+        sink = UsersRepository(database)
+    else:
+        sink = CountingSink()
+
+    auth_service = AuthService(hashing_pool=HashingPool(workers=args.workers))
+    importer = UserImporter(users_repo=sink, auth_service=auth_service, chunk_size=args.chunk_size)
+    prefix = f"bulk_{uuid.uuid4().hex[:6]}_"
+
+    tracemalloc.start()
+    result = await importer.run(generate_upload(args.rows, prefix), UserBulkFormat.ndjson)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{result.imported} users in {result.seconds:.1f}s = {result.rows_per_second:,.1f} rows/s "
+        f"(workers={args.workers}, chunk={args.chunk_size}), peak heap {peak / 2 ** 20:.1f}MiB"
+    )
+
+    auth_service.hashing_pool.shutdown()
+    if database is not None:
+        await database.execute(query="DELETE FROM users WHERE username LIKE :prefix", values={"prefix": f"{prefix}%"})
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--sink", choices=("count", "db"), default="count")
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Forecast window reads from the memory-mapped candle cache versus Postgres, and what
+the mapped rings cost each worker in memory.
+
+Seeds --candles synthetic 1m candles for each of --symbols symbols into the database
+configured in .env and into ring files under a temporary directory, then times reading
+the newest --window closes of a random symbol --requests times:
+    - postgres:  CandlesRepository.get_recent_closes()
+    - cache:     get_latest_open_time() (the freshness check the forecast route runs
+                 anyway) plus CandleCache.recent()
+    - cache only: CandleCache.recent() alone
+Finally --workers processes map every ring and read from it, and their RSS and PSS
+(/proc/<pid>/smaps_rollup) are printed: the rings are shared page cache, so PSS stays
+near the ring size divided by the number of workers while RSS counts it in full.
+The benchmark symbols and ring files are deleted afterwards.
+
+> python -m benchmarks.candle_cache --symbols 20 --candles 20000 --window 256
+"""
+# Std Library Imports
+import os
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+# Third Party Imports
+import numpy as np
+
+from app.core.config import DATABASE_URL
+from app.db.repositories.candles import CandlesRepository
+from app.db.tasks import create_database
+from app.services.candle_cache import CandleCache
+
+SYMBOL_PREFIX = "BENCHRING"
+START = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    with open(f"/proc/{pid}/smaps_rollup") as smaps:
+        fields = dict(line.split(":", 1) for line in smaps if ":" in line)
+
+    return {name: int(fields[name].split()[0]) for name in ("Rss", "Pss")}
+
+
+def map_rings(directory: str, symbols: List[str], window: int, ready, done) -> None:
+    cache = CandleCache(directory, enabled=True)
+    for symbol in symbols:
+        ring = cache.ring(symbol, "1m")
+        # Touch every page, as a worker serving charts of every range eventually does
+        float(ring.data.sum())
+        ring.recent(window)
+    ready.set()
+    done.wait()
+    cache.close()
+
+
+async def seed(candles_repo: CandlesRepository, candle_cache: CandleCache, symbols: List[str], count: int) -> None:
+    rng = np.random.default_rng(11)
+    await candles_repo.ensure_partitions(start=START, end=START + timedelta(minutes=count))
+
+    for symbol in symbols:
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, count)))
+        records = [
+            (symbol, "1m", START + timedelta(minutes=i), float(c), float(c) * 1.001, float(c) * 0.999, float(c), 1.0)
+            for i, c in enumerate(closes)
+        ]
+        await candles_repo.copy_candles(records=records)
+        candle_cache.write(records)
+
+
+async def timed(requests: int, read: Callable) -> List[float]:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await read()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return latencies
+
+
+async def run(args: argparse.Namespace) -> None:
+    database = create_database(str(DATABASE_URL))
+    await database.connect()
+    directory = tempfile.mkdtemp(prefix="candle-cache-bench-")
+    candles_repo = CandlesRepository(database)
+    candle_cache = CandleCache(directory, capacity=args.capacity, enabled=True)
+    symbols = [f"{SYMBOL_PREFIX}{i}-USD" for i in range(args.symbols)]
+    rng = np.random.default_rng(7)
+
+    try:
+        print(f"seeding {args.symbols} symbols x {args.candles} 1m candles ...")
+        await seed(candles_repo, candle_cache, symbols, args.candles)
+
+        async def from_postgres() -> None:
+            symbol = symbols[rng.integers(len(symbols))]
+            await candles_repo.get_recent_closes(symbol=symbol, interval="1m", limit=args.window)
+
+        async def from_cache() -> None:
+            symbol = symbols[rng.integers(len(symbols))]
+            last_open_time = await candles_repo.get_latest_open_time(symbol=symbol, interval="1m")
+            window = candle_cache.recent(symbol=symbol, interval="1m", n=args.window, last_open_time=last_open_time)
+            assert window is not None and len(window["close"]) == args.window
+
+        newest = START + timedelta(minutes=args.candles - 1)
+
+        async def from_cache_only() -> None:
+            symbol = symbols[rng.integers(len(symbols))]
+            candle_cache.recent(symbol=symbol, interval="1m", n=args.window, last_open_time=newest)
+
+        for label, read in (("postgres", from_postgres), ("cache", from_cache), ("cache only", from_cache_only)):
+            latencies = await timed(args.requests, read)
+            print(
+                f"{label:>10}: p50={statistics.median(latencies):8.3f}ms "
+                f"p99={np.percentile(latencies, 99):8.3f}ms ({args.window} closes)"
+            )
+
+        ring_kb = sum(os.path.getsize(candle_cache.path(symbol, "1m")) for symbol in symbols) // 1024
+        ready, done = multiprocessing.Event(), multiprocessing.Event()
+        workers = [
+            multiprocessing.Process(target=map_rings, args=(directory, symbols, args.window, ready, done))
+            for _ in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+            ready.wait()
+            ready.clear()
+
+        print(f"{args.workers} workers mapping {len(symbols)} rings ({ring_kb:,} KiB of ring files):")
+        for worker in workers:
+            memory = memory_kb(worker.pid)
+            print(f"  pid {worker.pid}: rss={memory['Rss']:>8,} KiB pss={memory['Pss']:>8,} KiB")
+        done.set()
+        for worker in workers:
+            worker.join()
+    finally:
+        candle_cache.close()
+        shutil.rmtree(directory, ignore_errors=True)
+        await database.execute(
+            query="DELETE FROM candles WHERE symbol LIKE :prefix", values={"prefix": f"{SYMBOL_PREFIX}%"}
+        )
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--candles", type=int, default=20_000, help="1m candles per symbol")
+    parser.add_argument("--capacity", type=int, default=4096, help="candles per ring")
+    parser.add_argument("--window", type=int, default=256)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Candle ingest throughput (rows/sec) for the two bulk paths of CandlesRepository:
+multi-row upserts through unnest and COPY into a staging table.
+
+Synthetic 1-minute candles (a random walk per symbol) are generated in batches
+and loaded into the database configured in .env. Benchmark symbols are deleted
+afterwards.
+
+> python -m benchmarks.candle_ingest --rows 10000000 --batch-size 50000
+"""
+# Std Library Imports
+import time
+import asyncio
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List
+
+# Third Party Imports
+import numpy as np
+from databases import Database
+
+from app.core.config import DATABASE_URL
+from app.db.repositories.candles import CandlesRepository, CandleRecord
+
+START = datetime(2019, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_batches(rows: int, symbols: int, batch_size: int, prefix: str) -> Iterator[List[CandleRecord]]:
+    rng = np.random.default_rng(7)
+    per_symbol = rows // symbols
+
+    for s in range(symbols):
+        symbol = f"{prefix}{s}-USD"
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, per_symbol)))
+        for offset in range(0, per_symbol, batch_size):
+            close = closes[offset:offset + batch_size]
+            yield [
+                (
+                    symbol, "1m", START + timedelta(minutes=offset + i),
+                    float(c), float(c * 1.001), float(c * 0.999), float(c), 1.0
+                )
+                for i, c in enumerate(close)
+            ]
+
+
+async def run(rows: int, symbols: int, batch_size: int, method: str) -> None:
+    db = Database(str(DATABASE_URL))
+    await db.connect()
+    candles_repo = CandlesRepository(db)
+    await candles_repo.ensure_partitions(start=START, end=START + timedelta(minutes=rows // symbols))
+
+    prefix = f"BENCH{method.upper()}"
+    load = candles_repo.copy_candles if method == "copy" else candles_repo.upsert_candles
+
+    loaded = 0
+    elapsed = 0.0
+    for batch in synthetic_batches(rows, symbols, batch_size, prefix):
+        start = time.perf_counter()
+        loaded += await load(records=batch)
+        elapsed += time.perf_counter() - start
+
+    print(f"{method:>6}: {loaded:,} rows in {elapsed:.1f}s -> {loaded / elapsed:,.0f} rows/s")
+
+    await db.execute(query="DELETE FROM candles WHERE symbol LIKE :prefix", values={"prefix": f"{prefix}%"})
+    await db.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--method", choices=("copy", "upsert", "both"), default="both")
+    args = parser.parse_args()
+
+    methods = ("upsert", "copy") if args.method == "both" else (args.method,)
+    for method in methods:
+        asyncio.get_event_loop().run_until_complete(run(args.rows, args.symbols, args.batch_size, method))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Full versus incremental technical indicator features across many symbols.
+
+Random walks of --history closes for --symbols symbols are generated, then --ticks new
+candles arrive for every symbol. Each tick is handled three ways and the time per
+tick (all symbols) is reported:
+    - full, batched:     FeatureEngine.compute() over the last --history closes of every
+                         symbol at once
+    - full, per symbol:  the same, one symbol at a time (what batching saves), timed over
+                         --loop-ticks ticks
+    - incremental:       FeatureEngine.update() of the saved state with the new closes
+The largest relative difference between the incremental and the batched full features
+of the last tick is printed as a check (the full windows start later, so EMA-based
+features differ by the weight left on the dropped candles, far below display precision).
+
+> python -m benchmarks.features --symbols 1000 --history 256 --ticks 50
+"""
+# Std Library Imports
+import time
+import argparse
+
+# Third Party Imports
+import numpy as np
+
+from app.services.forecasting import FEATURE_NAMES, FeatureEngine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--history", type=int, default=256, help="closes per symbol for the full computation")
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--loop-ticks", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = FeatureEngine()
+    rng = np.random.default_rng(11)
+    closes = 100 * np.exp(rng.normal(0, 0.01, (args.symbols, args.history + args.ticks)).cumsum(axis=1))
+    _, state = engine.compute(closes[:, :args.history])
+
+    started = time.perf_counter()
+    for tick in range(args.ticks):
+        end = args.history + tick + 1
+        full, _ = engine.compute(closes[:, end - args.history:end])
+    full_ms = (time.perf_counter() - started) / args.ticks * 1000
+
+    started = time.perf_counter()
+    for tick in range(args.loop_ticks):
+        end = args.history + tick + 1
+        for symbol in range(args.symbols):
+            engine.compute(closes[symbol, end - args.history:end])
+    loop_ms = (time.perf_counter() - started) / max(1, args.loop_ticks) * 1000
+
+    started = time.perf_counter()
+    for tick in range(args.ticks):
+        incremental = engine.update(state, closes[:, args.history + tick])
+    incremental_ms = (time.perf_counter() - started) / args.ticks * 1000
+
+    print(f"{args.symbols} symbols, {args.history} candles of history, per new candle:")
+    print(f"  full, batched:     {full_ms:10.3f}ms")
+    print(f"  full, per symbol:  {loop_ms:10.3f}ms ({loop_ms / full_ms:.1f}x batched)")
+    print(f"  incremental:       {incremental_ms:10.3f}ms ({full_ms / incremental_ms:.0f}x faster than batched full)")
+
+    worst = {}
+    for name in FEATURE_NAMES:
+        expected, actual = full[name][:, -1], incremental[name]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            difference = np.abs(actual - expected) / np.maximum(np.abs(expected), 1e-12)
+        worst[name] = float(np.nanmax(difference))
+    name = max(worst, key=worst.get)
+    print(f"  largest relative difference: {worst[name]:.2e} ({name})")
+
+
+if __name__ == "__main__":
+    main()
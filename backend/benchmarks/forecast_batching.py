@@ -0,0 +1,64 @@
+"""
+Forecast throughput and latency at different micro-batch windows.
+
+Submits forecasts for random price histories straight to a MicroBatcher in front
+of the local Holt engine (no database), keeping --concurrency requests in flight,
+and reports requests/sec, p50/p99 latency and the achieved mean batch size for
+each window. A window of 0 dispatches every request on its own (no batching).
+
+> python -m benchmarks.forecast_batching --requests 5000 --concurrency 200 --windows 0 1 2 5 10
+"""
+# Std Library Imports
+import time
+import asyncio
+import argparse
+import statistics
+from typing import List
+
+# Third Party Imports
+import numpy as np
+
+from app.core.config import FORECAST_WINDOW
+from app.services.forecasting import ExponentialSmoothingEngine, MicroBatcher
+
+
+async def run(window_ms: float, requests: int, concurrency: int, max_batch_size: int) -> None:
+    batcher = MicroBatcher(ExponentialSmoothingEngine(), max_batch_size=max_batch_size, max_wait_ms=window_ms)
+    histories = 100 * np.exp(np.random.default_rng(1).normal(0, 0.01, (256, FORECAST_WINDOW)).cumsum(axis=1))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await batcher.submit(histories[i % len(histories)], 24)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(
+        f"window={window_ms:>5.1f}ms: {requests / elapsed:>8,.0f} req/s "
+        f"p50={statistics.median(latencies):.2f}ms p99={latencies[int(len(latencies) * 0.99) - 1]:.2f}ms "
+        f"mean_batch={batcher.stats()['mean_batch_size']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 1, 2, 5, 10])
+    args = parser.parse_args()
+
+    for window_ms in args.windows:
+        asyncio.get_event_loop().run_until_complete(
+            run(window_ms, args.requests, args.concurrency, args.max_batch_size)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Ingestion throughput (candles/sec) and memory ceiling, offline against the local
+exchange stub from tests.exchange_stub.
+
+By default candles are written to a sink that only counts them, isolating the
+fetch/parse/batch path; pass --sink db to write to the database in .env. Peak
+Python heap usage is tracked with tracemalloc and should stay flat as --days grows
+(it's bounded by max_parallel * (batch_size + page size), not by range length).
+
+> python -m benchmarks.ingestion --symbols 20 --days 30 --source poloniex
+"""
+# Std Library Imports
+import asyncio
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+# Third Party Imports
+
+from app.db.repositories.candles import CandlesRepository, CandleRecord
+from app.services.exchanges import EXCHANGE_ADAPTERS
+from app.services.ingestion import IngestionPipeline, create_http_client
+from tests.exchange_stub import stub_app
+
+START = datetime(2021, 2, 1, tzinfo=timezone.utc)
+
+
+class CountingSink:
+    """
+    Stands in for CandlesRepository and drops every batch after counting it.
+    """
+    def __init__(self) -> None:
+        self.rows = 0
+
+    async def ensure_partitions(self, **kwargs) -> None:
+        pass
+
+    async def get_latest_open_time(self, **kwargs) -> Optional[datetime]:
+        return None
+
+    async def upsert_candles(self, *, records: List[CandleRecord]) -> int:
+        self.rows += len(records)
+        return len(records)
+
+    async def refresh_rollups(self, **kwargs) -> None:
+        pass
+
+
+async def run(args: argparse.Namespace) -> None:
+    database = None
+    if args.sink == "db":
+        from app.core.config import DATABASE_URL
+        from databases import Database
+
+        database = Database(str(DATABASE_URL))
+        await database.connect()
+        sink = CandlesRepository(database)
+    else:
+        sink = CountingSink()
+
+    symbols = [f"BENCH{i}-USD" for i in range(args.symbols)]
+    tracemalloc.start()
+
+    async with create_http_client(app=stub_app) as client:
+        pipeline = IngestionPipeline(
+            candles_repo=sink,
+            adapter=EXCHANGE_ADAPTERS[args.source](client, rate_limit=1e6, burst=1000),
+            max_parallel=args.max_parallel,
+            batch_size=args.batch_size
+        )
+        report = await pipeline.backfill(
+            symbols=symbols, interval="1m", start=START, end=START + timedelta(days=args.days)
+        )
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{report} peak_heap={peak / 2 ** 20:.1f}MiB")
+
+    if database is not None:
+        await database.execute(query="DELETE FROM candles WHERE symbol LIKE 'BENCH%'")
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=("cryptocompare", "poloniex"), default="cryptocompare")
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--max-parallel", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--sink", choices=("null", "db"), default="null")
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
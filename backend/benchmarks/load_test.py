@@ -0,0 +1,269 @@
+"""
+Load test of the API's main routes with a machine-readable result and a regression gate.
+
+Boots the application from app.api.server:get_application against the database in
+.env (a local Postgres), seeds a throwaway symbol with 1h candles (forecast) and 1m
+candles plus rollups (viz), then drives each scenario closed-loop at --concurrency:
+    - register:  POST /api/users/          (bcrypt hash)
+    - login:     POST /api/users/login/token/ (bcrypt verify)
+    - me:        GET  /api/users/me/
+    - forecast:  GET  /api/forecast/
+    - viz:       GET  /api/viz/
+Every scenario first runs --warmup requests that aren't recorded. For each one the
+result file gets the RPS, latency percentiles (ms), errors, CPU seconds and CPU% of
+this process (the in-process client's share included, the same in every run) and
+RSS (current and peak, MiB). Rate limiting is turned off for the run. The seeded
+symbol and users are deleted afterwards.
+
+With --compare, the run (or an existing --results file) is checked against a stored
+baseline and the exit status is 1 when any scenario's RPS fell, or its p50 or p99
+latency rose, by more than --threshold.
+
+> python -m benchmarks.load_test --output baseline.json
+> python -m benchmarks.load_test --output run.json --compare baseline.json --threshold 0.15
+> python -m benchmarks.load_test --results run.json --compare baseline.json
+"""
+# Std Library Imports
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import platform
+import resource
+import subprocess
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Third Party Imports
+import numpy as np
+from asgi_lifespan import LifespanManager
+from httpx import AsyncClient, Response
+
+from app.api.server import get_application
+from app.core import config
+from app.core.config import JWT_TOKEN_PREFIX
+from app.db.repositories.candles import CandlesRepository
+
+SYMBOL = "BENCHLOAD-USD"
+PASSWORD = "loadtestpassword"
+SCENARIOS = ("register", "login", "me", "forecast", "viz")
+# Requests per scenario at --scale 1 (the bcrypt routes are far slower than the rest)
+REQUESTS = {"register": 100, "login": 100, "me": 5000, "forecast": 2000, "viz": 1000}
+# Lower is better for these; higher is better for rps
+LATENCY_KEYS = ("p50_ms", "p99_ms")
+
+
+def rss_mib() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return peak_rss_mib()
+
+
+def peak_rss_mib() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def drive(send: Callable[[int], Awaitable[Response]], requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    for i in range(warmup):
+        await send(requests + i)
+
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in pending:
+            started = time.perf_counter()
+            try:
+                res = await send(i)
+                errors += res.status_code >= 400
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+
+    p50, p90, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 90, 95, 99])
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(wall, 3),
+        "rps": round(requests / wall, 2),
+        "p50_ms": round(p50, 3),
+        "p90_ms": round(p90, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_percent": round(cpu / wall * 100, 1),
+        "rss_mib": round(rss_mib(), 1),
+        "peak_rss_mib": round(peak_rss_mib(), 1)
+    }
+
+
+async def seed(candles_repo: CandlesRepository, end: datetime) -> None:
+    rng = np.random.default_rng(7)
+    hours, minutes = 2000, 7 * 24 * 60
+    await candles_repo.ensure_partitions(start=end - timedelta(hours=hours), end=end)
+
+    for interval, step, count in (("1h", timedelta(hours=1), hours), ("1m", timedelta(minutes=1), minutes)):
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, count)))
+        start = end - step * count
+        await candles_repo.copy_candles(records=[
+            (SYMBOL, interval, start + step * i, float(c), float(c) * 1.001, float(c) * 0.999, float(c), 1.0)
+            for i, c in enumerate(closes)
+        ])
+    await candles_repo.refresh_rollups(symbol=SYMBOL, start=end - timedelta(minutes=minutes), end=end)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    # A load test comes from one address; don't measure the rate limiter turning it away
+    config.RATE_LIMIT_ENABLED = False
+    app = get_application()
+    run_id = uuid.uuid4().hex[:8]
+    end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    results: Dict[str, Any] = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "concurrency": args.concurrency,
+            "scale": args.scale,
+            "warmup": args.warmup
+        },
+        "scenarios": {}
+    }
+
+    async with LifespanManager(app):
+        db = app.state._db
+        await seed(CandlesRepository(db), end)
+
+        async with AsyncClient(app=app, base_url="http://load") as client:
+            def user(i: int) -> Dict[str, str]:
+                return {"email": f"load_{run_id}_{i}@load.io", "username": f"load_{run_id}_{i}", "password": PASSWORD}
+
+            async def register(i: int) -> Response:
+                return await client.post(app.url_path_for("users:register-new-user"), json={"new_user": user(i)})
+
+            async def login(i: int) -> Response:
+                return await client.post(
+                    app.url_path_for("users:login-email-and-password"),
+                    data={"username": user(i % args.users)["email"], "password": PASSWORD}
+                )
+
+            # The users logged in with (and the token /me/ uses)
+            for i in range(args.users):
+                (await register(i)).raise_for_status()
+            token = (await login(0)).json()["access_token"]
+            auth = {"Authorization": f"{JWT_TOKEN_PREFIX} {token}"}
+
+            async def me(i: int) -> Response:
+                return await client.get(app.url_path_for("users:get-current-user"), headers=auth)
+
+            async def forecast(i: int) -> Response:
+                return await client.get(
+                    app.url_path_for("forecast:get-forecast"), params={"symbol": SYMBOL, "horizon": 1 + i % 24}
+                )
+
+            async def viz(i: int) -> Response:
+                days = (1, 3, 7)[i % 3]
+                return await client.get(app.url_path_for("viz:get-chart-series"), params={
+                    "symbol": SYMBOL, "start": (end - timedelta(days=days)).isoformat(), "end": end.isoformat(),
+                    "width": 1000, "chart": ("line", "candles")[i % 2]
+                })
+
+            # Registration needs fresh users on every request
+            scenarios = {
+                "register": lambda i: register(args.users + i), "login": login, "me": me,
+                "forecast": forecast, "viz": viz
+            }
+            for name in args.scenarios:
+                requests = max(1, int(REQUESTS[name] * args.scale))
+                result = await drive(scenarios[name], requests, args.concurrency, args.warmup)
+                results["scenarios"][name] = result
+                print(
+                    f"{name:>9}: {result['rps']:9.1f} rps  p50 {result['p50_ms']:8.2f}ms  "
+                    f"p99 {result['p99_ms']:8.2f}ms  errors {result['errors']:>4}  "
+                    f"cpu {result['cpu_percent']:5.1f}%  rss {result['rss_mib']:.0f}MiB"
+                )
+
+        await db.execute(query="DELETE FROM users WHERE username LIKE :pattern", values={"pattern": f"load_{run_id}_%"})
+        await db.execute(query="DELETE FROM candles WHERE symbol = :symbol", values={"symbol": SYMBOL})
+        await db.execute(query="DELETE FROM candle_rollups WHERE symbol = :symbol", values={"symbol": SYMBOL})
+
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        current = results["scenarios"].get(name)
+        if current is None:
+            continue
+
+        if current["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {base['rps']} -> {current['rps']}")
+        for key in LATENCY_KEYS:
+            if current[key] > base[key] * (1 + threshold):
+                regressions.append(f"{name}: {key} {base[key]} -> {current[key]}")
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {current['errors']}")
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--users", type=int, default=20, help="users registered up front for login")
+    parser.add_argument("--output", help="write the results here (JSON)")
+    parser.add_argument("--results", help="compare this results file instead of running")
+    parser.add_argument("--compare", help="baseline results file to check against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative regression")
+    args = parser.parse_args()
+
+    if args.results:
+        with open(args.results) as results_file:
+            results = json.load(results_file)
+    else:
+        results = asyncio.get_event_loop().run_until_complete(run(args))
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Overhead of the Prometheus instrumentation.
+
+Times, per call, the pieces that run on every request against the same work without
+them: MetricsMiddleware around an endpoint that does nothing, a repository query
+through TimedDatabase against the bare database (a stand-in that returns at once, so
+only the timing is measured) and the cost of rendering a scrape.
+
+Run it once as is (single process, the uvicorn setup) and once the way gunicorn runs
+it, with values kept in memory-mapped files:
+
+> python -m benchmarks.metrics --requests 50000
+> PROMETHEUS_MULTIPROC_DIR=$(mktemp -d) python -m benchmarks.metrics --requests 50000
+"""
+# Std Library Imports
+import time
+import asyncio
+import argparse
+
+# Third Party Imports
+
+from app.api.middleware import MetricsMiddleware
+from app.api.server import get_application
+from app.core.metrics import MULTIPROC_DIR, render_metrics
+from app.db.repositories.base import TimedDatabase
+from app.db.repositories.users import UsersRepository, GET_USER_BY_USERNAME
+
+
+async def endpoint(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class BareDatabase:
+    async def fetch_one(self, query, values=None):
+        return None
+
+
+async def per_call(func, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def run(requests: int) -> None:
+    app = get_application()
+    users_route = next(route for route in app.routes if getattr(route, "name", None) == "users:get-current-user")
+    scope = {
+        "type": "http", "method": "GET", "path": "/api/users/me/", "headers": [], "app": app,
+        "endpoint": users_route.endpoint
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: dict) -> None:
+        pass
+
+    middleware = MetricsMiddleware(endpoint)
+    bare = await per_call(lambda: endpoint(scope, receive, send), requests)
+    timed = await per_call(lambda: middleware(scope, receive, send), requests)
+    print(f"request:  bare {bare:5.2f}us, MetricsMiddleware {timed:5.2f}us (+{timed - bare:.2f}us)")
+
+    database = BareDatabase()
+    timed_database = TimedDatabase(database, UsersRepository._query_names)
+    values = {"username": "someone"}
+    bare = await per_call(lambda: database.fetch_one(query=GET_USER_BY_USERNAME, values=values), requests)
+    timed = await per_call(lambda: timed_database.fetch_one(query=GET_USER_BY_USERNAME, values=values), requests)
+    print(f"query:    bare {bare:5.2f}us, TimedDatabase {timed:5.2f}us (+{timed - bare:.2f}us)")
+
+    start = time.perf_counter()
+    body, _ = render_metrics()
+    print(f"scrape:   {(time.perf_counter() - start) * 1e3:.1f}ms for {len(body):,} bytes")
+    print(f"mode:     {'multi-process (' + MULTIPROC_DIR + ')' if MULTIPROC_DIR else 'single process'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000)
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
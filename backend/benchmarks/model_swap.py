@@ -0,0 +1,124 @@
+"""
+Forecast latency while the model is hot-swapped (app.services.forecasting.registry).
+
+--concurrency clients call ForecastService.compute() back to back for --seconds (the
+candles come from memory, so only batching and the model are measured). Every
+--swap-every seconds the registry loads the next of two artifact versions, warms it
+up and swaps it in, exactly as a refresh after an activation does. Reported:
+    - p50 / p99 / max latency (ms) of requests that overlapped a swap (from the start
+      of the load to the swap itself) and of all the others
+    - errors (must be 0) and how many requests each version served
+    - how long each load and warm-up took
+
+> python -m benchmarks.model_swap --seconds 10 --swap-every 0.5 --concurrency 64
+"""
+# Std Library Imports
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+# Third Party Imports
+import numpy as np
+
+from app.core.config import FORECAST_WINDOW
+from app.models.candle import CandleInterval
+from app.models.forecast import ForecastModelInDB
+from app.services.forecasting import ExponentialSmoothingEngine, ForecastCache, ForecastService
+from app.services.forecasting.registry import ModelRegistry, file_sha256
+
+
+class MemoryCandlesRepository:
+    def __init__(self, window: int) -> None:
+        start = datetime(2021, 6, 1, tzinfo=timezone.utc)
+        self.open_times = [start + timedelta(hours=i) for i in range(window)]
+        self.closes = list(100 * np.exp(np.random.default_rng(1).normal(0, 0.01, window).cumsum()))
+
+    async def get_recent_closes(self, *, symbol: str, interval: CandleInterval, limit: int) -> Tuple[list, list]:
+        return self.open_times, self.closes
+
+
+def write_versions(directory: str) -> List[ForecastModelInDB]:
+    models = []
+    for version, alpha in (("a", 0.3), ("b", 0.6)):
+        path = f"{directory}/holt-{version}.json"
+        with open(path, "w") as artifact:
+            json.dump({"alpha": alpha, "beta": 0.1}, artifact)
+        models.append(ForecastModelInDB.from_trusted({
+            "id": len(models) + 1, "name": "holt-bench", "version": version, "engine": "holt",
+            "artifact": f"holt-{version}.json", "sha256": file_sha256(path), "is_active": True,
+            "activated_at": datetime.now(timezone.utc)
+        }))
+
+    return models
+
+
+async def run(args: argparse.Namespace) -> None:
+    service = ForecastService(engine=ExponentialSmoothingEngine(), cache=ForecastCache())
+    candles_repo = MemoryCandlesRepository(FORECAST_WINDOW)
+    requests: List[Tuple[float, float, str]] = []
+    swaps: List[Tuple[float, float]] = []
+    errors = 0
+    deadline = time.perf_counter() + args.seconds
+
+    async def client() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                forecast = await service.compute(
+                    candles_repo=candles_repo, symbol="BTC-USD", interval=CandleInterval.one_hour, horizon=args.horizon
+                )
+                requests.append((started, time.perf_counter(), forecast.model_version))
+            except Exception:
+                errors += 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        registry = ModelRegistry(service, directory=directory)
+        versions = write_versions(directory)
+
+        async def swapper() -> None:
+            while time.perf_counter() + args.swap_every < deadline:
+                await asyncio.sleep(args.swap_every)
+                started = time.perf_counter()
+                await registry.deploy(versions[len(swaps) % len(versions)])
+                swaps.append((started, time.perf_counter()))
+
+        await asyncio.gather(swapper(), *(client() for _ in range(args.concurrency)))
+
+    def overlaps(request: Tuple[float, float, str]) -> bool:
+        return any(request[0] <= swapped and request[1] >= started for started, swapped in swaps)
+
+    print(f"{len(requests)} requests, {errors} errors, {len(swaps)} swaps, served: {dict(Counter(r[2] for r in requests))}")
+    groups = {
+        "during a swap": [request for request in requests if overlaps(request)],
+        "otherwise": [request for request in requests if not overlaps(request)]
+    }
+    for label, selected in groups.items():
+        if not selected:
+            continue
+        latencies = np.array([finished - started for started, finished, _ in selected]) * 1000
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"  {label:<14} {len(selected):>7} requests  p50 {p50:7.2f}ms  p99 {p99:7.2f}ms  max {latencies.max():7.2f}ms")
+    if swaps:
+        durations = np.array([swapped - started for started, swapped in swaps]) * 1000
+        print(f"  load + warm up + swap: mean {durations.mean():.2f}ms, max {durations.max():.2f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--swap-every", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--horizon", type=int, default=24)
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
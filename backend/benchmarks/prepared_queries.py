@@ -0,0 +1,140 @@
+"""
+Per-query latency and CPU of repository lookups with and without prepared statements.
+
+Runs GET_USER_BY_USERNAME --queries times in three modes against the database
+configured in .env:
+
+    unprepared: through databases on a pool with statement_cache_size=0, so postgres
+                parses and plans the query on every call
+    databases:  through databases with asyncpg's default statement cache (the SQL is
+                still rebuilt through SQLAlchemy on every call)
+    prepared:   UsersRepository.fetch_one_prepared(), compiled once and run as a
+                prepared statement on the pooled connection
+
+Client CPU is the process time of the benchmark. Server CPU is the plan + execution
+time postgres records in pg_stat_statements, when that extension is installed and the
+user may reset it.
+
+asyncpg caches statements by SQL text in both the databases and prepared modes, so
+the difference between them is the client side build. --compile-only times just that,
+without a database: building the query through SQLAlchemy as databases does, against
+PreparedQuery.args() (30-50us against ~0.5us per query here).
+
+> python -m benchmarks.prepared_queries --queries 5000
+> python -m benchmarks.prepared_queries --compile-only
+"""
+# Std Library Imports
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Awaitable, Callable, Optional
+
+# Third Party Imports
+from databases import Database
+from databases.core import Connection
+from databases.backends.postgres import PostgresBackend
+
+from app.core.config import DATABASE_URL
+from app.db.repositories.users import GET_USER_BY_USERNAME, UsersRepository
+from app.models.user import UserCreate
+
+USERNAME = "bench_prepared"
+
+
+async def server_time_ms(db: Database) -> Optional[float]:
+    try:
+        return await db.fetch_val(
+            query="""
+                SELECT COALESCE(sum(total_plan_time + total_exec_time), 0)
+                FROM pg_stat_statements
+                WHERE query ILIKE '%FROM users%WHERE username%';
+            """
+        )
+    except Exception:
+        return None
+
+
+async def reset_server_stats(db: Database) -> None:
+    try:
+        await db.execute(query="SELECT pg_stat_statements_reset();")
+    except Exception:
+        pass
+
+
+async def measure(label: str, stats_db: Database, lookup: Callable[[], Awaitable], queries: int) -> None:
+    await lookup()
+    await reset_server_stats(stats_db)
+    latencies = []
+    cpu_start = time.process_time()
+
+    for _ in range(queries):
+        start = time.perf_counter()
+        await lookup()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    client_cpu = (time.process_time() - cpu_start) * 1e6 / queries
+    server_ms = await server_time_ms(stats_db)
+    latencies.sort()
+    print(
+        f"{label:>10}: p50={statistics.median(latencies):.3f}ms p99={latencies[int(len(latencies) * 0.99) - 1]:.3f}ms "
+        f"client cpu={client_cpu:.0f}us/query "
+        + (f"server={server_ms * 1000 / queries:.0f}us/query" if server_ms is not None else "server=n/a")
+    )
+
+
+def measure_compile(queries: int) -> None:
+    driver_connection = PostgresBackend(str(DATABASE_URL)).connection()
+    prepared = UsersRepository._prepared["get_user_by_username"]
+    values = {"username": USERNAME}
+
+    builds = {
+        "databases": lambda: driver_connection._compile(Connection._build_query(GET_USER_BY_USERNAME, values)),
+        "prepared": lambda: (prepared.positional_sql, prepared.args(values))
+    }
+    for label, build in builds.items():
+        build()
+        started = time.perf_counter()
+        for _ in range(queries):
+            build()
+        print(f"{label:>10}: build={(time.perf_counter() - started) * 1e6 / queries:.2f}us/query")
+
+
+async def run(queries: int) -> None:
+    db = Database(str(DATABASE_URL), min_size=1, max_size=1)
+    uncached_db = Database(str(DATABASE_URL), min_size=1, max_size=1, statement_cache_size=0)
+    await db.connect()
+    await uncached_db.connect()
+
+    user_repo = UsersRepository(db)
+    if not await user_repo.get_user_by_username(username=USERNAME):
+        await user_repo.register_new_user(
+            new_user=UserCreate(email=f"{USERNAME}@bench.io", username=USERNAME, password="benchpassword")
+        )
+    values = {"username": USERNAME}
+
+    await measure(
+        "unprepared", db, lambda: uncached_db.fetch_one(query=GET_USER_BY_USERNAME, values=values), queries
+    )
+    await measure("databases", db, lambda: db.fetch_one(query=GET_USER_BY_USERNAME, values=values), queries)
+    await measure("prepared", db, lambda: user_repo.fetch_one_prepared("get_user_by_username", values), queries)
+
+    await db.execute(query="DELETE FROM users WHERE username = :username", values=values)
+    await uncached_db.disconnect()
+    await db.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--compile-only", action="store_true", help="Time only the query build, without a database")
+    args = parser.parse_args()
+
+    if args.compile_only:
+        measure_compile(args.queries)
+    else:
+        asyncio.get_event_loop().run_until_complete(run(args.queries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Overhead of the profiler when it is off and while it samples.
+
+Runs the same request --requests times through an ASGI endpoint that does a realistic
+amount of CPU work (encoding a few hundred candles as JSON) and reports the time per
+request (best of --repeat runs):
+    - bare endpoint
+    - behind ProfilingMiddleware (slow request tracing on, sampler off)
+    - with the sampler on, at each --intervals-ms
+
+> python -m benchmarks.profiling --requests 5000 --intervals-ms 10 5 1
+"""
+# Std Library Imports
+import time
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+
+# Third Party Imports
+
+from app.api.middleware import ProfilingMiddleware
+from app.api.responses import TimedJSONResponse
+from app.core.profiling import SamplingProfiler, SlowRequestRecorder
+
+START = datetime(2021, 1, 1)
+CANDLES = [
+    {"open_time": START + timedelta(hours=i), "open": 100.0 + i, "high": 101.0 + i, "low": 99.0 + i, "close": 100.5 + i}
+    for i in range(300)
+]
+
+
+async def endpoint(scope, receive, send) -> None:
+    response = TimedJSONResponse([{**candle, "open_time": candle["open_time"].isoformat()} for candle in CANDLES])
+    await response(scope, receive, send)
+
+
+async def per_request(app, requests: int, repeat: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/bench", "headers": []}
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: dict) -> None:
+        pass
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await app(dict(scope), receive, send)
+        best = min(best, (time.perf_counter() - start) / requests * 1e6)
+
+    return best
+
+
+async def run(requests: int, intervals_ms, repeat: int) -> None:
+    recorder = SlowRequestRecorder(threshold_ms=0)
+    traced = ProfilingMiddleware(endpoint, recorder=recorder)
+
+    bare = await per_request(endpoint, requests, repeat)
+    print(f"bare endpoint:                 {bare:8.1f}us/request")
+    off = await per_request(traced, requests, repeat)
+    print(f"tracing on, sampler off:       {off:8.1f}us/request ({(off - bare) / bare:+.1%})")
+
+    for interval in intervals_ms:
+        profiler = SamplingProfiler(interval_ms=interval, recorder=recorder)
+        profiler.start()
+        sampled = await per_request(traced, requests, repeat)
+        profiler.stop()
+        print(
+            f"sampling every {interval:>4}ms:         {sampled:8.1f}us/request ({(sampled - bare) / bare:+.1%}), "
+            f"{profiler.samples} samples, {len(profiler.stacks)} stacks"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--intervals-ms", type=float, nargs="+", default=[10, 5, 1])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args.requests, args.intervals_ms, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
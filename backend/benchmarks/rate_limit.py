@@ -0,0 +1,122 @@
+"""
+Per-request cost of RateLimitMiddleware under high concurrency.
+
+Calls the middleware as a plain ASGI app in front of an endpoint that does nothing,
+so the difference from calling that endpoint directly is the middleware's own cost:
+route cost lookup against the application's real routes, caller identification and
+the GCRA check. Requests come from --clients distinct IPs and --users authenticated
+users (tokens already in the token cache, plus a run where they must be decoded),
+--concurrency at a time. Limits are set high enough that nothing is rejected.
+
+> python -m benchmarks.rate_limit --requests 50000 --concurrency 1000
+> python -m benchmarks.rate_limit --backend redis   # needs a Redis at RATE_LIMIT_REDIS_URL
+"""
+# Std Library Imports
+import time
+import random
+import asyncio
+import argparse
+from typing import List
+
+# Third Party Imports
+
+from app.api.server import get_application
+from app.core.config import JWT_TOKEN_PREFIX
+from app.models.user import UserInDB
+from app.services import auth_service, token_cache
+from app.api.middleware.rate_limit import Rate, RateLimitMiddleware, create_rate_limit_backend
+
+
+async def endpoint(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def make_scopes(app, requests: int, clients: int, tokens: List[str]) -> List[dict]:
+    paths = ["/api/users/me/", "/api/viz/", "/api/forecast/", "/api/users/login/token/"]
+    scopes = []
+    for i in range(requests):
+        headers = [(b"host", b"bench"), (b"accept", b"application/json")]
+        if tokens and i % 2:
+            headers.append((b"authorization", f"{JWT_TOKEN_PREFIX} {random.choice(tokens)}".encode()))
+        scopes.append({
+            "type": "http", "method": "GET", "path": random.choice(paths), "root_path": "", "query_string": b"",
+            "headers": headers, "client": (f"10.0.{random.randrange(clients) // 256}.{random.randrange(256)}", 50000),
+            "app": app
+        })
+
+    return scopes
+
+
+async def run_requests(asgi_app, scopes: List[dict], concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: dict) -> None:
+        pass
+
+    async def one(scope: dict) -> None:
+        async with semaphore:
+            await asyncio.sleep(0)
+            await asgi_app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(scope) for scope in scopes))
+    return (time.perf_counter() - start) / len(scopes) * 1e6
+
+
+def make_tokens(users: int, cache: bool) -> List[str]:
+    tokens = []
+    for i in range(users):
+        user = UserInDB(
+            id=i, email=f"bench_{i}@bench.io", username=f"bench_{i}", email_verified=False,
+            is_active=True, is_superuser=False, password="benchpassword", salt="salt"
+        )
+        token = auth_service.create_access_token_for_user(user=user)
+        if cache:
+            token_cache.set(token, user=user, username=user.username, token_exp=time.time() + 3600)
+        tokens.append(token)
+
+    return tokens
+
+
+async def run(args: argparse.Namespace) -> None:
+    app = get_application()
+    unlimited = Rate(per_minute=1e9, burst=10 ** 9)
+
+    for label, users, cache in (
+        ("anonymous", 0, False),
+        ("half authenticated, cached tokens", args.users, True),
+        ("half authenticated, tokens decoded", args.users, False)
+    ):
+        token_cache.clear()
+        tokens = make_tokens(users, cache)
+        scopes = make_scopes(app, args.requests, args.clients, tokens)
+        limited = RateLimitMiddleware(
+            endpoint, backend=create_rate_limit_backend(args.backend), user_rate=unlimited, ip_rate=unlimited
+        )
+
+        bare = await run_requests(endpoint, scopes, args.concurrency)
+        with_limit = await run_requests(limited, scopes, args.concurrency)
+        print(
+            f"{label:<36} bare {bare:6.1f}us/request, rate limited {with_limit:6.1f}us/request "
+            f"(+{with_limit - bare:.1f}us), {args.concurrency} concurrent"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--backend", choices=["local", "redis"], default="local")
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Latency of registering a user: the old three round trip flow (look up email, look up
+username, insert) against the single INSERT that detects taken credentials through
+the unique indexes.
+
+Password hashing is done once up front so only database time is compared. Runs
+against the database configured in .env and removes the users it creates.
+
+> python -m benchmarks.register_user --users 500
+"""
+# Std Library Imports
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+from typing import Awaitable, Callable, List
+
+# Third Party Imports
+from databases import Database
+
+from app.core.config import DATABASE_URL
+from app.db.repositories.users import GET_USER_BY_EMAIL, GET_USER_BY_USERNAME, REGISTER_NEW_USER
+from app.services import auth_service
+
+
+async def three_round_trips(db: Database, values: dict) -> None:
+    await db.fetch_one(query=GET_USER_BY_EMAIL, values={"email": values["email"]})
+    await db.fetch_one(query=GET_USER_BY_USERNAME, values={"username": values["username"]})
+    await db.fetch_one(query=REGISTER_NEW_USER, values=values)
+
+
+async def single_round_trip(db: Database, values: dict) -> None:
+    await db.fetch_one(query=REGISTER_NEW_USER, values=values)
+
+
+async def measure(db: Database, register: Callable[[Database, dict], Awaitable], users: int, prefix: str) -> List[float]:
+    hashed = auth_service.create_salt_and_hashed_password(plaintext_password="benchpassword")
+    latencies = []
+
+    for i in range(users):
+        values = {
+            "email": f"{prefix}{i}@bench.io",
+            "username": f"{prefix}{i}",
+            "password": hashed.password,
+            "salt": hashed.salt
+        }
+        start = time.perf_counter()
+        await register(db, values)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    await db.execute(query="DELETE FROM users WHERE username LIKE :prefix", values={"prefix": f"{prefix}%"})
+    return latencies
+
+
+async def run(users: int) -> None:
+    db = Database(str(DATABASE_URL))
+    await db.connect()
+
+    for label, register in (("3 round trips", three_round_trips), ("1 round trip", single_round_trip)):
+        latencies = sorted(await measure(db, register, users, f"bench_{uuid.uuid4().hex[:6]}_"))
+        print(
+            f"{label:>14}: p50={statistics.median(latencies):.2f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99) - 1]:.2f}ms"
+        )
+
+    await db.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args.users))
+
+
+if __name__ == "__main__":
+    main()
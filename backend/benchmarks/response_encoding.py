@@ -0,0 +1,87 @@
+"""
+Encode time and payload size of the /viz and /forecast response formats.
+
+Builds candle chart series of each --points size and times the JSON path the
+routes take by default (numpy -> lists -> pydantic model -> jsonable_encoder ->
+json.dumps, as FastAPI does) against the packed columns format and Arrow IPC
+(when pyarrow is installed). Sizes are reported raw and after gzip and brotli
+(when installed) at the levels CompressionMiddleware uses.
+
+> python -m benchmarks.response_encoding --points 100 1000 10000 --repeats 50
+"""
+# Std Library Imports
+import gzip
+import json
+import time
+import argparse
+import statistics
+from typing import Callable, Dict
+
+# Third Party Imports
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from app.api.middleware.compression import brotli
+from app.api.responses import ARROW_AVAILABLE, encode_arrow, encode_columns
+from app.core.config import RESPONSE_BROTLI_QUALITY, RESPONSE_GZIP_LEVEL
+from app.models.viz import VizSeries
+
+
+def make_series(points: int) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(5)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, points)))
+    return {
+        "timestamps": 1609459200 + 3600 * np.arange(points, dtype=np.int64),
+        "open": close * (1 + rng.normal(0, 0.001, points)),
+        "high": close * 1.004,
+        "low": close * 0.996,
+        "close": close,
+        "volume": rng.gamma(2.0, 50.0, points)
+    }
+
+
+def encode_json(meta: dict, columns: Dict[str, np.ndarray]) -> bytes:
+    series = VizSeries(**meta, **{name: values.tolist() for name, values in columns.items()})
+    return json.dumps(jsonable_encoder(series), separators=(",", ":")).encode()
+
+
+def time_encoder(encoder: Callable, meta: dict, columns: Dict[str, np.ndarray], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encoder(meta, columns)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    encoders = {"json": encode_json, "columns": encode_columns}
+    if ARROW_AVAILABLE:
+        encoders["arrow"] = encode_arrow
+
+    for points in args.points:
+        columns = make_series(points)
+        meta = {
+            "symbol": "BTC-USD", "chart": "candles", "resolution": "1h", "width": points * 6,
+            "source_points": points, "points": points
+        }
+        print(f"{points} candles")
+
+        for name, encoder in encoders.items():
+            encode_ms = time_encoder(encoder, meta, columns, args.repeats)
+            payload = encoder(meta, columns)
+            gzipped = len(gzip.compress(payload, compresslevel=RESPONSE_GZIP_LEVEL))
+            brotlied = len(brotli.compress(payload, quality=RESPONSE_BROTLI_QUALITY)) if brotli else None
+            print(
+                f"  {name:>7}: encode p50={encode_ms:8.3f}ms raw={len(payload):>9,}B gzip={gzipped:>9,}B"
+                + (f" br={brotlied:>9,}B" if brotlied is not None else "")
+            )
+
+
+if __name__ == "__main__":
+    main()
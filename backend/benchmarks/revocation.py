@@ -0,0 +1,104 @@
+"""
+False positive rate and per-request cost of the token revocation Bloom filter.
+
+1. Fills a filter sized for --capacity at --error-rate to 25%..150% of its capacity
+   and measures the false positive rate over --trials jtis that were never added,
+   next to the rate the filter estimates for itself.
+2. Times the revocation check done on every authenticated request for tokens that
+   are not revoked (the common case): the filter path against asking the revoked
+   tokens table every time. The table is simulated with --db-latency-ms per query,
+   or pass --db to query the revoked_tokens table in the database configured in .env.
+
+> python -m benchmarks.revocation --capacity 100000 --error-rate 0.001 --requests 20000
+"""
+# Std Library Imports
+import time
+import uuid
+import asyncio
+import argparse
+
+# Third Party Imports
+
+from app.services.revocation import BloomFilter, RevocationList
+
+
+class SimulatedRevocationsRepository:
+    """
+    Stands in for RevocationsRepository: every lookup costs one simulated round trip.
+    """
+    def __init__(self, latency_ms: float) -> None:
+        self.latency = latency_ms / 1000
+        self.lookups = 0
+
+    async def is_revoked(self, *, jti: str) -> bool:
+        self.lookups += 1
+        await asyncio.sleep(self.latency)
+        return False
+
+
+def measure_false_positives(capacity: int, error_rate: float, trials: int) -> None:
+    print(f"false positives (capacity={capacity:,}, target={error_rate})")
+    for fill in (0.25, 0.5, 0.75, 1.0, 1.5):
+        bloom = BloomFilter(capacity=capacity, error_rate=error_rate)
+        for _ in range(int(capacity * fill)):
+            bloom.add(uuid.uuid4().hex)
+        measured = sum(uuid.uuid4().hex in bloom for _ in range(trials)) / trials
+        print(
+            f"  {fill:>4.0%} full: measured={measured:.5f} estimated={bloom.false_positive_rate():.5f} "
+            f"({bloom.size / 8 / 2 ** 10:,.0f}KiB, {bloom.hashes} hashes)"
+        )
+
+
+async def measure_overhead(args: argparse.Namespace) -> None:
+    database = None
+    if args.db:
+        from databases import Database
+        from app.core.config import DATABASE_URL
+        from app.db.repositories.revocations import RevocationsRepository
+
+        database = Database(str(DATABASE_URL))
+        await database.connect()
+        repo = RevocationsRepository(database)
+    else:
+        repo = SimulatedRevocationsRepository(args.db_latency_ms)
+
+    revocation_list = RevocationList(capacity=args.capacity, error_rate=args.error_rate)
+    for _ in range(args.capacity):
+        revocation_list.filter.add(uuid.uuid4().hex)
+    jtis = [uuid.uuid4().hex for _ in range(args.requests)]
+
+    start = time.perf_counter()
+    for jti in jtis:
+        await revocation_list.is_revoked(jti, repo)
+    filtered = (time.perf_counter() - start) / args.requests * 1e6
+    positives = revocation_list.filter_positives
+
+    start = time.perf_counter()
+    for jti in jtis:
+        await repo.is_revoked(jti=jti)
+    every_request = (time.perf_counter() - start) / args.requests * 1e6
+
+    print(f"per-request revocation check (filter at capacity, {args.requests:,} unrevoked tokens)")
+    print(f"  bloom filter:  {filtered:8.1f}us/request, {positives} database lookups")
+    print(f"  table lookup:  {every_request:8.1f}us/request, {args.requests:,} database lookups")
+
+    if database is not None:
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity", type=int, default=100000)
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    parser.add_argument("--trials", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--db-latency-ms", type=float, default=0.5)
+    parser.add_argument("--db", action="store_true")
+    args = parser.parse_args()
+
+    measure_false_positives(args.capacity, args.error_rate, args.trials)
+    asyncio.get_event_loop().run_until_complete(measure_overhead(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Time from a cold process to the first answered request, measured in fresh interpreters.
+
+Every run starts a new `python -m benchmarks.startup --child` process (so nothing is
+already imported or cached in memory) which reports:
+    - import:        importing app.api.server (which builds the module level app)
+    - application:   another get_application() call (middleware, routers, handlers)
+    - first request: GET /api/health/live/ through the app; with --db the startup
+                     handlers run first (database pool, bcrypt workers) and the request
+                     is GET /api/health/ready/, a database round trip
+    - process:       from spawning the interpreter until the first response arrived
+The median and worst of --runs are printed. With --max-import-seconds the exit
+status is 1 when the median import is slower, to guard startup in CI. --top lists the
+modules with the largest cumulative import time (python -X importtime).
+
+> python -m benchmarks.startup --runs 10
+> python -m benchmarks.startup --runs 10 --db
+> python -m benchmarks.startup --max-import-seconds 0.6
+> python -m benchmarks.startup --top 15
+"""
+# Std Library Imports
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List
+
+# Third Party Imports
+
+STAGES = ("import", "application", "first_request", "process")
+
+
+async def first_request(app, db: bool) -> float:
+    from asgi_lifespan import LifespanManager
+    from httpx import AsyncClient
+
+    started = time.perf_counter()
+    async with AsyncClient(app=app, base_url="http://startup") as client:
+        if db:
+            async with LifespanManager(app):
+                res = await client.get(app.url_path_for("health:readiness"))
+        else:
+            res = await client.get(app.url_path_for("health:liveness"))
+    res.raise_for_status()
+
+    return time.perf_counter() - started
+
+
+def child(db: bool) -> None:
+    started = time.perf_counter()
+    from app.api import server
+    imported = time.perf_counter()
+    app = server.get_application()
+    built = time.perf_counter()
+    request = asyncio.get_event_loop().run_until_complete(first_request(app, db))
+
+    print(json.dumps({"import": imported - started, "application": built - imported, "first_request": request}))
+
+
+def run_once(db: bool) -> Dict[str, float]:
+    command = [sys.executable, "-m", "benchmarks.startup", "--child"] + (["--db"] if db else [])
+    started = time.perf_counter()
+    output = subprocess.check_output(command)
+    timings = json.loads(output.decode().strip().splitlines()[-1])
+    # The child exits right after its response; the parent's clock covers interpreter start too
+    timings["process"] = time.perf_counter() - started
+
+    return timings
+
+
+def top_imports(count: int) -> List[str]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.api.server"], stderr=subprocess.PIPE, check=True
+    )
+    modules = []
+    for line in result.stderr.decode().splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.append((int(cumulative), name.strip()))
+
+    return [f"{cumulative / 1000:8.1f}ms  {name}" for cumulative, name in sorted(modules, reverse=True)[:count]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--db", action="store_true", help="run the startup handlers and query the database")
+    parser.add_argument("--max-import-seconds", type=float, help="fail when the median import is slower")
+    parser.add_argument("--top", type=int, default=0, help="list the slowest imported modules")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.db)
+        return
+
+    runs = [run_once(args.db) for _ in range(args.runs)]
+    for stage in STAGES:
+        timings = [timing[stage] * 1000 for timing in runs]
+        print(f"{stage:>13}: median {statistics.median(timings):8.1f}ms  worst {max(timings):8.1f}ms")
+
+    if args.top:
+        print("\nslowest imports (cumulative):")
+        for line in top_imports(args.top):
+            print(line)
+
+    if args.max_import_seconds is not None:
+        median = statistics.median(timing["import"] for timing in runs)
+        if median > args.max_import_seconds:
+            print(f"REGRESSION import took {median:.3f}s, more than {args.max_import_seconds}s")
+            sys.exit(1)
+        print(f"import within {args.max_import_seconds}s")
+
+
+if __name__ == "__main__":
+    main()
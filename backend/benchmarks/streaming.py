@@ -0,0 +1,116 @@
+"""
+Broadcast of stream updates to many WebSocket clients on one worker.
+
+--clients simulated clients each subscribe to --per-client of --symbols symbols through
+the stream hub (no feeds or database: updates are published directly, like the feeds
+do). Each client's send() stands in for the socket write: --slow-fraction of them take
+--slow-ms per message, the rest return at once. Then --ticks rounds publish a new
+candle for every symbol, --interval-ms apart, and the benchmark reports:
+    - fan-out: time publish() takes per tick (encoding once, offering to every queue)
+    - delivery: time from publish until a client's send() got the message, for fast
+      and slow clients (p50 / p99)
+    - how many messages were sent, coalesced (a newer candle replaced an unsent one)
+      and dropped, and the largest queue left behind
+Slow clients never hold up the fast ones or the publisher: their queues coalesce to
+the newest candle per symbol.
+
+> python -m benchmarks.streaming --clients 10000 --symbols 100 --per-client 5 --ticks 20
+"""
+# Std Library Imports
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List
+
+# Third Party Imports
+import numpy as np
+
+from app.models.candle import CandleInterval
+from app.models.stream import StreamMessageType
+from app.services.forecasting import ForecastCache, ForecastService
+from app.services.streaming import StreamClient, StreamHub
+
+
+class SimulatedSocket:
+    def __init__(self, published_at: Dict[str, float], delay: float) -> None:
+        self.published_at = published_at
+        self.delay = delay
+        self.latencies: List[float] = []
+
+    async def send(self, text: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.latencies.append(time.perf_counter() - self.published_at[text])
+
+
+def percentiles(latencies: List[float]) -> str:
+    if not latencies:
+        return "no messages"
+    ms = np.array(latencies) * 1000
+    return f"p50={np.percentile(ms, 50):8.2f}ms p99={np.percentile(ms, 99):8.2f}ms ({len(ms):,} messages)"
+
+
+async def run(args: argparse.Namespace) -> None:
+    # Forecasts aren't published here, so the service is never called
+    hub = StreamHub(ForecastService(cache=ForecastCache()), max_subscriptions=args.per_client)
+    symbols = [f"BENCH{i}-USD" for i in range(args.symbols)]
+    rng = np.random.default_rng(5)
+    published_at: Dict[str, float] = {}
+
+    sockets, clients, senders = [], [], []
+    for i in range(args.clients):
+        slow = rng.random() < args.slow_fraction
+        socket = SimulatedSocket(published_at, args.slow_ms / 1000 if slow else 0.0)
+        client = StreamClient(socket.send, max_pending=args.queue_size)
+        hub.add(client)
+        for symbol in rng.choice(symbols, size=args.per_client, replace=False):
+            hub.subscribe(client, symbol=str(symbol), interval=CandleInterval.one_minute)
+        sockets.append((slow, socket))
+        clients.append(client)
+        senders.append(asyncio.ensure_future(client.run()))
+    print(f"{args.clients:,} clients, {len(hub.subscribers)} symbols, {hub.stats()['subscriptions']:,} subscriptions")
+
+    fan_out = []
+    for tick in range(args.ticks):
+        for i, symbol in enumerate(symbols):
+            started = time.perf_counter()
+            hub.publish((symbol, "1m"), StreamMessageType.candle, {"close": 100.0 + tick, "tick": tick, "symbol": i})
+            published_at[hub.latest[(symbol, "1m")]["candle"]] = started
+            fan_out.append(time.perf_counter() - started)
+        await asyncio.sleep(args.interval_ms / 1000)
+
+    # Let the fast clients drain; slow ones keep whatever they haven't sent
+    await asyncio.sleep(args.interval_ms / 1000)
+    stats = hub.stats()
+    largest_queue = max(len(client.pending) for client in clients)
+    for sender in senders:
+        sender.cancel()
+    await asyncio.gather(*senders, return_exceptions=True)
+
+    per_tick = [sum(fan_out[i:i + len(symbols)]) for i in range(0, len(fan_out), len(symbols))]
+    print(f"fan-out per tick ({len(symbols)} publishes): p50={statistics.median(per_tick) * 1000:.2f}ms "
+          f"max={max(per_tick) * 1000:.2f}ms")
+    print(f"fast clients delivery: {percentiles([l for slow, s in sockets if not slow for l in s.latencies])}")
+    print(f"slow clients delivery: {percentiles([l for slow, s in sockets if slow for l in s.latencies])}")
+    print(f"published={stats['published']:,} sent={stats['sent']:,} coalesced={stats['coalesced']:,} "
+          f"dropped={stats['dropped']:,} largest queue left={largest_queue}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--per-client", type=int, default=5, help="symbols each client subscribes to")
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--interval-ms", type=float, default=250.0, help="time between ticks")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=200.0, help="send time of a slow client per message")
+    parser.add_argument("--queue-size", type=int, default=64)
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Requests per second on /api/users/me/ with and without the verified token cache.
+
+Boots the real application (so a database must be reachable with the settings in
+.env), registers a throwaway user, then hammers the protected route at a fixed
+concurrency, first with the cache disabled and then enabled.
+
+> python -m benchmarks.token_cache --requests 5000 --concurrency 50
+"""
+# Std Library Imports
+import time
+import uuid
+import asyncio
+import argparse
+
+# Third Party Imports
+from asgi_lifespan import LifespanManager
+from httpx import AsyncClient
+
+from app.api.server import get_application
+from app.core.config import JWT_TOKEN_PREFIX
+from app.services import token_cache
+
+
+async def hammer(client: AsyncClient, url: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            res = await client.get(url)
+            res.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def run(requests: int, concurrency: int) -> None:
+    app = get_application()
+
+    async with LifespanManager(app):
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            suffix = uuid.uuid4().hex[:8]
+            new_user = {"email": f"bench_{suffix}@bench.io", "username": f"bench_{suffix}", "password": "benchpassword"}
+            res = await client.post(app.url_path_for("users:register-new-user"), json={"new_user": new_user})
+            res.raise_for_status()
+            res = await client.post(
+                app.url_path_for("users:login-email-and-password"),
+                data={"username": new_user["email"], "password": new_user["password"]}
+            )
+            res.raise_for_status()
+            token = res.json()["access_token"]
+            client.headers["Authorization"] = f"{JWT_TOKEN_PREFIX} {token}"
+            url = app.url_path_for("users:get-current-user")
+
+            max_entries = token_cache.max_entries
+            for label, entries in (("no cache", 0), ("cache", max_entries or 10000)):
+                token_cache.clear()
+                token_cache.max_entries = entries
+                rps = await hammer(client, url, requests, concurrency)
+                print(f"{label:>8}: {rps:,.0f} req/s {token_cache.stats()}")
+            token_cache.max_entries = max_entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Objects/sec and allocations per request for the in-process work behind /api/users/me/.
+
+Compares the validated path the route used to take with the trusted path it takes now:
+
+    validated: JWTPayload(**claims) -> UserInDB(**row) -> UserPublic re-validated
+               from the UserInDB (what response_model did) -> jsonable_encoder
+    trusted:   JWTPayload.from_trusted(claims) -> UserInDB.from_trusted(row) ->
+               UserPublic.from_trusted(...) -> jsonable_encoder
+
+Token signature checks and the database round trip are identical on both paths and
+left out, so the numbers isolate model construction and serialization. Memory allocated
+per request is the tracemalloc peak while serving one simulated request.
+
+> python -m benchmarks.users_me --requests 20000
+"""
+# Std Library Imports
+import time
+import argparse
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable
+
+# Third Party Imports
+from fastapi.encoders import jsonable_encoder
+
+from app.models.token import JWTMeta, JWTPayload
+from app.models.user import UserInDB, UserPublic
+
+ROW = {
+    "id": 42,
+    "username": "satoshi",
+    "email": "satoshi@crypto-helms.io",
+    "email_verified": True,
+    "password": "$2b$12$" + "x" * 53,
+    "salt": "$2b$12$" + "y" * 22,
+    "is_active": True,
+    "is_superuser": False,
+    "created_at": datetime(2021, 1, 1, tzinfo=timezone.utc),
+    "updated_at": datetime(2021, 1, 1, tzinfo=timezone.utc)
+}
+CLAIMS = {**JWTMeta().dict(), "sub": ROW["email"], "username": ROW["username"]}
+
+
+def validated_request() -> dict:
+    payload = JWTPayload(**CLAIMS)
+    user = UserInDB(**ROW)
+    return jsonable_encoder(UserPublic(**user.dict())) if payload.username else None
+
+
+def trusted_request() -> dict:
+    payload = JWTPayload.from_trusted(CLAIMS)
+    user = UserInDB.from_trusted(ROW)
+    return jsonable_encoder(UserPublic.from_trusted(user.__dict__)) if payload.username else None
+
+
+def rate(func: Callable, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - start)
+
+
+def peak_bytes(func: Callable, count: int) -> float:
+    total = 0
+    for _ in range(count):
+        tracemalloc.start()
+        func()
+        total += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return total / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    assert validated_request() == trusted_request()
+
+    print("objects/sec")
+    for name, validated, trusted in (
+        ("JWTPayload", lambda: JWTPayload(**CLAIMS), lambda: JWTPayload.from_trusted(CLAIMS)),
+        ("UserInDB", lambda: UserInDB(**ROW), lambda: UserInDB.from_trusted(ROW))
+    ):
+        slow, fast = rate(validated, args.requests), rate(trusted, args.requests)
+        print(f"  {name:>10}: validated={slow:>10,.0f} trusted={fast:>10,.0f} ({fast / slow:.1f}x)")
+
+    print("per /users/me/ request")
+    for name, func in (("validated", validated_request), ("trusted", trusted_request)):
+        print(
+            f"  {name:>10}: {rate(func, args.requests):>9,.0f} req/s "
+            f"peak={peak_bytes(func, min(args.requests, 2000)):>7,.0f}B/request"
+        )
+
+
+if __name__ == "__main__":
+    main()
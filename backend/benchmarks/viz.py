@@ -0,0 +1,104 @@
+"""
+/viz response size and latency for chart ranges from one day to five years,
+compared with shipping every stored 1m candle as JSON.
+
+Seeds --years of synthetic 1m candles for one symbol (plus their rollups) into the
+database configured in .env, then requests line and candle charts of each range
+through the real application. The benchmark symbol is deleted afterwards.
+
+> python -m benchmarks.viz --years 5 --width 1000
+"""
+# Std Library Imports
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime, timedelta, timezone
+
+# Third Party Imports
+import numpy as np
+from asgi_lifespan import LifespanManager
+from httpx import AsyncClient
+
+from app.api.server import get_application
+from app.db.repositories.candles import CandlesRepository
+
+SYMBOL = "BENCHVIZ-USD"
+RANGES = (("1d", 1), ("1w", 7), ("1M", 30), ("1y", 365), ("5y", 5 * 365))
+
+
+async def seed(candles_repo: CandlesRepository, start: datetime, minutes: int) -> None:
+    rng = np.random.default_rng(11)
+    chunk = 200_000
+    await candles_repo.ensure_partitions(start=start, end=start + timedelta(minutes=minutes))
+
+    for offset in range(0, minutes, chunk):
+        count = min(chunk, minutes - offset)
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, count)))
+        records = [
+            (SYMBOL, "1m", start + timedelta(minutes=offset + i), float(c), float(c) * 1.001, float(c) * 0.999, float(c), 1.0)
+            for i, c in enumerate(closes)
+        ]
+        await candles_repo.copy_candles(records=records)
+        await candles_repo.refresh_rollups(symbol=SYMBOL, start=records[0][2], end=records[-1][2])
+
+
+async def run(years: int, width: int, repeats: int) -> None:
+    app = get_application()
+    end = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    start = end - timedelta(days=years * 365)
+
+    async with LifespanManager(app):
+        candles_repo = CandlesRepository(app.state._db)
+        print(f"seeding {years} years of 1m candles ...")
+        await seed(candles_repo, start, years * 365 * 24 * 60)
+
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            for label, days in RANGES:
+                if days > years * 365:
+                    continue
+                range_start = end - timedelta(days=days)
+                # What shipping every stored candle would cost
+                raw_bytes = days * 24 * 60 * len(json.dumps({
+                    "open_time": range_start.isoformat(), "open": 123.456789, "high": 123.456789,
+                    "low": 123.456789, "close": 123.456789, "volume": 1.0
+                }))
+
+                for chart in ("line", "candles"):
+                    latencies = []
+                    for _ in range(repeats):
+                        started = time.perf_counter()
+                        res = await client.get(
+                            app.url_path_for("viz:get-chart-series"),
+                            params={
+                                "symbol": SYMBOL, "start": range_start.isoformat(), "end": end.isoformat(),
+                                "width": width, "chart": chart
+                            }
+                        )
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        res.raise_for_status()
+
+                    series = res.json()
+                    print(
+                        f"{label:>3} {chart:>7}: {series['resolution']:>3} read={series['source_points']:>6} "
+                        f"sent={series['points']:>5} bytes={len(res.content):>8,} (raw json ~{raw_bytes:>12,}) "
+                        f"p50={statistics.median(latencies):.1f}ms"
+                    )
+
+        await app.state._db.execute(query="DELETE FROM candles WHERE symbol = :symbol", values={"symbol": SYMBOL})
+        await app.state._db.execute(query="DELETE FROM candle_rollups WHERE symbol = :symbol", values={"symbol": SYMBOL})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args.years, args.width, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
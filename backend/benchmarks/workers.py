@@ -0,0 +1,178 @@
+"""
+Throughput of the production server (gunicorn_conf.py) as the number of workers grows.
+
+For every --workers count a gunicorn master is started on a free local port (with
+WEB_CONCURRENCY set to it and rate limiting off), and once --path answers, --clients
+load generating processes keep --concurrency requests in flight between them for
+--seconds. Reported per worker count:
+    - requests per second, p50 / p99 latency (ms) and errors
+    - speedup over the first worker count, and efficiency (speedup per added worker)
+    - PSS of the master and its workers together (MiB, Linux): memory shared
+      copy-on-write from the preloaded app is only counted once
+    - how long the server took to drain and exit after SIGTERM
+The clients run on the same machine, so leave them CPUs of their own (scaling past
+CPUs - clients only measures contention). The startup handlers connect to the database
+in .env, so a local Postgres has to be running; /api/health/ready/ adds a database round
+trip per request.
+
+> python -m benchmarks.workers --workers 1 2 4 --seconds 10
+> python -m benchmarks.workers --workers 1 2 --path /api/health/ready/ --output workers.json
+"""
+# Std Library Imports
+import os
+import sys
+import json
+import time
+import socket
+import signal
+import asyncio
+import argparse
+import subprocess
+import multiprocessing
+from typing import Any, Dict, List, Optional
+
+# Third Party Imports
+import httpx
+import numpy as np
+
+from app.core.workers import available_cpus
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            return [int(child) for child in children.read().split()]
+    except OSError:
+        return []
+
+
+def tree_pss_mib(pid: int) -> Optional[float]:
+    total = 0
+    for process in [pid] + _children(pid):
+        try:
+            with open(f"/proc/{process}/smaps_rollup") as rollup:
+                total += sum(int(line.split()[1]) for line in rollup if line.startswith("Pss:"))
+        except OSError:
+            return None
+
+    return round(total / 1024, 1)
+
+
+def start_server(workers: int, port: int, app: str) -> subprocess.Popen:
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "PORT": str(port), "RATE_LIMIT_ENABLED": "false"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn_conf.py", "--bind", f"127.0.0.1:{port}", app],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_until_serving(url: str, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+        try:
+            if httpx.get(url).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+
+    raise RuntimeError(f"{url} did not answer within {timeout}s")
+
+
+async def generate_load(url: str, concurrency: int, seconds: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    res = await client.get(url)
+                    errors += res.status_code >= 400
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return {"latencies": latencies, "errors": errors}
+
+
+def client_process(url: str, concurrency: int, seconds: float) -> Dict[str, Any]:
+    return asyncio.new_event_loop().run_until_complete(generate_load(url, concurrency, seconds))
+
+
+def run(workers: int, args: argparse.Namespace) -> Dict[str, Any]:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{args.path}"
+    server = start_server(workers, port, args.app)
+    try:
+        wait_until_serving(url, server)
+        per_client = max(1, args.concurrency // args.clients)
+        with multiprocessing.Pool(args.clients) as clients:
+            results = clients.starmap(client_process, [(url, per_client, args.seconds)] * args.clients)
+        pss = tree_pss_mib(server.pid)
+    finally:
+        stopping = time.perf_counter()
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+        drain = time.perf_counter() - stopping
+
+    latencies = np.array([latency for result in results for latency in result["latencies"]]) * 1000
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(result["errors"] for result in results),
+        "rps": round(len(latencies) / args.seconds, 1),
+        "p50_ms": round(p50, 3),
+        "p99_ms": round(p99, 3),
+        "pss_mib": pss,
+        "drain_seconds": round(drain, 3)
+    }
+
+
+def main() -> None:
+    cpus = available_cpus()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, max(1, cpus // 2), cpus}))
+    parser.add_argument("--clients", type=int, default=max(1, cpus // 2), help="load generating processes")
+    parser.add_argument("--concurrency", type=int, default=64, help="requests in flight across all clients")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--path", default="/api/health/live/")
+    parser.add_argument("--app", default="app.api.server:app")
+    parser.add_argument("--output", help="write the results here (JSON)")
+    args = parser.parse_args()
+
+    results = []
+    for workers in args.workers:
+        result = run(workers, args)
+        base = results[0] if results else result
+        speedup = result["rps"] / base["rps"] if base["rps"] else 0.0
+        result["speedup"] = round(speedup, 2)
+        result["efficiency"] = round(speedup / (workers / base["workers"]), 2)
+        results.append(result)
+        print(
+            f"{workers:>3} workers: {result['rps']:9.1f} rps  p50 {result['p50_ms']:7.2f}ms  "
+            f"p99 {result['p99_ms']:7.2f}ms  errors {result['errors']:>4}  x{result['speedup']:.2f} "
+            f"({result['efficiency']:.0%})  pss {result['pss_mib']}MiB  drain {result['drain_seconds']:.2f}s"
+        )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"cpus": cpus, "path": args.path, "clients": args.clients, "results": results}, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
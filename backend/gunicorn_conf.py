@@ -0,0 +1,63 @@
+"""
+Production server: gunicorn supervising uvicorn workers, one per available CPU.
+
+> gunicorn -c gunicorn_conf.py app.api.server:app
+
+Settings (all from app.core.config, so they can be set in the environment or .env):
+    - workers:          WEB_CONCURRENCY, or WEB_WORKERS_PER_CPU per CPU the container
+                        may use (app.core.workers); the count is published before the
+                        app is imported so the DB connection budget is split by it
+    - worker_class:     WEB_WORKER_CLASS (uvicorn's worker, on uvloop and httptools)
+    - bind:             0.0.0.0:PORT
+    - preload_app:      the app is imported once in the master and shared with the
+                        workers copy-on-write; database pools are only opened by each
+                        worker's startup handler, after the fork
+    - graceful_timeout: WEB_GRACEFUL_TIMEOUT seconds for a stopping worker to finish its
+                        requests and run the shutdown handler before it is killed
+
+Hooks:
+    - on_starting: removes metric files a previous master left in PROMETHEUS_MULTIPROC_DIR
+    - when_ready:  collects and freezes the preloaded heap, so the collector never writes
+                   to (and so copies) the shared pages in the workers
+    - child_exit:  drops a dead worker's live metric values
+"""
+# Std Library Imports
+import gc
+import os
+
+# Third Party Imports
+
+# Top level names are read as gunicorn settings, so import constants rather than the config module
+from app.core.config import (
+    PORT, WEB_GRACEFUL_TIMEOUT, WEB_KEEPALIVE, WEB_TIMEOUT, WEB_WORKER_CLASS
+)
+from app.core.workers import clear_metrics_dir, configure_workers, prepare_metrics_dir
+
+# Before the app (and with it prometheus_client) is imported
+metrics_dir = prepare_metrics_dir()
+
+bind = f"0.0.0.0:{PORT}"
+workers = configure_workers()
+worker_class = WEB_WORKER_CLASS
+preload_app = True
+keepalive = WEB_KEEPALIVE
+timeout = WEB_TIMEOUT
+graceful_timeout = WEB_GRACEFUL_TIMEOUT
+# Heartbeat files on a disk backed /tmp can stall workers (e.g. Docker's overlay filesystem)
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def on_starting(server) -> None:
+    removed = clear_metrics_dir(metrics_dir)
+    server.log.info("Metrics in %s (%d stale files removed), %d workers", metrics_dir, removed, workers)
+
+
+def when_ready(server) -> None:
+    gc.collect()
+    gc.freeze()
+
+
+def child_exit(server, worker) -> None:
+    from app.core.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
@@ -22,6 +22,9 @@ authorized_client():
     - In order to test authorized requests down the road, we need
       to create a user who is appropriately authorized
     - We will use this client instead for those tests
+
+superuser_client():
+    - A client authorized as a superuser, for the admin-only routes
 """
 # Std Library Imports
 import os
@@ -102,4 +105,20 @@ def authorized_client(client: AsyncClient, test_user: UserInDB) -> AsyncClient:
         "Authorization": f"{JWT_TOKEN_PREFIX} {access_token}"
     }
 
+    return client
+
+# Create client authorized as a superuser
+@pytest.fixture
+async def superuser_client(client: AsyncClient, db: Database) -> AsyncClient:
+    user_repo = UsersRepository(db)
+    admin = await user_repo.get_user_by_username(username="superuser")
+    if not admin:
+        admin = await user_repo.register_new_user(
+            new_user=UserCreate(email="superuser@crypto-helms.io", username="superuser", password="superuserpassword")
+        )
+    await db.execute(query="UPDATE users SET is_superuser = TRUE WHERE username = 'superuser';")
+
+    access_token = auth_service.create_access_token_for_user(user=admin, secret_key=str(SECRET_KEY))
+    client.headers = {**client.headers, "Authorization": f"{JWT_TOKEN_PREFIX} {access_token}"}
+
     return client
\ No newline at end of file
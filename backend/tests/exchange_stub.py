@@ -0,0 +1,71 @@
+"""
+Local stand-in for the market data sources so ingestion can be tested and
+benchmarked offline. Mount it on an httpx.AsyncClient with app=stub_app and every
+adapter request is answered in-process.
+
+Candles are generated deterministically from the symbol and open time (a smooth
+price curve), so repeated runs return identical data. Trading starts at
+LISTED_AT; earlier windows come back empty like a real exchange before listing.
+"""
+# Std Library Imports
+import math
+import zlib
+from datetime import datetime, timezone
+
+# Third Party Imports
+from fastapi import FastAPI
+
+LISTED_AT = int(datetime(2021, 1, 1, tzinfo=timezone.utc).timestamp())
+
+stub_app = FastAPI()
+stub_app.state.requests = 0
+
+
+def stub_candle(symbol: str, open_time: int, step: int) -> dict:
+    base = 100 + zlib.crc32(symbol.encode()) % 900
+    open_ = base * (1 + 0.01 * math.sin(open_time / 3600))
+    close = base * (1 + 0.01 * math.sin((open_time + step) / 3600))
+
+    return {
+        "time": open_time,
+        "open": open_,
+        "high": max(open_, close) * 1.001,
+        "low": min(open_, close) * 0.999,
+        "close": close,
+        "volumefrom": 1 + open_time % 7
+    }
+
+
+@stub_app.get("/data/v2/{endpoint}")
+async def cryptocompare_histo(endpoint: str, fsym: str, tsym: str, limit: int, toTs: int, aggregate: int = 1) -> dict:
+    stub_app.state.requests += 1
+    step = {"histominute": 60, "histohour": 3600, "histoday": 86400}[endpoint] * aggregate
+    to_ts = toTs - toTs % step
+    symbol = f"{fsym}-{tsym}"
+
+    rows = [
+        stub_candle(symbol, ts, step) if ts >= LISTED_AT else {**stub_candle(symbol, ts, step), "close": 0}
+        for ts in range(to_ts - limit * step, to_ts + step, step)
+    ]
+
+    return {"Response": "Success", "Data": {"Data": rows}}
+
+
+@stub_app.get("/markets/{market}/candles")
+async def poloniex_candles(market: str, interval: str, startTime: int, endTime: int, limit: int) -> list:
+    stub_app.state.requests += 1
+    step = {"MINUTE_1": 60, "MINUTE_5": 300, "MINUTE_15": 900, "HOUR_1": 3600, "HOUR_4": 14400, "DAY_1": 86400}[interval]
+    symbol = market.replace("_USDT", "-USD").replace("_", "-")
+    first = max(LISTED_AT, startTime // 1000 + (-startTime // 1000) % step)
+
+    rows = []
+    for ts in range(first, endTime // 1000 + 1, step):
+        if len(rows) == limit:
+            break
+        c = stub_candle(symbol, ts, step)
+        rows.append([
+            c["low"], c["high"], c["open"], c["close"], 0, c["volumefrom"], 0, 0, 0, 0, 0,
+            interval, ts * 1000, (ts + step) * 1000 - 1
+        ])
+
+    return rows
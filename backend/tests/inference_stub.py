@@ -0,0 +1,25 @@
+"""
+Local stand-in for a hosted model endpoint. Mount it on an httpx.AsyncClient with
+app=inference_stub_app and RemoteEngine requests are answered in-process by the
+local Holt model, so remote and local predictions can be compared directly.
+"""
+# Std Library Imports
+from typing import List
+
+# Third Party Imports
+import numpy as np
+from fastapi import FastAPI, Body
+
+from app.services.forecasting.engines import ExponentialSmoothingEngine
+
+inference_stub_app = FastAPI()
+inference_stub_app.state.invocations = 0
+engine = ExponentialSmoothingEngine()
+
+
+@inference_stub_app.post("/invocations")
+async def invocations(instances: List[List[float]] = Body(...), horizon: int = Body(...)) -> dict:
+    inference_stub_app.state.invocations += 1
+    predictions = engine.predict_sync(np.asarray(instances), horizon)
+
+    return {"predictions": predictions.tolist()}
@@ -0,0 +1,125 @@
+"""
+Tests for walk-forward backtesting (app.services.forecasting.backtesting).
+
+TestFolds:
+    - Origins leave `window` candles before and `horizon` after, and the folds are
+      consecutive blocks covering all of them
+
+TestSharedCandles:
+    - Every symbol reads back its own closes and the file is removed on close
+    - Only the path and offsets are pickled
+
+TestEvaluateFold:
+    - Candles after the fold's last horizon don't change its results (no lookahead)
+    - Fitted models beat the naive baseline on a trending series
+
+TestRunBacktest:
+    - The report counts every origin once, and a process pool gives the same metrics
+      as running inline
+    - Unknown models are rejected
+"""
+# Std Library Imports
+import os
+import pickle
+
+# Third Party Imports
+import numpy as np
+import pytest
+
+from app.services.forecasting.backtesting import (
+    MODELS,
+    SharedCandles,
+    evaluate_fold,
+    make_folds,
+    run_backtest
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def random_walk(length: int, seed: int, drift: float = 0.0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(drift, 0.01, length)))
+
+
+class TestFolds:
+    async def test_origins(self) -> None:
+        folds = make_folds(1000, window=100, horizon=10, step=7, folds=4)
+        origins = np.concatenate([np.arange(*fold) for fold in folds])
+
+        assert len(folds) == 4
+        assert origins[0] == 100 and origins[-1] + 10 <= 1000
+        assert np.array_equal(origins, np.arange(100, 991, 7))
+        assert all(fold[0] > previous[1] - 7 for previous, fold in zip(folds, folds[1:]))
+
+    async def test_short_history(self) -> None:
+        assert make_folds(50, window=100, horizon=10, step=1, folds=4) == []
+        assert len(make_folds(112, window=100, horizon=10, step=1, folds=4)) == 3
+
+
+class TestSharedCandles:
+    async def test_round_trip(self, tmp_path) -> None:
+        series = {"BTC-USD": random_walk(300, 1), "ETH-USD": random_walk(200, 2)}
+        candles = SharedCandles.create(series, directory=str(tmp_path))
+
+        copy = pickle.loads(pickle.dumps(candles))
+        for symbol, closes in series.items():
+            assert np.array_equal(copy.closes(symbol), closes)
+        assert len(pickle.dumps(candles)) < 500
+
+        candles.close()
+        assert not os.path.exists(candles.path)
+
+
+class TestEvaluateFold:
+    async def test_no_lookahead(self, tmp_path) -> None:
+        closes = random_walk(1200, 3)
+        fold = make_folds(len(closes), window=128, horizon=12, step=5, folds=3)[1]
+        options = {"window": 128, "horizon": 12}
+        last_used = fold[1] - 1 + 12
+
+        spiked = closes.copy()
+        spiked[last_used:] *= 10
+        candles = SharedCandles.create({"original": closes, "spiked": spiked}, directory=str(tmp_path))
+        try:
+            original = evaluate_fold(candles, "original", fold, list(MODELS), **options)
+            changed = evaluate_fold(candles, "spiked", fold, list(MODELS), **options)
+        finally:
+            candles.close()
+
+        for name in MODELS:
+            for key in ("absolute", "squared", "direction", "count"):
+                assert original["models"][name][key] == pytest.approx(changed["models"][name][key])
+
+    async def test_trend_beats_naive(self) -> None:
+        report = run_backtest(
+            {"TREND": random_walk(2000, 4, drift=0.004)}, window=128, horizon=12, step=4, folds=3, workers=1
+        )
+
+        assert report["models"]["holt-fit"]["mae_vs_naive"] < 1
+        assert report["models"]["drift"]["direction"] > 0.7
+
+
+class TestRunBacktest:
+    async def test_parallel_matches_inline(self) -> None:
+        series = {f"S{seed}": random_walk(800 + 100 * seed, seed) for seed in range(3)}
+        options = {"window": 64, "horizon": 8, "step": 10, "folds": 2}
+
+        inline = run_backtest(series, workers=1, **options)
+        pooled = run_backtest(series, workers=2, **options)
+
+        expected = sum(
+            len(np.arange(*fold))
+            for closes in series.values()
+            for fold in make_folds(len(closes), window=64, horizon=8, step=10, folds=2)
+        )
+        assert inline["forecasts"] == pooled["forecasts"] == expected
+        assert inline["tasks"] == 6 and set(inline["per_symbol"]) == set(series)
+        for name in MODELS:
+            for metric in ("mae", "rmse", "mape", "direction"):
+                assert pooled["models"][name][metric] == pytest.approx(inline["models"][name][metric])
+        assert inline["models"]["naive"]["mae_vs_naive"] == 1
+
+    async def test_unknown_model(self) -> None:
+        with pytest.raises(ValueError):
+            run_backtest({"BTC-USD": random_walk(500, 1)}, models=["naive", "oracle"], workers=1)
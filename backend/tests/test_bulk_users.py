@@ -0,0 +1,140 @@
+"""
+Testing of bulk user import and export.
+
+TestBulkImportParsing:
+    - Body chunks are split into lines even when a line spans chunks
+    - A line that isn't valid UTF-8 is rejected by line number; the rest still import
+    - NDJSON and CSV rows are validated like a signup; bad rows are reported by line
+      number and the rest are hashed and written a chunk at a time
+
+TestBulkUserRoutes:
+    - Only superusers may import or export
+    - An NDJSON upload creates its users, skips taken credentials, and the new users
+      can log in
+    - Export streams every user without password or salt
+"""
+# Std Library Imports
+import json
+from typing import AsyncIterator, List, Sequence, Tuple
+
+# Third Party Imports
+import pytest
+from httpx import AsyncClient
+from fastapi import FastAPI
+from databases import Database
+from starlette.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+
+from app.db.repositories.users import UsersRepository
+from app.models.user import UserBulkFormat
+from app.services import auth_service
+from app.services.bulk_users import UserImporter, iter_lines
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def as_chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+class RecordingUsersRepository:
+    """Stands in for UsersRepository.copy_new_users and remembers every chunk written."""
+    def __init__(self) -> None:
+        self.chunks: List[Sequence[Tuple[str, str, str, str]]] = []
+
+    async def copy_new_users(self, *, records: Sequence[Tuple[str, str, str, str]]) -> int:
+        self.chunks.append(records)
+        return len(records)
+
+
+class TestBulkImportParsing:
+    async def test_lines_span_chunks(self) -> None:
+        lines = [line async for line in iter_lines(as_chunks(b'{"a": ', b'1}\r\n{"b"', b": 2}\n\n", b'{"c": 3}'))]
+        assert lines == [b'{"a": 1}', b'{"b": 2}', b"", b'{"c": 3}']
+
+    async def test_invalid_utf8_rejects_only_its_line(self) -> None:
+        users_repo = RecordingUsersRepository()
+        importer = UserImporter(users_repo=users_repo, auth_service=auth_service)
+        body = (
+            b'{"email": "utf1@crypto-helms.io", "username": "utf1", "password": "bulkpassword"}\n'
+            b'{"email": "utf2@crypto-helms.io", "username": "utf\xff2", "password": "bulkpassword"}\n'
+            b'{"email": "utf3@crypto-helms.io", "username": "utf3", "password": "bulkpassword"}\n'
+        )
+
+        result = await importer.run(as_chunks(body), UserBulkFormat.ndjson)
+
+        assert result.imported == 2
+        assert result.invalid == 1
+        assert result.errors[0].line == 2 and "utf-8" in result.errors[0].detail
+
+    @pytest.mark.parametrize("bulk_format, body", (
+        (
+            UserBulkFormat.ndjson,
+            b'{"email": "bulk1@crypto-helms.io", "username": "bulk1", "password": "bulkpassword"}\n'
+            b'{"email": "not-an-email", "username": "bulk2", "password": "bulkpassword"}\n'
+            b'not json\n'
+            b'{"email": "bulk3@crypto-helms.io", "username": "bulk3", "password": "bulkpassword"}\n'
+            b'{"email": "bulk4@crypto-helms.io", "username": "bulk4", "password": "bulkpassword"}\n'
+        ),
+        (
+            UserBulkFormat.csv,
+            b"email,username,password\n"
+            b"bulk1@crypto-helms.io,bulk1,bulkpassword\n"
+            b"not-an-email,bulk2,bulkpassword\n"
+            b'"unterminated,bulk5\n'
+            b"bulk3@crypto-helms.io,bulk3,bulkpassword\n"
+            b'bulk4@crypto-helms.io,bulk4,"bulk,password"\n'
+        )
+    ))
+    async def test_valid_rows_are_hashed_in_chunks(self, bulk_format: UserBulkFormat, body: bytes) -> None:
+        users_repo = RecordingUsersRepository()
+        importer = UserImporter(users_repo=users_repo, auth_service=auth_service, chunk_size=2)
+
+        result = await importer.run(as_chunks(body[:37], body[37:]), bulk_format)
+
+        assert result.imported == 3
+        assert result.invalid == 2
+        assert [len(chunk) for chunk in users_repo.chunks] == [2, 1]
+        assert result.rows_per_second > 0
+
+        username, email, hashed_password, salt = users_repo.chunks[0][0]
+        assert (username, email) == ("bulk1", "bulk1@crypto-helms.io")
+        assert auth_service.verify_password(password="bulkpassword", salt=salt, hashed_pw=hashed_password)
+
+
+class TestBulkUserRoutes:
+    async def test_only_superusers_may_use_bulk_routes(self, app: FastAPI, authorized_client: AsyncClient) -> None:
+        res = await authorized_client.post(app.url_path_for("users:bulk-import"), data=b"")
+        assert res.status_code == HTTP_403_FORBIDDEN
+
+        res = await authorized_client.get(app.url_path_for("users:bulk-export"))
+        assert res.status_code == HTTP_403_FORBIDDEN
+
+    async def test_import_then_export(self, app: FastAPI, superuser_client: AsyncClient, db: Database) -> None:
+        rows = [
+            {"email": f"partner{i}@crypto-helms.io", "username": f"partner{i}", "password": "partnerpassword"}
+            for i in range(5)
+        ]
+        # The last row reuses a taken username
+        rows.append({"email": "partner-dup@crypto-helms.io", "username": "partner0", "password": "partnerpassword"})
+        body = "\n".join(json.dumps(row) for row in rows).encode()
+
+        res = await superuser_client.post(
+            app.url_path_for("users:bulk-import"), data=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert res.status_code == HTTP_200_OK
+        result = res.json()
+        assert (result["received"], result["imported"], result["skipped"], result["invalid"]) == (6, 5, 1, 0)
+
+        partner = await UsersRepository(db).authenticate_user(email="partner3@crypto-helms.io", password="partnerpassword")
+        assert partner and partner.username == "partner3"
+
+        res = await superuser_client.get(app.url_path_for("users:bulk-export"), params={"format": "ndjson"})
+        assert res.status_code == HTTP_200_OK
+        exported = [json.loads(line) for line in res.text.splitlines()]
+        assert {f"partner{i}" for i in range(5)} <= {user["username"] for user in exported}
+        assert all("password" not in user and "salt" not in user for user in exported)
+
+        res = await superuser_client.get(app.url_path_for("users:bulk-export"), params={"format": "csv"})
+        assert res.text.splitlines()[0] == "id,username,email,email_verified,is_active,is_superuser,created_at,updated_at"
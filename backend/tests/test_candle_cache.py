@@ -0,0 +1,230 @@
+"""
+Testing of the memory-mapped candle cache.
+
+TestCandleRing:
+    - Once the ring wraps, a window is still the newest n candles, copied out of the
+      mapping
+    - A reader mapping the same file sees every write
+    - The newest candles are overwritten in place; a batch with an older candle the
+      ring doesn't hold is refused and changes nothing
+    - A ring seeded from a short history serves any window; otherwise only windows it
+      holds in full
+    - Reads overlapping a write (odd sequence) give up rather than return torn data
+    - A returned window is a snapshot: a later in-place update doesn't change it, and a
+      write landing while a window is copied makes the read retry
+
+TestCandleCache:
+    - A window is only served when its newest candle is the caller's last_open_time
+    - series() covers [start, end) and misses when the ring doesn't reach back to start
+    - A disabled cache never serves
+
+TestForecastCandleCache:
+    - The forecast service reads the window from a current ring without Postgres and
+      falls back to the candles table when the ring is behind
+"""
+# Std Library Imports
+from datetime import datetime, timedelta, timezone
+
+# Third Party Imports
+import numpy as np
+import pytest
+
+from app.models.candle import CandleInterval
+from app.services.candle_cache import COLUMNS, SEQUENCE, CandleCache, CandleRing, records_to_columns
+from app.services.forecasting import ForecastCache, ForecastService
+from tests.test_forecast import CountingEngine
+
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2021, 5, 1, tzinfo=timezone.utc)
+
+
+def make_records(first: int, count: int, symbol: str = "RING-USD") -> list:
+    return [
+        (symbol, "1m", START + timedelta(minutes=i), 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1.0)
+        for i in range(first, first + count)
+    ]
+
+
+def minute(i: int) -> float:
+    return (START + timedelta(minutes=i)).timestamp()
+
+
+class FailingCandlesRepository:
+    async def get_recent_closes(self, **kwargs) -> None:
+        raise AssertionError("the window should have come from the candle cache")
+
+
+class RecentClosesRepository:
+    def __init__(self, records: list) -> None:
+        self.records = records
+        self.calls = 0
+
+    async def get_recent_closes(self, *, symbol: str, interval: CandleInterval, limit: int) -> tuple:
+        self.calls += 1
+        records = self.records[-limit:]
+        return [record[2] for record in records], [record[6] for record in records]
+
+
+class TestCandleRing:
+    async def test_wrapped_window_is_a_copy(self, tmp_path) -> None:
+        ring = CandleRing(str(tmp_path / "ring"), writable=True, capacity=16)
+        for first in range(0, 40, 7):
+            assert ring.write(records_to_columns(make_records(first, 7)))
+
+        window = ring.recent(10)
+        assert list(window["open_times"]) == [minute(i) for i in range(32, 42)]
+        assert list(window["close"]) == [100.5 + i for i in range(32, 42)]
+        for name in COLUMNS:
+            assert window[name].flags["C_CONTIGUOUS"] and not np.shares_memory(window[name], ring.data)
+        assert ring.recent(17) is None
+        ring.close()
+
+    async def test_reader_sees_writes(self, tmp_path) -> None:
+        path = str(tmp_path / "ring")
+        writer = CandleRing(path, writable=True, capacity=8)
+        reader = CandleRing(path)
+
+        assert reader.recent(1) is None
+        writer.write(records_to_columns(make_records(0, 3)))
+        assert list(reader.recent(3)["open_times"]) == [minute(0), minute(1), minute(2)]
+        writer.write(records_to_columns(make_records(3, 20)))
+        assert reader.recent(1)["open_times"][-1] == minute(22)
+
+        reader.close()
+        writer.close()
+
+    async def test_overwrite_and_refuse_older_candles(self, tmp_path) -> None:
+        ring = CandleRing(str(tmp_path / "ring"), writable=True, capacity=8)
+        ring.write(records_to_columns(make_records(10, 8)))
+
+        # The newest candle is still forming: rewrite it with the next one
+        update = make_records(17, 2)
+        update[0] = (*update[0][:6], 999.0, update[0][7])
+        assert ring.write(records_to_columns(update))
+        assert list(ring.recent(2)["close"]) == [999.0, 100.5 + 18]
+        assert ring.count == 9
+
+        # Candle 5 was never held (and 10 has been dropped since)
+        assert not ring.write(records_to_columns(make_records(5, 1) + make_records(19, 1)))
+        assert ring.count == 9 and ring.recent(1)["open_times"][-1] == minute(18)
+        ring.close()
+
+    async def test_complete_rings(self, tmp_path) -> None:
+        ring = CandleRing(str(tmp_path / "ring"), writable=True, capacity=8)
+        ring.reset(records_to_columns(make_records(0, 5)), complete=True)
+        assert len(ring.recent(50)["open_times"]) == 5
+        assert len(ring.between(minute(-60), minute(3))["open_times"]) == 3
+
+        ring.reset(records_to_columns(make_records(0, 5)), complete=False)
+        assert ring.recent(50) is None
+        assert ring.between(minute(-60), minute(3)) is None
+        assert len(ring.between(minute(1), minute(3))["open_times"]) == 2
+
+        # Once it wraps, a complete ring no longer holds every stored candle
+        ring.reset(records_to_columns(make_records(0, 5)), complete=True)
+        ring.write(records_to_columns(make_records(5, 4)))
+        assert ring.recent(50) is None
+        ring.close()
+
+    async def test_reads_skip_writes_in_progress(self, tmp_path) -> None:
+        ring = CandleRing(str(tmp_path / "ring"), writable=True, capacity=8)
+        ring.write(records_to_columns(make_records(0, 4)))
+
+        ring.header[SEQUENCE] += 1
+        assert ring.recent(2) is None
+        ring.header[SEQUENCE] += 1
+        assert len(ring.recent(2)["open_times"]) == 2
+        ring.close()
+
+
+    async def test_windows_are_snapshots(self, tmp_path) -> None:
+        path = str(tmp_path / "ring")
+        writer = CandleRing(path, writable=True, capacity=8)
+        reader = CandleRing(path)
+        writer.write(records_to_columns(make_records(0, 4)))
+
+        window = reader.recent(2)
+        update = make_records(3, 1)
+        update[0] = (*update[0][:6], 999.0, update[0][7])
+        writer.write(records_to_columns(update))
+        assert list(window["close"]) == [100.5 + 2, 100.5 + 3]
+
+        # A write landing between reading the bounds and copying the window
+        columns, writes = reader._columns, []
+
+        def columns_during_write(n: int) -> dict:
+            window = columns(n)
+            if not writes:
+                writes.append(writer.write(records_to_columns(make_records(4, 1))))
+            return window
+
+        reader._columns = columns_during_write
+        assert list(reader.recent(2)["open_times"]) == [minute(3), minute(4)]
+        assert list(reader.recent(2)["close"]) == [999.0, 100.5 + 4]
+
+        reader.close()
+        writer.close()
+
+
+class TestCandleCache:
+    async def test_window_must_be_current(self, tmp_path) -> None:
+        cache = CandleCache(str(tmp_path), capacity=32, enabled=True)
+        assert cache.recent(symbol="RING-USD", interval="1m", n=5, last_open_time=START) is None
+
+        assert cache.needs_seed(symbol="RING-USD", interval="1m")
+        assert cache.write(make_records(0, 10))
+        assert not cache.needs_seed(symbol="RING-USD", interval="1m")
+
+        newest = START + timedelta(minutes=9)
+        window = cache.recent(symbol="RING-USD", interval="1m", n=5, last_open_time=newest)
+        assert list(window["close"]) == [100.5 + i for i in range(5, 10)]
+        assert cache.recent(symbol="RING-USD", interval="1m", n=5, last_open_time=newest + timedelta(minutes=1)) is None
+        assert (cache.hits, cache.misses) == (1, 1)
+        cache.close()
+
+    async def test_series_covers_range(self, tmp_path) -> None:
+        cache = CandleCache(str(tmp_path), capacity=32, enabled=True)
+        cache.write(make_records(0, 40))
+        newest = START + timedelta(minutes=39)
+
+        series = cache.series(
+            symbol="RING-USD", interval="1m", last_open_time=newest,
+            start=START + timedelta(minutes=20), end=START + timedelta(minutes=30)
+        )
+        assert list(series["open_times"]) == [minute(i) for i in range(20, 30)]
+        assert cache.series(
+            symbol="RING-USD", interval="1m", last_open_time=newest,
+            start=START, end=START + timedelta(minutes=30)
+        ) is None
+        cache.close()
+
+    async def test_disabled_cache_never_serves(self, tmp_path) -> None:
+        CandleCache(str(tmp_path), capacity=32, enabled=True).write(make_records(0, 10))
+        cache = CandleCache(str(tmp_path), capacity=32, enabled=False)
+        assert cache.recent(
+            symbol="RING-USD", interval="1m", n=5, last_open_time=START + timedelta(minutes=9)
+        ) is None
+
+
+class TestForecastCandleCache:
+    async def test_service_reads_current_ring(self, tmp_path) -> None:
+        records = make_records(0, 300)
+        candle_cache = CandleCache(str(tmp_path), capacity=512, enabled=True)
+        candle_cache.write(records)
+        service = ForecastService(engine=CountingEngine(), cache=ForecastCache(), candle_cache=candle_cache)
+
+        forecast = await service.compute(
+            candles_repo=FailingCandlesRepository(), symbol="RING-USD", interval=CandleInterval.one_minute,
+            horizon=3, last_open_time=records[-1][2]
+        )
+        assert forecast.predictions == pytest.approx([records[-1][6]] * 3)
+
+        candles_repo = RecentClosesRepository(records + make_records(300, 1))
+        await service.compute(
+            candles_repo=candles_repo, symbol="RING-USD", interval=CandleInterval.one_minute,
+            horizon=3, last_open_time=START + timedelta(minutes=300)
+        )
+        assert candles_repo.calls == 1
+        candle_cache.close()
@@ -0,0 +1,96 @@
+"""
+Testing of the candles repository.
+
+test_upsert_candles_stores_batch():
+    - Write a batch with upsert_candles and read it back in open_time order
+
+test_upsert_candles_is_idempotent():
+    - Writing the same candles twice updates them instead of duplicating them
+
+test_copy_candles_merges_batch():
+    - Bulk load with COPY, including rows that already exist
+
+test_latest_open_time():
+    - The newest stored open_time is returned (None for unknown symbols)
+
+test_ensure_partitions_before_load():
+    - Candles outside the initial partitions load once ensure_partitions has covered
+      their (UTC) months, including either side of a month boundary
+"""
+# Std Library Imports
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+# Third Party Imports
+import pytest
+from httpx import AsyncClient
+from databases import Database
+
+from app.db.repositories.candles import CandlesRepository, CandleRecord
+
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2021, 5, 1, tzinfo=timezone.utc)
+
+
+def make_records(symbol: str, count: int, price: float = 100.0) -> List[CandleRecord]:
+    return [
+        (symbol, "1m", START + timedelta(minutes=i), price, price + 1, price - 1, price + 0.5, 10.0)
+        for i in range(count)
+    ]
+
+
+class TestCandlesRepository:
+    async def test_upsert_candles_stores_batch(self, client: AsyncClient, db: Database) -> None:
+        candles_repo = CandlesRepository(db)
+        assert await candles_repo.upsert_candles(records=make_records("UPSERT-USD", 50)) == 50
+
+        candles = await candles_repo.get_candles(
+            symbol="UPSERT-USD", interval="1m", start=START, end=START + timedelta(days=1)
+        )
+        assert len(candles) == 50
+        assert candles[0].open_time == START
+        assert all(a.open_time < b.open_time for a, b in zip(candles, candles[1:]))
+
+    async def test_upsert_candles_is_idempotent(self, client: AsyncClient, db: Database) -> None:
+        candles_repo = CandlesRepository(db)
+        await candles_repo.upsert_candles(records=make_records("IDEM-USD", 10))
+        await candles_repo.upsert_candles(records=make_records("IDEM-USD", 10, price=200.0))
+
+        candles = await candles_repo.get_candles(
+            symbol="IDEM-USD", interval="1m", start=START, end=START + timedelta(days=1)
+        )
+        assert len(candles) == 10
+        assert all(candle.open == 200.0 for candle in candles)
+
+    async def test_copy_candles_merges_batch(self, client: AsyncClient, db: Database) -> None:
+        candles_repo = CandlesRepository(db)
+        await candles_repo.upsert_candles(records=make_records("COPY-USD", 100))
+        assert await candles_repo.copy_candles(records=make_records("COPY-USD", 1000, price=50.0)) == 1000
+
+        candles = await candles_repo.get_candles(
+            symbol="COPY-USD", interval="1m", start=START, end=START + timedelta(days=1)
+        )
+        assert len(candles) == 1000
+        assert candles[0].close == 50.5
+
+    async def test_latest_open_time(self, client: AsyncClient, db: Database) -> None:
+        candles_repo = CandlesRepository(db)
+        await candles_repo.upsert_candles(records=make_records("LATEST-USD", 30))
+
+        latest = await candles_repo.get_latest_open_time(symbol="LATEST-USD", interval="1m")
+        assert latest == START + timedelta(minutes=29)
+        assert await candles_repo.get_latest_open_time(symbol="MISSING-USD", interval="1m") is None
+
+    async def test_ensure_partitions_before_load(self, client: AsyncClient, db: Database) -> None:
+        candles_repo = CandlesRepository(db)
+        start = datetime(2016, 2, 29, 23, 30, tzinfo=timezone.utc)
+        records = [
+            ("OLD-USD", "1m", start + timedelta(minutes=i), 10.0, 11.0, 9.0, 10.5, 1.0)
+            for i in range(60)
+        ]
+
+        await candles_repo.ensure_partitions(start=start, end=start + timedelta(hours=1))
+        assert await candles_repo.copy_candles(records=records) == 60
+        assert await candles_repo.get_latest_open_time(symbol="OLD-USD", interval="1m") == start + timedelta(minutes=59)
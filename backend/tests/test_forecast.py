@@ -0,0 +1,323 @@
+"""
+Testing of forecasting.
+
+TestForecastEngines:
+    - The Holt model continues a steady trend
+    - The remote engine (against the local inference stub) matches the local one
+
+TestMicroBatcher:
+    - Concurrent requests are coalesced into a single engine call
+    - Requests with different horizons never share a batch
+    - Engine errors reach every request of the batch
+
+TestForecastCache:
+    - Concurrent misses for one key run a single computation
+    - When the computing caller is cancelled, a waiting one computes instead of hanging
+    - A shared backend lets a second worker's cache reuse the first one's result
+    - A new candle (or model version) produces a different key
+
+TestFeatureEngine:
+    - Each indicator matches a direct (loop) computation
+    - Advancing a saved state candle by candle gives the same features as computing
+      over the extended history, also from before the windows filled up
+    - The forecast service advances its saved state by one new candle and recomputes
+      when more than one landed
+
+TestForecastRoute:
+    - A symbol without history is a 404
+    - A symbol with stored candles gets `horizon` predictions after its last candle,
+      and the indicators of that candle
+    - A new candle refreshes the cached forecast
+"""
+# Std Library Imports
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+# Third Party Imports
+import httpx
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from fastapi import FastAPI
+from databases import Database
+from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+
+from app.db.repositories.candles import CandlesRepository
+from app.models.forecast import ForecastPublic
+from app.models.candle import CandleInterval
+from app.services.forecasting import (
+    FEATURE_NAMES,
+    ExponentialSmoothingEngine,
+    FeatureEngine,
+    FeatureState,
+    ForecastCache,
+    ForecastService,
+    InferenceEngine,
+    LocalForecastCacheBackend,
+    MicroBatcher,
+    RemoteEngine
+)
+from tests.inference_stub import inference_stub_app
+
+
+pytestmark = pytest.mark.asyncio
+
+
+class CountingEngine(InferenceEngine):
+    name = "counting"
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def predict(self, batch: np.ndarray, horizon: int) -> np.ndarray:
+        self.calls.append(batch.shape)
+        return np.repeat(batch[:, -1:], horizon, axis=1)
+
+
+class FailingEngine(InferenceEngine):
+    async def predict(self, batch: np.ndarray, horizon: int) -> np.ndarray:
+        raise RuntimeError("model unavailable")
+
+
+class TestForecastEngines:
+    async def test_holt_continues_trend(self) -> None:
+        series = 100 * np.exp(0.01 * np.arange(64))[None, :]
+        predictions = await ExponentialSmoothingEngine().predict(series, 5)
+
+        assert predictions.shape == (1, 5)
+        expected = 100 * np.exp(0.01 * np.arange(64, 69))
+        assert np.allclose(predictions[0], expected, rtol=1e-3)
+
+    async def test_remote_engine_matches_local(self) -> None:
+        series = 50 + np.random.default_rng(0).random((4, 48)).cumsum(axis=1)
+
+        async with httpx.AsyncClient(app=inference_stub_app) as client:
+            remote = RemoteEngine(url="http://model/invocations", client=client)
+            remote_predictions = await remote.predict(series, 12)
+
+        local_predictions = await ExponentialSmoothingEngine().predict(series, 12)
+        assert np.allclose(remote_predictions, local_predictions)
+
+
+class TestMicroBatcher:
+    async def test_concurrent_requests_share_one_call(self) -> None:
+        engine = CountingEngine()
+        batcher = MicroBatcher(engine, max_batch_size=64, max_wait_ms=20)
+
+        results = await asyncio.gather(*(batcher.submit(np.full(32, float(i)), 3) for i in range(10)))
+
+        assert engine.calls == [(10, 32)]
+        assert all(np.all(result == float(i)) for i, result in enumerate(results))
+
+    async def test_full_batch_dispatches_immediately(self) -> None:
+        engine = CountingEngine()
+        batcher = MicroBatcher(engine, max_batch_size=4, max_wait_ms=10000)
+
+        await asyncio.wait_for(asyncio.gather(*(batcher.submit(np.ones(8), 1) for _ in range(8))), timeout=1)
+        assert engine.calls == [(4, 8), (4, 8)]
+
+    async def test_different_horizons_are_not_mixed(self) -> None:
+        engine = CountingEngine()
+        batcher = MicroBatcher(engine, max_batch_size=64, max_wait_ms=5)
+
+        short, long = await asyncio.gather(batcher.submit(np.ones(8), 2), batcher.submit(np.ones(8), 6))
+        assert short.shape == (2,) and long.shape == (6,)
+        assert len(engine.calls) == 2
+
+    async def test_engine_errors_reach_every_request(self) -> None:
+        batcher = MicroBatcher(FailingEngine(), max_batch_size=64, max_wait_ms=5)
+
+        results = await asyncio.gather(*(batcher.submit(np.ones(8), 1) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def make_forecast(symbol: str = "CACHE-USD") -> ForecastPublic:
+    start = datetime(2021, 4, 1, tzinfo=timezone.utc)
+    return ForecastPublic(
+        symbol=symbol,
+        interval="1h",
+        horizon=2,
+        model="holt",
+        model_version="1",
+        last_open_time=start,
+        open_times=[start + timedelta(hours=1), start + timedelta(hours=2)],
+        predictions=[1.0, 2.0]
+    )
+
+
+class TestForecastCache:
+    async def test_concurrent_misses_compute_once(self) -> None:
+        cache = ForecastCache()
+        calls = []
+
+        async def compute() -> ForecastPublic:
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return make_forecast()
+
+        results = await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(20)))
+
+        assert len(calls) == 1
+        assert all(result == results[0] for result in results)
+        assert cache.stats()["computations"] == 1
+        assert cache.stats()["hits"] == 19
+        assert cache.stats()["compute_seconds_saved"] > 0
+
+    async def test_cancelled_leader_hands_over(self) -> None:
+        cache = ForecastCache()
+        started = asyncio.Event()
+        calls = []
+
+        async def compute() -> ForecastPublic:
+            calls.append(1)
+            started.set()
+            await asyncio.sleep(0.01 if len(calls) > 1 else 10)
+            return make_forecast()
+
+        leader = asyncio.ensure_future(cache.get_or_compute("key", compute))
+        await started.wait()
+        followers = [asyncio.ensure_future(cache.get_or_compute("key", compute)) for _ in range(5)]
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        results = await asyncio.wait_for(asyncio.gather(*followers), timeout=1)
+        assert leader.cancelled()
+        assert len(calls) == 2
+        assert all(result == results[0] for result in results)
+
+    async def test_shared_backend_serves_other_workers(self) -> None:
+        backend = LocalForecastCacheBackend()
+        first_worker, second_worker = ForecastCache(backend=backend), ForecastCache(backend=backend)
+        calls = []
+
+        async def compute() -> ForecastPublic:
+            calls.append(1)
+            return make_forecast()
+
+        await first_worker.get_or_compute("key", compute)
+        forecast = await second_worker.get_or_compute("key", compute)
+
+        assert len(calls) == 1
+        assert forecast == make_forecast()
+
+    async def test_key_tracks_latest_candle_and_model_version(self) -> None:
+        base = dict(symbol="A-USD", interval="1h", horizon=24, model="holt", model_version="1")
+        at = datetime(2021, 4, 1, tzinfo=timezone.utc)
+
+        key = ForecastCache.make_key(**base, last_open_time=at)
+        assert key == ForecastCache.make_key(**base, last_open_time=at)
+        assert key != ForecastCache.make_key(**base, last_open_time=at + timedelta(hours=1))
+        assert key != ForecastCache.make_key(**{**base, "model_version": "2"}, last_open_time=at)
+
+
+def random_closes(symbols: int, length: int) -> np.ndarray:
+    return 100 * np.exp(np.random.default_rng(3).normal(0, 0.01, (symbols, length)).cumsum(axis=1))
+
+
+class TestFeatureEngine:
+    async def test_indicators_match_direct_computation(self) -> None:
+        closes = random_closes(1, 120)[0]
+        features, _ = FeatureEngine(window=20, ema_span=10, rsi_period=14).compute(closes)
+        last = {name: values[0, -1] for name, values in features.items()}
+
+        window = closes[-20:]
+        log_returns = np.log(closes[1:] / closes[:-1])
+        assert np.isclose(last["sma"], window.mean())
+        assert np.isclose(last["bollinger_upper"], window.mean() + 2 * window.std())
+        assert np.isclose(last["volatility"], log_returns[-20:].std(ddof=1))
+        assert np.isclose(last["return"], closes[-1] / closes[-2] - 1)
+
+        ema = closes[0]
+        for close in closes[1:]:
+            ema += 2 / 11 * (close - ema)
+        assert np.isclose(last["ema"], ema)
+
+        changes = np.diff(closes)
+        gain, loss = np.maximum(changes[:14], 0).mean(), np.maximum(-changes[:14], 0).mean()
+        for change in changes[14:]:
+            gain, loss = (gain * 13 + max(change, 0)) / 14, (loss * 13 + max(-change, 0)) / 14
+        assert np.isclose(last["rsi"], 100 - 100 / (1 + gain / loss))
+
+        assert np.isnan(features["sma"][0, 18]) and not np.isnan(features["sma"][0, 19])
+        assert np.isnan(features["rsi"][0, 13]) and not np.isnan(features["rsi"][0, 14])
+
+    @pytest.mark.parametrize("start", (1, 10, 25, 100))
+    async def test_incremental_matches_full(self, start: int) -> None:
+        closes = random_closes(30, 200)
+        engine = FeatureEngine()
+        full, _ = engine.compute(closes)
+
+        _, state = engine.compute(closes[:, :start])
+        state = FeatureState.from_arrays(state.arrays())
+        for t in range(start, closes.shape[1]):
+            features = engine.update(state, closes[:, t])
+            for name in FEATURE_NAMES:
+                assert np.allclose(features[name], full[name][:, t], rtol=1e-8, equal_nan=True), (name, t)
+
+    async def test_service_advances_saved_state(self) -> None:
+        service = ForecastService(engine=CountingEngine(), cache=ForecastCache())
+        closes = list(random_closes(1, 60)[0])
+        start = datetime(2021, 4, 1, tzinfo=timezone.utc)
+        open_times = [start + timedelta(hours=i) for i in range(60)]
+
+        def indicators(end: int) -> dict:
+            return service.indicators(
+                symbol="FEAT-USD", interval=CandleInterval.one_hour, open_times=open_times[:end], closes=closes[:end]
+            )
+
+        indicators(50)
+        assert (service.full_computations, service.incremental_updates) == (1, 0)
+        advanced = indicators(51)
+        assert (service.full_computations, service.incremental_updates) == (1, 1)
+        assert indicators(51) == advanced
+        indicators(55)
+        assert (service.full_computations, service.incremental_updates) == (2, 1)
+
+        features, _ = FeatureEngine().compute(np.array(closes[:51]))
+        assert advanced == pytest.approx(FeatureEngine.latest(features))
+
+
+class TestForecastRoute:
+    async def test_unknown_symbol_is_not_found(self, app: FastAPI, client: AsyncClient) -> None:
+        res = await client.get(app.url_path_for("forecast:get-forecast"), params={"symbol": "NOPE-USD"})
+        assert res.status_code == HTTP_404_NOT_FOUND
+
+    async def test_forecast_follows_last_candle(self, app: FastAPI, client: AsyncClient, db: Database) -> None:
+        start = datetime(2021, 4, 1, tzinfo=timezone.utc)
+        records = [
+            ("FCST-USD", "1h", start + timedelta(hours=i), 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1.0)
+            for i in range(100)
+        ]
+        await CandlesRepository(db).upsert_candles(records=records)
+
+        res = await client.get(
+            app.url_path_for("forecast:get-forecast"), params={"symbol": "FCST-USD", "interval": "1h", "horizon": 6}
+        )
+        assert res.status_code == HTTP_200_OK
+
+        forecast = ForecastPublic(**res.json())
+        assert forecast.last_open_time == start + timedelta(hours=99)
+        assert forecast.open_times[0] == start + timedelta(hours=100)
+        assert len(forecast.predictions) == 6
+        assert forecast.predictions[0] > records[-1][6]
+        assert set(forecast.indicators) == set(FEATURE_NAMES)
+        assert forecast.indicators["sma"] == pytest.approx(np.mean([record[6] for record in records[-20:]]))
+
+    async def test_new_candle_refreshes_forecast(self, app: FastAPI, client: AsyncClient, db: Database) -> None:
+        start = datetime(2021, 4, 1, tzinfo=timezone.utc)
+        candles_repo = CandlesRepository(db)
+        params = {"symbol": "FRESH-USD", "interval": "1h", "horizon": 3}
+        await candles_repo.upsert_candles(records=[
+            ("FRESH-USD", "1h", start + timedelta(hours=i), 100.0, 101.0, 99.0, 100.0, 1.0) for i in range(50)
+        ])
+
+        first = await client.get(app.url_path_for("forecast:get-forecast"), params=params)
+        cached = await client.get(app.url_path_for("forecast:get-forecast"), params=params)
+        assert first.json() == cached.json()
+
+        await candles_repo.upsert_candles(records=[
+            ("FRESH-USD", "1h", start + timedelta(hours=50), 100.0, 121.0, 99.0, 120.0, 1.0)
+        ])
+        refreshed = await client.get(app.url_path_for("forecast:get-forecast"), params=params)
+        assert refreshed.json()["last_open_time"] != first.json()["last_open_time"]
+        assert refreshed.json()["predictions"] != first.json()["predictions"]
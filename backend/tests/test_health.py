@@ -0,0 +1,57 @@
+"""
+Testing of health routes and pool sizing.
+
+test_readiness_reports_pool():
+    - Ensure the readiness route answers 200 and includes the pool statistics
+
+test_pool_size_respects_connection_budget():
+    - Ensure every worker's max pool size times the number of workers never
+      exceeds the global connection budget
+
+test_database_bounds_acquisition():
+    - Ensure created databases hand out connections that acquire with a timeout
+"""
+# Std Library Imports
+
+# Third Party Imports
+import pytest
+from httpx import AsyncClient
+from fastapi import FastAPI
+from starlette.status import HTTP_200_OK
+
+from app.core import config
+from app.db.backends import TimedPostgresBackend, TimedPostgresConnection
+from app.db.tasks import create_database, get_pool_size
+
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestHealthRoutes:
+    async def test_liveness(self, app: FastAPI, client: AsyncClient) -> None:
+        res = await client.get(app.url_path_for("health:liveness"))
+        assert res.status_code == HTTP_200_OK
+
+    async def test_readiness_reports_pool(self, app: FastAPI, client: AsyncClient) -> None:
+        res = await client.get(app.url_path_for("health:readiness"))
+        assert res.status_code == HTTP_200_OK
+        pool = res.json()["pool"]
+        assert pool["size"] >= 1
+        assert 0 <= pool["saturation"] <= 1
+
+
+class TestPoolSizing:
+    @pytest.mark.parametrize("workers", (1, 2, 4, 8, 64))
+    async def test_pool_size_respects_connection_budget(self, monkeypatch, workers: int) -> None:
+        monkeypatch.setattr(config, "DB_CONNECTION_BUDGET", 40)
+        monkeypatch.setattr(config, "DB_MAX_POOL_SIZE", 10)
+        monkeypatch.setattr(config, "DB_MIN_POOL_SIZE", 2)
+
+        min_size, max_size = get_pool_size(workers)
+        assert 1 <= min_size <= max_size <= 10
+        assert max_size * workers <= 40 or max_size == 1
+
+    async def test_database_bounds_acquisition(self) -> None:
+        database = create_database("postgresql://user:password@db:5432/db")
+        assert isinstance(database._backend, TimedPostgresBackend)
+        assert isinstance(database.connection()._connection, TimedPostgresConnection)
@@ -0,0 +1,152 @@
+"""
+Testing of market data ingestion against the local exchange stub.
+
+test_backfill_stores_every_candle():
+    - Backfill several symbols in parallel and ensure every candle in the range is stored
+
+test_backfill_resumes_from_latest_candle():
+    - A second backfill over the same range makes no requests and writes nothing
+    - Extending the range only fetches the new candles
+
+test_token_bucket_limits_rate():
+    - Requests beyond the burst wait for tokens to refill
+
+test_failing_symbol_doesnt_stop_the_others():
+    - A symbol that raises is reported as failed while the rest are still ingested
+
+test_follow_backs_off_after_errors():
+    - follow() survives any error, doubles its wait after each failed poll (up to the
+      cap) and goes back to the poll interval after a clean one
+"""
+# Std Library Imports
+import time
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+# Third Party Imports
+import pytest
+from httpx import AsyncClient
+from databases import Database
+
+from app.db.repositories.candles import CandlesRepository
+from app.services.exchanges import CryptoCompareAdapter, PoloniexAdapter, TokenBucket
+from app.services import ingestion
+from app.services.ingestion import IngestionPipeline, create_http_client
+from tests.exchange_stub import stub_app
+
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2021, 3, 1, tzinfo=timezone.utc)
+
+
+class FlakySink:
+    """
+    Stands in for CandlesRepository: drops every batch, fails every symbol in `broken`
+    and fails whole backfills while `outages` lasts.
+    """
+    def __init__(self, *, broken: tuple = (), outages: int = 0) -> None:
+        self.broken = broken
+        self.outages = outages
+        self.rows = 0
+
+    async def ensure_partitions(self, **kwargs) -> None:
+        if self.outages:
+            self.outages -= 1
+            raise RuntimeError("database unavailable")
+
+    async def get_latest_open_time(self, *, symbol: str, interval: str) -> None:
+        if symbol in self.broken:
+            raise RuntimeError(f"can't read {symbol}")
+
+    async def upsert_candles(self, *, records: list) -> int:
+        self.rows += len(records)
+        return len(records)
+
+    async def refresh_rollups(self, **kwargs) -> None:
+        pass
+
+
+class TestIngestionPipeline:
+    @pytest.mark.parametrize("adapter_class", (CryptoCompareAdapter, PoloniexAdapter))
+    async def test_backfill_stores_every_candle(self, client: AsyncClient, db: Database, adapter_class) -> None:
+        candles_repo = CandlesRepository(db)
+        symbols = [f"{adapter_class.name.upper()}{i}-USD" for i in range(3)]
+
+        async with create_http_client(app=stub_app) as client:
+            pipeline = IngestionPipeline(
+                candles_repo=candles_repo,
+                adapter=adapter_class(client, rate_limit=1000, burst=100),
+                max_parallel=2,
+                batch_size=500
+            )
+            report = await pipeline.backfill(
+                symbols=symbols, interval="1m", start=START, end=START + timedelta(days=1)
+            )
+
+        assert report["rows"] == 3 * 24 * 60
+        for symbol in symbols:
+            candles = await candles_repo.get_candles(
+                symbol=symbol, interval="1m", start=START, end=START + timedelta(days=1)
+            )
+            assert len(candles) == 24 * 60
+
+    async def test_backfill_resumes_from_latest_candle(self, client: AsyncClient, db: Database) -> None:
+        candles_repo = CandlesRepository(db)
+        end = START + timedelta(hours=6)
+
+        async with create_http_client(app=stub_app) as client:
+            adapter = CryptoCompareAdapter(client, rate_limit=1000, burst=100)
+            pipeline = IngestionPipeline(candles_repo=candles_repo, adapter=adapter)
+
+            first = await pipeline.backfill(symbols=["RESUME-USD"], interval="1m", start=START, end=end)
+            again = await pipeline.backfill(symbols=["RESUME-USD"], interval="1m", start=START, end=end)
+            later = await pipeline.backfill(
+                symbols=["RESUME-USD"], interval="1m", start=START, end=end + timedelta(minutes=30)
+            )
+
+        assert first["rows"] == 6 * 60
+        assert again["rows"] == 0 and again["requests"] == 0
+        assert later["rows"] == 30
+
+    async def test_token_bucket_limits_rate(self) -> None:
+        bucket = TokenBucket(rate=20, capacity=2)
+
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+
+        # Two tokens are free, the other four refill at 20 per second
+        assert time.monotonic() - start >= 0.19
+
+    async def test_failing_symbol_doesnt_stop_the_others(self) -> None:
+        sink = FlakySink(broken=("BROKEN-USD",))
+
+        async with create_http_client(app=stub_app) as client:
+            pipeline = IngestionPipeline(candles_repo=sink, adapter=CryptoCompareAdapter(client, rate_limit=1000, burst=100))
+            report = await pipeline.backfill(
+                symbols=["OK1-USD", "BROKEN-USD", "OK2-USD"], interval="1m", start=START, end=START + timedelta(hours=1)
+            )
+
+        assert report["failed"] == ["BROKEN-USD"]
+        assert report["rows"] == sink.rows == 2 * 60
+
+    async def test_follow_backs_off_after_errors(self, monkeypatch) -> None:
+        sink = FlakySink(outages=5)
+        delays = []
+
+        async def sleep(seconds: float) -> None:
+            delays.append(seconds)
+            if len(delays) == 7:
+                raise asyncio.CancelledError()
+
+        monkeypatch.setattr(ingestion.asyncio, "sleep", sleep)
+        async with create_http_client(app=stub_app) as client:
+            pipeline = IngestionPipeline(candles_repo=sink, adapter=CryptoCompareAdapter(client, rate_limit=1000, burst=100))
+            with pytest.raises(asyncio.CancelledError):
+                await pipeline.follow(
+                    symbols=["FOLLOW-USD"], interval="1m", start=datetime.now(timezone.utc) - timedelta(minutes=5),
+                    poll_seconds=1.0, max_backoff=10.0
+                )
+
+        assert delays == [2.0, 4.0, 8.0, 10.0, 10.0, 1.0, 1.0]
+        assert sink.rows > 0
@@ -0,0 +1,116 @@
+"""
+Tests for the Prometheus instrumentation.
+
+TestQueryMetrics:
+    - Repository queries are timed under the name of their SQL constant, and SQL built
+      on the fly under "unnamed"
+
+TestRequestMetrics:
+    - Requests are timed per route name and status; unknown paths share "unmatched"
+
+TestRenderMetrics:
+    - JSON rendering and password hashing are timed and everything renders in the
+      Prometheus text format
+
+TestMetricsRoute:
+    - The scrape endpoint serves the text format from the running application
+"""
+# Std Library Imports
+
+# Third Party Imports
+import pytest
+from httpx import AsyncClient
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.status import HTTP_200_OK
+
+from app.api.middleware import MetricsMiddleware
+from app.api.responses import TimedJSONResponse
+from app.core.metrics import render_metrics
+from app.db.repositories.users import UsersRepository, GET_USER_BY_USERNAME
+from app.services.authentication import HashingPool, _hash
+
+pytestmark = pytest.mark.asyncio
+
+
+def sample(name: str, labels: dict = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+class FakeDatabase:
+    async def fetch_one(self, query, values=None):
+        return None
+
+    async def execute(self, query, values=None):
+        return None
+
+
+class TestQueryMetrics:
+    async def test_queries_are_named_by_constant(self) -> None:
+        repo = UsersRepository(FakeDatabase())
+        named = sample("db_query_duration_seconds_count", {"query": "GET_USER_BY_USERNAME"})
+        unnamed = sample("db_query_duration_seconds_count", {"query": "unnamed"})
+
+        await repo.db.fetch_one(query=GET_USER_BY_USERNAME, values={"username": "someone"})
+        await repo.db.execute(query="SELECT 1;")
+
+        assert sample("db_query_duration_seconds_count", {"query": "GET_USER_BY_USERNAME"}) == named + 1
+        assert sample("db_query_duration_seconds_count", {"query": "unnamed"}) == unnamed + 1
+
+    async def test_repositories_do_not_wrap_twice(self) -> None:
+        first = UsersRepository(FakeDatabase())
+        second = UsersRepository(first.db)
+        assert isinstance(second.db._db, FakeDatabase)
+
+
+class TestRequestMetrics:
+    async def test_requests_are_timed_per_route(self) -> None:
+        async def ok(request):
+            return PlainTextResponse("ok")
+
+        app = Starlette(routes=[Route("/timed", ok, name="timed")])
+        app.add_middleware(MetricsMiddleware)
+        timed = {"method": "GET", "route": "timed", "status": "200"}
+        unmatched = {"method": "GET", "route": "unmatched", "status": "404"}
+        before = sample("http_request_duration_seconds_count", timed), sample("http_request_duration_seconds_count", unmatched)
+
+        async with AsyncClient(app=app, base_url="http://testserver") as client:
+            await client.get("/timed")
+            await client.get("/timed")
+            await client.get("/nowhere/1")
+            await client.get("/nowhere/2")
+
+        assert sample("http_request_duration_seconds_count", timed) == before[0] + 2
+        assert sample("http_request_duration_seconds_count", unmatched) == before[1] + 2
+
+
+class TestRenderMetrics:
+    async def test_serialization_and_hashing_are_timed(self) -> None:
+        rendered = sample("response_serialization_seconds_count", {"format": "json"})
+        hashed = sample("password_hash_duration_seconds_count", {"operation": "hash"})
+
+        TimedJSONResponse({"a": 1})
+        await HashingPool(workers=1).run(_hash, "somepassword")
+
+        assert sample("response_serialization_seconds_count", {"format": "json"}) == rendered + 1
+        assert sample("password_hash_duration_seconds_count", {"operation": "hash"}) == hashed + 1
+
+        body, content_type = render_metrics()
+        assert content_type.startswith("text/plain")
+        for name in (
+            "http_request_duration_seconds", "db_query_duration_seconds", "db_pool_wait_seconds",
+            "password_hash_duration_seconds", "response_serialization_seconds"
+        ):
+            assert f"# TYPE {name} histogram".encode() in body
+
+
+class TestMetricsRoute:
+    async def test_metrics_route(self, app: FastAPI, client: AsyncClient) -> None:
+        await client.get(app.url_path_for("health:readiness"))
+        res = await client.get(app.url_path_for("metrics:get-metrics"))
+        assert res.status_code == HTTP_200_OK
+        assert 'route="health:readiness"' in res.text
+        assert "db_pool_wait_seconds_count" in res.text
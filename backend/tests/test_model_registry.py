@@ -0,0 +1,186 @@
+"""
+Tests for the forecast model registry and hot-swapping (app.services.forecasting.registry).
+
+TestLoadEngine:
+    - An artifact builds its engine named after the registered version
+    - A changed artifact or an unknown engine is refused
+
+TestHotSwap:
+    - Requests in flight during a swap finish on the engine they started with, later
+      ones use the new engine, and none fail
+    - A refresh deploys a newly activated version once; one that fails to load leaves
+      the current engine serving and isn't retried
+    - maybe_refresh() checks in the background, at most every refresh_seconds
+
+TestModelRoutes:
+    - Activating needs a superuser, 404s for unregistered versions and swaps this
+      worker to the version
+"""
+# Std Library Imports
+import json
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+# Third Party Imports
+import numpy as np
+import pytest
+from databases import Database
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED, HTTP_404_NOT_FOUND
+
+from app.db.repositories.forecast_models import ForecastModelsRepository
+from app.models.candle import CandleInterval
+from app.models.forecast import ForecastModelCreate, ForecastModelInDB
+from app.services import forecast_service, model_registry
+from app.services.forecasting import ExponentialSmoothingEngine, ForecastCache, ForecastService, InferenceEngine
+from app.services.forecasting.registry import ModelRegistry, file_sha256, load_engine
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2021, 6, 1, tzinfo=timezone.utc)
+
+
+def write_artifact(directory, name: str, version: str, params: dict, engine: str = "holt") -> ForecastModelInDB:
+    path = directory / f"{name}-{version}.json"
+    path.write_text(json.dumps(params))
+    return ForecastModelInDB.from_trusted({
+        "id": 1, "name": name, "version": version, "engine": engine, "artifact": path.name,
+        "sha256": file_sha256(str(path)), "is_active": True, "activated_at": START
+    })
+
+
+class SlowEngine(InferenceEngine):
+    name = "slow"
+
+    def __init__(self, version: str, delay: float) -> None:
+        self.version = version
+        self.delay = delay
+
+    async def predict(self, batch: np.ndarray, horizon: int) -> np.ndarray:
+        await asyncio.sleep(self.delay)
+        return np.full((len(batch), horizon), float(self.version))
+
+
+class FakeCandlesRepository:
+    async def get_recent_closes(self, *, symbol: str, interval: CandleInterval, limit: int) -> Tuple[List[datetime], List[float]]:
+        open_times = [START + timedelta(hours=i) for i in range(64)]
+        return open_times, [100.0 + i for i in range(64)]
+
+
+class FakeModelsRepository:
+    def __init__(self, model: Optional[ForecastModelInDB] = None) -> None:
+        self.model = model
+        self.queries = 0
+
+    async def get_active_model(self) -> Optional[ForecastModelInDB]:
+        self.queries += 1
+        return self.model
+
+
+class TestLoadEngine:
+    async def test_builds_named_engine(self, tmp_path) -> None:
+        model = write_artifact(tmp_path, "holt-hourly", "7", {"alpha": 0.3, "beta": 0.05})
+        engine = load_engine(model, str(tmp_path))
+
+        assert isinstance(engine, ExponentialSmoothingEngine)
+        assert (engine.alpha, engine.beta) == (0.3, 0.05)
+        assert (engine.name, engine.version) == ("holt-hourly", "7")
+        assert ExponentialSmoothingEngine.version == "1"
+
+    async def test_refuses_changed_or_unknown(self, tmp_path) -> None:
+        model = write_artifact(tmp_path, "holt-hourly", "7", {"alpha": 0.3})
+        (tmp_path / model.artifact).write_text(json.dumps({"alpha": 0.9}))
+        with pytest.raises(ValueError):
+            load_engine(model, str(tmp_path))
+
+        model = write_artifact(tmp_path, "arima", "1", {}, engine="arima")
+        with pytest.raises(ValueError):
+            load_engine(model, str(tmp_path))
+
+
+class TestHotSwap:
+    async def test_in_flight_requests_keep_their_engine(self) -> None:
+        service = ForecastService(engine=SlowEngine("1", 0.05), cache=ForecastCache())
+        candles_repo = FakeCandlesRepository()
+
+        async def forecast() -> str:
+            result = await service.compute(
+                candles_repo=candles_repo, symbol="BTC-USD", interval=CandleInterval.one_hour, horizon=2
+            )
+            assert result.predictions == [float(result.model_version)] * 2
+            return result.model_version
+
+        before = [asyncio.ensure_future(forecast()) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        previous = service.swap_engine(SlowEngine("2", 0.01))
+        after = [asyncio.ensure_future(forecast()) for _ in range(5)]
+
+        assert previous.version == "1"
+        assert await asyncio.gather(*before) == ["1"] * 5
+        assert await asyncio.gather(*after) == ["2"] * 5
+
+    async def test_refresh_deploys_once(self, tmp_path) -> None:
+        service = ForecastService(engine=ExponentialSmoothingEngine(), cache=ForecastCache())
+        registry = ModelRegistry(service, directory=str(tmp_path), warmup_batches=1)
+        models_repo = FakeModelsRepository()
+
+        assert not await registry.refresh(models_repo)
+
+        models_repo.model = write_artifact(tmp_path, "holt-hourly", "2", {"alpha": 0.7, "beta": 0.2})
+        assert await registry.refresh(models_repo)
+        assert not await registry.refresh(models_repo)
+        assert (service.engine.version, service.engine.alpha) == ("2", 0.7)
+        assert registry.stats()["swaps"] == 1
+
+        broken = write_artifact(tmp_path, "holt-hourly", "3", {"alpha": 0.7})
+        (tmp_path / broken.artifact).write_text("{}")
+        models_repo.model = broken
+        with pytest.raises(ValueError):
+            await registry.refresh(models_repo)
+        assert not await registry.refresh(models_repo)
+        assert service.engine.version == "2"
+        assert registry.stats()["failures"] == 1
+
+    async def test_refresh_runs_in_background(self, tmp_path) -> None:
+        service = ForecastService(engine=ExponentialSmoothingEngine(), cache=ForecastCache())
+        registry = ModelRegistry(service, directory=str(tmp_path), refresh_seconds=60, warmup_batches=1)
+        models_repo = FakeModelsRepository(write_artifact(tmp_path, "holt-hourly", "2", {"alpha": 0.7}))
+
+        registry.maybe_refresh(models_repo)
+        assert service.engine.version == "1"
+        await registry._in_flight
+        assert service.engine.version == "2"
+
+        registry.maybe_refresh(models_repo)
+        assert registry._in_flight is None and models_repo.queries == 1
+
+
+class TestModelRoutes:
+    async def test_activate(
+        self, app: FastAPI, client: AsyncClient, superuser_client: AsyncClient, db: Database, tmp_path, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(model_registry, "directory", str(tmp_path))
+        previous = forecast_service.engine
+        artifact = write_artifact(tmp_path, "holt-route", "1", {"alpha": 0.4})
+        await ForecastModelsRepository(db).register_model(new_model=ForecastModelCreate(**artifact.dict()))
+
+        url = app.url_path_for("forecast:activate-model", model_name="holt-route", version="1")
+        missing = app.url_path_for("forecast:activate-model", model_name="holt-route", version="2")
+        try:
+            assert (await superuser_client.post(missing)).status_code == HTTP_404_NOT_FOUND
+            res = await superuser_client.post(url)
+            assert res.status_code == HTTP_200_OK
+            assert res.json()["is_active"]
+            assert (forecast_service.engine.name, forecast_service.engine.version) == ("holt-route", "1")
+
+            res = await superuser_client.get(app.url_path_for("forecast:list-models"))
+            assert res.json()["serving"] == {"name": "holt-route", "version": "1"}
+        finally:
+            forecast_service.swap_engine(previous)
+            await db.execute(query="UPDATE forecast_models SET is_active = FALSE WHERE is_active;")
+
+    async def test_activate_needs_a_superuser(self, app: FastAPI, client: AsyncClient) -> None:
+        url = app.url_path_for("forecast:activate-model", model_name="holt-route", version="1")
+        assert (await client.post(url)).status_code == HTTP_401_UNAUTHORIZED
@@ -0,0 +1,147 @@
+"""
+Tests for the sampling profiler and the slow request recorder.
+
+TestSamplingProfiler:
+    - Sampling the event loop thread finds the function that was burning CPU, in the
+      collapsed stack format
+    - The number of distinct stacks is bounded
+    - Toggling (what the signal does) starts, then stops and writes the profile
+
+TestSlowRequestRecorder:
+    - Only the slowest requests of each route above the threshold are kept
+    - A traced request keeps its repository queries and the stacks sampled while it ran
+
+TestProfilingRoutes:
+    - Only superusers may use the profiling routes
+    - A superuser can start and stop the profiler and read the profile
+"""
+# Std Library Imports
+import time
+import asyncio
+
+# Third Party Imports
+import pytest
+from httpx import AsyncClient
+from fastapi import FastAPI
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+
+from app.core import profiling
+from app.core.profiling import SamplingProfiler, SlowRequestRecorder
+from app.api.middleware import ProfilingMiddleware
+from app.db.repositories.users import UsersRepository, GET_USER_BY_USERNAME
+
+pytestmark = pytest.mark.asyncio
+
+
+def burn_cpu(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+class FakeDatabase:
+    async def fetch_one(self, query, values=None):
+        return None
+
+
+class TestSamplingProfiler:
+    async def test_samples_the_busy_function(self) -> None:
+        profiler = SamplingProfiler(interval_ms=1)
+        profiler.start()
+        burn_cpu(0.3)
+        profiler.stop()
+
+        assert not profiler.running
+        assert profiler.samples > 0
+        collapsed = profiler.collapsed()
+        assert "burn_cpu (" in collapsed
+        stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+
+    async def test_distinct_stacks_are_bounded(self) -> None:
+        profiler = SamplingProfiler(interval_ms=1, max_stacks=1)
+        profiler.start()
+        for _ in range(20):
+            burn_cpu(0.005)
+            await asyncio.sleep(0.005)
+        profiler.stop()
+
+        assert len(profiler.stacks) == 1
+        assert profiler.samples == sum(profiler.stacks.values()) + profiler.dropped
+
+    async def test_toggle_writes_the_profile(self, monkeypatch, tmp_path) -> None:
+        monkeypatch.setattr(profiling, "PROFILING_OUTPUT_DIR", str(tmp_path))
+        profiler = SamplingProfiler(interval_ms=1)
+
+        assert profiler.toggle() is None
+        assert profiler.running
+        burn_cpu(0.1)
+        path = profiler.toggle()
+
+        assert not profiler.running
+        assert open(path).read() == profiler.collapsed()
+
+
+class TestSlowRequestRecorder:
+    async def test_keeps_the_slowest_per_route(self) -> None:
+        recorder = SlowRequestRecorder(per_route=2, threshold_ms=0)
+        for duration in (0.01, 0.05, 0.03, 0.02):
+            trace = recorder.begin(method="GET", path="/a")
+            trace.started -= duration
+            recorder.end(trace, route="a", status=200)
+        fast = recorder.begin(method="GET", path="/b")
+        recorder.end(fast, route="b", status=200)
+
+        slowest = recorder.slowest()
+        assert [round(trace["duration_ms"], -1) for trace in slowest["a"]] == [50, 30]
+        assert set(slowest) == {"a", "b"}
+
+        strict = SlowRequestRecorder(per_route=2, threshold_ms=1000)
+        strict.end(strict.begin(method="GET", path="/a"), route="a", status=200)
+        assert strict.slowest() == {}
+
+    async def test_trace_keeps_queries_and_samples(self) -> None:
+        recorder = SlowRequestRecorder(per_route=5, threshold_ms=0)
+        profiler = SamplingProfiler(interval_ms=1, recorder=recorder)
+
+        async def slow(request):
+            await UsersRepository(FakeDatabase()).db.fetch_one(query=GET_USER_BY_USERNAME, values={"username": "a"})
+            burn_cpu(0.2)
+            return PlainTextResponse("done")
+
+        app = Starlette(routes=[Route("/slow", slow, name="slow")])
+        app.add_middleware(ProfilingMiddleware, recorder=recorder)
+
+        async with AsyncClient(app=app, base_url="http://testserver") as client:
+            profiler.start()
+            res = await client.get("/slow")
+            profiler.stop()
+        assert res.status_code == HTTP_200_OK
+
+        trace, = recorder.slowest()["slow"]
+        assert trace["status"] == 200 and trace["duration_ms"] >= 200
+        assert trace["queries"][0]["name"] == "GET_USER_BY_USERNAME"
+        assert trace["queries"][0]["sql"].startswith("SELECT")
+        assert any("burn_cpu (" in sample for sample in trace["samples"])
+
+
+class TestProfilingRoutes:
+    async def test_only_superusers(self, app: FastAPI, authorized_client: AsyncClient) -> None:
+        res = await authorized_client.post(app.url_path_for("profiling:start"))
+        assert res.status_code == HTTP_403_FORBIDDEN
+
+    async def test_start_stop_and_read_profile(self, app: FastAPI, superuser_client: AsyncClient) -> None:
+        res = await superuser_client.post(app.url_path_for("profiling:start"), params={"interval_ms": 1})
+        assert res.status_code == HTTP_200_OK
+        assert res.json()["running"]
+
+        await superuser_client.get(app.url_path_for("health:readiness"))
+        res = await superuser_client.post(app.url_path_for("profiling:stop"))
+        assert not res.json()["running"]
+
+        res = await superuser_client.get(app.url_path_for("profiling:get-profile"))
+        assert res.status_code == HTTP_200_OK
+        assert res.headers["content-type"].startswith("text/plain")
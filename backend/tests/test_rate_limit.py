@@ -0,0 +1,153 @@
+"""
+Tests for the GCRA rate limiting middleware, run against a bare Starlette app so no
+database is needed.
+
+TestLocalRateLimitBackend:
+    - A key gets its burst at once, then one request per interval
+    - Costs are charged in request units and keys are independent
+    - Concurrent checks never allow more than the burst
+    - The key store stays bounded
+
+TestRateLimitMiddleware:
+    - Anonymous clients are limited per IP with a 429 and Retry-After
+    - Authenticated clients are limited per user, whatever their IP
+    - Route costs apply by route name and a cost of 0 exempts a route
+    - X-Forwarded-For is only used when trusted
+"""
+# Std Library Imports
+import asyncio
+
+# Third Party Imports
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.config import JWT_TOKEN_PREFIX
+from app.models.user import UserInDB
+from app.services import auth_service
+from app.api.middleware.rate_limit import LocalRateLimitBackend, Rate, RateLimitMiddleware
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_limited_app(*, clock: FakeClock, trust_forwarded: bool = False) -> Starlette:
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[
+        Route("/cheap", ok, name="cheap"),
+        Route("/expensive", ok, name="expensive"),
+        Route("/health", ok, name="health")
+    ])
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=LocalRateLimitBackend(clock=clock),
+        user_rate=Rate(per_minute=60, burst=5),
+        ip_rate=Rate(per_minute=60, burst=3),
+        route_costs={"expensive": 3, "health": 0},
+        trust_forwarded=trust_forwarded
+    )
+
+    return app
+
+
+def make_token(username: str) -> str:
+    user = UserInDB(
+        id=1, email=f"{username}@limits.io", username=username, email_verified=False,
+        is_active=True, is_superuser=False, password="hashedpassword", salt="salt"
+    )
+    return auth_service.create_access_token_for_user(user=user)
+
+
+class TestLocalRateLimitBackend:
+    async def test_burst_then_one_per_interval(self) -> None:
+        clock = FakeClock()
+        backend = LocalRateLimitBackend(clock=clock)
+        results = [await backend.acquire("key", cost=1, interval=1.0, burst=3) for _ in range(4)]
+        assert [allowed for allowed, _, _ in results] == [True, True, True, False]
+        assert [remaining for _, _, remaining in results[:3]] == [2, 1, 0]
+        assert results[3][1] == pytest.approx(1.0)
+
+        clock.now += 1.0
+        assert (await backend.acquire("key", cost=1, interval=1.0, burst=3))[0]
+        assert not (await backend.acquire("key", cost=1, interval=1.0, burst=3))[0]
+
+    async def test_costs_and_independent_keys(self) -> None:
+        backend = LocalRateLimitBackend(clock=FakeClock())
+        assert (await backend.acquire("a", cost=3, interval=1.0, burst=3))[0]
+        assert not (await backend.acquire("a", cost=1, interval=1.0, burst=3))[0]
+        assert (await backend.acquire("b", cost=2, interval=1.0, burst=3))[0]
+        assert not (await backend.acquire("b", cost=2, interval=1.0, burst=3))[0]
+
+    async def test_concurrent_checks_respect_the_burst(self) -> None:
+        backend = LocalRateLimitBackend(clock=FakeClock())
+        results = await asyncio.gather(*(backend.acquire("key", cost=1, interval=1.0, burst=50) for _ in range(500)))
+        assert sum(allowed for allowed, _, _ in results) == 50
+
+    async def test_key_store_is_bounded(self) -> None:
+        clock = FakeClock()
+        backend = LocalRateLimitBackend(max_keys=100, clock=clock)
+        for i in range(1000):
+            await backend.acquire(f"key-{i}", cost=1, interval=1.0, burst=3)
+            clock.now += 0.01
+        assert len(backend.tats) <= 100
+
+
+class TestRateLimitMiddleware:
+    async def test_anonymous_clients_are_limited_per_ip(self) -> None:
+        app = create_limited_app(clock=FakeClock())
+        async with AsyncClient(app=app, base_url="http://testserver") as client:
+            statuses = [(await client.get("/cheap")).status_code for _ in range(4)]
+            assert statuses == [200, 200, 200, 429]
+
+            res = await client.get("/cheap")
+            assert res.json() == {"detail": "Too many requests."}
+            assert int(res.headers["retry-after"]) >= 1
+
+    async def test_authenticated_clients_are_limited_per_user(self) -> None:
+        app = create_limited_app(clock=FakeClock())
+        async with AsyncClient(app=app, base_url="http://testserver") as client:
+            headers = {"Authorization": f"{JWT_TOKEN_PREFIX} {make_token('limited')}"}
+            statuses = [(await client.get("/cheap", headers=headers)).status_code for _ in range(6)]
+            assert statuses == [200] * 5 + [429]
+
+            # A different user, and the anonymous IP budget, are untouched
+            other = {"Authorization": f"{JWT_TOKEN_PREFIX} {make_token('other')}"}
+            assert (await client.get("/cheap", headers=other)).status_code == 200
+            assert (await client.get("/cheap")).status_code == 200
+
+            # A token that doesn't verify falls back to the IP budget
+            bad = {"Authorization": f"{JWT_TOKEN_PREFIX} not-a-token"}
+            statuses = [(await client.get("/cheap", headers=bad)).status_code for _ in range(3)]
+            assert statuses == [200, 200, 429]
+
+    async def test_route_costs(self) -> None:
+        clock = FakeClock()
+        app = create_limited_app(clock=clock)
+        async with AsyncClient(app=app, base_url="http://testserver") as client:
+            assert (await client.get("/expensive")).status_code == 200
+            assert (await client.get("/cheap")).status_code == 429
+            assert all([(await client.get("/health")).status_code == 200 for _ in range(10)])
+
+            clock.now += 3.0
+            assert (await client.get("/expensive")).status_code == 200
+
+    async def test_forwarded_for_only_when_trusted(self) -> None:
+        for trusted, expected in ((False, [200, 200, 200, 429]), (True, [200, 200, 200, 200])):
+            app = create_limited_app(clock=FakeClock(), trust_forwarded=trusted)
+            async with AsyncClient(app=app, base_url="http://testserver") as client:
+                statuses = [
+                    (await client.get("/cheap", headers={"X-Forwarded-For": f"spoofed, 10.0.0.{i}"})).status_code
+                    for i in range(4)
+                ]
+                assert statuses == expected
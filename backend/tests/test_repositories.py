@@ -0,0 +1,82 @@
+"""
+Testing of the prepared query support shared by all repositories.
+
+TestPreparedQuery:
+    - Named parameters become positional ones in first-seen order, repeated names reuse
+      their position and "::" casts are left alone
+    - Registered queries are compiled once per repository class
+
+TestPreparedRepositoryQueries:
+    - A registered query returns the same row as the same SQL run through databases
+    - Prepared queries run on the task's connection, so they see an open transaction's writes
+    - Tasks sharing one connection can mix prepared and databases queries concurrently
+"""
+# Std Library Imports
+import asyncio
+
+# Third Party Imports
+import pytest
+from httpx import AsyncClient
+from databases import Database
+
+from app.db.repositories.base import BaseRepository, PreparedQuery
+from app.db.repositories.users import GET_USER_BY_USERNAME, UsersRepository
+from app.models.user import UserCreate, UserInDB
+
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestPreparedQuery:
+    async def test_named_parameters_become_positional(self) -> None:
+        query = PreparedQuery("q", "SELECT * FROM t WHERE a = :a AND b = CAST(:b AS INT) AND c = :a AND d = e::text;")
+
+        assert query.positional_sql == "SELECT * FROM t WHERE a = $1 AND b = CAST($2 AS INT) AND c = $1 AND d = e::text;"
+        assert query.params == ("a", "b")
+        assert query.args({"b": 2, "a": 1, "unused": 3}) == [1, 2]
+
+    async def test_queries_are_registered_per_repository(self) -> None:
+        class ThingsRepository(BaseRepository):
+            prepared_queries = {"get_thing": "SELECT :id;"}
+
+        assert set(ThingsRepository._prepared) == {"get_thing"}
+        assert "get_user_by_username" in UsersRepository._prepared
+        assert "get_user_by_username" not in ThingsRepository._prepared
+
+
+class TestPreparedRepositoryQueries:
+    async def test_prepared_and_unprepared_rows_match(self, client: AsyncClient, db: Database, test_user: UserInDB) -> None:
+        user_repo = UsersRepository(db)
+        prepared = await user_repo.fetch_one_prepared("get_user_by_username", {"username": test_user.username})
+        unprepared = await db.fetch_one(query=GET_USER_BY_USERNAME, values={"username": test_user.username})
+
+        assert dict(prepared) == dict(unprepared)
+
+    async def test_prepared_queries_join_open_transaction(self, client: AsyncClient, db: Database) -> None:
+        user_repo = UsersRepository(db)
+        new_user = UserCreate(email="prepared@crypto-helms.io", username="prepared", password="preparedpassword")
+
+        transaction = await db.transaction()
+        try:
+            await user_repo.register_new_user(new_user=new_user)
+            assert await user_repo.get_user_by_username(username="prepared")
+        finally:
+            await transaction.rollback()
+
+        assert await user_repo.get_user_by_username(username="prepared") is None
+
+    async def test_concurrent_queries_on_a_shared_connection(
+        self, client: AsyncClient, db: Database, test_user: UserInDB
+    ) -> None:
+        user_repo = UsersRepository(db)
+        values = {"username": test_user.username}
+
+        # Every task gathered inside the transaction runs on its connection
+        async with db.transaction():
+            rows = await asyncio.gather(*(
+                user_repo.fetch_one_prepared("get_user_by_username", values) if i % 2
+                else db.fetch_one(query=GET_USER_BY_USERNAME, values=values)
+                for i in range(20)
+            ))
+
+        assert all(dict(row) == dict(rows[0]) for row in rows)
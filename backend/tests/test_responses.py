@@ -0,0 +1,154 @@
+"""
+Testing of the binary response encodings and response compression.
+
+TestContentNegotiation:
+    - JSON is the default; the columns and Arrow types are picked from Accept, honoring q values
+    - Negotiated responses vary on Accept whichever format is served, JSON included
+
+TestColumnsEncoding:
+    - Columns and meta survive an encode/decode round trip, with every column 8-byte aligned
+    - The Arrow IPC stream carries the same columns and meta
+
+TestCompressionMiddleware:
+    - Large responses are brotli or gzip compressed as the client prefers
+    - Small responses and clients without Accept-Encoding are left alone
+"""
+# Std Library Imports
+import json
+
+# Third Party Imports
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from fastapi import FastAPI
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.api.middleware import CompressionMiddleware
+from app.api.middleware.compression import brotli
+from app.api.responses import (
+    ARROW_AVAILABLE, ARROW_MEDIA_TYPE, COLUMNS_MEDIA_TYPE, TimedJSONResponse, columnar_response, decode_columns,
+    encode_arrow, encode_columns, negotiate_format
+)
+
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_request(accept: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+class TestContentNegotiation:
+    @pytest.mark.parametrize("accept, expected", (
+        ("", "json"),
+        ("application/json", "json"),
+        ("*/*", "json"),
+        (COLUMNS_MEDIA_TYPE, "columns"),
+        (f"application/json;q=0.5, {COLUMNS_MEDIA_TYPE}", "columns"),
+        (f"application/json, {COLUMNS_MEDIA_TYPE};q=0.1", "json"),
+        ("image/png", "json")
+    ))
+    async def test_negotiate_format(self, accept: str, expected: str) -> None:
+        assert negotiate_format(make_request(accept)) == expected
+
+    @pytest.mark.skipif(not ARROW_AVAILABLE, reason="pyarrow is not installed")
+    async def test_negotiate_arrow(self) -> None:
+        assert negotiate_format(make_request(ARROW_MEDIA_TYPE)) == "arrow"
+
+    @pytest.mark.parametrize("accept, media_type", (
+        ("application/json", "application/json"),
+        (COLUMNS_MEDIA_TYPE, COLUMNS_MEDIA_TYPE)
+    ))
+    async def test_every_format_varies_on_accept(self, accept: str, media_type: str) -> None:
+        app = FastAPI(default_response_class=TimedJSONResponse)
+
+        @app.get("/series")
+        async def series(request: Request, response: Response) -> dict:
+            meta = {"points": 3}
+            return columnar_response(request, response, meta, {"values": np.arange(3)}) or meta
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            res = await client.get("/series", headers={"Accept": accept})
+
+        assert res.headers["content-type"] == media_type
+        assert res.headers["vary"] == "Accept"
+
+
+class TestColumnsEncoding:
+    async def test_round_trip(self) -> None:
+        meta = {"symbol": "BTC-USD", "points": 3}
+        columns = {
+            "timestamps": np.array([1, 2, 3], dtype=np.int64),
+            "values": np.array([1.5, 2.5, 3.5]),
+            "volume": np.array([7.0, 8.0, 9.0], dtype=np.float32)
+        }
+
+        payload = encode_columns(meta, columns)
+        decoded_meta, decoded = decode_columns(payload)
+        assert decoded_meta == meta
+        assert decoded["timestamps"].tolist() == [1, 2, 3]
+        assert decoded["values"].tolist() == [1.5, 2.5, 3.5]
+        assert decoded["volume"].dtype == np.float64
+        # Header + three 8-byte aligned columns of 3 x 8 bytes
+        assert (len(payload) - 3 * 24) % 8 == 0
+
+    async def test_rejects_other_payloads(self) -> None:
+        with pytest.raises(ValueError):
+            decode_columns(b'{"not": "columns"}')
+
+    @pytest.mark.skipif(not ARROW_AVAILABLE, reason="pyarrow is not installed")
+    async def test_arrow_round_trip(self) -> None:
+        payload = encode_arrow({"symbol": "BTC-USD"}, {"timestamps": np.arange(3), "values": np.ones(3)})
+
+        import pyarrow.ipc
+
+        table = pyarrow.ipc.open_stream(payload).read_all()
+        assert table.column_names == ["timestamps", "values"]
+        assert table.column("values").to_pylist() == [1.0, 1.0, 1.0]
+        assert json.loads(table.schema.metadata[b"meta"]) == {"symbol": "BTC-USD"}
+
+
+class TestCompressionMiddleware:
+    @pytest.fixture
+    def compressed_app(self) -> FastAPI:
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+        @app.get("/large")
+        async def large() -> dict:
+            return {"values": list(range(1000))}
+
+        @app.get("/small")
+        async def small() -> dict:
+            return {"ok": True}
+
+        return app
+
+    @pytest.mark.parametrize("accept_encoding, expected", (
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("gzip, br;q=0", "gzip")
+    ))
+    async def test_large_responses_are_compressed(
+        self, compressed_app: FastAPI, accept_encoding: str, expected: str
+    ) -> None:
+        if expected == "br" and brotli is None:
+            expected = "gzip"
+
+        async with AsyncClient(app=compressed_app, base_url="http://test") as client:
+            res = await client.get("/large", headers={"Accept-Encoding": accept_encoding})
+
+        assert res.headers["content-encoding"] == expected
+        assert "Accept-Encoding" in res.headers["vary"]
+        assert int(res.headers["content-length"]) < len(json.dumps({"values": list(range(1000))}))
+        assert res.json() == {"values": list(range(1000))}
+
+    async def test_small_and_unaccepted_responses_are_untouched(self, compressed_app: FastAPI) -> None:
+        async with AsyncClient(app=compressed_app, base_url="http://test") as client:
+            small = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+            identity = await client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in small.headers
+        assert "content-encoding" not in identity.headers
+        assert identity.json() == {"values": list(range(1000))}
@@ -0,0 +1,185 @@
+"""
+Testing of access token revocation.
+
+TestBloomFilter:
+    - Every added item is found (no false negatives)
+    - The measured false positive rate stays near the configured rate at capacity
+
+TestRevocationList:
+    - A jti the filter doesn't contain never reaches the database
+    - The filter is built on first use and refreshed incrementally with rows revoked since,
+      also while no token has been revoked yet
+    - Expired rows are pruned in the background, and only when the filter outgrows its capacity
+    - Newly seen revocations drop the token from the token cache
+
+TestLogout:
+    - A logged out token is refused, while the user's other tokens keep working
+    - Only superusers may revoke another user's token
+"""
+# Std Library Imports
+import uuid
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+# Third Party Imports
+import pytest
+from httpx import AsyncClient
+from fastapi import FastAPI
+from starlette.status import HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN
+
+from app.core.config import JWT_TOKEN_PREFIX, SECRET_KEY
+from app.models.user import UserInDB
+from app.services import auth_service
+from app.services.revocation import BloomFilter, RevocationList
+from app.services.token_cache import TokenCache
+
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeRevocationsRepository:
+    """Stands in for RevocationsRepository and counts how often it is asked."""
+    def __init__(self) -> None:
+        self.rows: List[Tuple[str, datetime]] = []
+        self.lookups = 0
+        self.rebuilds = 0
+        self.refreshes = 0
+        self.prunes = 0
+
+    def revoke(self, jti: str) -> None:
+        self.rows.append((jti, datetime.now(timezone.utc)))
+
+    async def is_revoked(self, *, jti: str) -> bool:
+        self.lookups += 1
+        return any(row_jti == jti for row_jti, _ in self.rows)
+
+    async def get_database_time(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    async def prune_expired(self) -> None:
+        self.prunes += 1
+
+    async def get_active_revocations(self) -> List[Tuple[str, datetime]]:
+        self.rebuilds += 1
+        return list(self.rows)
+
+    async def get_revocations_since(self, *, since: datetime) -> List[Tuple[str, datetime]]:
+        self.refreshes += 1
+        return [row for row in self.rows if row[1] > since]
+
+
+class TestBloomFilter:
+    async def test_no_false_negatives(self) -> None:
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [uuid.uuid4().hex for _ in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+
+    async def test_false_positive_rate_at_capacity(self) -> None:
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        for _ in range(5000):
+            bloom.add(uuid.uuid4().hex)
+
+        trials = 20000
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(trials))
+        assert false_positives / trials < 0.02
+        assert bloom.false_positive_rate() == pytest.approx(0.01, rel=0.2)
+
+
+class TestRevocationList:
+    async def test_filter_negatives_skip_the_database(self) -> None:
+        repo = FakeRevocationsRepository()
+        repo.revoke("revoked-jti")
+        revocation_list = RevocationList(capacity=1000, error_rate=0.001)
+        await revocation_list.maybe_refresh(repo)
+
+        assert not await revocation_list.is_revoked(None, repo)
+        for _ in range(100):
+            assert not await revocation_list.is_revoked(uuid.uuid4().hex, repo)
+        assert await revocation_list.is_revoked("revoked-jti", repo)
+        # 100 random jtis at a 0.1% false positive rate: the database is only asked about the revoked one
+        assert repo.lookups <= 2
+
+    async def test_refreshes_incrementally(self) -> None:
+        repo = FakeRevocationsRepository()
+        revocation_list = RevocationList(capacity=1000, error_rate=0.001, refresh_seconds=0)
+        repo.revoke("first-jti")
+        await revocation_list.maybe_refresh(repo)
+        assert repo.rebuilds == 1
+
+        repo.revoke("second-jti")
+        await revocation_list.maybe_refresh(repo)
+        assert repo.rebuilds == 1 and repo.refreshes == 1
+        assert await revocation_list.is_revoked("second-jti", repo)
+
+    async def test_empty_table_refreshes_incrementally(self) -> None:
+        repo = FakeRevocationsRepository()
+        revocation_list = RevocationList(capacity=1000, error_rate=0.001, refresh_seconds=0)
+        for _ in range(3):
+            await revocation_list.maybe_refresh(repo)
+
+        assert repo.rebuilds == 1 and repo.refreshes == 2
+        assert repo.prunes == 0
+        assert revocation_list.watermark is not None
+
+    async def test_capacity_rebuild_prunes_in_background(self) -> None:
+        repo = FakeRevocationsRepository()
+        revocation_list = RevocationList(capacity=2, error_rate=0.01, refresh_seconds=0)
+        await revocation_list.maybe_refresh(repo)
+        for i in range(3):
+            repo.revoke(f"jti-{i}")
+        await revocation_list.maybe_refresh(repo)
+        assert repo.rebuilds == 1 and repo.prunes == 0
+
+        await revocation_list.maybe_refresh(repo)
+        assert repo.rebuilds == 2
+        assert revocation_list._pruning is not None
+
+        await asyncio.sleep(0)
+        assert repo.prunes == 1
+        assert revocation_list._pruning is None
+
+    async def test_revocations_drop_cached_tokens(self) -> None:
+        user = UserInDB.construct(id=1, username="cached", email="cached@crypto-helms.io", password="x" * 60, salt="s")
+        cache = TokenCache(max_entries=10, ttl_seconds=60)
+        cache.set("token", user=user, username="cached", token_exp=time.time() + 60, jti="cached-jti")
+        cache.set("other-token", user=user, username="cached", token_exp=time.time() + 60, jti="other-jti")
+        revocation_list = RevocationList(capacity=1000, error_rate=0.001, on_revoke=cache.invalidate_jti)
+
+        revocation_list.add("cached-jti")
+        assert cache.get("token") is None
+        assert cache.get("other-token") is not None
+
+
+class TestLogout:
+    async def test_logged_out_token_is_refused(self, app: FastAPI, client: AsyncClient, test_user: UserInDB) -> None:
+        token = auth_service.create_access_token_for_user(user=test_user, secret_key=str(SECRET_KEY))
+        other_token = auth_service.create_access_token_for_user(user=test_user, secret_key=str(SECRET_KEY))
+        headers = {"Authorization": f"{JWT_TOKEN_PREFIX} {token}"}
+
+        res = await client.get(app.url_path_for("users:get-current-user"), headers=headers)
+        assert res.status_code == HTTP_200_OK
+
+        res = await client.post(app.url_path_for("users:logout"), headers=headers)
+        assert res.status_code == HTTP_204_NO_CONTENT
+
+        res = await client.get(app.url_path_for("users:get-current-user"), headers=headers)
+        assert res.status_code == HTTP_401_UNAUTHORIZED
+
+        res = await client.get(
+            app.url_path_for("users:get-current-user"), headers={"Authorization": f"{JWT_TOKEN_PREFIX} {other_token}"}
+        )
+        assert res.status_code == HTTP_200_OK
+
+    async def test_only_superusers_revoke_other_tokens(
+        self, app: FastAPI, authorized_client: AsyncClient, test_user: UserInDB
+    ) -> None:
+        token = auth_service.create_access_token_for_user(user=test_user, secret_key=str(SECRET_KEY))
+        res = await authorized_client.post(
+            app.url_path_for("users:revoke-token"), json={"revocation": {"token": token}}
+        )
+        assert res.status_code == HTTP_403_FORBIDDEN
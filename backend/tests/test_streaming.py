@@ -0,0 +1,208 @@
+"""
+Testing of the real-time stream.
+
+TestStreamClient:
+    - A newer message for the same subscription replaces the unsent one, in place
+    - A full queue drops its oldest message and never blocks the publisher
+    - A client that doesn't accept a message within the send timeout is given up on
+
+TestStreamHub:
+    - Many subscribers of a symbol share one feed, which stops with the last of them
+    - A published message is encoded once and reaches every subscriber; a new
+      subscriber gets the latest one straight away
+    - Subscriptions per client are capped
+
+TestStreamRoute:
+    - The handshake is refused without a token, or with an invalid one
+    - An authenticated client subscribing to a symbol gets its newest candle and forecast
+"""
+# Std Library Imports
+import json
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+# Third Party Imports
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from databases import Database
+
+from app.core.config import SECRET_KEY
+from app.db.repositories.candles import CandlesRepository
+from app.models.candle import CandleInterval
+from app.models.stream import StreamMessageType
+from app.models.user import UserInDB
+from app.services import auth_service
+from app.services.forecasting import ForecastCache, ForecastService
+from app.services.streaming import StreamClient, StreamHub
+from tests.test_forecast import CountingEngine
+
+
+pytestmark = pytest.mark.asyncio
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.messages: List[str] = []
+
+    async def send(self, text: str) -> None:
+        self.messages.append(text)
+
+
+class CountingHub(StreamHub):
+    def __init__(self) -> None:
+        super().__init__(ForecastService(engine=CountingEngine(), cache=ForecastCache()), poll_seconds=0.01)
+        self.polls = {}
+
+    async def poll(self, subscription) -> None:
+        self.polls[subscription] = self.polls.get(subscription, 0) + 1
+
+
+class WebSocketSession:
+    """
+    Drives a WebSocket endpoint of the app over raw ASGI messages.
+    """
+    def __init__(self, app: FastAPI, path: str, query_string: bytes = b"") -> None:
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+        scope = {
+            "type": "websocket", "path": path, "raw_path": path.encode(), "root_path": "",
+            "scheme": "ws", "query_string": query_string, "headers": [], "client": ("test", 1234),
+            "server": ("testserver", 80), "subprotocols": []
+        }
+        self.incoming.put_nowait({"type": "websocket.connect"})
+        self.task = asyncio.ensure_future(app(scope, self.incoming.get, self.outgoing.put))
+
+    async def next(self, timeout: float = 5) -> dict:
+        return await asyncio.wait_for(self.outgoing.get(), timeout)
+
+    def send_json(self, data: dict) -> None:
+        self.incoming.put_nowait({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def close(self) -> None:
+        self.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self.task, 5)
+
+
+class TestStreamClient:
+    async def test_newer_message_replaces_unsent_one(self) -> None:
+        recorder = Recorder()
+        client = StreamClient(recorder.send, max_pending=8)
+        client.offer(("candle", "A-USD", "1h"), "a1")
+        client.offer(("candle", "B-USD", "1h"), "b1")
+        client.offer(("candle", "A-USD", "1h"), "a2")
+
+        sender = asyncio.ensure_future(client.run())
+        await asyncio.sleep(0.01)
+        sender.cancel()
+
+        assert recorder.messages == ["a2", "b1"]
+        assert (client.sent, client.coalesced, client.dropped) == (2, 1, 0)
+
+    async def test_full_queue_drops_oldest(self) -> None:
+        client = StreamClient(Recorder().send, max_pending=3)
+        for i in range(5):
+            client.offer(("candle", f"S{i}-USD", "1h"), str(i))
+
+        assert list(client.pending.values()) == ["2", "3", "4"]
+        assert client.dropped == 2
+
+    async def test_stalled_client_times_out(self) -> None:
+        async def stalled(text: str) -> None:
+            await asyncio.sleep(60)
+
+        client = StreamClient(stalled, send_timeout=0.01)
+        client.offer(("candle", "A-USD", "1h"), "a1")
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.run(), 5)
+
+
+class TestStreamHub:
+    async def test_subscribers_share_one_feed(self) -> None:
+        hub = CountingHub()
+        hub.start(None)
+        clients = [StreamClient(Recorder().send) for _ in range(100)]
+        for client in clients:
+            hub.add(client)
+            assert hub.subscribe(client, symbol="A-USD", interval=CandleInterval.one_hour)
+
+        await asyncio.sleep(0.05)
+        assert list(hub.feeds) == [("A-USD", "1h")]
+        assert hub.stats()["subscriptions"] == 100
+
+        for client in clients[:-1]:
+            hub.remove(client)
+        assert ("A-USD", "1h") in hub.feeds
+        feed = hub.feeds[("A-USD", "1h")]
+        hub.unsubscribe(clients[-1], symbol="A-USD", interval=CandleInterval.one_hour)
+        await asyncio.sleep(0)
+        assert not hub.feeds and feed.cancelled()
+        await hub.stop()
+
+    async def test_publish_fans_out_encoded_once(self) -> None:
+        hub = CountingHub()
+        clients = [StreamClient(Recorder().send) for _ in range(3)]
+        for client in clients:
+            hub.add(client)
+            hub.subscribe(client, symbol="A-USD", interval=CandleInterval.one_hour)
+        bystander = StreamClient(Recorder().send)
+        hub.subscribe(bystander, symbol="B-USD", interval=CandleInterval.one_hour)
+
+        assert hub.publish(("A-USD", "1h"), StreamMessageType.candle, {"close": 1.0}) == 3
+        texts = [client.pending[("candle", "A-USD", "1h")] for client in clients]
+        assert all(text is texts[0] for text in texts)
+        assert json.loads(texts[0]) == {"type": "candle", "symbol": "A-USD", "interval": "1h", "data": {"close": 1.0}}
+        assert not bystander.pending
+
+        late = StreamClient(Recorder().send)
+        hub.subscribe(late, symbol="A-USD", interval=CandleInterval.one_hour)
+        assert late.pending[("candle", "A-USD", "1h")] is texts[0]
+
+    async def test_subscriptions_are_capped(self) -> None:
+        hub = CountingHub()
+        hub.max_subscriptions = 2
+        client = StreamClient(Recorder().send)
+
+        assert hub.subscribe(client, symbol="A-USD", interval=CandleInterval.one_hour)
+        assert hub.subscribe(client, symbol="A-USD", interval=CandleInterval.one_hour)
+        assert hub.subscribe(client, symbol="A-USD", interval=CandleInterval.one_day)
+        assert not hub.subscribe(client, symbol="B-USD", interval=CandleInterval.one_hour)
+
+
+class TestStreamRoute:
+    @pytest.mark.parametrize("query_string", (b"", b"token=not-a-token"))
+    async def test_handshake_requires_valid_token(self, app: FastAPI, client: AsyncClient, query_string: bytes) -> None:
+        session = WebSocketSession(app, app.url_path_for("stream:updates"), query_string)
+        assert (await session.next())["type"] == "websocket.close"
+        await asyncio.wait_for(session.task, 5)
+
+    async def test_subscriber_gets_candle_and_forecast(
+        self, app: FastAPI, client: AsyncClient, db: Database, test_user: UserInDB
+    ) -> None:
+        candles_repo = CandlesRepository(db)
+        start = datetime(2021, 6, 1, tzinfo=timezone.utc)
+        records = [
+            ("STREAM-USD", "1h", start + timedelta(hours=i), 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1.0)
+            for i in range(64)
+        ]
+        await candles_repo.ensure_partitions(start=start, end=start + timedelta(hours=64))
+        await candles_repo.upsert_candles(records=records)
+
+        token = auth_service.create_access_token_for_user(user=test_user, secret_key=str(SECRET_KEY))
+        session = WebSocketSession(app, app.url_path_for("stream:updates"), f"token={token}".encode())
+        assert (await session.next())["type"] == "websocket.accept"
+
+        session.send_json({"action": "subscribe", "symbols": ["stream-usd"], "interval": "1h"})
+        messages = {}
+        while len(messages) < 2:
+            message = json.loads((await session.next())["text"])
+            messages[message["type"]] = message
+
+        assert messages["candle"]["symbol"] == "STREAM-USD"
+        assert messages["candle"]["data"]["close"] == records[-1][6]
+        assert messages["forecast"]["data"]["last_open_time"] == records[-1][2].isoformat()
+
+        session.send_json({"action": "subscribe", "symbols": ["not a symbol"]})
+        assert json.loads((await session.next())["text"])["type"] == "error"
+        await session.close()
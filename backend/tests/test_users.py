@@ -54,8 +54,31 @@ test_error_when_secret_or_token_is_wrong():
 TestUserMe:
     - Test the protected route we created for authenticated user to be
       able to access their own information
+
+TestConcurrentRegistration:
+    - Fire many simultaneous registrations with the same credentials and ensure
+      exactly one succeeds while the rest get the matching 400 error
+
+TestTokenCache:
+    - Ensure repeat requests with the same token are served from the cache
+    - Ensure entries honour the token's exp, the entry bound and user invalidation
+    - Ensure a user deactivated through one worker drops out of another worker's
+      cache on its next sync, and is served stale until then
+
+TestTrustedModels:
+    - Ensure rows and verified claims mapped with from_trusted() keep only model fields
+      and that a missing required field is rejected
+    - Ensure a signed token without a username is still a 401 and /me/ never leaks
+      the password or salt
+
+TestPasswordHashingPool:
+    - Ensure the async hashing functions agree with the sync ones
+    - Ensure a saturated pool answers with a 503 and a Retry-After header
+    - Ensure shutting the pool down from the app waits for running hashes off the event loop
 """
 # Std Library Imports
+import time
+import asyncio
 from typing import List, Union, Type, Optional
 
 # Third Party Imports
@@ -76,9 +99,11 @@ from starlette.status import (
     HTTP_422_UNPROCESSABLE_ENTITY
 )
 
-from app.models.user import UserCreate, UserInDB, UserPublic
+from app.models.user import UserCreate, UserInDB, UserPublic, UserUpdate
 from app.db.repositories.users import UsersRepository
-from app.services import auth_service
+from app.services import auth_service, token_cache
+from app.services.authentication import HashingPool
+from app.services.token_cache import TokenCache
 from app.core.config import SECRET_KEY, JWT_ALGORITHM, JWT_AUDIENCE, JWT_TOKEN_PREFIX, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.models.token import JWTMeta, JWTCreds, JWTPayload
 
@@ -136,12 +161,12 @@ class TestUserLogin:
         assert res.json().get("token_type") == "bearer"
     
     @pytest.mark.parametrize(
-        "credential, wrong_value, status_code"
+        "credential, wrong_value, status_code",
         (
             ("email", "wrong@email.com", 401),
             ("email", None, 401),
             ("email", "notanemail", 401),
-            ("password", "wrongpassword", 401)
+            ("password", "wrongpassword", 401),
             ("password", None, 401)
         )
     )
@@ -194,7 +219,7 @@ class TestAuthTokens:
             jwt.decode(access_token, str(SECRET_KEY), audience=JWT_AUDIENCE, algorithms=[JWT_ALGORITHM])
     
     @pytest.mark.parametrize(
-        "secret_key, jwt_audience, exception"
+        "secret_key, jwt_audience, exception",
         (
             ("wrong-secret", JWT_AUDIENCE, jwt.InvalidSignatureError),
             (None, JWT_AUDIENCE, jwt.InvalidSignatureError),
@@ -282,8 +307,8 @@ class TestUserRegistration:
         # Ensure that new user exists in db
         user_in_db = await user_repo.get_user_by_email(email=new_user["email"])
         assert user_in_db is not None
-        assert user_in_db.email = new_user["email"]
-        assert user_in_db.username = new_user["username"]
+        assert user_in_db.email == new_user["email"]
+        assert user_in_db.username == new_user["username"]
 
         # Check that user returned in response is the same as the one in the db
         created_user = UserPublic(**res.json()).dict(exclude={"access_token"})
@@ -314,7 +339,7 @@ class TestUserRegistration:
 
         # Send post request to client to ensure success
         res = await client.post(app.url_path_for("users:register-new-user"), json={"new_user": new_user})
-        assert res.status_code = status_code
+        assert res.status_code == status_code
     
 
     async def test_users_saved_password_is_hashed_and_has_salt(
@@ -340,4 +365,199 @@ class TestUserRegistration:
             password=new_user["password"],
             salt=user_in_db.salt,
             hashed_pw=user_in_db.password
-        )
\ No newline at end of file
+        )
+
+
+class TestPasswordHashingPool:
+    async def test_async_hash_is_verifiable(self) -> None:
+        update = await auth_service.async_create_salt_and_hashed_password(plaintext_password="supersecret")
+        assert update.password != "supersecret"
+        assert auth_service.verify_password(password="supersecret", salt=update.salt, hashed_pw=update.password)
+        assert await auth_service.async_verify_password(
+            password="supersecret", salt=update.salt, hashed_pw=update.password
+        )
+        assert not await auth_service.async_verify_password(
+            password="wrongsecret", salt=update.salt, hashed_pw=update.password
+        )
+
+    async def test_saturated_pool_raises_service_unavailable(self) -> None:
+        pool = HashingPool(workers=1, max_queue=0, retry_after=3)
+        busy = asyncio.ensure_future(pool.run(time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(time.sleep, 0)
+        assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert exc_info.value.headers["Retry-After"] == "3"
+
+        await busy
+        assert pool.pending == 0
+        pool.shutdown()
+
+    async def test_async_shutdown_keeps_event_loop_running(self) -> None:
+        pool = HashingPool(workers=1, max_queue=0)
+        busy = asyncio.ensure_future(pool.run(time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+
+        ticks = 0
+        shutdown = asyncio.ensure_future(pool.async_shutdown())
+        while not shutdown.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+        await busy
+        assert ticks > 5
+        assert pool._executor is None
+
+
+class TestTokenCache:
+    async def test_repeat_requests_hit_the_cache(
+        self, app: FastAPI, authorized_client: AsyncClient, test_user: UserInDB
+    ) -> None:
+        token_cache.clear()
+        hits_before = token_cache.hits
+
+        for _ in range(3):
+            res = await authorized_client.get(app.url_path_for("users:get-current-user"))
+            assert res.status_code == HTTP_200_OK
+
+        assert token_cache.hits - hits_before == 2
+        assert token_cache.stats()["entries"] == 1
+
+    async def test_entries_expire_with_token(self, client: AsyncClient, test_user: UserInDB) -> None:
+        cache = TokenCache(max_entries=10, ttl_seconds=300)
+        cache.set("expired-token", user=test_user, username=test_user.username, token_exp=time.time() - 1)
+        assert cache.get("expired-token") is None
+        assert cache.evictions == 1
+
+    async def test_least_recently_used_entry_is_evicted(self, client: AsyncClient, test_user: UserInDB) -> None:
+        cache = TokenCache(max_entries=2, ttl_seconds=300)
+        exp = time.time() + 60
+        cache.set("token-a", user=test_user, username=test_user.username, token_exp=exp)
+        cache.set("token-b", user=test_user, username=test_user.username, token_exp=exp)
+        assert cache.get("token-a") is not None
+        cache.set("token-c", user=test_user, username=test_user.username, token_exp=exp)
+
+        assert cache.get("token-b") is None
+        assert cache.get("token-a") is not None
+        assert cache.get("token-c") is not None
+        assert cache.evictions == 1
+
+    async def test_invalidate_user_drops_all_tokens(self, client: AsyncClient, test_user: UserInDB) -> None:
+        cache = TokenCache(max_entries=10, ttl_seconds=300)
+        exp = time.time() + 60
+        cache.set("token-a", user=test_user, username=test_user.username, token_exp=exp)
+        cache.set("token-b", user=test_user, username=test_user.username, token_exp=exp)
+        cache.invalidate_user(test_user.username)
+
+        assert cache.get("token-a") is None
+        assert cache.get("token-b") is None
+        assert cache.stats()["entries"] == 0
+
+    async def test_other_workers_drop_changed_users_on_sync(
+        self, db: Database, test_user: UserInDB
+    ) -> None:
+        # Two workers' caches: the change below goes through worker A only
+        worker_a = TokenCache(max_entries=10, ttl_seconds=300, sync_seconds=3600)
+        worker_b = TokenCache(max_entries=10, ttl_seconds=300, sync_seconds=3600)
+        users_a, users_b = UsersRepository(db), UsersRepository(db)
+        users_a.token_cache, users_b.token_cache = worker_a, worker_b
+        await worker_b.maybe_sync(users_b)
+
+        other_user = test_user.copy(update={"id": -1, "username": "unchanged_user"})
+        exp = time.time() + 60
+        for cache in (worker_a, worker_b):
+            cache.set("token-1", user=test_user, username=test_user.username, token_exp=exp)
+            cache.set("token-2", user=other_user, username=other_user.username, token_exp=exp)
+
+        await users_a.deactivate_user(username=test_user.username)
+        assert worker_a.get("token-1") is None
+
+        # Within the sync interval worker B still serves the stale user...
+        await worker_b.maybe_sync(users_b)
+        assert worker_b.get("token-1") is not None
+
+        # ...and its next sync drops them, leaving unchanged users cached
+        worker_b.synced_at = 0.0
+        await worker_b.maybe_sync(users_b)
+        assert worker_b.get("token-1") is None
+        assert worker_b.get("token-2") is not None
+
+    async def test_sync_catches_renames(self, db: Database, test_user: UserInDB) -> None:
+        cache = TokenCache(max_entries=10, ttl_seconds=300, sync_seconds=0)
+        users_repo = UsersRepository(db)
+        users_repo.token_cache = TokenCache(max_entries=10, ttl_seconds=300)
+        await cache.maybe_sync(users_repo)
+        cache.set("token-1", user=test_user, username=test_user.username, token_exp=time.time() + 60)
+
+        await users_repo.update_user(username=test_user.username, user_update=UserUpdate(username="renamed_user"))
+        await cache.maybe_sync(users_repo)
+
+        assert cache.get("token-1") is None
+        assert cache.stats()["entries"] == 0
+
+
+class TestConcurrentRegistration:
+    @pytest.mark.parametrize(
+        "attr, detail",
+        (
+            ("email", "Email already exists"),
+            ("username", "Username is already taken"),
+        )
+    )
+    async def test_exactly_one_duplicate_registration_succeeds(
+        self, client: AsyncClient, db: Database, monkeypatch, attr: str, detail: str
+    ) -> None:
+        # Give the hashing pool enough room that no request is shed with a 503
+        monkeypatch.setattr(auth_service.hashing_pool, "max_queue", 1000)
+        user_repo = UsersRepository(db)
+        attempts = 200
+
+        def new_user(i: int) -> UserCreate:
+            user = {"email": f"racer{i}@race.io", "username": f"racer_{i}", "password": "racepassword"}
+            user[attr] = {"email": f"{attr}_race@race.io", "username": f"{attr}_race"}[attr]
+            return UserCreate(**user)
+
+        results = await asyncio.gather(
+            *(user_repo.register_new_user(new_user=new_user(i)) for i in range(attempts)),
+            return_exceptions=True
+        )
+
+        created = [r for r in results if isinstance(r, UserInDB)]
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        assert len(created) == 1
+        assert len(rejected) == attempts - 1
+        assert all(r.status_code == HTTP_400_BAD_REQUEST and detail in r.detail for r in rejected)
+
+
+class TestTrustedModels:
+    async def test_from_trusted_maps_only_model_fields(self, client: AsyncClient, test_user: UserInDB) -> None:
+        row = {**test_user.dict(), "not_a_column": 1}
+        user = UserInDB.from_trusted(row)
+        assert user.username == test_user.username
+        assert user.salt == test_user.salt
+        assert "not_a_column" not in user.dict()
+
+        public = UserPublic.from_trusted(user.__dict__)
+        assert "password" not in public.dict() and "salt" not in public.dict()
+
+    async def test_from_trusted_requires_required_fields(self) -> None:
+        with pytest.raises(KeyError):
+            JWTPayload.from_trusted({"sub": "someone@crypto-helms.io"})
+
+    async def test_signed_token_without_username_is_rejected(self) -> None:
+        claims = JWTMeta().dict()
+        claims["sub"] = "someone@crypto-helms.io"
+        token = jwt.encode(claims, str(SECRET_KEY), algorithm=JWT_ALGORITHM)
+
+        with pytest.raises(HTTPException) as e:
+            auth_service.get_payload_from_token(token=token, secret_key=str(SECRET_KEY))
+        assert e.value.status_code == HTTP_401_UNAUTHORIZED
+
+    async def test_me_does_not_leak_credentials(
+        self, app: FastAPI, authorized_client: AsyncClient, test_user: UserInDB
+    ) -> None:
+        res = await authorized_client.get(app.url_path_for("users:get-current-user"))
+        assert res.status_code == HTTP_200_OK
+        assert "password" not in res.json() and "salt" not in res.json()
+        assert res.json()["username"] == test_user.username
@@ -0,0 +1,169 @@
+"""
+Testing of chart downsampling and the viz route.
+
+TestDownsampling:
+    - LTTB returns exactly `threshold` points, keeps the endpoints and the extremes
+    - OHLC re-bucketing keeps the range's open, close, high, low and total volume
+    - The coarsest resolution with enough points is chosen for a range
+
+TestCandleRollups:
+    - Rollups are refreshed from stored 1m candles, including partial buckets
+
+TestVizRoute:
+    - A chart never has more points than requested, and unknown symbols are a 404
+    - The binary columns format carries the same series as the JSON response
+"""
+# Std Library Imports
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+# Third Party Imports
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from fastapi import FastAPI
+from databases import Database
+from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+
+from app.api.responses import COLUMNS_MEDIA_TYPE, decode_columns
+from app.db.repositories.candles import CandlesRepository, CandleRecord
+from app.models.candle import CandleInterval
+from app.services.downsampling import choose_resolution, lttb, rebucket_ohlc
+
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2021, 6, 1, tzinfo=timezone.utc)
+
+
+def minute_candles(symbol: str, count: int) -> List[CandleRecord]:
+    return [
+        (symbol, "1m", START + timedelta(minutes=i), 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1.0)
+        for i in range(count)
+    ]
+
+
+class TestDownsampling:
+    async def test_lttb_keeps_shape(self) -> None:
+        x = np.arange(10000, dtype=np.float64)
+        y = np.sin(x / 500)
+        y[4321] = 50.0
+
+        xs, ys = lttb(x, y, 200)
+        assert len(xs) == 200
+        assert xs[0] == 0 and xs[-1] == 9999
+        assert 4321 in xs
+        assert np.all(np.diff(xs) > 0)
+
+    async def test_lttb_leaves_short_series_alone(self) -> None:
+        x, y = np.arange(10.0), np.arange(10.0)
+        xs, ys = lttb(x, y, 100)
+        assert len(xs) == 10
+
+    async def test_rebucket_ohlc_preserves_range(self) -> None:
+        n = 1000
+        times = np.arange(n) * 60.0
+        opens = np.random.default_rng(3).random(n) + 100
+        highs, lows, closes, volumes = opens + 1, opens - 1, opens + 0.5, np.ones(n)
+
+        candles = rebucket_ohlc(times, opens, highs, lows, closes, volumes, 37)
+        assert len(candles["open"]) <= 37
+        assert candles["open"][0] == opens[0]
+        assert candles["close"][-1] == closes[-1]
+        assert candles["high"].max() == highs.max()
+        assert candles["low"].min() == lows.min()
+        assert candles["volume"].sum() == n
+
+    @pytest.mark.parametrize(
+        "span, points, resolution",
+        (
+            (timedelta(hours=6), 1000, CandleInterval.one_minute),
+            (timedelta(days=7), 1000, CandleInterval.five_minutes),
+            (timedelta(days=90), 1000, CandleInterval.one_hour),
+            (timedelta(days=5 * 365), 1000, CandleInterval.one_day),
+        )
+    )
+    async def test_choose_resolution(self, span: timedelta, points: int, resolution: CandleInterval) -> None:
+        assert choose_resolution(span.total_seconds(), points) == resolution
+
+
+class TestCandleRollups:
+    async def test_rollups_follow_new_candles(self, client: AsyncClient, db: Database) -> None:
+        candles_repo = CandlesRepository(db)
+        records = minute_candles("ROLL-USD", 7)
+        await candles_repo.upsert_candles(records=records)
+        await candles_repo.refresh_rollups(symbol="ROLL-USD", start=records[0][2], end=records[-1][2])
+
+        series = await candles_repo.get_series(
+            symbol="ROLL-USD", interval="5m", start=START, end=START + timedelta(hours=1)
+        )
+        assert series["open"].tolist() == [100.0, 105.0]
+        assert series["close"].tolist() == [104.5, 106.5]
+        assert series["volume"].tolist() == [5.0, 2.0]
+
+        # The second bucket fills in as more candles land
+        later = minute_candles("ROLL-USD", 10)[7:]
+        await candles_repo.upsert_candles(records=later)
+        await candles_repo.refresh_rollups(symbol="ROLL-USD", start=later[0][2], end=later[-1][2])
+
+        series = await candles_repo.get_series(
+            symbol="ROLL-USD", interval="5m", start=START, end=START + timedelta(hours=1)
+        )
+        assert series["close"].tolist() == [104.5, 109.5]
+        assert series["high"].tolist() == [105.0, 110.0]
+
+
+class TestVizRoute:
+    @pytest.mark.parametrize("chart", ("line", "candles"))
+    async def test_chart_fits_width(self, app: FastAPI, client: AsyncClient, db: Database, chart: str) -> None:
+        candles_repo = CandlesRepository(db)
+        records = minute_candles("VIZ-USD", 600)
+        await candles_repo.upsert_candles(records=records)
+        await candles_repo.refresh_rollups(symbol="VIZ-USD", start=records[0][2], end=records[-1][2])
+
+        res = await client.get(
+            app.url_path_for("viz:get-chart-series"),
+            params={
+                "symbol": "VIZ-USD",
+                "start": START.isoformat(),
+                "end": (START + timedelta(hours=10)).isoformat(),
+                "width": 120,
+                "chart": chart
+            }
+        )
+        assert res.status_code == HTTP_200_OK
+        series = res.json()
+        # Ten hours hold 120 five minute candles, enough for the chart, so those are read
+        assert series["resolution"] == "5m"
+        assert series["source_points"] == 120
+        assert 0 < series["points"] <= 120
+        assert len(series["timestamps"]) == series["points"]
+
+    async def test_unknown_symbol_is_not_found(self, app: FastAPI, client: AsyncClient) -> None:
+        res = await client.get(
+            app.url_path_for("viz:get-chart-series"), params={"symbol": "NONE-USD", "start": START.isoformat()}
+        )
+        assert res.status_code == HTTP_404_NOT_FOUND
+
+    async def test_columns_format_matches_json(self, app: FastAPI, client: AsyncClient, db: Database) -> None:
+        candles_repo = CandlesRepository(db)
+        records = minute_candles("COLS-USD", 600)
+        await candles_repo.upsert_candles(records=records)
+        await candles_repo.refresh_rollups(symbol="COLS-USD", start=records[0][2], end=records[-1][2])
+
+        params = {"symbol": "COLS-USD", "start": START.isoformat(), "end": (START + timedelta(hours=10)).isoformat()}
+        json_res = await client.get(app.url_path_for("viz:get-chart-series"), params=params)
+        binary_res = await client.get(
+            app.url_path_for("viz:get-chart-series"), params=params, headers={"Accept": COLUMNS_MEDIA_TYPE}
+        )
+        assert binary_res.status_code == HTTP_200_OK
+        assert binary_res.headers["content-type"] == COLUMNS_MEDIA_TYPE
+        for res in (json_res, binary_res):
+            assert "Accept" in [value.strip() for value in res.headers["vary"].split(",")]
+
+        meta, columns = decode_columns(binary_res.content)
+        series = json_res.json()
+        assert meta["points"] == series["points"]
+        assert meta["resolution"] == series["resolution"]
+        assert columns["timestamps"].tolist() == series["timestamps"]
+        assert columns["values"].tolist() == series["values"]
@@ -0,0 +1,127 @@
+"""
+Tests for the multi-worker deployment mode (app.core.workers, gunicorn_conf.py).
+
+TestWorkerSizing:
+    - A cgroup CPU quota (v2 or v1) caps the CPUs, "max" or no quota does not
+    - Workers follow WEB_CONCURRENCY when set, otherwise the CPUs times
+      WEB_WORKERS_PER_CPU, capped by WEB_MAX_WORKERS and the connection budget
+    - The pools are sized by the same count, whether or not it has been settled yet
+
+TestMetricsDir:
+    - An unset PROMETHEUS_MULTIPROC_DIR gets a fresh directory, a set one is kept
+    - Stale metric files are removed
+
+TestShutdown:
+    - The stop handler releases the hashing pool before closing the database
+"""
+# Std Library Imports
+import os
+
+# Third Party Imports
+import pytest
+from fastapi import FastAPI
+
+from app.core import config, tasks, workers
+from app.db.tasks import get_pool_size
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestWorkerSizing:
+    async def test_cgroup_quota(self, tmp_path) -> None:
+        assert workers.cgroup_cpu_limit(str(tmp_path)) is None
+
+        (tmp_path / "cpu.max").write_text("max 100000\n")
+        assert workers.cgroup_cpu_limit(str(tmp_path)) is None
+
+        (tmp_path / "cpu.max").write_text("150000 100000\n")
+        assert workers.cgroup_cpu_limit(str(tmp_path)) == 1.5
+        assert workers.available_cpus(str(tmp_path)) <= 2
+
+        v1 = tmp_path / "v1"
+        (v1 / "cpu").mkdir(parents=True)
+        (v1 / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+        (v1 / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+        assert workers.cgroup_cpu_limit(str(v1)) is None
+        (v1 / "cpu" / "cpu.cfs_quota_us").write_text("50000\n")
+        assert workers.available_cpus(str(v1)) == 1
+
+    async def test_worker_count(self, monkeypatch) -> None:
+        monkeypatch.setattr(config, "WEB_CONCURRENCY", 0)
+        monkeypatch.setattr(config, "WEB_WORKERS_PER_CPU", 1.0)
+        monkeypatch.setattr(config, "WEB_MAX_WORKERS", 0)
+        monkeypatch.setattr(config, "DB_CONNECTION_BUDGET", 40)
+        assert workers.worker_count(cpus=8) == 8
+
+        monkeypatch.setattr(config, "WEB_WORKERS_PER_CPU", 1.5)
+        assert workers.worker_count(cpus=3) == 5
+
+        monkeypatch.setattr(config, "WEB_MAX_WORKERS", 4)
+        assert workers.worker_count(cpus=8) == 4
+
+        monkeypatch.setattr(config, "WEB_MAX_WORKERS", 0)
+        monkeypatch.setattr(config, "DB_CONNECTION_BUDGET", 6)
+        assert workers.worker_count(cpus=64) == 6
+
+        monkeypatch.setattr(config, "WEB_CONCURRENCY", 3)
+        assert workers.worker_count(cpus=64) == 3
+
+    async def test_configured_count_sizes_the_pools(self, monkeypatch) -> None:
+        monkeypatch.setattr(config, "WEB_CONCURRENCY", 0)
+        monkeypatch.setattr(config, "WEB_WORKERS_PER_CPU", 1.0)
+        monkeypatch.setattr(config, "WEB_MAX_WORKERS", 8)
+        monkeypatch.setattr(config, "DB_CONNECTION_BUDGET", 40)
+        monkeypatch.setattr(config, "DB_MAX_POOL_SIZE", 10)
+        monkeypatch.setattr(workers, "available_cpus", lambda: 64)
+        monkeypatch.setenv("WEB_CONCURRENCY", "0")
+
+        # Sized the same way before gunicorn_conf.py has settled the count
+        assert get_pool_size()[1] == 5
+        assert workers.configure_workers() == 8
+        assert os.environ["WEB_CONCURRENCY"] == "8"
+        assert get_pool_size()[1] == 5
+
+
+class TestMetricsDir:
+    async def test_prepare(self, monkeypatch, tmp_path) -> None:
+        monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+        monkeypatch.delenv("prometheus_multiproc_dir", raising=False)
+        fresh = workers.prepare_metrics_dir()
+        assert os.path.isdir(fresh) and os.listdir(fresh) == []
+        assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == fresh
+        os.rmdir(fresh)
+
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path / "metrics"))
+        assert workers.prepare_metrics_dir() == str(tmp_path / "metrics")
+        assert (tmp_path / "metrics").is_dir()
+
+    async def test_clear_removes_stale_files(self, tmp_path) -> None:
+        (tmp_path / "histogram_1.db").write_bytes(b"")
+        (tmp_path / "gauge_livesum_1.db").write_bytes(b"")
+        (tmp_path / "keep.txt").write_text("")
+
+        assert workers.clear_metrics_dir(str(tmp_path)) == 2
+        assert os.listdir(tmp_path) == ["keep.txt"]
+
+
+class FakeDatabase:
+    def __init__(self, calls: list) -> None:
+        self.calls = calls
+
+    async def disconnect(self) -> None:
+        self.calls.append("database")
+
+
+class TestShutdown:
+    async def test_database_closes_last(self, monkeypatch) -> None:
+        calls = []
+        async def async_shutdown() -> None:
+            calls.append("hashing")
+
+        monkeypatch.setattr(tasks.auth_service.hashing_pool, "async_shutdown", async_shutdown)
+        monkeypatch.setattr(tasks.profiler, "stop", lambda: calls.append("profiler"))
+        app = FastAPI()
+        app.state._db = FakeDatabase(calls)
+
+        await tasks.create_stop_app_handler(app)()
+        assert calls == ["profiler", "hashing", "database"]